@@ -0,0 +1,268 @@
+"""Bounded, prioritised scheduler for GPU generate calls.
+
+Replaces the coarse ``with orch.gen_lock:`` blocks in ``api/server.py``: only
+the model calls themselves hold a generation slot, callers queue per lane
+(``sql`` ahead of ``ask`` ahead of ``chat``), each lane has a depth limit that
+surfaces as HTTP 429, each queue wait is bounded by the lane timeout and the
+whole request by the lane deadline (a request past its deadline is refused its
+next slot).
+
+Routes run their pipeline under :meth:`GenerationScheduler.lane`; the
+orchestrator's model-bearing components are wrapped by
+:meth:`GenerationScheduler.instrument`, so each model call takes a slot on the
+bound lane and the database work between them does not.
+"""
+
+import contextvars
+import functools
+import heapq
+import inspect
+import itertools
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class SchedulerError(Exception):
+    """Base class for scheduling failures surfaced to HTTP callers."""
+
+    status_code = 503
+    error = "scheduler_error"
+
+
+class QueueFull(SchedulerError):
+    status_code = 429
+    error = "generation_queue_full"
+
+
+class QueueTimeout(SchedulerError):
+    status_code = 503
+    error = "generation_queue_timeout"
+
+
+@dataclass
+class Lane:
+    name: str
+    priority: int
+    max_depth: int
+    timeout_s: float
+    deadline_s: Optional[float] = None
+    waiting: int = 0
+    served: int = 0
+    rejected: int = 0
+    timed_out: int = 0
+
+
+@dataclass
+class Ticket:
+    lane: str
+    queue_ms: float = 0.0
+    service_ms: float = 0.0
+    calls: int = 0
+    deadline: Optional[float] = None
+    _t_enqueued: float = field(default_factory=perf_counter)
+
+    def timings(self) -> Dict[str, int]:
+        return {"queue_ms": int(self.queue_ms), "gen_ms": int(self.service_ms), "gen_calls": self.calls}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def default_lanes() -> List[Lane]:
+    """Lane configuration, overridable via GEN_QUEUE_MAX_/GEN_TIMEOUT_/GEN_DEADLINE_<LANE>."""
+
+    specs = (("sql", 0, 16, 60.0, 120.0), ("ask", 1, 16, 60.0, 180.0), ("chat", 2, 8, 120.0, 240.0))
+    return [
+        Lane(
+            name=name,
+            priority=prio,
+            max_depth=_env_int(f"GEN_QUEUE_MAX_{name.upper()}", depth),
+            timeout_s=_env_float(f"GEN_TIMEOUT_{name.upper()}", timeout),
+            deadline_s=_env_float(f"GEN_DEADLINE_{name.upper()}", deadline) or None,
+        )
+        for name, prio, depth, timeout, deadline in specs
+    ]
+
+
+class GenerationScheduler:
+    """Grant ``concurrency`` generation slots to waiters in (priority, FIFO) order."""
+
+    def __init__(
+        self,
+        lanes: Optional[List[Lane]] = None,
+        *,
+        concurrency: int = 1,
+        gpu_lock: Optional[Any] = None,
+    ) -> None:
+        self.lanes: Dict[str, Lane] = {lane.name: lane for lane in (lanes or default_lanes())}
+        self.concurrency = max(1, int(concurrency))
+        # Still taken inside a slot so code outside the API sharing the
+        # orchestrator's gen_lock stays mutually exclusive with us.
+        self.gpu_lock = gpu_lock
+        self._cond = threading.Condition()
+        self._heap: List[Tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._active = 0
+        self._bound: contextvars.ContextVar[Optional[Tuple[str, Ticket]]] = contextvars.ContextVar(
+            "gen_lane", default=None
+        )
+        self._holding: contextvars.ContextVar[bool] = contextvars.ContextVar("gen_holding", default=False)
+
+    # ------------------------------------------------------------------
+    def _acquire(self, lane: Lane, timeout_s: float) -> None:
+        with self._cond:
+            if lane.waiting >= lane.max_depth:
+                lane.rejected += 1
+                raise QueueFull(f"{lane.name} queue is full ({lane.max_depth})")
+            entry = (lane.priority, next(self._seq))
+            heapq.heappush(self._heap, entry)
+            lane.waiting += 1
+            deadline = perf_counter() + timeout_s
+            try:
+                while not (self._active < self.concurrency and self._heap[0] == entry):
+                    remaining = deadline - perf_counter()
+                    if remaining <= 0:
+                        lane.timed_out += 1
+                        self._heap.remove(entry)
+                        heapq.heapify(self._heap)
+                        self._cond.notify_all()
+                        raise QueueTimeout(f"{lane.name} waited more than {timeout_s:.0f}s")
+                    self._cond.wait(remaining)
+                heapq.heappop(self._heap)
+                self._active += 1
+            finally:
+                lane.waiting -= 1
+
+    def _release(self, lane: Lane) -> None:
+        with self._cond:
+            self._active -= 1
+            lane.served += 1
+            self._cond.notify_all()
+
+    def _ticket(self, lane: Lane, ticket: Optional[Ticket]) -> Ticket:
+        ticket = ticket or Ticket(lane=lane.name)
+        if ticket.deadline is None and lane.deadline_s:
+            ticket.deadline = ticket._t_enqueued + lane.deadline_s
+        return ticket
+
+    # ------------------------------------------------------------------
+    @contextmanager
+    def slot(self, lane_name: str, ticket: Optional[Ticket] = None, timeout_s: Optional[float] = None) -> Iterator[Ticket]:
+        """Hold one generation slot for the duration of the block."""
+
+        lane = self.lanes[lane_name]
+        ticket = self._ticket(lane, ticket)
+        t_wait = perf_counter()
+        wait_s = lane.timeout_s if timeout_s is None else timeout_s
+        if ticket.deadline is not None:
+            remaining = ticket.deadline - t_wait
+            if remaining <= 0:
+                with self._cond:
+                    lane.timed_out += 1
+                raise QueueTimeout(f"{lane.name} request exceeded its {lane.deadline_s or 0:.0f}s deadline")
+            wait_s = min(wait_s, remaining)
+        self._acquire(lane, wait_s)
+        t_start = perf_counter()
+        ticket.queue_ms += (t_start - t_wait) * 1000
+        holding = self._holding.set(True)
+        try:
+            if self.gpu_lock is not None:
+                with self.gpu_lock:
+                    yield ticket
+            else:
+                yield ticket
+        finally:
+            self._holding.reset(holding)
+            ticket.service_ms += (perf_counter() - t_start) * 1000
+            ticket.calls += 1
+            self._release(lane)
+
+    def run(self, lane_name: str, fn: Callable[..., Any], *args: Any, ticket: Optional[Ticket] = None, **kwargs: Any) -> Any:
+        """Call ``fn`` while holding a slot; timings accumulate on ``ticket``."""
+
+        with self.slot(lane_name, ticket):
+            return fn(*args, **kwargs)
+
+    @contextmanager
+    def lane(self, lane_name: str, ticket: Optional[Ticket] = None) -> Iterator[Ticket]:
+        """Bind ``lane_name`` for instrumented calls made inside the block (no slot held).
+
+        The lane deadline starts here and covers every slot taken in the block.
+        """
+
+        ticket = self._ticket(self.lanes[lane_name], ticket)
+        token = self._bound.set((lane_name, ticket))
+        try:
+            yield ticket
+        finally:
+            self._bound.reset(token)
+
+    def wrap(self, fn: Callable[..., Any]) -> Callable[..., Any]:
+        """Gate ``fn`` on the lane bound by :meth:`lane`.
+
+        Calls made with no lane bound (code outside the API, which manages
+        ``gen_lock`` itself) or while a slot is already held pass straight
+        through, so nesting never deadlocks.
+        """
+
+        @functools.wraps(fn)
+        def gated(*args: Any, **kwargs: Any) -> Any:
+            bound = self._bound.get()
+            if bound is None or self._holding.get():
+                return fn(*args, **kwargs)
+            lane_name, ticket = bound
+            with self.slot(lane_name, ticket):
+                return fn(*args, **kwargs)
+
+        gated.__gen_scheduled__ = True  # type: ignore[attr-defined]
+        return gated
+
+    def instrument(self, obj: Any, *method_names: str) -> None:
+        """Replace ``obj``'s named methods with :meth:`wrap`-ped versions (idempotent).
+
+        With no names every public method of ``obj``'s class is wrapped, so a
+        model call added to a component later is gated without being listed.
+        """
+
+        if obj is None:
+            return
+        if not method_names:
+            method_names = tuple(
+                name for name, _ in inspect.getmembers(type(obj), inspect.isfunction) if not name.startswith("_")
+            )
+        for name in method_names:
+            method = getattr(obj, name, None)
+            if callable(method) and not getattr(method, "__gen_scheduled__", False):
+                setattr(obj, name, self.wrap(method))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "active": self._active,
+                "concurrency": self.concurrency,
+                "lanes": {
+                    name: {
+                        "waiting": lane.waiting,
+                        "max_depth": lane.max_depth,
+                        "served": lane.served,
+                        "rejected": lane.rejected,
+                        "timed_out": lane.timed_out,
+                    }
+                    for name, lane in self.lanes.items()
+                },
+            }
@@ -5,6 +5,14 @@ from flask import Flask, request, jsonify
 from typing import Dict, Any
 from time import perf_counter
 
+from api.scheduler import GenerationScheduler, SchedulerError
+
+# Orchestrator components that may run a model: every public method on them
+# takes a slot on the request's lane (nested calls share the outer slot).
+GENERATION_COMPONENTS = ("chat_interface", "sql_generator", "intent_analyzer")
+# Model handles whose ``generate`` is gated too, for calls made from elsewhere.
+MODEL_HANDLES = ("generator", "sqlgen")
+
 def create_app(orchestrator) -> Flask:
     """Create Flask application"""
     app = Flask(__name__)
@@ -12,6 +20,28 @@ def create_app(orchestrator) -> Flask:
     # Store orchestrator in app config
     app.config['orchestrator'] = orchestrator
 
+    # Only the model calls hold a generation slot; everything else runs concurrently.
+    scheduler = GenerationScheduler(
+        concurrency=int(os.getenv("GEN_CONCURRENCY", "1") or 1),
+        gpu_lock=getattr(orchestrator, "gen_lock", None),
+    )
+    app.config['gen_scheduler'] = scheduler
+
+    def _gate_generation(orch) -> None:
+        # Components may only exist after initialization; instrument() is idempotent.
+        for attr in GENERATION_COMPONENTS:
+            scheduler.instrument(getattr(orch, attr, None))
+        for attr in MODEL_HANDLES:
+            scheduler.instrument(getattr(orch, attr, None), "generate")
+
+    @app.errorhandler(SchedulerError)
+    def _scheduler_error(exc):
+        resp = jsonify({"ok": False, "error": exc.error, "message": str(exc)})
+        resp.status_code = exc.status_code
+        if exc.status_code == 429:
+            resp.headers["Retry-After"] = os.getenv("GEN_RETRY_AFTER_SECONDS", "2")
+        return resp
+
     # CORS setup - use config directly if orchestrator exists
     if orchestrator and hasattr(orchestrator, 'config'):
         cors_origins = orchestrator.config.API_CORS_ORIGINS
@@ -80,7 +110,8 @@ def create_app(orchestrator) -> Flask:
             "initialized": orch.is_initialized() if orch else False,
             "db": os.getenv("DB_NAME"),
             "chat_model": "llama-3.1-8b",
-            "sql_model": ("sqlcoder" if orch and orch.sqlgen is not None else "llama")
+            "sql_model": ("sqlcoder" if orch and orch.sqlgen is not None else "llama"),
+            "scheduler": scheduler.stats(),
         })
 
     @app.post("/ask")
@@ -104,7 +135,9 @@ def create_app(orchestrator) -> Flask:
         limit = int(limit) if str(limit or "").isdigit() else None
         allow_sensitive = bool(data.get("allow_sensitive", False)) or orch.config.ALLOW_SENSITIVE_BY_DEFAULT
 
-        with orch.gen_lock:
+        # Only the model calls inside answer_question take a slot; SQL execution does not.
+        _gate_generation(orch)
+        with scheduler.lane("ask") as ticket:
             result = orch.answer_question(q, execute=execute, limit=limit)
 
         # Check sensitive fields
@@ -118,6 +151,7 @@ def create_app(orchestrator) -> Flask:
                 }), 400
 
         result["took_ms"] = int((perf_counter() - t0) * 1000)
+        result["took_ms_breakdown"] = {**ticket.timings(), "total_ms": result["took_ms"]}
         result["used_sqlcoder"] = orch.config.ASK_USES_SQLCODER and orch.sqlgen is not None
 
         return jsonify(result)
@@ -135,13 +169,16 @@ def create_app(orchestrator) -> Flask:
         limit = int(limit) if str(limit or "").isdigit() else None
         allow_sensitive = bool(data.get("allow_sensitive", False)) or orchestrator.config.ALLOW_SENSITIVE_BY_DEFAULT
 
-        with orchestrator.gen_lock:
+        _gate_generation(orchestrator)
+        with scheduler.lane("sql") as ticket:
             analysis = orchestrator.intent_analyzer.analyze_question_intent(q)
             refined = orchestrator.chat_interface.refine_user_question(q)
 
             try:
                 sql = orchestrator.sql_generator.generate_sql_with_sqlcoder(refined, analysis)
                 used_sqlcoder = True
+            except SchedulerError:
+                raise
             except Exception as e:
                 # Fallback to Llama
                 sql = orchestrator.sql_generator.generate_intelligent_sql(
@@ -174,6 +211,7 @@ def create_app(orchestrator) -> Flask:
             cols, rows = orchestrator.db_manager.execute_sql_query(sql)
             rows_json = _json_rows(cols, rows)
 
+        took_ms = int((perf_counter() - t0) * 1000)
         return jsonify({
             "ok": True,
             "mode": "sqlcoder" if used_sqlcoder else "fallback_llama",
@@ -181,11 +219,13 @@ def create_app(orchestrator) -> Flask:
             "analysis": analysis,
             "columns": cols,
             "rows": rows_json,
-            "took_ms": int((perf_counter() - t0) * 1000),
+            "took_ms": took_ms,
+            "took_ms_breakdown": {**ticket.timings(), "total_ms": took_ms},
         })
 
     @app.post("/chat")
     def chat_endpoint():
+        t0 = perf_counter()
         data = request.get_json(force=True, silent=False) or {}
         q = (data.get("q") or "").strip()
         if not q:
@@ -194,11 +234,19 @@ def create_app(orchestrator) -> Flask:
         if orchestrator.generator is None or orchestrator.tokenizer is None:
             return jsonify({"ok": False, "error": "chat_model_unavailable"}), 503
 
-        with orchestrator.gen_lock:
-            system_msg = "You are a helpful assistant for HCM. Be concise and accurate."
+        _gate_generation(orchestrator)
+        system_msg = "You are a helpful assistant for HCM. Be concise and accurate."
+        with scheduler.lane("chat") as ticket:
             answer = orchestrator.chat_interface.generate_chat_response(system_msg, q)
 
-        return jsonify({"ok": True, "mode": "chat", "answer": answer})
+        took_ms = int((perf_counter() - t0) * 1000)
+        return jsonify({
+            "ok": True,
+            "mode": "chat",
+            "answer": answer,
+            "took_ms": took_ms,
+            "took_ms_breakdown": {**ticket.timings(), "total_ms": took_ms},
+        })
 
     return app
 
@@ -235,13 +283,18 @@ def run_api_server(app: Flask, config):
 
 def _json_rows(columns, rows):
     """Convert rows to JSON-safe format"""
+    columns = list(columns)
+    # Decode bytes only in the columns that actually hold them.
+    binary = set()
+    for r in rows:
+        binary.update(i for i, v in enumerate(r) if isinstance(v, (bytes, bytearray)))
+    if not binary:
+        return [dict(zip(columns, r)) for r in rows]
     out = []
     for r in rows:
-        item = {}
-        for i, c in enumerate(columns):
-            v = r[i]
-            if isinstance(v, (bytes, bytearray)):
-                v = v.decode("utf-8", "ignore")
-            item[c] = v
-        out.append(item)
+        values = list(r)
+        for i in binary:
+            if isinstance(values[i], (bytes, bytearray)):
+                values[i] = values[i].decode("utf-8", "ignore")
+        out.append(dict(zip(columns, values)))
     return out
\ No newline at end of file
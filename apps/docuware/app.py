@@ -140,7 +140,7 @@ def answer():
         return jsonify(payload)
 
     engine = pipe.ds.engine(datasource)
-    result = run_sql(engine, plan.sql)
+    result = run_sql(engine, plan.sql, settings=getattr(pipe, "settings", None))
     response = {
         "inquiry_id": inquiry_id,
         "status": "answered" if result.ok else "failed",
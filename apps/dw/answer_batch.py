@@ -0,0 +1,305 @@
+"""Shared state for ``/dw/answer/batch``.
+
+A batch answers many questions through the regular ``/dw/answer`` planner,
+but the expensive per-request work is done once for the whole batch:
+
+* settings are read through a :class:`SettingsSnapshot`, so each key is
+  fetched from ``mem_settings`` at most once;
+* persisted ``dw_rules`` rows for every question are loaded in one query
+  (:func:`prefetch_rules`);
+* generated SQL goes through :meth:`BatchContext.execute`. Identical
+  ``(sql, binds)`` pairs run once, and distinct statements run on a bounded
+  pool, so the batch holds at most ``db_workers`` Oracle connections.
+
+The planner finds the active batch through :func:`current_batch`. Outside a
+batch it returns ``None`` and ``/dw/answer`` behaves exactly as before.
+"""
+from __future__ import annotations
+
+import contextvars
+import copy
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+_CURRENT: contextvars.ContextVar[Optional["BatchContext"]] = contextvars.ContextVar(
+    "dw_answer_batch", default=None
+)
+
+DEFAULT_MAX_ITEMS = 100
+DEFAULT_WORKERS = 8
+DEFAULT_DB_WORKERS = 4
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        value = int(str(os.getenv(name, "")).strip() or default)
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+def batch_limits() -> Dict[str, int]:
+    """``DW_ANSWER_BATCH_MAX`` / ``_WORKERS`` / ``_DB_WORKERS`` with defaults."""
+
+    return {
+        "max_items": _env_int("DW_ANSWER_BATCH_MAX", DEFAULT_MAX_ITEMS),
+        "workers": _env_int("DW_ANSWER_BATCH_WORKERS", DEFAULT_WORKERS),
+        "db_workers": _env_int("DW_ANSWER_BATCH_DB_WORKERS", DEFAULT_DB_WORKERS),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Settings snapshot
+# ---------------------------------------------------------------------------
+
+class SettingsSnapshot:
+    """Memoise ``settings._fetch`` so a batch reads every key once."""
+
+    def __init__(self, settings: Any) -> None:
+        self._fetch_fn = getattr(settings, "_fetch", None)
+        self._memo: Dict[Tuple[Any, ...], Any] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def fetch(self, key: str, **kwargs: Any) -> Any:
+        memo_key = (key,) + tuple(sorted(kwargs.items()))
+        with self._lock:
+            if memo_key in self._memo:
+                self.hits += 1
+                return self._memo[memo_key]
+        value = self._fetch_fn(key, **kwargs)  # type: ignore[misc]
+        with self._lock:
+            self.misses += 1
+            self._memo.setdefault(memo_key, value)
+        return value
+
+
+def snapshot_settings(settings: Any) -> Tuple[Any, Optional[SettingsSnapshot]]:
+    """Return a copy of ``settings`` whose ``_fetch`` is memoised for the batch.
+
+    Objects without a ``_fetch`` hook (plain dicts, stubs) are returned as-is.
+    """
+
+    if settings is None or not callable(getattr(settings, "_fetch", None)):
+        return settings, None
+    snapshot = SettingsSnapshot(settings)
+    clone = copy.copy(settings)
+    clone._fetch = snapshot.fetch  # instance attribute shadows the bound method
+    return clone, snapshot
+
+
+# ---------------------------------------------------------------------------
+# Rules prefetch
+# ---------------------------------------------------------------------------
+
+_RULES_SQL = """
+    SELECT rule_kind,
+           COALESCE(rule_payload, '{}'::jsonb) AS rule_payload,
+           COALESCE(question_norm, '') AS question_norm
+      FROM dw_rules
+     WHERE enabled = TRUE
+       AND (COALESCE(question_norm, '') = '' OR question_norm IN :qnorms)
+     ORDER BY id ASC
+"""
+
+
+def prefetch_rules(session_factory: Callable[[], Any], qnorms: Sequence[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Load enabled ``dw_rules`` for all ``qnorms`` in one query.
+
+    Returns ``{qnorm: rows}`` where each row list keeps ``id`` order and
+    includes the global (empty ``question_norm``) rules, matching what the
+    per-question loader in ``/dw/answer`` selects.
+    """
+
+    from sqlalchemy import bindparam, text
+
+    wanted = sorted({q for q in qnorms if q})
+    if not wanted:
+        return {}
+    stmt = text(_RULES_SQL).bindparams(bindparam("qnorms", expanding=True))
+    with session_factory() as session:
+        rows = session.execute(stmt, {"qnorms": wanted}).mappings().all()
+    by_q: Dict[str, List[Dict[str, Any]]] = {q: [] for q in wanted}
+    for row in rows:
+        entry = {"rule_kind": row.get("rule_kind"), "rule_payload": row.get("rule_payload")}
+        target = row.get("question_norm") or ""
+        for qnorm in ([target] if target else wanted):
+            if qnorm in by_q:
+                by_q[qnorm].append(entry)
+    return by_q
+
+
+# ---------------------------------------------------------------------------
+# Batch context
+# ---------------------------------------------------------------------------
+
+def _sql_key(sql: str, binds: Optional[Mapping[str, Any]]) -> str:
+    return json.dumps([" ".join(str(sql or "").split()), binds or {}], sort_keys=True, default=str)
+
+
+class BatchContext:
+    """Per-batch settings snapshot, prefetched rules and shared SQL executor."""
+
+    def __init__(
+        self,
+        *,
+        settings: Any = None,
+        rules: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+        db_workers: int = DEFAULT_DB_WORKERS,
+    ) -> None:
+        self.settings, self.settings_snapshot = snapshot_settings(settings)
+        self.rules = rules
+        self.db_workers = max(1, int(db_workers))
+        self._pool = ThreadPoolExecutor(max_workers=self.db_workers, thread_name_prefix="dw-batch-sql")
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.shared_hits = 0
+
+    def rules_for(self, qnorm: str) -> Optional[List[Dict[str, Any]]]:
+        """Prefetched rule rows for ``qnorm``; ``None`` means "not prefetched, query yourself"."""
+
+        if self.rules is None or qnorm not in self.rules:
+            return None
+        return self.rules[qnorm]
+
+    def execute(
+        self,
+        sql: str,
+        binds: Optional[Mapping[str, Any]],
+        runner: Callable[[str, Dict[str, Any]], Tuple[List[Any], List[str], Dict[str, Any]]],
+    ) -> Tuple[List[Any], List[str], Dict[str, Any]]:
+        """Run ``runner(sql, binds)`` once per distinct statement on the bounded pool."""
+
+        key = _sql_key(sql, binds)
+        with self._lock:
+            future = self._inflight.get(key)
+            shared = future is not None
+            if future is None:
+                future = self._pool.submit(runner, sql, dict(binds or {}))
+                self._inflight[key] = future
+                self.executions += 1
+            else:
+                self.shared_hits += 1
+        rows, cols, meta = future.result()
+        # Callers may post-process rows in place; hand each one its own copy.
+        meta = dict(meta or {})
+        if shared:
+            meta["batch_shared"] = True
+        return [list(r) if isinstance(r, (list, tuple)) else r for r in rows], list(cols), meta
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self.settings_snapshot
+        return {
+            "distinct_sql": self.executions,
+            "shared_sql_hits": self.shared_hits,
+            "db_workers": self.db_workers,
+            "settings_fetches": snapshot.misses if snapshot else None,
+            "settings_cache_hits": snapshot.hits if snapshot else None,
+        }
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+
+def current_batch() -> Optional[BatchContext]:
+    return _CURRENT.get()
+
+
+@contextmanager
+def activate(ctx: BatchContext) -> Iterator[BatchContext]:
+    token = _CURRENT.set(ctx)
+    try:
+        yield ctx
+    finally:
+        _CURRENT.reset(token)
+
+
+# ---------------------------------------------------------------------------
+# Item fan-out
+# ---------------------------------------------------------------------------
+
+def normalize_items(payload: Mapping[str, Any]) -> List[Dict[str, Any]]:
+    """Expand ``{"questions": [...], <shared keys>}`` into per-item ``/dw/answer`` payloads.
+
+    Each entry is either a question string or an object with its own
+    ``question`` (and optional overrides); top-level keys other than
+    ``questions``/``stream`` are shared defaults.
+    """
+
+    shared = {k: v for k, v in payload.items() if k not in {"questions", "items", "stream"}}
+    raw = payload.get("questions")
+    if raw is None:
+        raw = payload.get("items")
+    if not isinstance(raw, list):
+        raise ValueError("questions must be a list")
+    items: List[Dict[str, Any]] = []
+    for entry in raw:
+        if isinstance(entry, str):
+            item = dict(shared, question=entry)
+        elif isinstance(entry, Mapping):
+            item = dict(shared)
+            item.update(entry)
+        else:
+            raise ValueError("each question must be a string or an object")
+        item["question"] = str(item.get("question") or "").strip()
+        items.append(item)
+    return items
+
+
+def run_items(
+    items: Sequence[Dict[str, Any]],
+    answer_fn: Callable[[Dict[str, Any]], Tuple[int, Dict[str, Any]]],
+    ctx: BatchContext,
+    *,
+    workers: int = DEFAULT_WORKERS,
+) -> Iterator[Dict[str, Any]]:
+    """Answer ``items`` concurrently; yield one result dict per item as it completes.
+
+    ``answer_fn(payload) -> (status, body)`` runs inside ``ctx`` so the planner
+    sees the shared snapshot and executor.
+    """
+
+    def _one(index: int, item: Dict[str, Any]) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        try:
+            with activate(ctx):
+                status, body = answer_fn(item)
+        except Exception as exc:
+            status, body = 500, {"ok": False, "error": str(exc)}
+        return {
+            "index": index,
+            "question": item.get("question"),
+            "status": status,
+            "elapsed_ms": round((time.perf_counter() - t0) * 1000, 1),
+            "response": body,
+        }
+
+    if not items:
+        return
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(items))), thread_name_prefix="dw-batch") as pool:
+        futures = [
+            pool.submit(contextvars.copy_context().run, _one, index, item)
+            for index, item in enumerate(items)
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+__all__ = [
+    "BatchContext",
+    "SettingsSnapshot",
+    "activate",
+    "batch_limits",
+    "current_batch",
+    "normalize_items",
+    "prefetch_rules",
+    "run_items",
+    "snapshot_settings",
+]
@@ -1,17 +1,18 @@
 """DocuWare DW blueprint backed by a deterministic contract planner."""
 from __future__ import annotations
 
-import copy
 import json
 import os
 import csv
 import logging
 import re
+import threading
 import time
 from dataclasses import dataclass
 from collections import OrderedDict
 from os import getenv
 from datetime import date, datetime, timedelta
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 try:  # Ensure emoji compatibility for recognizers-text
@@ -105,6 +106,13 @@ try:
 except Exception:  # pragma: no cover - fallback when learning module unavailable
     _merge_or_prefer_question = None
 from apps.dw.explain import build_explain
+from apps.dw.nlp.lexer import COMPARATOR, lex, phrases_present
+from apps.dw.answer_batch import current_batch
+from apps.dw import row_limit
+from apps.dw.projection import project_select
+from core import cost_guard, fast_json
+from core.frozen import FrozenDict, freeze, thaw_shallow
+from core.singleflight import canonical_key, engine_scope, get_flight, singleflight_stats
 from .contracts.fts import extract_fts_terms, build_fts_where_groups
 from .contracts.filters import parse_explicit_filters
 from .contracts.contract_planner import plan_contract_query
@@ -137,54 +145,6 @@ def _ensure_exports_dir() -> str:
         os.makedirs(path, exist_ok=True)
     except Exception:
         pass
-
-    # Unconditional alias assignment capture (e.g., DEPARTMENTS = X), independent of inline parser
-    try:
-        alias_map3_raw = _get_namespace_mapping(settings, namespace, "DW_EQ_ALIAS_COLUMNS", {}) or {}
-        alias_map3: Dict[str, List[str]] = {}
-        if isinstance(alias_map3_raw, dict):
-            for k, cols in alias_map3_raw.items():
-                if not isinstance(cols, (list, tuple, set)):
-                    continue
-                bucket: List[str] = []
-                seen3: set[str] = set()
-                for c in cols:
-                    s3 = str(c or "").strip().upper()
-                    if s3 and s3 not in seen3:
-                        seen3.add(s3)
-                        bucket.append(s3)
-                if bucket:
-                    alias_map3[str(k or "").strip().upper()] = bucket
-        if not alias_map3:
-            # conservative defaults when mapping is unavailable
-            targets = [
-                "DEPARTMENT_1","DEPARTMENT_2","DEPARTMENT_3","DEPARTMENT_4",
-                "DEPARTMENT_5","DEPARTMENT_6","DEPARTMENT_7","DEPARTMENT_8",
-                "OWNER_DEPARTMENT",
-            ]
-            alias_map3 = {"DEPARTMENTS": targets, "DEPARTMENT": targets}
-        alias_keys3 = list(alias_map3.keys())
-        if alias_keys3:
-            import re as _re
-            alias_pat3 = r"(?:" + "|".join(_re.escape(a) for a in alias_keys3) + r")"
-            rx3 = _re.compile(rf"(?i)\b({alias_pat3})\s*=\s*([^\n\r;]+)")
-            found3: List[tuple[str,str]] = []
-            for m in rx3.finditer(question or ""):
-                kk = (m.group(1) or "").strip().upper()
-                vv = (m.group(2) or "").strip().strip("'\"")
-                if kk and vv:
-                    found3.append((kk, vv))
-            if found3:
-                eq3 = online_intent.setdefault("eq_filters", [])
-                # avoid duplicates
-                present = {(str(it[0]).upper(), tuple(it[1]) if isinstance(it, (list,tuple)) and len(it)==2 and isinstance(it[1], (list,tuple)) else None) for it in eq3 if isinstance(it,(list,tuple))}
-                for kkey, vval in found3:
-                    candidate = (kkey, (vval,))
-                    if candidate not in present:
-                        eq3.append([kkey, [vval]])
-                _expand_eq_aliases_with_map(online_intent, alias_map3)
-    except Exception:
-        pass
     return path
 
 def _export_rows_to_csv(rows, columns, *, inquiry_id=None):
@@ -602,6 +562,22 @@ def _respond(payload: Dict[str, Any], response: Dict[str, Any]):
     except Exception:
         pass
 
+    # Optional payload metrics (DW_PAYLOAD_METRICS=1): size and encode time of the result rows.
+    if _bool_env("DW_PAYLOAD_METRICS", False) and isinstance(response.get("rows"), list):
+        try:
+            t_ser = time.perf_counter()
+            encoded = json.dumps(response["rows"], default=str)
+            payload_meta = {
+                "columns": len(response.get("columns") or []),
+                "rows_json_bytes": len(encoded.encode("utf-8")),
+                "rows_json_ms": round((time.perf_counter() - t_ser) * 1000, 2),
+            }
+            if meta.get("export_csv"):
+                payload_meta["csv_bytes"] = os.path.getsize(meta["export_csv"])
+            meta["payload"] = payload_meta
+        except Exception:
+            pass
+
     debug_section = response.setdefault("debug", {}) if isinstance(response, dict) else {}
     precomputed_boolean_debug = None
     if isinstance(debug_section, dict):
@@ -614,7 +590,7 @@ def _respond(payload: Dict[str, Any], response: Dict[str, Any]):
         engine_value: Optional[str] = None
         raw_engine: Any = None
         try:
-            settings_obj = get_settings()
+            settings_obj = _planner_settings()
         except Exception:  # pragma: no cover - defensive fallback
             settings_obj = None
         if isinstance(settings_obj, dict):
@@ -710,7 +686,29 @@ def _respond(payload: Dict[str, Any], response: Dict[str, Any]):
     except Exception:
         pass
 
-    return jsonify(response)
+    return _encode_response(payload, response)
+
+
+def _encode_response(payload: Dict[str, Any], response: Dict[str, Any]):
+    """Serialise an answer; ``format: "columnar"`` / ``DW_FAST_JSON=1`` take the fast path.
+
+    The fast path encodes with ``core.fast_json`` (orjson when installed, ISO
+    dates, numeric Decimals) and compresses per ``Accept-Encoding``. Batch
+    items stay plain dicts for ``/dw/answer/batch`` to collect.
+    """
+
+    want_columnar = str((payload or {}).get("format") or "").strip().lower() == "columnar"
+    if want_columnar and isinstance(response.get("rows"), list) and isinstance(response.get("columns"), list):
+        table = fast_json.columnar(response["columns"], response.pop("rows"))
+        response["columns"] = table["columns"]
+        response["data"] = table["data"]
+        response["format"] = "columnar"
+    if current_batch() is not None or not (want_columnar or _bool_env("DW_FAST_JSON", False)):
+        return jsonify(response)
+    from flask import Response
+
+    body, headers = fast_json.encode_body(response, request.headers.get("Accept-Encoding"))
+    return Response(body, mimetype="application/json", headers=headers)
 
 
 def _ensure_engine():
@@ -836,6 +834,96 @@ def _execute_oracle(sql: str, binds: Dict[str, Any]):
     engine = _ensure_engine()
     if engine is None:
         return [], [], {"rows": 0}
+    # Settings need the app context, so resolve the guard policy here on the
+    # request thread; batch runners execute on plain pool threads.
+    guard_policy = cost_guard.load_policy(_get_settings())
+    timeout_ms = guard_policy.timeout_ms
+    sql, binds, limit_meta = _plan_row_limit(engine, sql, binds, timeout_ms=timeout_ms)
+    sql, guard_meta = _guard_oracle_sql(engine, sql, guard_policy)
+    batch = current_batch()
+    if batch is not None:
+        # /dw/answer/batch: identical statements run once on the batch's bounded pool.
+        rows, cols, meta = batch.execute(
+            sql, binds, lambda s, b: _run_oracle_coalesced(engine, s, b, timeout_ms=timeout_ms)
+        )
+    else:
+        rows, cols, meta = _run_oracle_coalesced(engine, sql, binds, timeout_ms=timeout_ms)
+    if limit_meta:
+        meta = row_limit.finalize({**meta, **limit_meta}, len(rows))
+    if guard_meta:
+        meta = {**meta, "cost_guard": guard_meta}
+    return rows, cols, meta
+
+
+def _guard_oracle_sql(engine: Any, sql: str, policy: cost_guard.GuardPolicy):
+    """EXPLAIN-based cost guard (``DW_COST_GUARD_MODE``); raises ``CostGuardRejected``."""
+
+    if not policy.enabled:
+        return sql, {}
+    decision = cost_guard.check(sql, engine.connect, policy, scope=engine_scope(engine))
+    if decision.action != "allow":
+        LOGGER.info("[dw] cost_guard %s: %s", decision.action, decision.reason)
+    return cost_guard.enforce(decision), decision.meta()
+
+
+def _plan_row_limit(engine: Any, sql: str, binds: Dict[str, Any], *, timeout_ms: int = 0):
+    """Size unbounded SELECTs first and page them (``DW_ROW_LIMIT_MODE``)."""
+
+    policy = row_limit.load_policy(_get_settings())
+    cursor = row_limit.current_cursor()
+    if not policy.enabled and not cursor:
+        return sql, binds, {}
+
+    def _count(count_sql: str, count_binds: Dict[str, Any]) -> int:
+        rows, _, _ = _run_oracle_coalesced(engine, count_sql, count_binds, timeout_ms=timeout_ms)
+        return int(rows[0][0]) if rows and rows[0] else 0
+
+    def _estimate(plain_sql: str) -> Optional[int]:
+        try:
+            with engine.connect() as cx:  # type: ignore[union-attr]
+                return row_limit.explain_cardinality(cx, plain_sql)
+        except Exception as exc:
+            LOGGER.info("[dw] row_limit explain failed, counting instead: %s", exc)
+            return None
+
+    return row_limit.plan(sql, binds, policy, count_fn=_count, estimate_fn=_estimate, cursor=cursor)
+
+
+def _project_answer_sql(sql: str, question: str, namespace: str, payload: Dict[str, Any]):
+    """Replace row-level ``SELECT *`` with the namespace projection (``DW_DISPLAY_COLUMNS``)."""
+
+    try:
+        return project_select(
+            sql,
+            settings=_get_settings(),
+            namespace=namespace,
+            question=question,
+            select_all=bool((payload or {}).get("select_all")),
+        )
+    except Exception as exc:
+        LOGGER.info("[dw] projection skipped: %s", exc)
+        return sql, {}
+
+
+def _copy_oracle_result(result):
+    rows, cols, meta = result
+    return [list(r) for r in rows], list(cols), dict(meta)
+
+
+def _run_oracle_coalesced(engine: Any, sql: str, binds: Dict[str, Any], *, timeout_ms: int = 0):
+    """Concurrent identical statements (same engine, SQL and binds) share one execution."""
+
+    key = canonical_key(sql, binds, scope=engine_scope(engine))
+    result, shared = get_flight("dw.oracle").do(
+        key, lambda: _run_oracle(engine, sql, binds, timeout_ms=timeout_ms), copy=_copy_oracle_result
+    )
+    if shared:
+        result[2]["coalesced"] = True
+    return result
+
+
+def _run_oracle(engine: Any, sql: str, binds: Dict[str, Any], *, timeout_ms: int = 0):
+    """Execute on ``engine``; no settings/app-context access, it may run on a pool thread."""
     # Normalize bind types first (prevents ORA-01861 and removes malformed try/except)
     safe_binds = _coerce_bind_dates(_coerce_oracle_binds(binds or {}))
     # Guard: collapse duplicate ASC/DESC tokens in ORDER BY
@@ -843,11 +931,13 @@ def _execute_oracle(sql: str, binds: Dict[str, Any]):
         sql = _normalize_order_by_directions(sql)
     except Exception:
         pass
+    t_exec = time.time()
     with engine.connect() as cx:  # type: ignore[union-attr]
-        rs = cx.execute(text(sql), safe_binds)
-        cols = list(rs.keys()) if hasattr(rs, "keys") else []
-        rows = [list(r) for r in rs.fetchall()]
-    return rows, cols, {"rows": len(rows)}
+        with cost_guard.call_timeout(cx, timeout_ms):
+            rs = cx.execute(text(sql), safe_binds)
+            cols = list(rs.keys()) if hasattr(rs, "keys") else []
+            rows = [list(r) for r in rs.fetchall()]
+    return rows, cols, {"rows": len(rows), "exec_ms": int((time.time() - t_exec) * 1000)}
 
 
 def _normalize_order_by_directions(sql: str) -> str:
@@ -1002,7 +1092,10 @@ class IntentPipelineConfig:
 
 
 _INTENT_CACHE_MAX = 256
-_INTENT_CACHE: OrderedDict[Any, Dict[str, Any]] = OrderedDict()
+# Entries are frozen: hits are returned without copying and may be shared
+# across threads; callers that edit an intent take a thaw_shallow() copy.
+_INTENT_CACHE: OrderedDict[Any, FrozenDict] = OrderedDict()
+_INTENT_CACHE_LOCK = threading.Lock()
 
 
 def _resolve_intent_pipeline_config() -> IntentPipelineConfig:
@@ -1029,20 +1122,23 @@ def _resolve_intent_pipeline_config() -> IntentPipelineConfig:
     )
 
 
-def _intent_cache_get(key: Any) -> Optional[Dict[str, Any]]:
-    cached = _INTENT_CACHE.get(key)
-    if cached is None:
-        return None
-    _INTENT_CACHE.move_to_end(key)
-    return copy.deepcopy(cached)
+def _intent_cache_get(key: Any) -> Optional[FrozenDict]:
+    with _INTENT_CACHE_LOCK:
+        cached = _INTENT_CACHE.get(key)
+        if cached is not None:
+            _INTENT_CACHE.move_to_end(key)
+        return cached
 
 
-def _intent_cache_put(key: Any, value: Dict[str, Any]) -> None:
-    if key in _INTENT_CACHE:
-        _INTENT_CACHE.move_to_end(key)
-    _INTENT_CACHE[key] = copy.deepcopy(value)
-    while len(_INTENT_CACHE) > _INTENT_CACHE_MAX:
-        _INTENT_CACHE.popitem(last=False)
+def _intent_cache_put(key: Any, value: Dict[str, Any]) -> FrozenDict:
+    frozen = freeze(value)
+    with _INTENT_CACHE_LOCK:
+        if key in _INTENT_CACHE:
+            _INTENT_CACHE.move_to_end(key)
+        _INTENT_CACHE[key] = frozen
+        while len(_INTENT_CACHE) > _INTENT_CACHE_MAX:
+            _INTENT_CACHE.popitem(last=False)
+    return frozen
 
 
 def _filter_fts_groups(groups: Optional[List[List[str]]], *, min_length: int = 2) -> List[List[str]]:
@@ -1137,6 +1233,19 @@ def _normalize_numbers_with_recognizers(text: str) -> str:
     return updated
 
 
+def _is_word_bounded(key: str) -> bool:
+    return bool(key) and (key[0].isalnum() or key[0] == "_") and (key[-1].isalnum() or key[-1] == "_")
+
+
+@lru_cache(maxsize=512)
+def _alias_value_patterns(key: str, stop_lookahead: str) -> Tuple[re.Pattern, re.Pattern]:
+    escaped = re.escape(key)
+    return (
+        re.compile(rf"(?i)\b{escaped}\b\s*=\s*([^\n\r;]+?){stop_lookahead}"),
+        re.compile(rf"(?i)\b{escaped}\b\s+(?:has|contains)\s+([^\n\r;]+?){stop_lookahead}"),
+    )
+
+
 def _augment_light_intent_with_aliases(
     question: str,
     light_intent: dict,
@@ -1171,6 +1280,9 @@ def _augment_light_intent_with_aliases(
             continue
         column_tokens_lower.append(token.lower())
     comparison_tokens_lower = [mk.lower() for mk in comparison_markers or []]
+    # One automaton pass tells which aliases occur at all; only those get the
+    # per-alias value patterns below.
+    present = phrases_present(q, [k for k in alias_keys if isinstance(k, str)])
 
     def _strip_trailing_clause(text: str) -> str:
         if not text:
@@ -1205,14 +1317,12 @@ def _augment_light_intent_with_aliases(
                         return True
                 return False
 
+            if alias_norm not in present and _is_word_bounded(key):
+                continue
             if _already_has_alias():
                 continue
 
-            escaped = re.escape(key)
-            patterns = [
-                re.compile(rf"(?i)\b{escaped}\b\s*=\s*([^\n\r;]+?){stop_lookahead}"),
-                re.compile(rf"(?i)\b{escaped}\b\s+(?:has|contains)\s+([^\n\r;]+?){stop_lookahead}"),
-            ]
+            patterns = _alias_value_patterns(key, stop_lookahead)
 
             captured_vals: List[str] = []
             for pat in patterns:
@@ -1256,7 +1366,7 @@ def _normalize_numeric_value(raw: str) -> Any:
 
 
 def _extract_comparison_filters(question: str, allowed_cols: Sequence[str]) -> List[Dict[str, Any]]:
-    if not question:
+    if not question or not lex(question).has(COMPARATOR):
         return []
     results: List[Dict[str, Any]] = []
     seen_spans: set[Tuple[int, int]] = set()
@@ -1264,9 +1374,12 @@ def _extract_comparison_filters(question: str, allowed_cols: Sequence[str]) -> L
     sorted_phrases = {
         op: sorted(phrases, key=len, reverse=True) for op, phrases in _COMPARISON_TEXT_SYNONYMS.items()
     }
+    # One lexer pass finds the columns named in the question; only those get
+    # the per-column comparison regexes.
+    present = phrases_present(text, [str(c or "").strip() for c in (allowed_cols or [])])
     for raw_col in (allowed_cols or []):
         col = str(raw_col or "").strip()
-        if not col:
+        if not col or col.upper() not in present:
             continue
         col_pat = re.escape(col)
         symbol_regex = re.compile(rf"(?i)\b{col_pat}\b\s*(>=|<=|==|=|>|<|≥|≤)\s*([-+]?\d+(?:\.\d+)?)")
@@ -1310,8 +1423,12 @@ def _extract_comparison_filters(question: str, allowed_cols: Sequence[str]) -> L
     return results
 
 
-def _build_light_intent_from_question(q: str, allowed_cols) -> dict:
-    """Build a lightweight intent used for signature + learning overlays."""
+def _build_light_intent_from_question(q: str, allowed_cols) -> FrozenDict:
+    """Build a lightweight intent used for signature + learning overlays.
+
+    The result is the frozen cache entry itself; use ``thaw_shallow`` before
+    editing it.
+    """
     config = _resolve_intent_pipeline_config()
     namespace = _ns()
     normalized_question = _normalize_question_text(q or "")
@@ -1329,7 +1446,7 @@ def _build_light_intent_from_question(q: str, allowed_cols) -> dict:
     if cached is not None:
         return cached
 
-    settings_obj = get_settings()
+    settings_obj = _planner_settings()
     alias_map = _get_namespace_mapping(settings_obj, namespace, "DW_EQ_ALIAS_COLUMNS", {}) or {}
 
     question_text = q or ""
@@ -1385,8 +1502,7 @@ def _build_light_intent_from_question(q: str, allowed_cols) -> dict:
     except Exception:
         pass
 
-    _intent_cache_put(cache_key, intent)
-    return intent
+    return _intent_cache_put(cache_key, intent)
 
 
 def _get_lark_parser() -> DwQuestionParser:
@@ -1795,7 +1911,7 @@ def _coalesce_rate_intent(raw: Optional[Dict[str, Any]]) -> Dict[str, Any]:
             # Build alias map via settings helper on demand (best-effort)
             alias_map_raw = {}
             try:
-                settings_obj = get_settings()
+                settings_obj = _planner_settings()
                 alias_map_raw = _get_namespace_mapping(settings_obj, _ns(), "DW_EQ_ALIAS_COLUMNS", {}) or {}
             except Exception:
                 alias_map_raw = {}
@@ -3378,12 +3494,25 @@ def _get_pipeline():
 
 
 def _get_settings():
+    batch = current_batch()
+    if batch is not None and batch.settings is not None:
+        return batch.settings
     pipeline = _get_pipeline()
     if pipeline is None:
         return None
     return getattr(pipeline, "settings", None)
 
 
+def _planner_settings():
+    """:func:`_get_settings`, falling back to the dw::common map outside a pipeline."""
+
+    try:
+        settings_obj = _get_settings()
+    except RuntimeError:  # no application context
+        settings_obj = None
+    return settings_obj if settings_obj is not None else get_settings()
+
+
 def _get_namespace_setting(settings_obj: Any, namespace: str, key: str, default: Any = None) -> Any:
     """Fetch a namespaced setting using ``get_json``/``get`` fallbacks."""
 
@@ -3701,10 +3830,20 @@ def _attempt_like_eq_fallback(
 
 @dw_bp.post("/answer")
 def answer():
+    payload = request.get_json(force=True, silent=False) or {}
+    return _answer_payload(payload)
+
+
+def _answer_payload(payload: Dict[str, Any]):
+    # ``cursor`` (from a previous response's meta.row_limit.next_cursor) selects a page.
+    with row_limit.requested_page(payload.get("cursor")):
+        return _answer_question(payload)
+
+
+def _answer_question(payload: Dict[str, Any]):
     logger = logging.getLogger("dw")
     logger.info({"event": "start question"})  # موجودة لديك بالفعل
     t0 = time.time()
-    payload = request.get_json(force=True, silent=False) or {}
     question = (payload.get("question") or "").strip()
     if not question:
         return jsonify({"ok": False, "error": "question required"}), 400
@@ -3794,25 +3933,28 @@ def answer():
     try:
         qnorm = _normalize_question_text(question)
         kinds_loaded: list[str] = []
-        rows = []
-        with get_memory_session() as s:
-            rows = (
-                s.execute(
-                    text(
-                        """
-                        SELECT rule_kind,
-                               COALESCE(rule_payload, '{}'::jsonb) AS rule_payload
-                          FROM dw_rules
-                         WHERE enabled = TRUE
-                           AND (COALESCE(question_norm, '') = '' OR question_norm = :qnorm)
-                         ORDER BY id ASC
-                        """
-                    ),
-                    {"qnorm": qnorm},
+        batch = current_batch()
+        # /dw/answer/batch prefetches the rules of every question in one query.
+        rows = batch.rules_for(qnorm) if batch is not None else None
+        if rows is None:
+            with get_memory_session() as s:
+                rows = (
+                    s.execute(
+                        text(
+                            """
+                            SELECT rule_kind,
+                                   COALESCE(rule_payload, '{}'::jsonb) AS rule_payload
+                              FROM dw_rules
+                             WHERE enabled = TRUE
+                               AND (COALESCE(question_norm, '') = '' OR question_norm = :qnorm)
+                             ORDER BY id ASC
+                            """
+                        ),
+                        {"qnorm": qnorm},
+                    )
+                    .mappings()
+                    .all()
                 )
-                .mappings()
-                .all()
-            )
         for r in rows:
             kind = (r.get("rule_kind") or "").strip().lower()
             payload = r.get("rule_payload") or {}
@@ -3943,7 +4085,10 @@ def answer():
     # Attempt signature-first when memory engine is available; fall back gracefully
     if mem_engine is not None:
         qnorm = _normalize_question_text(question)
-        light_intent = _build_light_intent_from_question(question, allowed_columns_initial)
+        # Only eq_filters is edited below; every other part stays shared with the cache.
+        light_intent = thaw_shallow(
+            _build_light_intent_from_question(question, allowed_columns_initial), "eq_filters"
+        )
         # Augment signature intent with alias-based EQ from settings (DW_EQ_ALIAS_COLUMNS)
         try:
             alias_map_raw = _get_namespace_mapping(settings, namespace, "DW_EQ_ALIAS_COLUMNS", {}) or {}
@@ -4734,6 +4879,7 @@ def answer():
         )
         if ":top_n" in contract_sql and "top_n" not in binds:
             binds["top_n"] = 10
+        contract_sql, projection_meta = _project_answer_sql(contract_sql, question, namespace, payload)
         # LOG: تنفيذ SQL للمسار الحتمي
         logger.info(
             {
@@ -4747,6 +4893,7 @@ def answer():
         )
         t_exec = time.time()
         rows, cols, exec_meta = _execute_oracle(contract_sql, binds)
+        exec_meta = {**exec_meta, **projection_meta}
         logger.info(
             {
                 "event": "answer.sql.done",
@@ -4945,6 +5092,7 @@ def answer():
             sql += " FETCH FIRST :top_n ROWS ONLY"
             explain_bits.append(f"Limited to top {int(top_n)} rows.")
 
+        sql, projection_meta = _project_answer_sql(sql, question, namespace, payload)
         LOGGER.info("[dw] explicit_filters_sql: %s", {"size": len(sql), "sql": sql})
         # LOG: تنفيذ SQL لمسار explicit_filters
         logger.info(
@@ -4958,6 +5106,7 @@ def answer():
         t_exec = time.time()
         binds = _coerce_bind_dates(binds)
         rows, cols, exec_meta = _execute_oracle(sql, binds)
+        exec_meta = {**exec_meta, **projection_meta}
         logger.info(
             {
                 "event": "answer.sql.done",
@@ -5043,7 +5192,9 @@ def answer():
     t_exec = time.time()
     sql, binds, online_meta = _apply_online_rate_hints(sql, binds or {}, online_intent)
     binds = _coerce_bind_dates(binds or {})
+    sql, projection_meta = _project_answer_sql(sql, question, namespace, payload)
     rows, cols, exec_meta = _execute_oracle(sql, binds)
+    exec_meta = {**exec_meta, **projection_meta}
     logger.info(
         {
             "event": "answer.sql.done",
@@ -5180,7 +5331,7 @@ def answer():
             response["debug"]["fts"]["error"] = error_value
         debug_section = response["debug"]
         fts_debug = debug_section.setdefault("fts", {})
-        settings_obj = get_settings()
+        settings_obj = _planner_settings()
         if hasattr(settings_obj, "get"):
             try:
                 fts_debug["engine"] = settings_obj.get("DW_FTS_ENGINE", "like")
@@ -5209,6 +5360,86 @@ def answer():
     return _respond(payload, response)
 
 
+def _answer_item(payload: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+    """Run the /dw/answer planner for one batch item and return ``(status, body)``."""
+
+    rv = _answer_payload(payload)
+    status = 200
+    if isinstance(rv, tuple):
+        rv, status = rv[0], int(rv[1])
+    if isinstance(rv, dict):
+        return status, rv
+    body = rv.get_json(silent=True) if hasattr(rv, "get_json") else None
+    return int(getattr(rv, "status_code", status) or status), body if isinstance(body, dict) else {}
+
+
+@dw_bp.post("/answer/batch")
+def answer_batch():
+    """Answer many questions in one call.
+
+    Body: ``{"questions": ["...", {"question": "...", ...}], "stream": false, <shared /dw/answer keys>}``.
+    Settings, persisted rules and identical SQL are shared across the batch;
+    with ``stream`` (or ``Accept: application/x-ndjson``) items are returned as
+    NDJSON lines in completion order, followed by a ``{"done": true}`` summary.
+    """
+
+    from flask import Response, stream_with_context
+
+    from apps.dw.answer_batch import BatchContext, batch_limits, normalize_items, prefetch_rules, run_items
+
+    payload = request.get_json(force=True, silent=True) or {}
+    limits = batch_limits()
+    try:
+        items = normalize_items(payload)
+    except ValueError as exc:
+        return jsonify({"ok": False, "error": str(exc)}), 400
+    if not items:
+        return jsonify({"ok": False, "error": "questions required"}), 400
+    if len(items) > limits["max_items"]:
+        return jsonify({"ok": False, "error": f"at most {limits['max_items']} questions per batch"}), 400
+
+    t0 = time.time()
+    rules = None
+    try:
+        rules = prefetch_rules(
+            get_memory_session,
+            [_normalize_question_text(item["question"]) for item in items if item["question"]],
+        )
+    except Exception as exc:
+        LOGGER.warning("[dw] batch rules prefetch fell back: %s", exc)
+    ctx = BatchContext(settings=_get_settings(), rules=rules, db_workers=limits["db_workers"])
+    app = current_app._get_current_object()
+
+    def _answer_in_app(item: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        if not item.get("question"):
+            return 400, {"ok": False, "error": "question required"}
+        with app.app_context():
+            return _answer_item(item)
+
+    def _summary() -> Dict[str, Any]:
+        return {"count": len(items), "duration_ms": int((time.time() - t0) * 1000), **ctx.stats()}
+
+    results = run_items(items, _answer_in_app, ctx, workers=limits["workers"])
+    accept = request.headers.get("Accept") or ""
+    if payload.get("stream") or "application/x-ndjson" in accept:
+
+        def _ndjson():
+            try:
+                for result in results:
+                    yield json.dumps(result, default=str) + "\n"
+                yield json.dumps({"done": True, "meta": _summary()}, default=str) + "\n"
+            finally:
+                ctx.close()
+
+        return Response(stream_with_context(_ndjson()), mimetype="application/x-ndjson")
+
+    try:
+        ordered = sorted(results, key=lambda r: r["index"])
+    finally:
+        ctx.close()
+    return jsonify({"ok": True, "items": ordered, "meta": _summary()})
+
+
 def create_dw_blueprint(*args, **kwargs):
     return dw_bp
 
@@ -5218,11 +5449,56 @@ def create_dw_blueprint(*args, **kwargs):
 @dw_bp.route("/admin/dw/metrics", methods=["GET"])
 def dw_metrics():
     try:
-        return jsonify({"ok": True, "metrics_24h": list_metrics_summary(24)})
+        from core.outbox import outbox_stats
+
+        return jsonify(
+            {
+                "ok": True,
+                "metrics_24h": list_metrics_summary(24),
+                "singleflight": singleflight_stats(),
+                "outbox": outbox_stats(),
+            }
+        )
+    except Exception as exc:
+        return jsonify({"ok": False, "error": str(exc)}), 500
+
+
+@dw_bp.route("/admin/dw/index_advice", methods=["GET"])
+def dw_index_advice():
+    from apps.dw.index_advisor import build_report
+    from apps.dw.learning_store import engine as mem_engine
+
+    try:
+        days = int(request.args.get("days") or 30)
+        min_queries = int(request.args.get("min_queries") or 5)
+    except ValueError:
+        return jsonify({"ok": False, "error": "days and min_queries must be integers"}), 400
+    try:
+        return jsonify({"ok": True, **build_report(mem_engine, days=days, min_queries=min_queries)})
     except Exception as exc:
         return jsonify({"ok": False, "error": str(exc)}), 500
 
 
+@dw_bp.route("/admin/dw/rollups/refresh", methods=["POST"])
+def dw_rollups_refresh():
+    """Rebuild the monthly gross rollups; ``{"since": "YYYY-MM-DD"}`` refreshes incrementally."""
+
+    from apps.dw.contracts.rollups import RollupConfig, refresh_rollups, rollup_config
+
+    payload = request.get_json(silent=True) or {}
+    engine = _ensure_engine()
+    if engine is None:
+        return jsonify({"ok": False, "error": "no_engine"}), 503
+    config = rollup_config() or RollupConfig()
+    try:
+        result = refresh_rollups(engine, config, since=payload.get("since"))
+    except ValueError as exc:
+        return jsonify({"ok": False, "error": str(exc)}), 400
+    except Exception as exc:
+        return jsonify({"ok": False, "error": str(exc)}), 500
+    return jsonify({"ok": True, **result})
+
+
 @dw_bp.route("/admin/dw/examples", methods=["GET"])
 def dw_examples():
     namespace = request.args.get("namespace") or _ns()
@@ -5302,6 +5578,11 @@ def dw_rules():
             if not rule:
                 return jsonify({"ok": False, "error": "rule_not_found"}), 404
             if action in {"approve", "activate"}:
+                from apps.dw.canary import promotion_block
+
+                block = None if payload.get("force") else promotion_block(session, rule)
+                if block is not None:
+                    return jsonify({"ok": False, "error": "canary_regressed", "canary_eval": block}), 409
                 rule.status = "active"
                 rule.approved_at = datetime.utcnow()
             elif action in {"disable", "reject"}:
@@ -5316,6 +5597,9 @@ def dw_rules():
             session.commit()
 
         rows = session.query(DWRule).order_by(DWRule.id.desc()).limit(200).all()
+        from apps.dw.canary import latest_evals
+
+        evals = latest_evals(session, [row.id for row in rows if row.status == "canary"])
         data = [
             {
                 "id": row.id,
@@ -5323,12 +5607,32 @@ def dw_rules():
                 "status": row.status,
                 "version": row.version,
                 "canary_percent": row.canary_percent,
+                "canary_eval": evals.get(row.id),
                 "created_at": row.created_at.isoformat() if row.created_at else None,
             }
             for row in rows
         ]
     return jsonify({"ok": True, "rules": data})
 
+
+@dw_bp.route("/admin/dw/rules/canary_eval", methods=["POST"])
+def dw_rules_canary_eval():
+    """Start a shadow replay of canary rules in the background (results land in dw_rules listing)."""
+
+    from apps.dw.canary import evaluate_canaries
+
+    payload = request.get_json(silent=True) or {}
+    rule_ids = [int(r) for r in payload.get("rule_ids") or [] if str(r).isdigit()]
+    namespace = payload.get("namespace")
+    worker = threading.Thread(
+        target=evaluate_canaries,
+        kwargs={"namespace": namespace, "rule_ids": rule_ids or None},
+        name="dw-canary-eval",
+        daemon=True,
+    )
+    worker.start()
+    return jsonify({"ok": True, "started": True, "rule_ids": rule_ids or None}), 202
+
 # ensure FTS engine check and default
 from apps.dw.settings import get_setting, get_settings
 
@@ -24,6 +24,7 @@ from apps.dw.settings_defaults import DEFAULT_EXPLICIT_FILTER_COLUMNS
 from apps.dw.settings_utils import load_explicit_filter_columns
 
 from .builder import build_sql
+from .contracts.rollups import rollup_config
 from .intent import NLIntent, parse_intent_legacy
 from .logs import scrub_binds
 from .rate_hints import (
@@ -166,7 +167,12 @@ def run_attempt(
     strict_hints = parse_rate_comment_strict(rate_comment)
     if rate_comment and not strict_hints.is_empty():
         intent = merge_rate_comment_hints(intent, strict_hints, allowed_columns)
-    sql, binds = build_sql(intent)
+    # Rate comments and FTS append predicates on base-table columns, so only
+    # plain questions may be answered from the monthly rollup.
+    rollup = None
+    if not (rate_comment and rate_comment.strip()) and not intent.full_text_search:
+        rollup = rollup_config({"DW_GROSS_ROLLUP": _unwrap_setting(_settings_get("DW_GROSS_ROLLUP"), None)})
+    sql, binds = build_sql(intent, rollup=rollup)
 
     fts_meta: Dict[str, Any] = {
         "enabled": bool(intent.full_text_search),
@@ -286,6 +292,7 @@ def run_attempt(
             "rowcount": len(rows),
             "attempt_no": attempt_no,
             "strategy": strategy,
+            "aggregate_source": (intent.notes or {}).get("aggregate_source") or "base",
             "fts": fts_meta,
             "rate_hints": hints_meta,
         },
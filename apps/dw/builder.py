@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 import re
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from collections import defaultdict
 
 from apps.dw.filters import build_boolean_groups_where
 from apps.dw.fts import build_fts_clause
 from apps.dw.common.eq_aliases import resolve_eq_targets
+from apps.dw.contracts.rollups import RollupConfig, is_gross_measure, plan_grouped_gross
 
 from .intent import NLIntent
 from .sql_builders import window_predicate
@@ -601,7 +602,12 @@ def or_groups_clause(or_groups: List[List[Tuple[str, List[str]]]], binds: Dict[s
     return (" AND ".join(f"({g})" for g in groups_sql if g), idx)
 
 
-def build_sql(intent: NLIntent) -> Tuple[str, Dict[str, Any]]:
+def build_sql(intent: NLIntent, rollup: Optional[RollupConfig] = None) -> Tuple[str, Dict[str, Any]]:
+    """Build Contract SQL for ``intent``.
+
+    When ``rollup`` is given, grouped gross questions over a month-aligned
+    window with no other filters are answered from the monthly rollup.
+    """
     binds: Dict[str, Any] = {}
     where_clauses = []
     order_clause = ""
@@ -645,6 +651,25 @@ def build_sql(intent: NLIntent) -> Tuple[str, Dict[str, Any]]:
         gb = ", ".join(gb_cols) if gb_cols else group_by
         wants_gross = bool(intent.gross) or sort_by.upper() == "TOTAL_GROSS"
 
+        if rollup is not None and intent.explicit_dates and not eq_clause and not manual_where:
+            plan = None
+            window = {
+                "date_column": "END_DATE" if intent.expire else (intent.date_column or "OVERLAP"),
+                "date_start": binds.get("date_start"),
+                "date_end": binds.get("date_end"),
+                "sort_desc": sort_desc,
+                "top_n": intent.top_n,
+            }
+            if wants_gross:
+                plan = plan_grouped_gross(rollup, gb_cols, **window)
+            elif is_gross_measure(measure):
+                plan = plan_grouped_gross(
+                    rollup, gb_cols, measure_alias="MEASURE", with_count=False, **window
+                )
+            if plan is not None:
+                intent.notes = {**(intent.notes or {}), "aggregate_source": "rollup"}
+                return plan
+
         if wants_gross:
             gross = _gross_expr()
             sql = (
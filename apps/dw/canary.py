@@ -0,0 +1,367 @@
+"""Shadow replay of canary ``dw_rules`` before promotion.
+
+A rule in ``canary`` status is evaluated off the request path: recent
+successful questions from ``dw_runs`` are planned twice -- once as today and
+once with the rule's overrides applied -- and every question whose SQL
+changes is executed both ways (``SELECT COUNT(*)`` over the statement, so
+the full query runs but only one row comes back).  The verdict compares
+latency and row counts, not only whether the SQL still runs, so a rule that
+widens FTS or adds ``UNION ALL`` branches is caught before promotion.
+
+Verdicts (stored in ``dw_rule_canary_evals``):
+  pass         no regression among the changed questions
+  regressed    latency or row-count regression, or candidate-only errors
+  no_coverage  no replayed question changed SQL under the rule
+
+Thresholds (mem_settings or env):
+  DW_CANARY_MAX_LATENCY_RATIO=1.25   candidate/baseline total latency
+  DW_CANARY_MIN_DELTA_MS=50          mean slowdown below this is noise
+  DW_CANARY_MAX_ROW_RATIO=5          candidate rows vs baseline, per question
+  DW_CANARY_REPLAY_LIMIT=50          questions replayed per rule
+  DW_CANARY_REPLAY_HOURS=168         how far back to pick questions
+  DW_CANARY_REPEATS=2                executions per side, fastest kept
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+log = logging.getLogger("dw.canary")
+
+PlanFn = Callable[[str, Dict[str, Any]], Tuple[str, Dict[str, Any]]]
+ExecuteFn = Callable[[str, Dict[str, Any]], int]
+
+BLOCKING_VERDICTS = frozenset({"regressed"})
+
+
+@dataclass(frozen=True)
+class CanaryThresholds:
+    max_latency_ratio: float = 1.25
+    min_delta_ms: float = 50.0
+    max_row_ratio: float = 5.0
+    replay_limit: int = 50
+    replay_hours: int = 168
+    repeats: int = 2
+
+
+def load_thresholds(settings: Any = None) -> CanaryThresholds:
+    defaults = CanaryThresholds()
+    keys = {
+        "max_latency_ratio": "DW_CANARY_MAX_LATENCY_RATIO",
+        "min_delta_ms": "DW_CANARY_MIN_DELTA_MS",
+        "max_row_ratio": "DW_CANARY_MAX_ROW_RATIO",
+        "replay_limit": "DW_CANARY_REPLAY_LIMIT",
+        "replay_hours": "DW_CANARY_REPLAY_HOURS",
+        "repeats": "DW_CANARY_REPEATS",
+    }
+    values: Dict[str, Any] = {}
+    for attr, key in keys.items():
+        raw = None
+        if settings is not None:
+            try:
+                raw = settings.get(key)
+            except Exception:
+                raw = None
+        if raw in (None, ""):
+            raw = os.getenv(key)
+        if raw in (None, ""):
+            continue
+        kind = type(getattr(defaults, attr))
+        try:
+            values[attr] = kind(float(raw)) if kind is int else kind(raw)
+        except (TypeError, ValueError):
+            continue
+    return CanaryThresholds(**{**asdict(defaults), **values})
+
+
+def rule_overrides(payload: Any) -> Dict[str, Any]:
+    """Planner overrides carried by a ``DWRule.payload`` (``{"overrides": {...}}`` or the dict itself)."""
+
+    if not isinstance(payload, dict):
+        return {}
+    inner = payload.get("overrides")
+    return dict(inner) if isinstance(inner, dict) else dict(payload)
+
+
+@dataclass
+class ShadowSample:
+    question: str
+    changed: bool
+    baseline_sql: str = ""
+    candidate_sql: str = ""
+    baseline_ms: Optional[float] = None
+    candidate_ms: Optional[float] = None
+    baseline_rows: Optional[int] = None
+    candidate_rows: Optional[int] = None
+    baseline_error: Optional[str] = None
+    candidate_error: Optional[str] = None
+
+
+def _measure(execute: ExecuteFn, sql: str, binds: Dict[str, Any], repeats: int) -> Tuple[int, float]:
+    best = float("inf")
+    rows = 0
+    for _ in range(max(repeats, 1)):
+        t0 = time.perf_counter()
+        rows = int(execute(sql, binds))
+        best = min(best, (time.perf_counter() - t0) * 1000)
+    return rows, best
+
+
+def replay(
+    questions: Iterable[str],
+    plan: PlanFn,
+    execute: ExecuteFn,
+    overrides: Dict[str, Any],
+    *,
+    repeats: int = 2,
+) -> List[ShadowSample]:
+    """Plan each question with and without ``overrides``; execute both when the SQL differs."""
+
+    samples: List[ShadowSample] = []
+    for idx, question in enumerate(questions):
+        try:
+            base_sql, base_binds = plan(question, {})
+        except Exception as exc:
+            base_error = f"plan: {exc}"
+        else:
+            base_error = None
+        try:
+            cand_sql, cand_binds = plan(question, overrides)
+        except Exception as exc:
+            # Only an overrides-specific failure counts against the candidate.
+            samples.append(ShadowSample(question, True, candidate_error=f"plan: {exc}", baseline_error=base_error))
+            continue
+        if base_error is not None:
+            # The live rules cannot plan this question either; nothing to compare.
+            samples.append(ShadowSample(question, True, candidate_sql=cand_sql, baseline_error=base_error))
+            continue
+        sample = ShadowSample(question, (base_sql, base_binds) != (cand_sql, cand_binds), base_sql, cand_sql)
+        if sample.changed:
+            # Alternate which side runs first so buffer-cache warm-up does not
+            # systematically favour the second execution.
+            sides = [("baseline", base_sql, base_binds), ("candidate", cand_sql, cand_binds)]
+            for side, sql, binds in sides if idx % 2 == 0 else reversed(sides):
+                try:
+                    rows, ms = _measure(execute, sql, binds, repeats)
+                    setattr(sample, f"{side}_rows", rows)
+                    setattr(sample, f"{side}_ms", round(ms, 2))
+                except Exception as exc:
+                    setattr(sample, f"{side}_error", str(exc)[:500])
+        samples.append(sample)
+    return samples
+
+
+def summarise(samples: List[ShadowSample], thresholds: CanaryThresholds) -> Dict[str, Any]:
+    changed = [s for s in samples if s.changed]
+    candidate_only_errors = [s for s in changed if s.candidate_error and not s.baseline_error]
+    timed = [s for s in changed if s.baseline_ms is not None and s.candidate_ms is not None]
+    base_total = sum(s.baseline_ms for s in timed)
+    cand_total = sum(s.candidate_ms for s in timed)
+    ratio = (cand_total / base_total) if base_total > 0 else None
+    mean_delta = ((cand_total - base_total) / len(timed)) if timed else 0.0
+    widened = [
+        s.question
+        for s in timed
+        if s.candidate_rows is not None
+        and s.candidate_rows > thresholds.max_row_ratio * max(s.baseline_rows or 0, 1)
+    ]
+
+    reasons: List[str] = []
+    if candidate_only_errors:
+        reasons.append(f"candidate_errors:{len(candidate_only_errors)}")
+    if ratio is not None and ratio > thresholds.max_latency_ratio and mean_delta > thresholds.min_delta_ms:
+        reasons.append(f"latency_ratio:{ratio:.2f}")
+    if widened:
+        reasons.append(f"rows_widened:{len(widened)}")
+
+    if not changed:
+        verdict = "no_coverage"
+    elif reasons:
+        verdict = "regressed"
+    else:
+        verdict = "pass"
+    slowest = sorted(timed, key=lambda s: s.candidate_ms - s.baseline_ms, reverse=True)[:5]
+    return {
+        "verdict": verdict,
+        "reasons": reasons,
+        "replayed": len(samples),
+        "changed": len(changed),
+        "timed": len(timed),
+        "baseline_ms": round(base_total, 2),
+        "candidate_ms": round(cand_total, 2),
+        "latency_ratio": round(ratio, 3) if ratio is not None else None,
+        "mean_delta_ms": round(mean_delta, 2),
+        "rows_widened": widened[:10],
+        "errors": [{"question": s.question, "error": s.candidate_error} for s in candidate_only_errors[:10]],
+        "slowest": [
+            {"question": s.question, "baseline_ms": s.baseline_ms, "candidate_ms": s.candidate_ms}
+            for s in slowest
+        ],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Memory DB / warehouse glue
+# ---------------------------------------------------------------------------
+
+def contract_planner(namespace: str) -> PlanFn:
+    from apps.dw.tables.contracts import build_contract_sql
+    from apps.mem.kv import get_settings_for_namespace
+
+    settings = get_settings_for_namespace(namespace) or {}
+
+    def _plan(question: str, overrides: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        sql, binds, _meta = build_contract_sql(question, settings, overrides=overrides)
+        return sql, dict(binds or {})
+
+    return _plan
+
+
+def count_executor(engine: Any) -> ExecuteFn:
+    from sqlalchemy import text
+
+    def _execute(sql: str, binds: Dict[str, Any]) -> int:
+        stmt = sql.strip().rstrip(";")
+        with engine.connect() as conn:
+            return int(conn.execute(text(f"SELECT COUNT(*) FROM ({stmt}) canary_q"), binds).scalar() or 0)
+
+    return _execute
+
+
+def recent_questions(session: Any, namespace: str, *, hours: int, limit: int) -> List[str]:
+    import datetime as dt
+
+    from apps.dw.learning_store import DWRun
+
+    since = dt.datetime.utcnow() - dt.timedelta(hours=hours)
+    rows = (
+        session.query(DWRun.question)
+        .filter(DWRun.namespace == namespace, DWRun.ok.is_(True), DWRun.created_at >= since)
+        .filter(DWRun.question.isnot(None))
+        .order_by(DWRun.id.desc())
+        .limit(limit * 5)
+        .all()
+    )
+    seen: Dict[str, str] = {}
+    for (question,) in rows:
+        norm = " ".join(str(question).lower().split())
+        if norm and norm not in seen:
+            seen[norm] = question
+        if len(seen) >= limit:
+            break
+    return list(seen.values())
+
+
+def evaluate_rule(
+    rule: Any,
+    *,
+    session: Any,
+    plan: PlanFn,
+    execute: ExecuteFn,
+    thresholds: CanaryThresholds,
+) -> Dict[str, Any]:
+    from apps.dw.learning_store import DWRuleCanaryEval
+
+    namespace = rule.namespace or "dw::common"
+    questions = recent_questions(session, namespace, hours=thresholds.replay_hours, limit=thresholds.replay_limit)
+    samples = replay(questions, plan, execute, rule_overrides(rule.payload), repeats=thresholds.repeats)
+    summary = summarise(samples, thresholds)
+    session.add(
+        DWRuleCanaryEval(rule_id=rule.id, namespace=namespace, verdict=summary["verdict"], summary=summary)
+    )
+    session.commit()
+    log.info("canary rule %s: %s %s", rule.id, summary["verdict"], summary["reasons"])
+    return {"rule_id": rule.id, **summary}
+
+
+def evaluate_canaries(namespace: Optional[str] = None, rule_ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+    """Shadow-evaluate every canary rule (optionally filtered); returns one summary per rule."""
+
+    from apps.dw.db import get_engine
+    from apps.dw.learning_store import DWRule, SessionLocal
+    from core.settings import Settings
+
+    results: List[Dict[str, Any]] = []
+    with SessionLocal() as session:
+        query = session.query(DWRule).filter(DWRule.status == "canary")
+        if namespace:
+            query = query.filter(DWRule.namespace == namespace)
+        if rule_ids:
+            query = query.filter(DWRule.id.in_(rule_ids))
+        for rule in query.order_by(DWRule.id).all():
+            ns = rule.namespace or "dw::common"
+            try:
+                thresholds = load_thresholds(Settings(namespace=ns))
+                results.append(
+                    evaluate_rule(
+                        rule,
+                        session=session,
+                        plan=contract_planner(ns),
+                        execute=count_executor(get_engine(namespace=ns)),
+                        thresholds=thresholds,
+                    )
+                )
+            except Exception as exc:
+                session.rollback()
+                log.warning("canary rule %s evaluation failed: %s", rule.id, exc)
+                results.append({"rule_id": rule.id, "verdict": "error", "reasons": [str(exc)]})
+    return results
+
+
+def latest_evals(session: Any, rule_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    from apps.dw.learning_store import DWRuleCanaryEval
+
+    ids = [int(r) for r in rule_ids]
+    if not ids:
+        return {}
+    out: Dict[int, Dict[str, Any]] = {}
+    rows = (
+        session.query(DWRuleCanaryEval)
+        .filter(DWRuleCanaryEval.rule_id.in_(ids))
+        .order_by(DWRuleCanaryEval.id.desc())
+        .all()
+    )
+    for row in rows:
+        if row.rule_id not in out:
+            out[row.rule_id] = {
+                "verdict": row.verdict,
+                "created_at": row.created_at.isoformat() if row.created_at else None,
+                "reasons": (row.summary or {}).get("reasons", []),
+                "latency_ratio": (row.summary or {}).get("latency_ratio"),
+            }
+    return out
+
+
+def promotion_block(session: Any, rule: Any) -> Optional[Dict[str, Any]]:
+    """Latest eval if it should block promoting ``rule``; ``None`` when promotion may proceed.
+
+    With ``DW_CANARY_REQUIRE_EVAL=1`` a canary rule without any eval is blocked too.
+    """
+
+    if getattr(rule, "status", None) != "canary":
+        return None
+    latest = latest_evals(session, [rule.id]).get(rule.id)
+    if latest is None:
+        if os.getenv("DW_CANARY_REQUIRE_EVAL", "0").lower() in {"1", "true", "yes", "on"}:
+            return {"verdict": "missing", "reasons": ["no shadow evaluation recorded"]}
+        return None
+    return latest if latest["verdict"] in BLOCKING_VERDICTS else None
+
+
+__all__ = [
+    "CanaryThresholds",
+    "ShadowSample",
+    "contract_planner",
+    "count_executor",
+    "evaluate_canaries",
+    "evaluate_rule",
+    "latest_evals",
+    "load_thresholds",
+    "promotion_block",
+    "replay",
+    "rule_overrides",
+    "summarise",
+]
@@ -0,0 +1,65 @@
+# English-only comments.
+"""Pre-normalised (UPPER/TRIM) shadow columns for case-insensitive predicates.
+
+Builders wrap columns as ``UPPER(TRIM(col))`` which plain B-tree indexes cannot
+serve.  When ``DW_NORMALIZED_COLUMNS`` maps a column to a virtual column that
+is defined as ``UPPER(TRIM(col))`` (see ``apps.dw.index_advisor``), builders
+compare against that column instead so its index is usable::
+
+    DW_NORMALIZED_COLUMNS = {"ENTITY": "ENTITY_UT", "REQUEST_TYPE": "REQUEST_TYPE_UT"}
+
+Only the combined ``ci`` + ``trim`` form is substituted; other wrappings keep
+their original expression because the shadow column would change semantics.
+"""
+import re
+from typing import Any, Dict, Optional
+
+_SAFE_IDENT_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_$#]*$")
+
+
+def normalized_columns(settings: Any) -> Dict[str, str]:
+    """Return ``{COLUMN: SHADOW_COLUMN}`` from a mapping or settings object."""
+
+    if settings is None:
+        return {}
+    if isinstance(settings, dict):
+        raw = settings.get("DW_NORMALIZED_COLUMNS")
+    else:
+        getter = getattr(settings, "get", None)
+        try:
+            raw = getter("DW_NORMALIZED_COLUMNS") if callable(getter) else None
+        except Exception:
+            raw = None
+    if not isinstance(raw, dict):
+        return {}
+    mapping: Dict[str, str] = {}
+    for column, shadow in raw.items():
+        col = str(column or "").strip().strip('"').upper()
+        target = str(shadow or "").strip()
+        if col and _SAFE_IDENT_RE.match(target):
+            mapping[col] = target
+    return mapping
+
+
+def shadow_for(column: str, mapping: Optional[Dict[str, str]]) -> Optional[str]:
+    if not mapping:
+        return None
+    return mapping.get(str(column or "").strip().strip('"').upper())
+
+
+def wrap_ci_trim(column: str, *, ci: bool, trim: bool, mapping: Optional[Dict[str, str]] = None) -> str:
+    """``UPPER(TRIM(col))`` or the configured shadow column for it."""
+
+    if ci and trim:
+        shadow = shadow_for(column, mapping)
+        if shadow:
+            return shadow
+    expr = column
+    if trim:
+        expr = f"TRIM({expr})"
+    if ci:
+        expr = f"UPPER({expr})"
+    return expr
+
+
+__all__ = ["normalized_columns", "shadow_for", "wrap_ci_trim"]
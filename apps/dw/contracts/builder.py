@@ -11,11 +11,13 @@ from apps.dw.fts_utils import resolve_fts_columns
 from apps.dw.settings import get_settings
 from core.sql_utils import normalize_order_by
 from apps.dw.settings_defaults import DEFAULT_EXPLICIT_FILTER_COLUMNS
+from apps.dw.projection import project_select
 from .planner_contracts import apply_equality_aliases, apply_full_text_search
 
 from .filters import try_parse_simple_equals
 from .rules_extra import try_build_special_cases
 from .named_filters import build_named_filter_sql
+from .rollups import RollupConfig, plan_yoy_gross, rollup_config
 
 # NOTE: Keep this module strictly table-specific (Contract).
 #       Cross-table / DocuWare-generic helpers should live elsewhere.
@@ -875,10 +877,15 @@ def build_top_gross_ytd(q: str, binds: Dict[str, object] | None, top_n: int, asc
     return sql, out_binds
 
 
-def build_yoy_gross_overlap(binds: Dict[str, object] | None) -> Tuple[str, Dict[str, object]]:
+def build_yoy_gross_overlap(
+    binds: Dict[str, object] | None, rollup: Optional[RollupConfig] = None
+) -> Tuple[str, Dict[str, object]]:
     """YoY gross totals using overlap windows for current and previous periods."""
     out = dict(binds or {})
     _ensure_date_binds(out, "ds", "de", "p_ds", "p_de")
+    planned = plan_yoy_gross(rollup, out, date_column="OVERLAP")
+    if planned is not None:
+        return planned
     sql = (
         "SELECT 'CURRENT' AS PERIOD, SUM(" + gross_expr() + ") AS TOTAL_GROSS\n"
         'FROM "Contract"\n'
@@ -891,10 +898,15 @@ def build_yoy_gross_overlap(binds: Dict[str, object] | None) -> Tuple[str, Dict[
     return sql, out
 
 
-def build_yoy_gross_requested(binds: Dict[str, object] | None) -> Tuple[str, Dict[str, object]]:
+def build_yoy_gross_requested(
+    binds: Dict[str, object] | None, rollup: Optional[RollupConfig] = None
+) -> Tuple[str, Dict[str, object]]:
     """YoY gross totals using REQUEST_DATE windows for current and previous periods."""
     out = dict(binds or {})
     _ensure_date_binds(out, "ds", "de", "p_ds", "p_de")
+    planned = plan_yoy_gross(rollup, out, date_column="REQUEST_DATE")
+    if planned is not None:
+        return planned
     sql = (
         "SELECT 'CURRENT' AS PERIOD, SUM(" + gross_expr() + ") AS TOTAL_GROSS\n"
         'FROM "Contract"\n'
@@ -971,6 +983,35 @@ def build_contracts_sql(
     *,
     table: str = "Contract",
     fts_columns: Optional[List[str]] = None
+) -> Tuple[str, Dict[str, object]]:
+    """Build Contract SQL and apply the namespace column projection to row-level output."""
+    sql, binds = _build_contracts_sql(intent, table=table, fts_columns=fts_columns)
+    notes = intent.get("notes") if isinstance(intent.get("notes"), dict) else {}
+    settings_obj = intent.get("settings")
+    namespace = (
+        intent.get("namespace")
+        or notes.get("namespace")
+        or getattr(settings_obj, "namespace", None)
+        or "dw::common"
+    )
+    question = str(notes.get("q") or intent.get("raw_question") or intent.get("question") or intent.get("q") or "")
+    sql, projection_meta = project_select(
+        sql,
+        settings=settings_obj,
+        namespace=str(namespace),
+        question=question,
+        select_all=intent.get("select_all") is True,
+    )
+    if projection_meta:
+        notes["projection"] = projection_meta["projection"]["columns"]
+    return sql, binds
+
+
+def _build_contracts_sql(
+    intent: Dict,
+    *,
+    table: str = "Contract",
+    fts_columns: Optional[List[str]] = None
 ) -> Tuple[str, Dict[str, object]]:
     """
     Build Oracle SQL for the Contract table based on a normalized intent dict.
@@ -1059,12 +1100,15 @@ def build_contracts_sql(
             p_de = p_de or date(this_year - 1, 3, 31)
         binds = {"ds": ds, "de": de, "p_ds": p_ds, "p_de": p_de}
         overlap = not _REQUEST_RE.search(q_text)
+        rollup = rollup_config(_as_settings_dict(settings_obj))
         if overlap:
-            sql, out_binds = build_yoy_gross_overlap(binds)
+            sql, out_binds = build_yoy_gross_overlap(binds, rollup)
             notes["yoy"] = "overlap"
         else:
-            sql, out_binds = build_yoy_gross_requested(binds)
+            sql, out_binds = build_yoy_gross_requested(binds, rollup)
             notes["yoy"] = "request_date"
+        if rollup is not None and rollup.table in sql:
+            notes["aggregate_source"] = "rollup"
         return sql, out_binds
 
     if (
@@ -4,10 +4,7 @@ import os
 import re
 from typing import List, Tuple, Dict
 from apps.dw.lib.sql_utils import is_email, is_phone
-try:
-    from apps.dw.nlp import detect_alias_spans  # type: ignore
-except ImportError:  # pragma: no cover - optional dependency
-    detect_alias_spans = None  # type: ignore
+from apps.dw.nlp.lexer import alias_spans
 _get_setting = None
 try:  # pragma: no cover
     from apps.dw.settings import get_setting as _get_setting  # type: ignore
@@ -143,26 +140,24 @@ def _eq_alias_keys() -> List[str]:
     return keys
 
 
+_CONNECTOR_TAIL_RE = re.compile(r"(?i)\b(?:and|or)\s+$")
+_ALIAS_OPERATOR_RE = re.compile(r"(?i)\s*(?:=|\bin\b|\blike\b|\bbetween\b)")
+
+
 def _cut_tail_at_alias(s: str, eq_aliases: List[str]) -> str:
     """Cut FTS tail at first 'AND|OR <ALIAS> (=|IN|LIKE|BETWEEN)' occurrence."""
     if not s or not eq_aliases:
         return s
     use_spacy = str(os.getenv("DW_USE_SPACY_ALIASES", "")).strip().lower() in {"1", "true", "t", "yes", "on"}
-    if use_spacy and detect_alias_spans:
-        try:
-            spans = detect_alias_spans(s, eq_aliases)
-        except Exception:
-            spans = []
-        if spans:
-            for start, _, _ in spans:
-                prefix = s[:start]
-                if re.search(r"(?i)\b(and|or)\s+$", prefix):
-                    return prefix.rstrip()
-        # fall through to regex trim if no connector found
-    alias_pat = r"(?:%s)" % "|".join(map(re.escape, eq_aliases))
-    cut_rx = re.compile(rf"(?i)\b(?:and|or)\s+(?=({alias_pat})\b\s*(?:=|\bin\b|\blike\b|\bbetween\b))")
-    parts = cut_rx.split(s, maxsplit=1)
-    return parts[0] if parts else s
+    for start, end, _ in alias_spans(s, eq_aliases):
+        prefix = s[:start]
+        connector = _CONNECTOR_TAIL_RE.search(prefix)
+        if connector is None:
+            continue
+        # DW_USE_SPACY_ALIASES keeps its old meaning: cut at any "and|or <alias>".
+        if use_spacy or _ALIAS_OPERATOR_RE.match(s, end):
+            return prefix.rstrip() if use_spacy else prefix[: connector.start()]
+    return s
 
 def extract_fts_terms(question: str, force: bool = False) -> Tuple[List[List[str]], str]:
     """
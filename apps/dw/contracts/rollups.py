@@ -0,0 +1,362 @@
+"""Monthly gross/net rollups of ``"Contract"`` and an aggregate-aware planner step.
+
+Top-N, group-by and YoY gross answers otherwise evaluate the gross expression
+row by row over the whole table on every request.  When ``DW_GROSS_ROLLUP`` is
+enabled, two summary tables hold the same measures pre-computed per month:
+
+    CONTRACT_GROSS_MONTHLY(REQUEST_MONTH, START_MONTH, END_MONTH,
+                           OWNER_DEPARTMENT, ENTITY, CONTRACT_STATUS,
+                           CNT, NET, GROSS)
+    CONTRACT_GROSS_STAKEHOLDER_MONTHLY(REQUEST_MONTH, START_MONTH, END_MONTH,
+                                       OWNER_DEPARTMENT, STAKEHOLDER,
+                                       CNT, NET, GROSS)
+
+``*_MONTH`` columns are ``TRUNC(<date>, 'MM')``.  Keeping request, start and
+end months in the grain lets a month-aligned window be answered exactly for
+REQUEST_DATE/START_DATE/END_DATE ranges and for the overlap predicate of
+``sql_builders.overlap_predicate()`` (NULL-tolerant unless
+``DW_STRICT_OVERLAP``).  Windows that do not start on the first and end on the
+last day of a month return ``None`` from the planner and callers keep the
+base-table SQL.  Dates are assumed to carry no time of day,
+as elsewhere in the DW builders.
+
+Settings example::
+
+    DW_GROSS_ROLLUP = {"enabled": true, "table": "CONTRACT_GROSS_MONTHLY",
+                       "stakeholder_table": "CONTRACT_GROSS_STAKEHOLDER_MONTHLY"}
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from apps.dw import sql_builders
+from apps.dw.contracts.slot_bridge import SLOT_COUNT
+
+DEFAULT_TABLE = "CONTRACT_GROSS_MONTHLY"
+DEFAULT_STAKEHOLDER_TABLE = "CONTRACT_GROSS_STAKEHOLDER_MONTHLY"
+
+DIMENSIONS: Tuple[str, ...] = ("OWNER_DEPARTMENT", "ENTITY", "CONTRACT_STATUS")
+STAKEHOLDER_DIMENSIONS: Tuple[str, ...] = ("OWNER_DEPARTMENT", "STAKEHOLDER")
+
+_NET = "NVL(CONTRACT_VALUE_NET_OF_VAT,0)"
+_GROSS = (
+    "NVL(CONTRACT_VALUE_NET_OF_VAT,0) + CASE WHEN NVL(VAT,0) BETWEEN 0 AND 1 "
+    "THEN NVL(CONTRACT_VALUE_NET_OF_VAT,0) * NVL(VAT,0) ELSE NVL(VAT,0) END"
+)
+
+# date semantics -> rollup month column
+_MONTH_COLUMN = {
+    "REQUEST_DATE": "REQUEST_MONTH",
+    "START_DATE": "START_MONTH",
+    "END_DATE": "END_MONTH",
+}
+
+_SAFE_IDENT_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_$#]*$")
+_WS_RE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class RollupConfig:
+    table: str = DEFAULT_TABLE
+    stakeholder_table: str = DEFAULT_STAKEHOLDER_TABLE
+
+
+def rollup_config(settings: Any = None) -> Optional[RollupConfig]:
+    """Return the rollup configuration when ``DW_GROSS_ROLLUP`` is enabled.
+
+    ``settings`` may be a mapping holding ``DW_GROSS_ROLLUP``; when omitted the
+    namespace setting is read through :func:`apps.dw.settings.get_setting`.
+    """
+
+    raw: Any = None
+    if isinstance(settings, dict):
+        raw = settings.get("DW_GROSS_ROLLUP")
+    elif settings is None:
+        try:
+            from apps.dw.settings import get_setting
+
+            raw = get_setting("DW_GROSS_ROLLUP", scope="namespace")
+        except Exception:
+            raw = None
+    if isinstance(raw, bool):
+        return RollupConfig() if raw else None
+    if not isinstance(raw, dict) or not raw.get("enabled"):
+        return None
+    table = str(raw.get("table") or DEFAULT_TABLE).strip()
+    stakeholder_table = str(raw.get("stakeholder_table") or DEFAULT_STAKEHOLDER_TABLE).strip()
+    if not (_SAFE_IDENT_RE.match(table) and _SAFE_IDENT_RE.match(stakeholder_table)):
+        return None
+    return RollupConfig(table=table, stakeholder_table=stakeholder_table)
+
+
+def is_gross_measure(expr: Optional[str]) -> bool:
+    """True when ``expr`` is the canonical gross expression (whitespace-insensitive)."""
+
+    if not expr:
+        return False
+    return _WS_RE.sub("", str(expr)).upper() == _WS_RE.sub("", _GROSS).upper()
+
+
+def _as_date(value: Any) -> Optional[date]:
+    if isinstance(value, datetime):
+        if value.time() != datetime.min.time():
+            return None
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        try:
+            return date.fromisoformat(value[:10]) if len(value.strip()) == 10 else None
+        except ValueError:
+            return None
+    return None
+
+
+def month_aligned(start: Any, end: Any) -> bool:
+    """True when ``[start, end]`` covers whole calendar months only."""
+
+    ds = _as_date(start)
+    de = _as_date(end)
+    if ds is None or de is None or ds > de:
+        return False
+    return ds.day == 1 and (de + timedelta(days=1)).day == 1
+
+
+def _window_predicate(date_column: Optional[str], ds_bind: str, de_bind: str) -> str:
+    col = (date_column or "OVERLAP").upper()
+    month_col = _MONTH_COLUMN.get(col)
+    if month_col:
+        return f"{month_col} BETWEEN {ds_bind} AND {de_bind}"
+    # Mirror sql_builders.overlap_predicate(): open-ended contracts (NULL
+    # start/end) count unless DW_STRICT_OVERLAP is on.  NULL months are kept
+    # as their own rows by the refresh, so both forms are exact.
+    if sql_builders.STRICT_OVERLAP:
+        return f"(START_MONTH <= {de_bind} AND END_MONTH >= {ds_bind})"
+    return (
+        f"((START_MONTH IS NULL OR START_MONTH <= {de_bind}) "
+        f"AND (END_MONTH IS NULL OR END_MONTH >= {ds_bind}))"
+    )
+
+
+def _table_for(config: RollupConfig, group_cols: Sequence[str]) -> Optional[str]:
+    cols = {c.upper() for c in group_cols}
+    if cols <= set(DIMENSIONS):
+        return config.table
+    if cols <= set(STAKEHOLDER_DIMENSIONS):
+        return config.stakeholder_table
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Planner step
+# ---------------------------------------------------------------------------
+
+def plan_grouped_gross(
+    config: Optional[RollupConfig],
+    group_cols: Sequence[str],
+    *,
+    date_column: Optional[str],
+    date_start: Any,
+    date_end: Any,
+    sort_desc: bool = True,
+    top_n: Optional[int] = None,
+    measure_alias: str = "TOTAL_GROSS",
+    key_alias: Optional[str] = "GROUP_KEY",
+    with_count: bool = True,
+) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Grouped gross totals from the rollup, or ``None`` when it cannot answer.
+
+    Output columns mirror the base-table builders (``<group cols> AS <key_alias>``,
+    ``<measure_alias>`` and optionally ``CNT``) so callers can swap the SQL in.
+    """
+
+    if config is None or not group_cols or not month_aligned(date_start, date_end):
+        return None
+    cols = [c.strip().upper() for c in group_cols if c and c.strip()]
+    table = _table_for(config, cols)
+    if table is None:
+        return None
+
+    gb = ", ".join(cols)
+    select = f"SELECT {gb} AS {key_alias},\n" if key_alias else f"SELECT {gb},\n"
+    measures = f"       SUM(GROSS) AS {measure_alias}"
+    if with_count:
+        measures += ",\n       SUM(CNT) AS CNT"
+    where = _window_predicate(date_column, ":date_start", ":date_end")
+    if table == config.stakeholder_table:
+        where += " AND STAKEHOLDER IS NOT NULL"
+    sql = (
+        f"{select}{measures}\n"
+        f"FROM {table}\n"
+        f"WHERE {where}\n"
+        f"GROUP BY {gb}\n"
+        f"ORDER BY {measure_alias} {'DESC' if sort_desc else 'ASC'}"
+    )
+    binds: Dict[str, Any] = {"date_start": _as_date(date_start), "date_end": _as_date(date_end)}
+    if top_n:
+        binds["top_n"] = int(top_n)
+        sql += "\nFETCH FIRST :top_n ROWS ONLY"
+    return sql, binds
+
+
+def plan_yoy_gross(
+    config: Optional[RollupConfig], binds: Dict[str, Any], *, date_column: Optional[str]
+) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """CURRENT/PREVIOUS gross totals from the rollup for ``:ds..:de`` and ``:p_ds..:p_de``."""
+
+    if config is None:
+        return None
+    if not (month_aligned(binds.get("ds"), binds.get("de")) and month_aligned(binds.get("p_ds"), binds.get("p_de"))):
+        return None
+    out = dict(binds)
+    for key in ("ds", "de", "p_ds", "p_de"):
+        out[key] = _as_date(out[key])
+    sql = (
+        "SELECT 'CURRENT' AS PERIOD, SUM(GROSS) AS TOTAL_GROSS\n"
+        f"FROM {config.table}\n"
+        f"WHERE {_window_predicate(date_column, ':ds', ':de')}\n"
+        "UNION ALL\n"
+        "SELECT 'PREVIOUS' AS PERIOD, SUM(GROSS) AS TOTAL_GROSS\n"
+        f"FROM {config.table}\n"
+        f"WHERE {_window_predicate(date_column, ':p_ds', ':p_de')}"
+    )
+    return sql, out
+
+
+# ---------------------------------------------------------------------------
+# Maintenance
+# ---------------------------------------------------------------------------
+
+_MONTH_KEYS = (
+    ("REQUEST_MONTH", "TRUNC(REQUEST_DATE, 'MM')"),
+    ("START_MONTH", "TRUNC(START_DATE, 'MM')"),
+    ("END_MONTH", "TRUNC(END_DATE, 'MM')"),
+)
+
+
+def rollup_ddl(config: RollupConfig = RollupConfig()) -> List[str]:
+    """Oracle DDL for both rollups and their month indexes."""
+
+    months = "".join(f"  {name} DATE,\n" for name, _ in _MONTH_KEYS)
+    measures = "  CNT NUMBER NOT NULL,\n  NET NUMBER NOT NULL,\n  GROSS NUMBER NOT NULL\n"
+    return [
+        f"CREATE TABLE {config.table} (\n{months}"
+        + "".join(f"  {dim} NVARCHAR2(400),\n" for dim in DIMENSIONS)
+        + f"{measures})",
+        f"CREATE INDEX {config.table}_REQ_IX ON {config.table} (REQUEST_MONTH)",
+        f"CREATE INDEX {config.table}_OVL_IX ON {config.table} (END_MONTH, START_MONTH)",
+        f"CREATE TABLE {config.stakeholder_table} (\n{months}"
+        + "".join(f"  {dim} NVARCHAR2(400),\n" for dim in STAKEHOLDER_DIMENSIONS)
+        + f"{measures})",
+        f"CREATE INDEX {config.stakeholder_table}_REQ_IX ON {config.stakeholder_table} (REQUEST_MONTH)",
+        f"CREATE INDEX {config.stakeholder_table}_OVL_IX ON {config.stakeholder_table} (END_MONTH, START_MONTH)",
+    ]
+
+
+def _scope(prefix: str, since: Optional[date]) -> str:
+    if since is None:
+        return ""
+    # The same predicate on rollup month keys and on base dates selects the
+    # same contracts because :since is the first day of a month.
+    if prefix == "rollup":
+        return "REQUEST_MONTH >= :since OR END_MONTH >= :since"
+    return "REQUEST_DATE >= :since OR END_DATE >= :since"
+
+
+def refresh_statements(
+    config: RollupConfig = RollupConfig(), since: Optional[date] = None
+) -> List[Tuple[str, str]]:
+    """``(kind, sql)`` pairs rebuilding the rollups, incrementally from ``since``.
+
+    With ``since`` the months whose contracts were requested or end on/after
+    that month are deleted and recomputed; everything older stays in place.
+    """
+
+    month_select = ", ".join(f"{expr}" for _, expr in _MONTH_KEYS)
+    month_names = ", ".join(name for name, _ in _MONTH_KEYS)
+    rollup_scope = _scope("rollup", since)
+    base_scope = _scope("base", since)
+    statements: List[Tuple[str, str]] = []
+
+    for table in (config.table, config.stakeholder_table):
+        delete = f"DELETE FROM {table}"
+        if rollup_scope:
+            delete += f" WHERE {rollup_scope}"
+        statements.append(("delete", delete))
+
+    dims = ", ".join(DIMENSIONS)
+    where = f"\nWHERE {base_scope}" if base_scope else ""
+    statements.append(
+        (
+            "contract",
+            f"INSERT INTO {config.table} ({month_names}, {dims}, CNT, NET, GROSS)\n"
+            f"SELECT {month_select}, {dims},\n"
+            f"       COUNT(*), SUM({_NET}), SUM({_GROSS})\n"
+            f'FROM "Contract"{where}\n'
+            f"GROUP BY {month_select}, {dims}",
+        )
+    )
+
+    slot_where = f" AND ({base_scope})" if base_scope else ""
+    branches = "\nUNION ALL\n".join(
+        f"SELECT REQUEST_DATE, START_DATE, END_DATE, OWNER_DEPARTMENT,\n"
+        f"       CONTRACT_STAKEHOLDER_{idx} AS STAKEHOLDER, CONTRACT_VALUE_NET_OF_VAT, VAT\n"
+        '  FROM "Contract"\n'
+        f"  WHERE CONTRACT_STAKEHOLDER_{idx} IS NOT NULL{slot_where}"
+        for idx in range(1, SLOT_COUNT + 1)
+    )
+    statements.append(
+        (
+            "stakeholder",
+            f"INSERT INTO {config.stakeholder_table} ({month_names}, OWNER_DEPARTMENT, STAKEHOLDER, CNT, NET, GROSS)\n"
+            f"SELECT {month_select}, OWNER_DEPARTMENT, STAKEHOLDER,\n"
+            f"       COUNT(*), SUM({_NET}), SUM({_GROSS})\n"
+            f"FROM (\n{branches}\n) S\n"
+            f"GROUP BY {month_select}, OWNER_DEPARTMENT, STAKEHOLDER",
+        )
+    )
+    return statements
+
+
+def refresh_rollups(
+    engine: Any, config: RollupConfig = RollupConfig(), since: Any = None
+) -> Dict[str, Any]:
+    """Rebuild the rollups in one transaction; ``since`` is snapped to its month start."""
+
+    from sqlalchemy import text
+
+    since_date = _as_date(since) if since is not None else None
+    if since is not None and since_date is None:
+        raise ValueError(f"invalid since date: {since!r}")
+    if since_date is not None:
+        since_date = since_date.replace(day=1)
+    binds = {"since": since_date} if since_date is not None else {}
+    counts: Dict[str, int] = {}
+    with engine.begin() as cx:
+        for kind, stmt in refresh_statements(config, since_date):
+            result = cx.execute(text(stmt), binds)
+            if kind != "delete":
+                counts[kind] = int(getattr(result, "rowcount", 0) or 0)
+    return {
+        "tables": [config.table, config.stakeholder_table],
+        "since": since_date.isoformat() if since_date else None,
+        "rows": counts,
+    }
+
+
+__all__ = [
+    "DIMENSIONS",
+    "RollupConfig",
+    "STAKEHOLDER_DIMENSIONS",
+    "is_gross_measure",
+    "month_aligned",
+    "plan_grouped_gross",
+    "plan_yoy_gross",
+    "refresh_rollups",
+    "refresh_statements",
+    "rollup_config",
+    "rollup_ddl",
+]
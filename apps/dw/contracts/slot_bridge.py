@@ -0,0 +1,229 @@
+"""Optional unpivoted bridge for the Contract stakeholder/department slots.
+
+``"Contract"`` stores stakeholders and departments in eight positional columns
+(CONTRACT_STAKEHOLDER_1..8, DEPARTMENT_1..8).  Filters and group-bys over them
+expand into eight ORs or an eight-way ``UNION ALL`` that scans the table once
+per slot.  When ``DW_SLOT_BRIDGE`` is enabled in settings, builders target a
+denormalised bridge instead:
+
+    CONTRACT_SLOT_BRIDGE(CONTRACT_ID, SLOT_KIND, SLOT_NO, VALUE_NORM, VALUE_RAW)
+
+``VALUE_NORM`` is ``UPPER(TRIM(value))`` and is indexed with ``SLOT_KIND``;
+``VALUE_RAW`` keeps the original text so grouped answers show the same labels.
+The bridge is rebuilt by :func:`refresh_bridge` (e.g. from a scheduled job).
+Rows whose CONTRACT_ID is NULL cannot be joined and are left out.
+
+Settings example::
+
+    DW_SLOT_BRIDGE = {"enabled": true, "table": "CONTRACT_SLOT_BRIDGE"}
+"""
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_BRIDGE_TABLE = "CONTRACT_SLOT_BRIDGE"
+SLOT_COUNT = 8
+
+# SLOT_KIND -> column prefix on "Contract"
+SLOT_FAMILIES: Dict[str, str] = {
+    "STAKEHOLDER": "CONTRACT_STAKEHOLDER_",
+    "DEPARTMENT": "DEPARTMENT_",
+}
+
+_SAFE_IDENT_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_$#]*$")
+
+
+def bridge_table(settings: Any) -> Optional[str]:
+    """Return the bridge table name when ``DW_SLOT_BRIDGE`` is enabled, else ``None``."""
+
+    if settings is None:
+        return None
+    raw: Any
+    if isinstance(settings, dict):
+        raw = settings.get("DW_SLOT_BRIDGE")
+    else:
+        getter = getattr(settings, "get", None)
+        try:
+            raw = getter("DW_SLOT_BRIDGE") if callable(getter) else None
+        except Exception:
+            raw = None
+    if isinstance(raw, bool):
+        return DEFAULT_BRIDGE_TABLE if raw else None
+    if not isinstance(raw, dict) or not raw.get("enabled"):
+        return None
+    table = str(raw.get("table") or DEFAULT_BRIDGE_TABLE).strip()
+    return table if _SAFE_IDENT_RE.match(table) else None
+
+
+def slot_of(column: str) -> Optional[Tuple[str, int]]:
+    """Map ``CONTRACT_STAKEHOLDER_3`` -> ("STAKEHOLDER", 3); ``None`` for other columns."""
+
+    name = str(column or "").strip().strip('"').upper()
+    for kind, prefix in SLOT_FAMILIES.items():
+        if name.startswith(prefix):
+            suffix = name[len(prefix):]
+            if suffix.isdigit() and 1 <= int(suffix) <= SLOT_COUNT:
+                return kind, int(suffix)
+    return None
+
+
+def split_slot_columns(columns: Iterable[str]) -> Tuple[Dict[str, List[int]], List[str]]:
+    """Partition columns into ``{SLOT_KIND: [slot numbers]}`` and the remaining columns."""
+
+    slots: Dict[str, List[int]] = {}
+    rest: List[str] = []
+    for column in columns:
+        hit = slot_of(column)
+        if hit is None:
+            rest.append(column)
+            continue
+        kind, number = hit
+        if number not in slots.setdefault(kind, []):
+            slots[kind].append(number)
+    return slots, rest
+
+
+def _slot_filter(alias: str, kind: str, slot_nos: Optional[Sequence[int]]) -> str:
+    clause = f"{alias}.SLOT_KIND = '{kind}'"
+    if slot_nos and len(set(slot_nos)) < SLOT_COUNT:
+        nums = ", ".join(str(n) for n in sorted(set(slot_nos)))
+        clause += f" AND {alias}.SLOT_NO IN ({nums})"
+    return clause
+
+
+def exists_predicate(
+    table: str,
+    kind: str,
+    bind_names: Sequence[str],
+    *,
+    op: str = "in",
+    slot_nos: Optional[Sequence[int]] = None,
+    outer: str = '"Contract"',
+) -> str:
+    """Correlated EXISTS against the bridge replacing an OR across slot columns.
+
+    ``op="in"`` matches ``VALUE_NORM IN (UPPER(TRIM(:b)), ...)`` (index seek);
+    ``op="like"`` ORs ``VALUE_NORM LIKE UPPER(:b)`` over the narrow bridge rows.
+    """
+
+    if op == "like":
+        value_clause = "(" + " OR ".join(f"b.VALUE_NORM LIKE UPPER(:{name})" for name in bind_names) + ")"
+    else:
+        value_clause = "b.VALUE_NORM IN (" + ", ".join(f"UPPER(TRIM(:{name}))" for name in bind_names) + ")"
+    return (
+        f"EXISTS (SELECT 1 FROM {table} b WHERE b.CONTRACT_ID = {outer}.CONTRACT_ID "
+        f"AND {_slot_filter('b', kind, slot_nos)} AND {value_clause})"
+    )
+
+
+def slot_source_sql(
+    table: str,
+    kind: str,
+    select_template: str,
+    where: str,
+    *,
+    slots: int = SLOT_COUNT,
+) -> str:
+    """Single join replacing the per-slot ``UNION ALL`` CTE body.
+
+    ``select_template`` is the per-slot select list with ``{col}`` standing for
+    the slot column, exactly as used to build the UNION ALL branches.
+    """
+
+    slot_nos = list(range(1, max(1, min(slots, SLOT_COUNT)) + 1))
+    select_list = select_template.format(col="b.VALUE_RAW")
+    return (
+        f"SELECT {select_list}"
+        '  FROM "Contract"\n'
+        f'  JOIN {table} b ON b.CONTRACT_ID = "Contract".CONTRACT_ID AND {_slot_filter("b", kind, slot_nos)}\n'
+        f"  WHERE {where}"
+    )
+
+
+def slot_union_sql(kind: str, select_template: str, where: str, *, slots: int = SLOT_COUNT) -> str:
+    """Per-slot ``UNION ALL`` over ``"Contract"`` (the non-bridge form)."""
+
+    prefix = SLOT_FAMILIES[kind]
+    parts = [
+        f"SELECT {select_template.format(col=f'{prefix}{idx}')}"
+        '  FROM "Contract"\n'
+        f"  WHERE {where}"
+        for idx in range(1, slots + 1)
+    ]
+    return "\nUNION ALL\n".join(parts)
+
+
+def slot_cte_sql(
+    bridge: Optional[str], kind: str, select_template: str, where: str, *, slots: int = SLOT_COUNT
+) -> str:
+    if bridge:
+        return slot_source_sql(bridge, kind, select_template, where, slots=slots)
+    return slot_union_sql(kind, select_template, where, slots=slots)
+
+
+# ---------------------------------------------------------------------------
+# Maintenance
+# ---------------------------------------------------------------------------
+
+def bridge_ddl(table: str = DEFAULT_BRIDGE_TABLE) -> List[str]:
+    """Oracle DDL for the bridge and its lookup indexes."""
+
+    return [
+        f"CREATE TABLE {table} (\n"
+        "  CONTRACT_ID NVARCHAR2(100) NOT NULL,\n"
+        "  SLOT_KIND   VARCHAR2(20)   NOT NULL,\n"
+        "  SLOT_NO     NUMBER(2)      NOT NULL,\n"
+        "  VALUE_NORM  NVARCHAR2(400) NOT NULL,\n"
+        "  VALUE_RAW   NVARCHAR2(400)\n"
+        ")",
+        f"CREATE INDEX {table}_VAL_IX ON {table} (SLOT_KIND, VALUE_NORM, CONTRACT_ID)",
+        f"CREATE INDEX {table}_CID_IX ON {table} (CONTRACT_ID, SLOT_KIND)",
+    ]
+
+
+def refresh_statements(table: str = DEFAULT_BRIDGE_TABLE) -> List[str]:
+    """DELETE + INSERT statements that rebuild the bridge from ``"Contract"``."""
+
+    statements = [f"DELETE FROM {table}"]
+    for kind, prefix in SLOT_FAMILIES.items():
+        branches = [
+            f"SELECT CONTRACT_ID, '{kind}', {idx}, UPPER(TRIM({prefix}{idx})), TRIM({prefix}{idx})\n"
+            '  FROM "Contract"\n'
+            f"  WHERE CONTRACT_ID IS NOT NULL AND TRIM({prefix}{idx}) IS NOT NULL"
+            for idx in range(1, SLOT_COUNT + 1)
+        ]
+        statements.append(
+            f"INSERT INTO {table} (CONTRACT_ID, SLOT_KIND, SLOT_NO, VALUE_NORM, VALUE_RAW)\n"
+            + "\nUNION ALL\n".join(branches)
+        )
+    return statements
+
+
+def refresh_bridge(engine: Any, table: str = DEFAULT_BRIDGE_TABLE) -> Dict[str, Any]:
+    """Rebuild the bridge in one transaction; returns the inserted row counts."""
+
+    from sqlalchemy import text
+
+    counts: Dict[str, int] = {}
+    statements = refresh_statements(table)
+    with engine.begin() as cx:
+        cx.execute(text(statements[0]))
+        for kind, stmt in zip(SLOT_FAMILIES, statements[1:]):
+            result = cx.execute(text(stmt))
+            counts[kind] = int(getattr(result, "rowcount", 0) or 0)
+    return {"table": table, "rows": counts}
+
+
+__all__ = [
+    "DEFAULT_BRIDGE_TABLE",
+    "SLOT_FAMILIES",
+    "bridge_ddl",
+    "bridge_table",
+    "exists_predicate",
+    "refresh_bridge",
+    "refresh_statements",
+    "slot_cte_sql",
+    "slot_of",
+    "split_slot_columns",
+]
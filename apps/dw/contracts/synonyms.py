@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import copy
+import threading
 from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 
@@ -16,6 +18,158 @@ def _load_enum_synonyms(get_setting) -> Dict[str, dict]:
     return {}
 
 
+def _str_list(values: Any) -> List[str]:
+    if not isinstance(values, (list, tuple)):
+        return []
+    return [v for v in values if isinstance(v, str)]
+
+
+def _upper_unique(values: Any) -> Tuple[str, ...]:
+    out: List[str] = []
+    seen: set = set()
+    for raw in _str_list(values):
+        text = raw.strip().upper()
+        if text and text not in seen:
+            seen.add(text)
+            out.append(text)
+    return tuple(out)
+
+
+class CompiledEnumSynonyms:
+    """One ``DW_ENUM_SYNONYMS`` entry (``"Table.COLUMN"``) compiled for lookups.
+
+    Bucket resolution keeps the scan's precedence -- any ``equals`` match,
+    then any ``prefix``, then any ``contains``, each won by the first bucket
+    in settings order -- but ``equals`` is a dict lookup and ``prefix`` a
+    single walk of a character trie over the user value.  Each bucket's
+    ``OR`` tail and binds are rendered once.
+    """
+
+    def __init__(self, col: str, entry: Dict[str, Any]) -> None:
+        self.col = col
+        self._equals: Dict[str, str] = {}
+        self._trie: Dict[str, Any] = {}
+        self._contains: List[Tuple[str, str]] = []
+        self._tails: Dict[str, Tuple[str, Dict[str, str]]] = {}
+        # request-type style expansion: value -> (equals, prefixes, contains)
+        self._expansions: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]] = {}
+
+        for order, (name, rules) in enumerate((entry or {}).items()):
+            if not isinstance(rules, dict):
+                continue
+            equals = _str_list(rules.get("equals"))
+            prefixes = _str_list(rules.get("prefix"))
+            contains = _str_list(rules.get("contains"))
+            for value in equals:
+                self._equals.setdefault(value.upper(), name)
+            for value in prefixes:
+                node = self._trie
+                for ch in value.upper():
+                    node = node.setdefault(ch, {})
+                node.setdefault("", (order, name))
+            for value in contains:
+                self._contains.append((value.upper(), name))
+
+            pieces: List[str] = []
+            binds: Dict[str, str] = {}
+            for i, value in enumerate(v for v in equals if v):
+                pieces.append(f"UPPER({col}) = UPPER(:v_eq_{i})")
+                binds[f"v_eq_{i}"] = value
+            for j, value in enumerate(v for v in prefixes if v):
+                pieces.append(f"UPPER({col}) LIKE UPPER(:v_pref_{j})")
+                binds[f"v_pref_{j}"] = f"{value}%"
+            self._tails.setdefault(name, ("".join(" OR " + p for p in pieces), binds))
+
+            key_text = str(name).strip()
+            if key_text:
+                expansion = (
+                    _upper_unique(rules.get("equals", [])) or (key_text.upper(),),
+                    _upper_unique(rules.get("prefix", [])),
+                    _upper_unique(rules.get("contains", [])),
+                )
+                self._expansions.setdefault(key_text.upper(), expansion)
+                for value in expansion[0]:
+                    self._expansions.setdefault(value, expansion)
+
+    def resolve(self, user_value: str) -> Optional[str]:
+        """Bucket name for ``user_value`` or ``None``."""
+
+        uv_up = (user_value or "").strip().upper()
+        if not uv_up:
+            return None
+        bucket = self._equals.get(uv_up)
+        if bucket is not None:
+            return bucket
+        # Walk the value through the trie; every terminal passed is a prefix
+        # rule that matches, and the earliest bucket among them wins.
+        node = self._trie
+        best: Optional[Tuple[int, str]] = node.get("")
+        for ch in uv_up:
+            node = node.get(ch)
+            if node is None:
+                break
+            hit = node.get("")
+            if hit is not None and (best is None or hit[0] < best[0]):
+                best = hit
+        if best is not None:
+            return best[1]
+        for token, name in self._contains:
+            if token in uv_up:
+                return name
+        return None
+
+    def predicate(self, user_value: str) -> Tuple[str, dict]:
+        uv = (user_value or "").strip()
+        binds: Dict[str, object] = {"v_like": f"%{uv}%"}
+        tail = ""
+        bucket = self.resolve(uv)
+        if bucket and bucket in self._tails:
+            tail, bucket_binds = self._tails[bucket]
+            binds.update(bucket_binds)
+        return f"(UPPER({self.col}) LIKE UPPER(:v_like){tail})", binds
+
+    def expansion(self, value: str) -> Optional[Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]]:
+        """``(equals, prefixes, contains)`` (upper-cased) of the bucket named or listing ``value``."""
+
+        return self._expansions.get((value or "").strip().upper())
+
+
+# "Table.COLUMN|COL" -> (loaded entry, snapshot of it, matcher).  Loaded
+# settings are treated as immutable; a reload calls invalidate_enum_synonyms().
+_COMPILED: Dict[str, Tuple[Any, Dict[str, Any], CompiledEnumSynonyms]] = {}
+_COMPILED_LOCK = threading.Lock()
+
+
+def invalidate_enum_synonyms() -> None:
+    """Drop compiled matchers; called when settings are reloaded."""
+
+    with _COMPILED_LOCK:
+        _COMPILED.clear()
+
+
+def compiled_enum_synonyms(cfg: Dict[str, Any], key: str, col: Optional[str] = None) -> CompiledEnumSynonyms:
+    """Compiled matcher for ``cfg[key]``, rebuilt only when the synonym settings change."""
+
+    entry = cfg.get(key) if isinstance(cfg, dict) else None
+    entry = entry if isinstance(entry, dict) else {}
+    col = col or key.rsplit(".", 1)[-1]
+    slot = f"{key}|{col}"
+    cached = _COMPILED.get(slot)
+    if cached is not None:
+        loaded, snapshot, compiled = cached
+        # The same settings object is a pointer check; a freshly loaded copy
+        # of unchanged settings costs one dict comparison.
+        if entry is loaded:
+            return compiled
+        if entry == snapshot:
+            _COMPILED[slot] = (entry, snapshot, compiled)
+            return compiled
+    compiled = CompiledEnumSynonyms(col, entry)
+    with _COMPILED_LOCK:
+        _COMPILED[slot] = (entry, copy.deepcopy(entry), compiled)
+    return compiled
+
+
 def expand_enum_predicate(
     table: str, col: str, user_value: str, get_setting
 ) -> Tuple[str, dict]:
@@ -27,62 +181,7 @@ def expand_enum_predicate(
     """
 
     cfg = _load_enum_synonyms(get_setting)
-    key = f"{table}.{col}"
-    entry = cfg.get(key) or {}
-
-    uv = (user_value or "").strip()
-    uv_up = uv.upper()
-
-    bucket = None
-    for name, rules in entry.items():
-        equals_list = [s.upper() for s in rules.get("equals", []) if isinstance(s, str)]
-        if uv_up and uv_up in equals_list:
-            bucket = name
-            break
-    if bucket is None and uv_up:
-        for name, rules in entry.items():
-            for p in rules.get("prefix", []) or []:
-                if not isinstance(p, str):
-                    continue
-                if uv_up.startswith(p.upper()):
-                    bucket = name
-                    break
-            if bucket:
-                break
-    if bucket is None and uv_up:
-        for name, rules in entry.items():
-            for c in rules.get("contains", []) or []:
-                if not isinstance(c, str):
-                    continue
-                if c.upper() in uv_up:
-                    bucket = name
-                    break
-            if bucket:
-                break
-
-    binds: Dict[str, object] = {}
-    pieces: List[str] = []
-
-    pieces.append(f"UPPER({col}) LIKE UPPER(:v_like)")
-    binds["v_like"] = f"%{uv}%"
-
-    if bucket and bucket in entry:
-        rules = entry[bucket]
-        eqs = [s for s in rules.get("equals", []) if isinstance(s, str) and s]
-        prefs = [s for s in rules.get("prefix", []) if isinstance(s, str) and s]
-
-        for i, s in enumerate(eqs):
-            name = f"v_eq_{i}"
-            pieces.append(f"UPPER({col}) = UPPER(:{name})")
-            binds[name] = s
-
-        for j, p in enumerate(prefs):
-            name = f"v_pref_{j}"
-            pieces.append(f"UPPER({col}) LIKE UPPER(:{name})")
-            binds[name] = f"{p}%"
-
-    frag = "(" + " OR ".join(pieces) + ")"
-    return frag, binds
+    return compiled_enum_synonyms(cfg, f"{table}.{col}", col).predicate(user_value)
 
 DEFAULT_REQUEST_TYPE_SYNONYMS: Dict[str, List[str]] = {
     "RENEWAL": ["renew", "renewal", "renew contract", "renewed", "extension"],
@@ -0,0 +1,497 @@
+"""Shared date-window resolver for DW questions and ``/dw/rate`` comments.
+
+Three parsers grew their own regex cascades for the same phrases ("last N
+months", "YTD", explicit ranges, Arabic relative windows):
+``apps.dw.rate_dates``, ``apps.dw.rate.date_windows`` and ``apps.dw.rate_time``.
+They now all go through this module, which owns
+
+* one phrase normaliser (Arabic digits, whitespace, case),
+* the precompiled English/Arabic patterns, scanned once per phrase,
+* the calendar arithmetic (month/quarter bounds, month/year shifts), and
+* one memoised :func:`resolve` keyed by normalised phrase, reference date and
+  profile.
+
+The parsers never agreed on precedence or coverage, and callers depend on
+their answers, so each keeps its rule order as a *profile* here rather than
+being merged into a single behaviour.
+"""
+
+from __future__ import annotations
+
+import re
+from calendar import monthrange
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:  # Optional dependency used elsewhere in the DW stack
+    import dateparser  # type: ignore
+except Exception:  # pragma: no cover - optional dependency may not exist
+    dateparser = None  # type: ignore
+
+__all__ = [
+    "PROFILES",
+    "PhraseFacts",
+    "RelativeSpan",
+    "Resolution",
+    "YTD_YEAR_RE",
+    "add_months",
+    "add_years",
+    "last_full_months",
+    "last_n",
+    "month_bounds",
+    "next_n_days",
+    "normalise_phrase",
+    "parse_date_loose",
+    "parse_date_strict",
+    "quarter_bounds",
+    "resolve",
+    "scan_phrase",
+]
+
+AR_DIGITS = str.maketrans("٠١٢٣٤٥٦٧٨٩", "0123456789")
+_WS_RE = re.compile(r"\s+")
+
+# ---- Patterns ---------------------------------------------------------------
+
+_ISO = r"\d{4}-\d{2}-\d{2}"
+_LOOSE_DATE = r"\d{1,4}[^A-Za-z0-9]\d{1,2}[^A-Za-z0-9]\d{2,4}"
+_LAST_WORDS = ("last", "آخر", "الماضي", "السابق")
+
+# "last/next N <unit>" in every spelling any parser accepted; profiles filter
+# the spans they understand.
+RELATIVE_RE = re.compile(
+    r"\b(?P<dir>last|next|آخر|الماضي|السابق|القادم|التالي)\s+"
+    r"(?P<n>\d+)(?P<gap>\s*)"
+    r"(?P<unit>days?|weeks?|months?|quarters?|years?"
+    r"|يوم|أيام|اسبوع|أسبوع|أسابيع|شهر|أشهر|شهور|سنة|سنين|سنوات)\b"
+)
+EXPLICIT_COL_RE = re.compile(r"\b(REQUEST_DATE|START_DATE|END_DATE)\b", re.I)
+REQUESTED_RE = re.compile(r"\b(requested|request date|created|طلب|تم الطلب)\b")
+EXPIRING_RE = re.compile(r"\b(expiring|expires|will expire|انتهاء|ينتهي|تنتهي|انقضاء)\b")
+LAST_NEXT_QUARTER_RE = re.compile(r"\b(?:last|next|آخر|القادم|التالي)\s+(?:quarter|ربع)\b")
+
+# Explicit ranges as written in rate comments ("2024-01-01..2024-03-31").
+ISO_RANGE_RE = re.compile(rf"\b({_ISO})\s*(?:\.\.|to|-)\s*({_ISO})\b", re.I)
+DMY_RANGE_RE = re.compile(
+    r"\b(\d{1,2}/\d{1,2}/\d{4})\s*(?:\.\.|to|-)\s*(\d{1,2}/\d{1,2}/\d{4})\b", re.I
+)
+# Free-text ranges (EN/AR) with any date spelling.
+BETWEEN_RE = re.compile(
+    r"(?:between|بين)\s+(?P<d1>[^;,\n]+?)\s*"
+    r"(?:and|و|to|حتى|(?<=\s)-+(?=\s)|–+|\.\.)\s*(?P<d2>[^;,\n]+)",
+    re.I,
+)
+DOTS_RANGE_RE = re.compile(rf"(?P<d1>{_LOOSE_DATE})\s*\.\.\s*(?P<d2>.+)")
+FROM_RE = re.compile(rf"(?:from|من)\s+(?P<d1>{_LOOSE_DATE})", re.I)
+UNTIL_RE = re.compile(rf"(?:until|to|حتى|الى|إلى)\s+(?P<d2>{_LOOSE_DATE})", re.I)
+# ISO-only ranges accepted by the rate_time builder.
+ISO_BETWEEN_RE = re.compile(rf"\bbetween\s+({_ISO})\s+(?:and|-)\s+({_ISO})\b", re.I)
+ISO_FROM_RE = re.compile(rf"\bfrom\s+({_ISO})\b", re.I)
+ISO_UNTIL_RE = re.compile(rf"\b(?:until|to)\s+({_ISO})\b", re.I)
+
+THIS_MONTH_RE = re.compile(r"\b(this|current)\s+month\b")
+THIS_QUARTER_RE = re.compile(r"\b(this|current)\s+quarter\b")
+THIS_YEAR_RE = re.compile(r"\b(this|current)\s+year\b")
+LAST_QUARTER_RE = re.compile(r"\blast\s+quarter\b")
+NEXT_QUARTER_RE = re.compile(r"\bnext\s+quarter\b")
+
+YTD_YEAR_RE = re.compile(
+    r"(?:\b(?:ytd|year\s*to\s*date)\s*(\d{4})\b)|(?:\b(\d{4})\s*(?:ytd|year\s*to\s*date)\b)",
+    re.IGNORECASE,
+)
+
+WINDOW_KEYWORDS = {
+    "last month": "LAST_MONTH",
+    "this month": "THIS_MONTH",
+    "last quarter": "LAST_QUARTER",
+    "this quarter": "THIS_QUARTER",
+    "quarter to date": "QTD",
+    "qtd": "QTD",
+    "year to date": "YTD",
+    "ytd": "YTD",
+    "this year": "THIS_YEAR",
+    "last year": "LAST_YEAR",
+    "last 3 months": "LAST_3_MONTHS",
+    "next 90 days": "NEXT_90_DAYS",
+}
+
+_STRICT_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d")
+_LOOSE_FORMATS = (
+    "%Y-%m-%d",
+    "%d-%m-%Y",
+    "%m-%d-%Y",
+    "%Y/%m/%d",
+    "%d/%m/%Y",
+    "%m/%d/%Y",
+    "%Y.%m.%d",
+    "%d.%m.%Y",
+    "%m.%d.%Y",
+    "%d %b %Y",
+    "%d %B %Y",
+    "%b %d %Y",
+    "%B %d %Y",
+)
+
+
+def normalise_phrase(text: str) -> str:
+    """Canonical cache key: Arabic digits to ASCII, collapsed spaces, lower case."""
+
+    return _WS_RE.sub(" ", (text or "").translate(AR_DIGITS).strip()).lower()
+
+
+# ---- Calendar arithmetic ----------------------------------------------------
+
+
+def add_months(d: date, months: int) -> date:
+    """Shift by whole months, clamping the day like ``relativedelta``."""
+
+    index = d.month - 1 + months
+    year = d.year + index // 12
+    month = index % 12 + 1
+    return date(year, month, min(d.day, monthrange(year, month)[1]))
+
+
+def add_years(d: date, years: int) -> date:
+    """Shift by whole years; 29 February becomes the 28th in common years."""
+
+    return add_months(d, 12 * years)
+
+
+def month_bounds(ref: date, shift: int = 0) -> Tuple[date, date]:
+    start = add_months(ref.replace(day=1), shift)
+    return start, start.replace(day=monthrange(start.year, start.month)[1])
+
+
+def quarter_bounds(ref: date, shift: int = 0) -> Tuple[date, date]:
+    first = date(ref.year, (ref.month - 1) // 3 * 3 + 1, 1)
+    start = add_months(first, 3 * shift)
+    return start, add_months(start, 3) - timedelta(days=1)
+
+
+def last_full_months(n: int, today: date) -> Tuple[date, date]:
+    """The ``n`` calendar months before the current one."""
+
+    return month_bounds(today, -n)[0], month_bounds(today, -1)[1]
+
+
+def next_n_days(n: int, today: date) -> Tuple[date, date]:
+    return today, today + timedelta(days=n)
+
+
+def _dateparser_settings(today: Optional[date], **settings: Any) -> Dict[str, Any]:
+    # Relative phrases must resolve against the caller's reference date, not
+    # the wall clock, or memoised resolutions would go stale.
+    if today is not None:
+        settings["RELATIVE_BASE"] = datetime.combine(today, datetime.min.time())
+    return settings
+
+
+def parse_date_strict(text: str, today: Optional[date] = None) -> Optional[date]:
+    """Parse the date spellings accepted in rate comments (ISO or D/M/Y)."""
+
+    cleaned = text.strip()
+    if not cleaned:
+        return None
+    for fmt in _STRICT_FORMATS:
+        try:
+            return datetime.strptime(cleaned, fmt).date()
+        except ValueError:
+            continue
+    if dateparser is not None:
+        parsed = dateparser.parse(cleaned, settings=_dateparser_settings(today))  # pragma: no cover
+        if parsed:
+            return parsed.date()
+    return None
+
+
+def parse_date_loose(text: str, today: Optional[date] = None) -> Optional[date]:
+    """Parse free-text dates (day-first, month names, Arabic digits)."""
+
+    cleaned = normalise_phrase(text)
+    if dateparser:
+        parsed = dateparser.parse(
+            cleaned, settings=_dateparser_settings(today, PREFER_DAY_OF_MONTH="first", DATE_ORDER="DMY")
+        )
+        if parsed:
+            return parsed.date()
+    for fmt in _LOOSE_FORMATS:
+        try:
+            return datetime.strptime(cleaned, fmt).date()
+        except Exception:
+            pass
+    return None
+
+
+# ---- Phrase scan ------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class RelativeSpan:
+    direction: str
+    n: int
+    unit: str
+    spaced: bool
+
+    @property
+    def is_last(self) -> bool:
+        return self.direction in _LAST_WORDS
+
+    @property
+    def english(self) -> bool:
+        return self.direction in ("last", "next") and self.unit.isascii()
+
+
+@dataclass(frozen=True)
+class PhraseFacts:
+    """Everything the patterns extract from one normalised phrase."""
+
+    relative: Tuple[RelativeSpan, ...] = ()
+    explicit_col: Optional[str] = None
+    requested: bool = False
+    expiring: bool = False
+    quarter_word: Optional[str] = None
+    iso_range: Optional[Tuple[str, str]] = None
+    dmy_range: Optional[Tuple[str, str]] = None
+    between: Optional[Tuple[str, str]] = None
+    dots_range: Optional[Tuple[str, str]] = None
+    from_date: Optional[str] = None
+    until_date: Optional[str] = None
+    iso_between: Optional[Tuple[str, str]] = None
+    iso_from: Optional[str] = None
+    iso_until: Optional[str] = None
+
+
+def _pair(match: Optional[re.Match], a=1, b=2) -> Optional[Tuple[str, str]]:
+    return (match.group(a), match.group(b)) if match else None
+
+
+def _one(match: Optional[re.Match], group=1) -> Optional[str]:
+    return match.group(group) if match else None
+
+
+@lru_cache(maxsize=1024)
+def scan_phrase(phrase: str) -> PhraseFacts:
+    """Run every pattern over ``phrase`` (already normalised) exactly once."""
+
+    col = EXPLICIT_COL_RE.search(phrase)
+    return PhraseFacts(
+        relative=tuple(
+            RelativeSpan(m.group("dir"), int(m.group("n")), m.group("unit"), bool(m.group("gap")))
+            for m in RELATIVE_RE.finditer(phrase)
+        ),
+        explicit_col=col.group(1).upper() if col else None,
+        requested=bool(REQUESTED_RE.search(phrase)),
+        expiring=bool(EXPIRING_RE.search(phrase)),
+        quarter_word=_one(LAST_NEXT_QUARTER_RE.search(phrase), 0),
+        iso_range=_pair(ISO_RANGE_RE.search(phrase)),
+        dmy_range=_pair(DMY_RANGE_RE.search(phrase)),
+        between=_pair(BETWEEN_RE.search(phrase), "d1", "d2"),
+        dots_range=_pair(DOTS_RANGE_RE.search(phrase), "d1", "d2"),
+        from_date=_one(FROM_RE.search(phrase), "d1"),
+        until_date=_one(UNTIL_RE.search(phrase), "d2"),
+        iso_between=_pair(ISO_BETWEEN_RE.search(phrase)),
+        iso_from=_one(ISO_FROM_RE.search(phrase)),
+        iso_until=_one(ISO_UNTIL_RE.search(phrase)),
+    )
+
+
+def last_n(text: str, unit: str) -> Optional[int]:
+    """``N`` from the first "last N <unit>" in ``text`` (exact unit spelling)."""
+
+    for span in scan_phrase(normalise_phrase(text)).relative:
+        if span.direction == "last" and span.spaced and span.unit == unit:
+            return span.n
+    return None
+
+
+# ---- Profiles ---------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class Resolution:
+    label: str
+    start: date
+    end: date
+
+
+def _first(spans, accept) -> Optional[RelativeSpan]:
+    return next((span for span in spans if accept(span)), None)
+
+
+def _rate_dates(phrase: str, facts: PhraseFacts, today: date) -> Optional[Resolution]:
+    keyword = WINDOW_KEYWORDS.get(phrase)
+    if keyword:
+        start, end = {
+            "LAST_MONTH": lambda: month_bounds(today, -1),
+            "THIS_MONTH": lambda: month_bounds(today, 0),
+            "LAST_QUARTER": lambda: quarter_bounds(today, -1),
+            "THIS_QUARTER": lambda: quarter_bounds(today, 0),
+            "QTD": lambda: (quarter_bounds(today, 0)[0], today),
+            "YTD": lambda: (date(today.year, 1, 1), today),
+            "THIS_YEAR": lambda: (date(today.year, 1, 1), date(today.year, 12, 31)),
+            "LAST_YEAR": lambda: (date(today.year - 1, 1, 1), date(today.year - 1, 12, 31)),
+            "LAST_3_MONTHS": lambda: (month_bounds(today, -2)[0], today),
+            "NEXT_90_DAYS": lambda: next_n_days(90, today),
+        }[keyword]()
+        return Resolution(keyword, start, end)
+
+    def _accept(direction):
+        return lambda s: s.direction == direction and s.spaced and s.unit.rstrip("s") in ("day", "month", "year")
+
+    for direction, sign in (("next", 1), ("last", -1)):
+        span = _first(facts.relative, _accept(direction))
+        if span is None:
+            continue
+        unit = span.unit.rstrip("s")
+        if unit == "day":
+            other = today + timedelta(days=sign * span.n)
+        elif unit == "month":
+            other = add_months(today, sign * span.n)
+        else:
+            other = add_years(today, sign * span.n)
+        start, end = (today, other) if sign > 0 else (other, today)
+        return Resolution(f"{direction.upper()}_N_{unit.upper()}S", start, end)
+
+    for pair in (facts.iso_range, facts.dmy_range):
+        if pair:
+            start, end = parse_date_strict(pair[0], today), parse_date_strict(pair[1], today)
+            if start and end:
+                return Resolution("RANGE", start, end)
+
+    single = parse_date_strict(phrase, today)
+    if single:
+        return Resolution("DATE", single, single)
+    return None
+
+
+_DW_UNITS = (
+    (("day", "يوم", "أيا"), "days"),
+    (("week", "اسبوع", "أسبوع", "أسابي"), "weeks"),
+    (("month", "شهر", "أشه", "شهو"), "months"),
+    (("year", "سنة", "سنين", "سنوا"), "years"),
+)
+
+
+def _date_windows(phrase: str, facts: PhraseFacts, today: date) -> Optional[Resolution]:
+    pair = facts.between or facts.dots_range
+    if pair:
+        d1, d2 = parse_date_loose(pair[0], today), parse_date_loose(pair[1], today)
+        if d1 and d2 and d1 <= d2:
+            return Resolution(f"between:{d1}..{d2}", d1, d2)
+
+    if facts.from_date or facts.until_date:
+        d1 = parse_date_loose(facts.from_date, today) if facts.from_date else date(1, 1, 1)
+        d2 = parse_date_loose(facts.until_date, today) if facts.until_date else today
+        if d1 and d2 and d1 <= d2:
+            return Resolution(f"from:{d1}-to:{d2}", d1, d2)
+
+    if facts.quarter_word:
+        if any(word in facts.quarter_word for word in _LAST_WORDS):
+            start, end = quarter_bounds(today, -1)
+            return Resolution("last_quarter", start, end)
+        start, end = quarter_bounds(today, 1)
+        return Resolution("next_quarter", start, end)
+
+    span = _first(facts.relative, lambda s: not s.unit.startswith("quarter"))
+    if span:
+        side = "last" if span.is_last else "next"
+        sign = -1 if span.is_last else 1
+        unit = next((name for prefixes, name in _DW_UNITS if span.unit.startswith(prefixes)), None)
+        if unit == "months":
+            other = add_months(today, sign * span.n)
+            label = f"{side}_{span.n}_months"
+        elif unit == "years":
+            other = add_years(today, sign * span.n)
+            label = f"{side}_{span.n}_years"
+        else:
+            days = {"days": span.n, "weeks": 7 * span.n}.get(unit, 0)
+            other = today + timedelta(days=sign * days)
+            label = f"{side}_{span.n}_{span.unit}"
+        start, end = (other, today) if span.is_last else (today, other)
+        return Resolution(label, start, end)
+
+    if "last month" in phrase or "الشهر الماضي" in phrase:
+        return Resolution("last_month", *month_bounds(today, -1))
+    if "next month" in phrase or "الشهر القادم" in phrase or "الشهر التالي" in phrase:
+        return Resolution("next_month", *month_bounds(today, 1))
+    if "last week" in phrase or "الأسبوع الماضي" in phrase:
+        return Resolution("last_week", today - timedelta(days=7), today)
+    if "next week" in phrase or "الأسبوع القادم" in phrase or "الأسبوع التالي" in phrase:
+        return Resolution("next_week", today, today + timedelta(days=7))
+    return None
+
+
+def _rate_time(phrase: str, facts: PhraseFacts, today: date) -> Optional[Resolution]:
+    if THIS_MONTH_RE.search(phrase) or "هذا الشهر" in phrase or "الشهر الحالي" in phrase:
+        return Resolution("THIS_MONTH", *month_bounds(today, 0))
+    if THIS_QUARTER_RE.search(phrase) or "الربع الحالي" in phrase:
+        return Resolution("THIS_QUARTER", *quarter_bounds(today, 0))
+    if THIS_YEAR_RE.search(phrase) or "هذه السنة" in phrase or "السنة الحالية" in phrase:
+        return Resolution("THIS_YEAR", date(today.year, 1, 1), date(today.year, 12, 31))
+
+    if LAST_QUARTER_RE.search(phrase) or "الربع الماضي" in phrase:
+        return Resolution("LAST_QUARTER", *quarter_bounds(today, -1))
+    if NEXT_QUARTER_RE.search(phrase) or "الربع القادم" in phrase or "الربع الجاي" in phrase:
+        return Resolution("NEXT_QUARTER", *quarter_bounds(today, 1))
+
+    span = _first(facts.relative, lambda s: s.english and s.spaced)
+    if span:
+        side = span.direction.upper()
+        sign = -1 if span.is_last else 1
+        unit = span.unit.rstrip("s")
+        if unit in ("month", "quarter", "year"):
+            months = {"month": 1, "quarter": 3, "year": 12}[unit] * span.n
+            other = add_months(today, sign * months)
+            label = f"{side}_N_{unit.upper()}S"
+        else:
+            days = span.n * (7 if unit == "week" else 1)
+            other = today + timedelta(days=sign * days)
+            label = f"{side}_N_DW"
+        start, end = (other, today) if span.is_last else (today, other)
+        return Resolution(label, start, end)
+
+    if facts.iso_between:
+        d1, d2 = (date.fromisoformat(value) for value in facts.iso_between)
+        if d2 < d1:
+            d1, d2 = d2, d1
+        return Resolution("BETWEEN", d1, d2)
+    if facts.iso_from:
+        return Resolution("FROM_TO", date.fromisoformat(facts.iso_from), today)
+    if facts.iso_until:
+        return Resolution("FROM_TO", date(1970, 1, 1), date.fromisoformat(facts.iso_until))
+
+    if "الشهر الماضي" in phrase or "الشهر اللى فات" in phrase:
+        return Resolution("LAST_MONTH", *month_bounds(today, -1))
+    if "الشهر القادم" in phrase or "الشهر الجاي" in phrase:
+        return Resolution("NEXT_MONTH", *month_bounds(today, 1))
+    if "الأسبوع الماضي" in phrase or "الاسبوع الماضي" in phrase:
+        return Resolution("LAST_WEEK", today - timedelta(days=7), today)
+    if "الأسبوع القادم" in phrase or "الاسبوع القادم" in phrase or "الأسبوع الجاي" in phrase:
+        return Resolution("NEXT_WEEK", today, today + timedelta(days=7))
+    return None
+
+
+PROFILES: Dict[str, Callable[[str, PhraseFacts, date], Optional[Resolution]]] = {
+    "rate_dates": _rate_dates,
+    "date_windows": _date_windows,
+    "rate_time": _rate_time,
+}
+
+
+@lru_cache(maxsize=2048)
+def _resolve_cached(phrase: str, today: date, profile: str) -> Optional[Resolution]:
+    return PROFILES[profile](phrase, scan_phrase(phrase), today)
+
+
+def resolve(text: str, today: date, profile: str = "date_windows") -> Optional[Resolution]:
+    """Resolve ``text`` to a date window using ``profile``'s rule order.
+
+    Results are memoised per (normalised phrase, ``today``, profile); the
+    returned :class:`Resolution` is immutable and safe to share.
+    """
+
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown date profile: {profile}")
+    return _resolve_cached(normalise_phrase(text), today, profile)
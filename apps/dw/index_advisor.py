@@ -0,0 +1,261 @@
+"""Function-based index advisor for wrapped-column predicates.
+
+The DW builders compare ``UPPER(TRIM(col))`` (or ``UPPER(col)`` /
+``TRIM(col)``) against binds, which plain B-tree indexes cannot serve.  This
+module mines executed SQL from ``dw_runs.sql`` and ``mem_runs.sql_text``,
+counts which wrapped column expressions appear in predicates and how
+(equality/IN vs LIKE), and emits matching DDL:
+
+* a function-based index on the exact expression, or
+* a virtual column ``<COL>_UT`` plus an index on it, to be listed in
+  ``DW_NORMALIZED_COLUMNS`` so builders target it directly
+  (see :mod:`apps.dw.common.ci_columns`).
+
+CLI:
+  MEMORY_DB_URL=postgresql+psycopg2://... python -m apps.dw.index_advisor --days 30
+  python -m apps.dw.index_advisor --days 30 --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_TABLE = '"Contract"'
+
+# UPPER(TRIM(col)) / UPPER(col) / TRIM(col) / LOWER(TRIM(col)) / LOWER(col) followed
+# by a comparison operator.
+_WRAPPED_RE = re.compile(
+    r"\b(?P<outer>UPPER|LOWER|TRIM)\s*\(\s*"
+    r"(?:(?P<inner>TRIM)\s*\(\s*)?"
+    r"(?P<col>\"?[A-Za-z_][A-Za-z0-9_$#]*\"?)\s*\)"
+    r"(?(inner)\s*\))"
+    r"\s*(?P<op>=|<>|!=|\bNOT\s+IN\b|\bIN\b|\bNOT\s+LIKE\b|\bLIKE\b)",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class ExprStats:
+    expr: str
+    column: str
+    wrapper: str
+    eq: int = 0
+    like: int = 0
+    queries: int = 0
+    samples: List[str] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return self.eq + self.like
+
+
+def _canonical(outer: str, inner: Optional[str], column: str) -> Tuple[str, str]:
+    col = column.strip('"').upper()
+    outer = outer.upper()
+    if inner:
+        wrapper = f"{outer}(TRIM())"
+        return f"{outer}(TRIM({col}))", wrapper
+    return f"{outer}({col})", f"{outer}()"
+
+
+def scan_sql(sql: str) -> Dict[str, Tuple[str, str, int, int]]:
+    """Return ``{expr: (column, wrapper, eq_count, like_count)}`` for one statement."""
+
+    found: Dict[str, Tuple[str, str, int, int]] = {}
+    for match in _WRAPPED_RE.finditer(sql or ""):
+        # TRIM(col) nested inside UPPER(...) also matches on its own; skip the inner hit.
+        start = match.start()
+        prefix = sql[max(0, start - 8):start].upper().replace(" ", "")
+        if match.group("outer").upper() == "TRIM" and prefix.endswith(("UPPER(", "LOWER(")):
+            continue
+        expr, wrapper = _canonical(match.group("outer"), match.group("inner"), match.group("col"))
+        column = expr[expr.rfind("(") + 1:expr.find(")")]
+        op = re.sub(r"\s+", " ", match.group("op").upper())
+        col_, wrap_, eq, like = found.get(expr, (column, wrapper, 0, 0))
+        if "LIKE" in op:
+            like += 1
+        else:
+            eq += 1
+        found[expr] = (col_, wrap_, eq, like)
+    return found
+
+
+def analyse(statements: Iterable[str], *, sample_limit: int = 2) -> List[ExprStats]:
+    """Aggregate :func:`scan_sql` over many statements, most frequent first."""
+
+    stats: Dict[str, ExprStats] = {}
+    for sql in statements:
+        if not sql:
+            continue
+        for expr, (column, wrapper, eq, like) in scan_sql(sql).items():
+            entry = stats.get(expr)
+            if entry is None:
+                entry = stats[expr] = ExprStats(expr=expr, column=column, wrapper=wrapper)
+            entry.eq += eq
+            entry.like += like
+            entry.queries += 1
+            if len(entry.samples) < sample_limit:
+                entry.samples.append(" ".join(sql.split())[:240])
+    return sorted(stats.values(), key=lambda s: (s.queries, s.total), reverse=True)
+
+
+# Expression kind in function-index names, so UPPER(TRIM(X)) and UPPER(X) differ.
+_WRAPPER_TAGS = {
+    "UPPER(TRIM())": "UT",
+    "LOWER(TRIM())": "LT",
+    "UPPER()": "U",
+    "LOWER()": "L",
+    "TRIM()": "T",
+}
+
+
+def _index_name(table: str, column: str, suffix: str, used: Optional[set] = None) -> str:
+    prefix = table.strip('"').upper()
+    name = f"{prefix}_{column}_{suffix}"[:128]
+    if used is None:
+        return name
+    # Truncation can still collide; number the later ones.
+    candidate, n = name, 2
+    while candidate in used:
+        tail = f"_{n}"
+        candidate, n = name[: 128 - len(tail)] + tail, n + 1
+    used.add(candidate)
+    return candidate
+
+
+def recommend(
+    stats: Sequence[ExprStats],
+    *,
+    table: str = DEFAULT_TABLE,
+    min_queries: int = 5,
+    min_share: float = 0.01,
+    total_queries: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Turn frequent wrapped expressions into function-based index / virtual column DDL."""
+
+    total = total_queries or max((s.queries for s in stats), default=0) or 1
+    out: List[Dict[str, Any]] = []
+    used: set = set()
+    for entry in stats:
+        share = entry.queries / total
+        if entry.queries < min_queries or share < min_share:
+            continue
+        tag = _WRAPPER_TAGS.get(entry.wrapper, "X")
+        fbi = _index_name(table, entry.column, f"{tag}_FX", used)
+        rec: Dict[str, Any] = {
+            "expr": entry.expr,
+            "column": entry.column,
+            "queries": entry.queries,
+            "share": round(share, 4),
+            "eq": entry.eq,
+            "like": entry.like,
+            "function_index_ddl": f"CREATE INDEX {fbi} ON {table} ({entry.expr})",
+        }
+        if entry.wrapper == "UPPER(TRIM())":
+            shadow = f"{entry.column}_UT"
+            rec["virtual_column"] = shadow
+            rec["virtual_column_ddl"] = [
+                f"ALTER TABLE {table} ADD ({shadow} GENERATED ALWAYS AS ({entry.expr}) VIRTUAL)",
+                f"CREATE INDEX {_index_name(table, shadow, 'IX', used)} ON {table} ({shadow})",
+            ]
+        if entry.like and not entry.eq:
+            rec["note"] = "LIKE only: the index helps prefix patterns; leading '%' still scans"
+        out.append(rec)
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Mining executed SQL
+# ---------------------------------------------------------------------------
+
+_SOURCES = (
+    ("dw_runs", "SELECT sql FROM dw_runs WHERE created_at >= :since AND sql IS NOT NULL"),
+    ("mem_runs", "SELECT sql_text FROM mem_runs WHERE created_at >= :since AND sql_text IS NOT NULL"),
+)
+
+
+def load_statements(engine: Any, *, days: int = 30, limit: int = 50000) -> Tuple[List[str], Dict[str, Any]]:
+    """Fetch executed SQL from ``dw_runs`` and ``mem_runs``; missing tables are skipped."""
+
+    from sqlalchemy import text
+
+    since = datetime.utcnow() - timedelta(days=days)
+    statements: List[str] = []
+    sources: Dict[str, Any] = {}
+    for name, query in _SOURCES:
+        try:
+            with engine.connect() as cx:
+                rows = cx.execute(text(query), {"since": since}).fetchmany(limit)
+        except Exception as exc:
+            sources[name] = {"error": str(exc).splitlines()[0][:200]}
+            continue
+        batch = [str(r[0]) for r in rows if r[0]]
+        sources[name] = {"statements": len(batch)}
+        statements.extend(batch)
+    return statements, sources
+
+
+def build_report(
+    engine: Any,
+    *,
+    days: int = 30,
+    min_queries: int = 5,
+    table: str = DEFAULT_TABLE,
+) -> Dict[str, Any]:
+    statements, sources = load_statements(engine, days=days)
+    stats = analyse(statements)
+    return {
+        "days": days,
+        "statements": len(statements),
+        "sources": sources,
+        "expressions": [
+            {
+                "expr": s.expr,
+                "queries": s.queries,
+                "eq": s.eq,
+                "like": s.like,
+                "samples": s.samples,
+            }
+            for s in stats[:50]
+        ],
+        "recommendations": recommend(
+            stats, table=table, min_queries=min_queries, total_queries=len(statements) or None
+        ),
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Function-based index advisor for DW predicates")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--min-queries", type=int, default=5)
+    parser.add_argument("--table", default=DEFAULT_TABLE)
+    parser.add_argument("--json", action="store_true", help="emit the full JSON report")
+    args = parser.parse_args(argv)
+
+    from apps.dw.learning_store import engine
+
+    report = build_report(engine, days=args.days, min_queries=args.min_queries, table=args.table)
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+        return 0
+    print(f"{report['statements']} statements over {args.days} days ({report['sources']})")
+    print("\nwrapped expressions (queries / eq / like):")
+    for row in report["expressions"][:20]:
+        print(f"  {row['queries']:>7} {row['eq']:>7} {row['like']:>7}  {row['expr']}")
+    print("\nrecommended DDL:")
+    for rec in report["recommendations"]:
+        print(f"  -- {rec['expr']} ({rec['queries']} queries)")
+        print(f"  {rec['function_index_ddl']};")
+        for stmt in rec.get("virtual_column_ddl") or []:
+            print(f"  -- or: {stmt};")
+        if rec.get("note"):
+            print(f"  -- {rec['note']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,12 +1,44 @@
+"""Lark grammar and transformer turning DW filter questions into intents.
+
+The grammar is LALR(1): every place where a word could either continue a
+value or start a new clause is decided by the lexer via lookahead terminals
+(``OR`` vs ``VALUE_OR``, ``CLAUSE_BREAK`` vs ``COMMA``, and the clause-head
+lookahead inside ``VALUE``), so the parser never backtracks.  Parser tables
+are serialised to a cache file keyed by the grammar hash (see
+:func:`_lark_cache_path`) so new workers load them instead of rebuilding.
+"""
 from __future__ import annotations
 
+import hashlib
+import os
 import re
+import tempfile
+import threading
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Sequence
 
+import lark
 from lark import Lark, Token, Transformer, v_args
 
-GRAMMAR = r"""
+# Words that end an alias phrase: boolean/operator words and the FTS verbs.
+_STOP_WORDS = (
+    r"(?:and|or|for|total|sum|count|has|have|includes?|including|with|is|equals?|in|between"
+    r"|greater|more|less|above|over|under|below|at\s+(?:least|most)|no\s+(?:less|more)"
+    r"|contains|mentioning|about|search\s+for)\b"
+)
+_ALIAS_WORD = rf"(?!{_STOP_WORDS})[A-Z0-9_]+"
+_ALIAS_BODY = rf"{_ALIAS_WORD}(?:\s+{_ALIAS_WORD})*"
+_QUOTED_BODY = r"[\"'][A-Z0-9_]+(?:\s+[A-Z0-9_]+)*[\"']"
+# Lookahead for "a new clause starts here": an alias followed by an operator,
+# an FTS verb, or an opening parenthesis.
+_CLAUSE_HEAD = (
+    rf"(?:(?:{_QUOTED_BODY}|{_ALIAS_BODY})\s*"
+    r"(?:=|[<>]|in\s*\(|(?:has|have|includes?|including|with|is|equals|equal\s+to|between"
+    r"|greater|more|less|above|over|under|below|at\s+least|at\s+most|no\s+less|no\s+more)\b)"
+    r"|(?:contains|mentioning|about|search\s+for)\b|\()"
+)
+
+GRAMMAR = rf"""
 ?start: aggregator_sentence
      | expr
 
@@ -24,16 +56,9 @@ GRAMMAR = r"""
        | eq_clause
        | in_clause
 
-aggregator_sentence: for_filter CLAUSE_BREAK aggregate_phrase trailing_filters   -> aggregator_sentence
-                   | for_filter CLAUSE_BREAK aggregate_phrase                    -> aggregator_sentence
-                   | for_filter COMMA aggregate_phrase trailing_filters          -> aggregator_sentence
-                   | for_filter COMMA aggregate_phrase                           -> aggregator_sentence
-                   | for_filter aggregate_phrase trailing_filters                -> aggregator_sentence
-                   | for_filter aggregate_phrase                                 -> aggregator_sentence
-                   | aggregate_phrase trailing_filters                           -> aggregator_sentence
-                   | aggregate_phrase                                            -> aggregator_sentence
+aggregator_sentence: (for_filter CLAUSE_BREAK?)? aggregate_phrase trailing_filters?
 
-trailing_filters: (COMMA? for_filter)+
+trailing_filters: (CLAUSE_BREAK? for_filter)+
 
 aggregate_phrase: COMMAND? aggregate_list group_by_tail?       -> aggregate_phrase
 
@@ -47,21 +72,18 @@ fts_clause: FTS_VERB LPAREN token_list RPAREN   -> fts_group
 
 token_list: value (_token_sep value)*
 
-_token_sep: OR | PIPE | COMMA
+_token_sep: VALUE_OR | PIPE | COMMA
 
-eq_clause: alias comparator value_list          -> eq_clause
-         | alias EQ_OP value_list               -> eq_clause
-         | alias HAS value_list                 -> eq_clause
-         | alias IS value_list                  -> eq_clause
+eq_clause: alias (EQ_OP | HAS | IS) value_list  -> eq_clause
 
-for_filter: FOR alias (EQ_OP value_list | value_list) -> for_filter
+for_filter: FOR alias EQ_OP? value_list -> for_filter
 
 group_by_tail: GROUPED_BY alias -> group_by_clause
              | BY alias         -> group_by_clause
 
 value_list: value (_value_sep value)*
 
-_value_sep: OR | COMMA
+_value_sep: VALUE_OR | COMMA
 
 value: value_atom value_paren? -> value_with_paren
 
@@ -77,35 +99,33 @@ alias: ALIAS        -> alias_token
 number: NUMBER      -> number_token
 
 value_atom: VALUE       -> value_token
-          | ALIAS       -> alias_value_token
-          | QUOTED_ALIAS -> quoted_alias_value_token
 
 value_paren: LPAREN value_atom RPAREN -> value_paren_token
 
 AND: /(?i:\band\b)/
-OR: /(?i:\bor\b)/
+OR.2: /(?i:\bor\b(?=\s+{_CLAUSE_HEAD}))/
+VALUE_OR: /(?i:\bor\b)/
 PIPE: "|"
-CLAUSE_BREAK: /,\s*(?=(?:total|sum|count)\b)/i
+CLAUSE_BREAK.2: /(?i:,\s*(?=(?:total|sum|count|contract\s+count|number\s+of|for|show|list|display|give|provide|report|present)\b))/
 COMMA: ","
-HAS: /(?i:(has|include|includes|including|with))/
-IS: /(?i:(is|equals|equal\s+to))/
+HAS.6: /(?i:\b(?:has|have|includes?|including|with)\b)/
+IS.6: /(?i:\b(?:is|equals|equal\s+to)\b)/
 EQ_OP: "="
-comparator: /(?i:(equals|equal\s+to|is))/
-IN: /(?i:in)/
-BETWEEN: /(?i:between)/
-FTS_VERB: /(?i:(contains|including|mentioning|about|with|search\s+for))/
+IN.6: /(?i:\bin\b)/
+BETWEEN.6: /(?i:\bbetween\b)/
+FTS_VERB: /(?i:\b(?:contains|including|mentioning|about|with|search\s+for)\b)/
 COMP_SIGN: ">=" | "<=" | ">" | "<"
-COMP_WORD: /(?i:(greater\s+than\s+or\s+equal\s+to|greater\s+than|more\s+than|above|over|at\s+least|less\s+than\s+or\s+equal\s+to|less\s+than|under|below|at\s+most|no\s+less\s+than|no\s+more\s+than))/
-FOR: /(?i:for)/
-COMMAND: /(?i:(show|list|display|give|provide|report|present))/
-GROUPED_BY: /(?i:group(?:ed)?\s+by)/
-BY: /(?i:by)/
+COMP_WORD.6: /(?i:\b(?:greater\s+than\s+or\s+equal\s+to|greater\s+than|more\s+than|above|over|at\s+least|less\s+than\s+or\s+equal\s+to|less\s+than|under|below|at\s+most|no\s+less\s+than|no\s+more\s+than)\b)/
+FOR: /(?i:\bfor\b)/
+COMMAND: /(?i:\b(?:show|list|display|give|provide|report|present)\b)/
+GROUPED_BY: /(?i:\bgroup(?:ed)?\s+by\b)/
+BY: /(?i:\bby\b)/
 AGG_TOTAL.1: /(?i:total(?:\s+(?:amount|value))?|sum(?:\s+(?:amount|value))?)/
-AGG_COUNT.1: /(?i:count(?:\s*\(\*\))?|count(?:\s+of)?(?:\s+contracts)?|contract\s+count|number\s+of\s+contracts)/
+AGG_COUNT.1: /(?i:count\s*\(\*\)|count(?:\s+of)?(?:\s+contracts)?|contract\s+count|number\s+of\s+contracts)/
 
-QUOTED_ALIAS.7: /(?i:(["'])[A-Z0-9_]+(?:\s+[A-Z0-9_]+)*["'])/
-ALIAS.6: /(?i:(?!FOR\b)(?!TOTAL\b)(?!COUNT\b)(?!AND\b)(?!OR\b)[A-Z0-9_]+(?:\s+[A-Z0-9_]+)*)/
-VALUE.5: /(?i:(?!and\b)(?!or\b)(?!total\b)(?!sum\b)(?!count\b))[^\s(),|=][^(),|=]*?(?=\s+(?i:(?:or)\b|(?:and\b\s+(?:\"[A-Z0-9_ ]+\"|[A-Z0-9_]+(?:\s+[A-Z0-9_]+)*)\s*=)|\s*(?:total|sum|count)\b)|\)|,|$)/
+QUOTED_ALIAS.7: /(?i:{_QUOTED_BODY})/
+ALIAS.6: /(?i:{_ALIAS_BODY})/
+VALUE.5: /(?i:(?!(?:and|or|total|sum|count)\b)[^\s(),|=][^(),|=]*?(?=\s+or\b|\s+and\s+{_CLAUSE_HEAD}|\s*(?:total|sum|count)\b|\s*[(|]|\)|,|$))/
 NUMBER: /[-+]?\d+(?:\.\d+)?/
 LPAREN: "("
 RPAREN: ")"
@@ -186,12 +206,6 @@ class _DwTransformer(Transformer):
     def value_token(self, token: Token) -> str:
         return self._clean_value(token)
 
-    def alias_value_token(self, token: Token) -> str:
-        return self._clean_value(token)
-
-    def quoted_alias_value_token(self, token: Token) -> str:
-        return self._clean_value(token)
-
     def number_token(self, token: Token) -> Any:
         text = str(token)
         return self._normalize_number(text)
@@ -207,9 +221,6 @@ class _DwTransformer(Transformer):
             return f"{base} {suffix}"
         return base
 
-    def comparator(self, token: Token) -> str:
-        return "eq"
-
     # ---- list helpers -----------------------------------------------------
 
     def value_list(self, first: Any, *rest: Any) -> List[str]:
@@ -261,8 +272,9 @@ class _DwTransformer(Transformer):
         values = self._flatten_values(values_node or [])
         return self._append_eq_filter(alias.upper(), values)
 
-    def in_clause(self, alias: str, values: List[str]) -> Dict[str, Any]:
-        return self.eq_clause(alias, values)
+    def in_clause(self, alias: str, *args: Any) -> Dict[str, Any]:
+        values = [item for item in args if isinstance(item, list)]
+        return self.eq_clause(alias, values[0] if values else [])
 
     def comp_sign_clause(self, alias: str, comp_token: Token, number: Any) -> Dict[str, Any]:
         op = COMPARISON_SIGN_MAP.get(str(comp_token), "eq")
@@ -272,11 +284,14 @@ class _DwTransformer(Transformer):
         op = self._normalize_comparison_word(str(word_token))
         return self._register_numeric_clause(alias, op, [number])
 
-    def between_clause(self, alias: str, first: Any, _and_tok: Token, second: Any) -> Dict[str, Any]:
+    def between_clause(
+        self, alias: str, _between_tok: Token, first: Any, _and_tok: Token, second: Any
+    ) -> Dict[str, Any]:
         return self._register_numeric_clause(alias, "between", [first, second])
 
-    def group(self, node: Any) -> Any:
-        return node
+    def group(self, *items: Any) -> Any:
+        nodes = [item for item in items if not isinstance(item, Token)]
+        return nodes[0] if nodes else {}
 
     def aggregator_sentence(self, *items: Any) -> Dict[str, Any]:
         clause: Dict[str, Any] = {"type": "aggregate", "aggregations": [], "group_by": []}
@@ -504,18 +519,66 @@ class _DwTransformer(Transformer):
             self.order_hint = {"col": normalized, "desc": False}
 
 
+_START_SYMBOLS = ["start", "aggregator_sentence"]
+_LARK_OPTIONS: Dict[str, Any] = {
+    "parser": "lalr",
+    "lexer": "contextual",
+    "start": _START_SYMBOLS,
+    "propagate_positions": False,
+    "maybe_placeholders": False,
+}
+
+_SHARED_LARK: Optional[Lark] = None
+_SHARED_LARK_LOCK = threading.Lock()
+
+
+def grammar_hash() -> str:
+    """Hash of the grammar, its options and the Lark version (the cache key)."""
+
+    blob = "\n".join([GRAMMAR, repr(sorted(_LARK_OPTIONS.items())), lark.__version__])
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+
+def _lark_cache_path() -> Optional[str]:
+    """Serialised parser-table file, or ``None`` when ``DW_LARK_CACHE=0``.
+
+    ``DW_LARK_CACHE_DIR`` overrides the directory (default: the temp dir).
+    Lark re-validates the hash stored in the file and rebuilds on mismatch.
+    """
+
+    if str(os.getenv("DW_LARK_CACHE", "1")).strip().lower() in {"0", "false", "no", "off"}:
+        return None
+    directory = os.getenv("DW_LARK_CACHE_DIR") or tempfile.gettempdir()
+    return os.path.join(directory, f"dw_question_parser_{grammar_hash()}.lark")
+
+
+def build_lark(*, cache: bool = True) -> Lark:
+    """Build the LALR parser, loading the serialised tables when available."""
+
+    path = _lark_cache_path() if cache else None
+    if path:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        except OSError:
+            path = None
+    return Lark(GRAMMAR, cache=path or False, **_LARK_OPTIONS)
+
+
+def _shared_lark() -> Lark:
+    global _SHARED_LARK
+    if _SHARED_LARK is None:
+        with _SHARED_LARK_LOCK:
+            if _SHARED_LARK is None:
+                _SHARED_LARK = build_lark()
+    return _SHARED_LARK
+
+
 class DwQuestionParser:
     """Parse NL DW questions to a normalized intent via Lark grammar."""
 
     def __init__(self) -> None:
-        self._parser = Lark(GRAMMAR, parser="lalr", propagate_positions=False, maybe_placeholders=False)
-        self._agg_parser = Lark(
-            GRAMMAR,
-            parser="lalr",
-            start="aggregator_sentence",
-            propagate_positions=False,
-            maybe_placeholders=False,
-        )
+        # LALR parsers are stateless between parse() calls, so instances share one.
+        self._parser = _shared_lark()
 
     def parse(
         self,
@@ -537,11 +600,11 @@ class DwQuestionParser:
         )
         if agg_hint:
             try:
-                tree = self._agg_parser.parse(question_text)
+                tree = self._parser.parse(question_text, start="aggregator_sentence")
             except Exception:
-                tree = self._parser.parse(question_text)
+                tree = self._parser.parse(question_text, start="start")
         else:
-            tree = self._parser.parse(question_text)
+            tree = self._parser.parse(question_text, start="start")
         transformer = _DwTransformer(alias_map=alias_map, allowed_columns=allowed_columns)
         bool_tree = transformer.transform(tree)
         aggregations = [dict(agg) for agg in transformer.aggregations]
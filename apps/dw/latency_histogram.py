@@ -0,0 +1,44 @@
+"""HDR-style latency buckets for the per-minute run rollups.
+
+A duration maps to a bucket keyed by its lower bound, keeping three
+significant digits: 0..999 ms are exact, 1000..9999 ms step by 10,
+10000..99999 by 100, and so on. A bucket is at most 1% wide, and a window
+holds at most a few thousand buckets however many runs there are.
+
+Percentiles use the same rank rule as the old in-memory summary
+(``round(q * (n - 1))`` over the sorted durations). They therefore agree
+exactly below one second and to within 1% above.
+"""
+from __future__ import annotations
+
+from typing import Iterable, Mapping, Tuple
+
+
+def latency_bucket(duration_ms: object) -> int:
+    try:
+        ms = int(duration_ms or 0)
+    except (TypeError, ValueError):
+        ms = 0
+    if ms < 1000:
+        return max(ms, 0)
+    scale = 10 ** (len(str(ms)) - 3)
+    return (ms // scale) * scale
+
+
+def percentile(counts: Mapping[int, int] | Iterable[Tuple[int, int]], q: float) -> int:
+    """``q``-quantile (0..1) of a ``{bucket: count}`` histogram; 0 when empty."""
+
+    items = sorted((int(b), int(n)) for b, n in (counts.items() if isinstance(counts, Mapping) else counts) if n)
+    total = sum(n for _, n in items)
+    if not total:
+        return 0
+    rank = int(round(q * (total - 1)))
+    seen = 0
+    for bucket, n in items:
+        seen += n
+        if seen > rank:
+            return bucket
+    return items[-1][0]
+
+
+__all__ = ["latency_bucket", "percentile"]
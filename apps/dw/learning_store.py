@@ -25,6 +25,7 @@ import hashlib as _hashlib
 import json as _json
 import re as _re
 
+from apps.dw.latency_histogram import latency_bucket, percentile
 from core.settings import Settings
 
 
@@ -244,6 +245,18 @@ class DWRun(Base):
     meta = Column(JSON)
 
 
+class DWRunRollup(Base):
+    """Per-minute run counts by latency bucket, maintained by ``record_run``."""
+
+    __tablename__ = "dw_run_rollups"
+
+    minute = Column(DateTime, primary_key=True)
+    namespace = Column(String(128), primary_key=True, default="dw::common")
+    latency_bucket = Column(Integer, primary_key=True)
+    runs = Column(Integer, nullable=False, default=0)
+    ok_runs = Column(Integer, nullable=False, default=0)
+
+
 class DWExample(Base):
     __tablename__ = "dw_examples"
 
@@ -277,6 +290,19 @@ class DWRule(Base):
     approved_at = Column(DateTime)
 
 
+
+class DWRuleCanaryEval(Base):
+    """Shadow replay verdicts for canary rules, written by ``apps.dw.canary``."""
+
+    __tablename__ = "dw_rule_canary_evals"
+
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, default=dt.datetime.utcnow, index=True)
+    rule_id = Column(Integer, index=True)
+    namespace = Column(String(128), default="dw::common")
+    verdict = Column(String(32))  # pass|regressed|error|no_coverage
+    summary = Column(JSON)
+
 class DWPatch(Base):
     __tablename__ = "dw_patches"
 
@@ -313,9 +339,11 @@ def record_run(
     explain: str,
     meta: Dict[str, Any],
 ) -> None:
+    created_at = dt.datetime.utcnow()
     with SessionLocal() as session:
         session.add(
             DWRun(
+                created_at=created_at,
                 namespace=namespace,
                 user_email=user_email,
                 question=question,
@@ -329,9 +357,74 @@ def record_run(
                 meta=meta or {},
             )
         )
+        _bump_run_rollup(session, namespace, created_at, duration_ms, ok)
         session.commit()
 
 
+# Postgres and SQLite (3.24+) share this upsert syntax.
+_ROLLUP_UPSERT_SQL = """
+    INSERT INTO dw_run_rollups (minute, namespace, latency_bucket, runs, ok_runs)
+    VALUES (:minute, :namespace, :bucket, :runs, :ok_runs)
+    ON CONFLICT (minute, namespace, latency_bucket)
+    DO UPDATE SET runs = dw_run_rollups.runs + excluded.runs,
+                  ok_runs = dw_run_rollups.ok_runs + excluded.ok_runs
+"""
+
+
+def _minute(ts: dt.datetime) -> dt.datetime:
+    return ts.replace(second=0, microsecond=0)
+
+
+def _bump_run_rollup(session, namespace: str, created_at: dt.datetime, duration_ms: Any, ok: bool) -> None:
+    # Savepoint: a rollup failure must never lose the run row itself.
+    try:
+        with session.begin_nested():
+            session.execute(
+                _sql_text(_ROLLUP_UPSERT_SQL),
+                {
+                    "minute": _minute(created_at),
+                    "namespace": namespace or "dw::common",
+                    "bucket": latency_bucket(duration_ms),
+                    "runs": 1,
+                    "ok_runs": 1 if ok else 0,
+                },
+            )
+    except Exception as exc:
+        log.warning("dw_run_rollups update failed: %s", exc)
+
+
+def rebuild_run_rollups(hours: int = 24) -> int:
+    """Recompute rollups for the last ``hours`` from ``dw_runs``; returns runs folded in.
+
+    Use once after deploying the rollup table, or to repair it.
+    """
+
+    since = _minute(dt.datetime.utcnow() - dt.timedelta(hours=hours))
+    counts: Dict[Tuple[dt.datetime, str, int], List[int]] = {}
+    folded = 0
+    with SessionLocal() as session:
+        query = (
+            session.query(DWRun.created_at, DWRun.namespace, DWRun.duration_ms, DWRun.ok)
+            .filter(DWRun.created_at >= since)
+            .yield_per(5000)
+        )
+        for created_at, namespace, duration_ms, ok in query:
+            key = (_minute(created_at), namespace or "dw::common", latency_bucket(duration_ms))
+            entry = counts.setdefault(key, [0, 0])
+            entry[0] += 1
+            entry[1] += 1 if ok else 0
+            folded += 1
+        session.query(DWRunRollup).filter(DWRunRollup.minute >= since).delete(synchronize_session=False)
+        session.bulk_save_objects(
+            [
+                DWRunRollup(minute=m, namespace=ns, latency_bucket=b, runs=n, ok_runs=k)
+                for (m, ns, b), (n, k) in counts.items()
+            ]
+        )
+        session.commit()
+    return folded
+
+
 def record_example(
     namespace: str,
     user_email: Optional[str],
@@ -414,24 +507,47 @@ def get_similar_examples(namespace: str, question: str, limit: int = 5) -> List[
 
 
 def list_metrics_summary(hours: int = 24) -> Dict[str, Any]:
-    cutoff = dt.datetime.utcnow() - dt.timedelta(hours=hours)
-    with SessionLocal() as session:
-        runs = session.query(DWRun).filter(DWRun.created_at >= cutoff).all()
-        total = len(runs)
-        ok = sum(1 for run in runs if run.ok)
-        latencies = sorted([run.duration_ms or 0 for run in runs])
+    """Run counts and latency percentiles for the last ``hours``.
 
-    def _p95(values: List[int]) -> int:
-        if not values:
-            return 0
-        idx = int(round(0.95 * (len(values) - 1)))
-        return values[idx]
+    Reads ``dw_run_rollups`` (bounded by minutes x latency buckets, not by
+    run count); falls back to scanning ``dw_runs`` if the rollups cannot be
+    read. Windows start on the minute boundary.
+    """
 
+    since = _minute(dt.datetime.utcnow() - dt.timedelta(hours=hours))
+    try:
+        with SessionLocal() as session:
+            grouped = session.execute(
+                _sql_text(
+                    "SELECT latency_bucket, SUM(runs), SUM(ok_runs) FROM dw_run_rollups "
+                    "WHERE minute >= :since GROUP BY latency_bucket"
+                ),
+                {"since": since},
+            ).all()
+        source = "rollups"
+    except Exception as exc:
+        log.warning("dw_run_rollups unavailable, scanning dw_runs: %s", exc)
+        with SessionLocal() as session:
+            runs = session.query(DWRun.duration_ms, DWRun.ok).filter(DWRun.created_at >= since).all()
+        by_bucket: Dict[int, List[int]] = {}
+        for duration_ms, ok in runs:
+            entry = by_bucket.setdefault(latency_bucket(duration_ms), [0, 0])
+            entry[0] += 1
+            entry[1] += 1 if ok else 0
+        grouped = [(b, n, k) for b, (n, k) in by_bucket.items()]
+        source = "dw_runs"
+
+    histogram = {int(b): int(n or 0) for b, n, _ in grouped}
+    total = sum(histogram.values())
+    ok = sum(int(k or 0) for _, _, k in grouped)
     return {
         "total": total,
         "ok": ok,
         "ok_rate": (ok / total if total else 0.0),
-        "p95_ms": _p95(latencies),
+        "p50_ms": percentile(histogram, 0.50),
+        "p95_ms": percentile(histogram, 0.95),
+        "p99_ms": percentile(histogram, 0.99),
+        "source": source,
     }
 
 
@@ -9,6 +9,7 @@ from core.logging_utils import get_logger, log_event
 from core.model_loader import get_model
 from core.nlu.clarify import infer_intent
 from core.nlu.types import NLIntent
+from .projection import display_columns
 from .validator import basic_checks, extract_sql
 
 _MONTH_WORDS = re.compile(r"\blast\s+month\b", re.IGNORECASE)
@@ -162,6 +163,19 @@ def clarify_intent(question: str, context: dict) -> Dict[str, object]:
     return {"intent": data, "raw": raw}
 
 
+def _columns_instruction(ctx: dict, intent: Dict[str, object]) -> str:
+    display = ctx.get("display_columns") or []
+    if display and not intent.get("select_all"):
+        return (
+            "If the question does not specify which columns to show, SELECT only: "
+            + ", ".join(display)
+            + " plus any column used in filters or ORDER BY. Use SELECT * only if the user asks for all columns."
+        )
+    if intent.get("wants_all_columns", True):
+        return "If the question does not specify which columns to show, SELECT ALL columns (use SELECT *)."
+    return "If unsure, default to SELECT *."
+
+
 def _build_prompt(question: str, ctx: dict, intent: Dict[str, object]) -> str:
     prompt_builder = ctx.get("prompt_builder")
     if callable(prompt_builder):
@@ -184,10 +198,7 @@ def _build_prompt(question: str, ctx: dict, intent: Dict[str, object]) -> str:
         lines.append("Return a single COUNT query: SELECT COUNT(*) AS CNT ...")
         lines.append("Do not select other columns.")
     else:
-        if intent.get("wants_all_columns", True):
-            lines.append("If the question does not specify which columns to show, SELECT ALL columns (use SELECT *).")
-        else:
-            lines.append("If unsure, default to SELECT *.")
+        lines.append(_columns_instruction(ctx, intent))
         lines.append("Only add a row limit (FETCH FIRST :top_n ROWS ONLY) if the user explicitly asks for Top N.")
 
     lines.extend([
@@ -215,6 +226,9 @@ def nl_to_sql_with_llm(
         clarifier_raw = clarifier.get("raw")
 
     intent = intent or {}
+    if "display_columns" not in ctx:
+        # Namespace display set (DW_DISPLAY_COLUMNS) drives _columns_instruction.
+        ctx = {**ctx, "display_columns": display_columns(ctx.get("settings"), ctx.get("namespace"))}
     prompt = _build_prompt(question, ctx, intent)
     log_event(log, "dw", "sql_prompt_compact", {"size": len(prompt)})
     log_event(log, "dw", "sql_prompt", {"prompt": prompt[:1600]})
@@ -269,10 +283,7 @@ def nl_to_sql_with_llm(
     if intent.get("agg") == "count":
         repair_lines.append("Return a single COUNT query: SELECT COUNT(*) AS CNT ... Do not select other columns.")
     else:
-        if intent.get("wants_all_columns", True):
-            repair_lines.append("If the question does not specify which columns to show, SELECT ALL columns (use SELECT *).")
-        else:
-            repair_lines.append("If unsure, default to SELECT *.")
+        repair_lines.append(_columns_instruction(ctx, intent))
         repair_lines.append("Only add a row limit (FETCH FIRST :top_n ROWS ONLY) if the user explicitly asks for Top N.")
     repair_lines.extend(
         [
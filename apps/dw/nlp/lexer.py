@@ -0,0 +1,364 @@
+"""Single-pass question lexer shared by the DW intent parsers.
+
+A question used to be rescanned by every parser: one compiled regex per alias
+key (or column), a spaCy PhraseMatcher for alias spans, ad-hoc alias
+alternations, and so on.  :func:`lex` scans it once and returns a typed
+:class:`TokenStream`:
+
+* ``ALIAS``   - keys of ``DW_EQ_ALIAS_COLUMNS`` (value: target columns)
+* ``ENUM``    - ``DW_ENUM_SYNONYMS`` equals/prefix/contains phrases
+                (value: ``(table.column, bucket, mode)``)
+* ``DATE``    - date phrases (``last 3 months``, ``ytd``, ``2024-01-31`` ...)
+* ``NUMBER``  (value: the number, ``k``/``m``/``b`` suffixes applied),
+  ``EMAIL``, ``COMPARATOR`` and ``BOOL`` (and/or/not)
+
+Parsers use the stream to decide what to run, not as their input: the
+comparison parser is skipped without a ``COMPARATOR`` token, and
+:func:`phrases_present` (every key present, overlaps included) gates the alias
+``=``/``has`` scan and the per-column comparison regexes.  Capture of values
+stays with each parser's own patterns, which accept more spellings than these
+token classes.
+
+Dictionary phrases are matched with an Aho-Corasick automaton built once per
+settings mapping; everything else comes from one combined regex.  Streams are
+memoised per (question, lexicon) so parsers of the same request share the
+scan.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+ALIAS = "ALIAS"
+ENUM = "ENUM"
+DATE = "DATE"
+NUMBER = "NUMBER"
+EMAIL = "EMAIL"
+COMPARATOR = "COMPARATOR"
+BOOL = "BOOL"
+
+
+@dataclass(frozen=True)
+class Token:
+    kind: str
+    text: str
+    start: int
+    end: int
+    value: Any = None
+
+
+class TokenStream(tuple):
+    """Immutable token sequence ordered by position."""
+
+    def of_kind(self, kind: str) -> List[Token]:
+        return [tok for tok in self if tok.kind == kind]
+
+    def has(self, kind: str) -> bool:
+        return any(tok.kind == kind for tok in self)
+
+    def matched(self, kind: str) -> set:
+        """Upper-cased phrases of ``kind`` present in the question (e.g. alias keys)."""
+
+        return {tok.text.upper() for tok in self if tok.kind == kind}
+
+
+# ---------------------------------------------------------------------------
+# Aho-Corasick
+# ---------------------------------------------------------------------------
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class AhoCorasick:
+    """Case-insensitive multi-pattern matcher with word-boundary filtering."""
+
+    def __init__(self, patterns: Iterable[Tuple[str, Any]]) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Any]]] = [[]]
+        for phrase, payload in patterns:
+            key = str(phrase or "").lower()
+            if key.strip():
+                self._add(key, payload)
+        self._build()
+
+    def _add(self, key: str, payload: Any) -> None:
+        node = 0
+        for ch in key:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(key), payload))
+
+    def _build(self) -> None:
+        queue: deque = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                candidate = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = candidate if candidate != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_raw(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        node = 0
+        lowered = text.lower()
+        for idx, ch in enumerate(lowered):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for length, payload in self._out[node]:
+                yield idx + 1 - length, idx + 1, payload
+
+    def find(
+        self, text: str, *, prefix_ok: bool = False, overlapping: bool = False
+    ) -> List[Tuple[int, int, Any]]:
+        """Leftmost-longest, non-overlapping, word-bounded matches (all of them with ``overlapping``)."""
+
+        hits = []
+        for start, end, payload in self.iter_raw(text):
+            if start > 0 and _is_word(text[start - 1]) and _is_word(text[start]):
+                continue
+            open_end = prefix_ok or (isinstance(payload, tuple) and payload and payload[-1] == "prefix")
+            if not open_end and end < len(text) and _is_word(text[end]) and _is_word(text[end - 1]):
+                continue
+            hits.append((start, end, payload))
+        hits.sort(key=lambda h: (h[0], -(h[1] - h[0])))
+        if overlapping:
+            return hits
+        chosen: List[Tuple[int, int, Any]] = []
+        cursor = -1
+        for start, end, payload in hits:
+            if start >= cursor:
+                chosen.append((start, end, payload))
+                cursor = end
+        return chosen
+
+
+# ---------------------------------------------------------------------------
+# Lexicon (settings -> automaton)
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Lexicon:
+    version: str
+    automaton: AhoCorasick
+
+
+def _normalize_alias_map(alias_map: Optional[Mapping[str, Any]]) -> Dict[str, Tuple[str, ...]]:
+    out: Dict[str, Tuple[str, ...]] = {}
+    for key, cols in (alias_map or {}).items():
+        name = str(key or "").strip()
+        if not name:
+            continue
+        if isinstance(cols, str):
+            cols = [cols]
+        targets = tuple(str(c).strip().upper() for c in (cols or []) if str(c or "").strip())
+        out[name.upper()] = targets
+    return out
+
+
+def _enum_patterns(enum_map: Optional[Mapping[str, Any]]) -> List[Tuple[str, Any]]:
+    patterns: List[Tuple[str, Any]] = []
+    for column, buckets in (enum_map or {}).items():
+        if not isinstance(buckets, Mapping):
+            continue
+        for bucket, rules in buckets.items():
+            if not isinstance(rules, Mapping):
+                continue
+            for mode in ("equals", "contains", "prefix"):
+                for phrase in rules.get(mode) or []:
+                    if isinstance(phrase, str) and phrase.strip():
+                        patterns.append((phrase.strip(), (ENUM, str(column), str(bucket), mode)))
+    return patterns
+
+
+_LEXICONS: Dict[str, Lexicon] = {}
+# (id(alias_map), id(enum_map)) -> (alias_map, enum_map, lexicon); holding the
+# mappings keeps their ids from being reused.
+_BY_IDENTITY: Dict[Tuple[int, int], Tuple[Any, Any, Lexicon]] = {}
+_LEXICON_LOCK = threading.Lock()
+
+
+def build_lexicon(
+    alias_map: Optional[Mapping[str, Any]] = None,
+    enum_map: Optional[Mapping[str, Any]] = None,
+) -> Lexicon:
+    """Return the (cached) lexicon for these settings.
+
+    Lookups go by mapping identity, so the content fingerprint is computed only
+    the first time a settings mapping is seen (settings are replaced on
+    change, never mutated in place).
+    """
+
+    ident = (id(alias_map), id(enum_map))
+    hit = _BY_IDENTITY.get(ident)
+    if hit is not None and hit[0] is alias_map and hit[1] is enum_map:
+        return hit[2]
+    aliases = _normalize_alias_map(alias_map)
+    blob = json.dumps([aliases, enum_map or {}], sort_keys=True, default=str)
+    version = hashlib.sha1(blob.encode("utf-8")).hexdigest()[:16]
+    lexicon = _LEXICONS.get(version)
+    if lexicon is None:
+        patterns: List[Tuple[str, Any]] = [(name, (ALIAS, name, targets)) for name, targets in aliases.items()]
+        patterns.extend(_enum_patterns(enum_map))
+        lexicon = Lexicon(version=version, automaton=AhoCorasick(patterns))
+    with _LEXICON_LOCK:
+        if len(_LEXICONS) > 32:
+            _LEXICONS.clear()
+        if len(_BY_IDENTITY) > 32:
+            _BY_IDENTITY.clear()
+        lexicon = _LEXICONS.setdefault(version, lexicon)
+        _BY_IDENTITY[ident] = (alias_map, enum_map, lexicon)
+    return lexicon
+
+
+@lru_cache(maxsize=64)
+def _keys_lexicon(keys: Tuple[str, ...]) -> Lexicon:
+    return build_lexicon({key: [] for key in keys})
+
+
+def _alias_keys(alias_keys: Sequence[str]) -> Tuple[str, ...]:
+    return tuple(str(k) for k in alias_keys if str(k or "").strip())
+
+
+# ---------------------------------------------------------------------------
+# Regex-class tokens
+# ---------------------------------------------------------------------------
+
+_UNIT = r"(?:days?|weeks?|months?|quarters?|years?)"
+_MONTH = (
+    r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|jun(?:e)?|jul(?:y)?|"
+    r"aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)"
+)
+_TOKEN_RE = re.compile(
+    r"(?P<EMAIL>[\w.+-]+@[\w-]+(?:\.[\w-]+)+)"
+    r"|(?P<DATE>"
+    r"\b\d{4}-\d{1,2}-\d{1,2}\b"
+    r"|\b\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4}\b"
+    rf"|\b(?:last|next|past|previous|coming)\s+\d+\s+{_UNIT}\b"
+    rf"|\b(?:last|next|this|current|previous|past)\s+{_UNIT}\b"
+    r"|\b(?:ytd|year[\s-]to[\s-]date|mtd|qtd|today|yesterday|tomorrow)\b"
+    rf"|\b{_MONTH}\s+\d{{4}}\b"
+    r"|\bq[1-4]\s+\d{4}\b"
+    r")"
+    # Covers every operator spelling the DW comparison parser accepts.
+    r"|(?P<COMPARATOR>>=|<=|<>|!=|==|=|>|<|≥|≤"
+    r"|\b(?:greater|more|less|fewer)\s+than\b|\bat\s+(?:least|most)\b"
+    r"|\b(?:above|below|over|under|between|in|like)\b|\bequal(?:s|\s+to)?\b)"
+    r"|(?P<BOOL>\b(?:and|or|not)\b)"
+    r"|(?P<NUMBER>(?<![\w.])\d[\d,]*(?:\.\d+)?(?:%|[kmb]\b)?(?![\w@]))",
+    re.IGNORECASE,
+)
+_NUMBER_SCALE = {"k": 1_000, "m": 1_000_000, "b": 1_000_000_000}
+
+
+def _number_value(raw: str) -> Any:
+    raw = raw.replace(",", "").rstrip("%").lower()
+    scale = _NUMBER_SCALE.get(raw[-1:], 1)
+    if scale != 1:
+        raw = raw[:-1]
+    try:
+        value = float(raw) if "." in raw else int(raw)
+    except ValueError:
+        return None
+    return value * scale
+
+
+def _regex_tokens(text: str) -> List[Token]:
+    tokens: List[Token] = []
+    for match in _TOKEN_RE.finditer(text):
+        kind = match.lastgroup or ""
+        value: Any = None
+        if kind == NUMBER:
+            value = _number_value(match.group(0))
+        elif kind in (COMPARATOR, BOOL, DATE):
+            value = " ".join(match.group(0).lower().split())
+        tokens.append(Token(kind, match.group(0), match.start(), match.end(), value))
+    return tokens
+
+
+# ---------------------------------------------------------------------------
+# Entry points
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=2048)
+def _lex_cached(text: str, lexicon: Lexicon) -> TokenStream:
+    phrase_tokens: List[Token] = []
+    for start, end, payload in lexicon.automaton.find(text):
+        if payload[0] == ALIAS:
+            phrase_tokens.append(Token(ALIAS, text[start:end], start, end, payload[2]))
+        else:
+            _, column, bucket, mode = payload
+            phrase_tokens.append(Token(ENUM, text[start:end], start, end, (column, bucket, mode)))
+    taken = [(tok.start, tok.end) for tok in phrase_tokens]
+
+    def _free(start: int, end: int) -> bool:
+        return all(end <= s or start >= e for s, e in taken)
+
+    tokens = phrase_tokens + [tok for tok in _regex_tokens(text) if _free(tok.start, tok.end)]
+    tokens.sort(key=lambda tok: tok.start)
+    return TokenStream(tokens)
+
+
+def lex(
+    question: str,
+    alias_map: Optional[Mapping[str, Any]] = None,
+    enum_map: Optional[Mapping[str, Any]] = None,
+    *,
+    lexicon: Optional[Lexicon] = None,
+) -> TokenStream:
+    """Tokenise ``question`` once for every consumer."""
+
+    text = question or ""
+    lexicon = lexicon or build_lexicon(alias_map, enum_map)
+    return _lex_cached(text, lexicon)
+
+
+def phrases_present(question: str, alias_keys: Sequence[str]) -> set:
+    """Upper-cased alias keys occurring anywhere in ``question``, overlaps included."""
+
+    lexicon = _keys_lexicon(_alias_keys(alias_keys))
+    return {payload[1] for _, _, payload in lexicon.automaton.find(question or "", overlapping=True)}
+
+
+def alias_spans(question: str, alias_keys: Sequence[str]) -> List[Tuple[int, int, str]]:
+    """``(start, end, text)`` for every alias key found in ``question``."""
+
+    text = question or ""
+    lexicon = _keys_lexicon(_alias_keys(alias_keys))
+    return [(start, end, text[start:end]) for start, end, _ in lexicon.automaton.find(text)]
+
+
+__all__ = [
+    "ALIAS",
+    "AhoCorasick",
+    "BOOL",
+    "COMPARATOR",
+    "DATE",
+    "EMAIL",
+    "ENUM",
+    "Lexicon",
+    "NUMBER",
+    "Token",
+    "TokenStream",
+    "alias_spans",
+    "build_lexicon",
+    "lex",
+    "phrases_present",
+]
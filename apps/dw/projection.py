@@ -0,0 +1,174 @@
+"""Column projection for row-level Contract answers.
+
+Row-level builders used to emit ``SELECT *``, so every wide Contract row was
+fetched, converted, JSON-encoded and CSV-exported even when the UI shows a
+handful of fields.  When a namespace configures ``DW_DISPLAY_COLUMNS`` in
+mem_settings the builders select, in order:
+
+1. the display set;
+2. known columns referenced by the statement (filters, ``ORDER BY``);
+3. known columns the question names ("... by owner department").
+
+``SELECT *`` is kept when no display set is configured, when the question
+explicitly asks for every column, or when the statement is not a plain
+single-table ``SELECT *``.
+
+Settings (namespace scope):
+  DW_DISPLAY_COLUMNS   list of columns (JSON list or comma-separated)
+"""
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from apps.dw.fts_utils import DEFAULT_CONTRACT_FTS_COLUMNS
+from apps.dw.settings_defaults import DEFAULT_EXPLICIT_FILTER_COLUMNS
+
+_BASE_COLUMNS = (
+    "CONTRACT_ID",
+    "REQUEST_DATE",
+    "START_DATE",
+    "END_DATE",
+    "CONTRACT_VALUE_NET_OF_VAT",
+    "VAT",
+)
+
+_IDENT_RE = re.compile(r"^[A-Za-z][A-Za-z0-9_$#]*$")
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_WORD_RE = re.compile(r"(?<![:\w.\"])([A-Za-z][A-Za-z0-9_$#]*)\b(?!\s*[.(])")
+_SELECT_STAR_RE = re.compile(r"^\s*SELECT\s+\*\s+FROM\s+(\"[^\"]+\"|[A-Za-z][\w$#]*)", re.IGNORECASE)
+_ALL_COLUMNS_RE = re.compile(
+    r"\b(?:all|every)\s+(?:the\s+)?(?:columns|fields|details|attributes)\b"
+    r"|\bselect\s*\*|\bfull\s+(?:details|rows?|records?)\b",
+    re.IGNORECASE,
+)
+
+
+def _as_list(raw: Any) -> List[str]:
+    if raw is None:
+        return []
+    if isinstance(raw, str):
+        text = raw.strip()
+        if not text:
+            return []
+        if text.startswith("["):
+            try:
+                raw = json.loads(text)
+            except ValueError:
+                return []
+        else:
+            raw = text.split(",")
+    if isinstance(raw, Mapping):
+        raw = [v for values in raw.values() for v in (values if isinstance(values, (list, tuple)) else [values])]
+    if not isinstance(raw, (list, tuple, set)):
+        return []
+    out: List[str] = []
+    for item in raw:
+        col = str(item or "").strip().upper()
+        if col and _IDENT_RE.match(col) and col not in out:
+            out.append(col)
+    return out
+
+
+def _setting(settings: Any, key: str, namespace: Optional[str]) -> Any:
+    if settings is None:
+        return None
+    if isinstance(settings, Mapping):
+        return settings.get(key)
+    getter = getattr(settings, "get_json", None) or getattr(settings, "get", None)
+    if not callable(getter):
+        return None
+    try:
+        if namespace:
+            return getter(key, scope="namespace", namespace=namespace)
+        return getter(key)
+    except TypeError:
+        return getter(key)
+    except Exception:
+        return None
+
+
+def display_columns(settings: Any, namespace: Optional[str] = None) -> List[str]:
+    """Configured display set for ``namespace``; empty means "no projection"."""
+
+    return _as_list(_setting(settings, "DW_DISPLAY_COLUMNS", namespace))
+
+
+def known_columns(settings: Any, namespace: Optional[str] = None) -> List[str]:
+    """Columns that may be added to a projection besides the display set."""
+
+    cols = list(_BASE_COLUMNS) + list(DEFAULT_EXPLICIT_FILTER_COLUMNS) + list(DEFAULT_CONTRACT_FTS_COLUMNS)
+    for key in ("DW_EXPLICIT_FILTER_COLUMNS", "DW_FTS_COLUMNS", "DW_EQ_ALIAS_COLUMNS"):
+        cols.extend(_as_list(_setting(settings, key, namespace)))
+    return list(dict.fromkeys(cols))
+
+
+def wants_all_columns(question: str) -> bool:
+    return bool(_ALL_COLUMNS_RE.search(question or ""))
+
+
+def referenced_columns(sql: str, universe: Iterable[str]) -> List[str]:
+    """Columns from ``universe`` that ``sql`` references, in order of appearance."""
+
+    known = {c.upper() for c in universe}
+    text = _LITERAL_RE.sub("''", str(sql or ""))
+    out: List[str] = []
+    for match in _WORD_RE.finditer(text):
+        word = match.group(1).upper()
+        if word in known and word not in out:
+            out.append(word)
+    return out
+
+
+def question_columns(question: str, universe: Iterable[str]) -> List[str]:
+    """Columns from ``universe`` named in ``question`` (``owner department`` -> ``OWNER_DEPARTMENT``)."""
+
+    q = " " + re.sub(r"[^a-z0-9]+", " ", (question or "").lower()) + " "
+    out: List[str] = []
+    for col in universe:
+        phrase = " " + col.lower().replace("_", " ") + " "
+        if phrase in q and col not in out:
+            out.append(col)
+    return out
+
+
+def project_select(
+    sql: str,
+    *,
+    settings: Any = None,
+    namespace: Optional[str] = None,
+    question: str = "",
+    select_all: bool = False,
+) -> Tuple[str, Dict[str, Any]]:
+    """Rewrite a leading ``SELECT * FROM <table>`` to the namespace projection.
+
+    Returns ``(sql, meta)``; ``meta`` is empty when ``sql`` is left alone.
+    """
+
+    match = _SELECT_STAR_RE.match(sql or "")
+    if match is None or select_all or wants_all_columns(question):
+        return sql, {}
+    display = display_columns(settings, namespace)
+    if not display:
+        return sql, {}
+    if re.search(r"\bJOIN\b", _LITERAL_RE.sub("''", sql), re.IGNORECASE):
+        return sql, {}
+    universe = known_columns(settings, namespace)
+    rest = sql[match.end(1):]
+    columns = list(display)
+    for col in referenced_columns(rest, universe) + question_columns(question, universe):
+        if col not in columns:
+            columns.append(col)
+    projected = f"SELECT {', '.join(columns)} FROM {match.group(1)}{rest}"
+    return projected, {"projection": {"columns": columns, "display": len(display)}}
+
+
+__all__ = [
+    "display_columns",
+    "known_columns",
+    "project_select",
+    "question_columns",
+    "referenced_columns",
+    "wants_all_columns",
+]
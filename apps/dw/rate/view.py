@@ -17,6 +17,7 @@ from apps.dw.search.filters import build_eq_where
 from apps.dw.fts_utils import DEFAULT_CONTRACT_FTS_COLUMNS
 from apps.dw.sql.builder import build_eq_boolean_groups_where, normalize_order_by
 from apps.dw.rate_dates import build_date_clause
+from apps.dw.projection import project_select
 
 rate_bp = Blueprint("rate", __name__)
 
@@ -224,6 +225,12 @@ def rate():
     if date_intent and getattr(date_intent, "order_by_override", None) and not has_explicit_sort:
         order_clause = date_intent.order_by_override
     final_sql = f'SELECT * FROM "{contract_table}"{where_sql} ORDER BY {order_clause}'
+    final_sql, projection_meta = project_select(
+        final_sql,
+        settings=effective_settings,
+        question=comment,
+        select_all=bool(payload.get("select_all")),
+    )
 
     binds: Dict[str, Any] = {}
     binds.update(date_binds)
@@ -242,7 +249,7 @@ def rate():
     legacy_sql: Optional[str] = None
     legacy_binds: Dict[str, Any] = {}
     try:
-        legacy_sql, legacy_binds = build_rate_sql(intent, enum_syn=enum_syn)
+        legacy_sql, legacy_binds = build_rate_sql(intent, enum_syn=enum_syn, settings=effective_settings)
     except Exception:
         legacy_sql = None
         legacy_binds = {}
@@ -319,8 +326,9 @@ def rate():
                 "binds": binds,
                 "clarifier_intent": intent,
                 "strategy": "det_overlaps_gross",
-                "wants_all_columns": True,
+                "wants_all_columns": not projection_meta,
                 "legacy_sql": legacy_sql,
+                **projection_meta,
             },
         }
     )
@@ -4,49 +4,14 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
-from datetime import date, datetime, timedelta
+from datetime import date, datetime
 from typing import Any, Dict, Optional, Tuple
 
+from apps.dw.date_resolver import parse_date_strict, resolve
 from apps.dw.rate.date_windows import compile_date_sql, detect_date_window
 
-try:  # Optional dependency used elsewhere in the DW stack
-    import dateparser  # type: ignore
-except Exception:  # pragma: no cover - optional dependency may not exist
-    dateparser = None  # type: ignore
-
-try:  # ``dateutil`` is available in most environments but keep a fallback.
-    from dateutil.relativedelta import relativedelta  # type: ignore
-except Exception:  # pragma: no cover - optional dependency may not exist
-    relativedelta = None  # type: ignore
-
 DateMode = str
 
-DATE_RE_RANGE = re.compile(
-    r"\b(\d{4}-\d{2}-\d{2})\s*(?:\.\.|to|-)\s*(\d{4}-\d{2}-\d{2})\b",
-    re.IGNORECASE,
-)
-DATE_RE_DMY_RANGE = re.compile(
-    r"\b(\d{1,2}/\d{1,2}/\d{4})\s*(?:\.\.|to|-)\s*(\d{1,2}/\d{1,2}/\d{4})\b",
-    re.IGNORECASE,
-)
-RE_NEXT_N = re.compile(r"\bnext\s+(\d+)\s+(day|days|month|months|year|years)\b", re.I)
-RE_LAST_N = re.compile(r"\blast\s+(\d+)\s+(day|days|month|months|year|years)\b", re.I)
-
-WINDOW_KEYWORDS = {
-    "last month": "LAST_MONTH",
-    "this month": "THIS_MONTH",
-    "last quarter": "LAST_QUARTER",
-    "this quarter": "THIS_QUARTER",
-    "quarter to date": "QTD",
-    "qtd": "QTD",
-    "year to date": "YTD",
-    "ytd": "YTD",
-    "this year": "THIS_YEAR",
-    "last year": "LAST_YEAR",
-    "last 3 months": "LAST_3_MONTHS",
-    "next 90 days": "NEXT_90_DAYS",
-}
-
 RE_REQUESTED = re.compile(r"\brequested\s+(.*)$", re.IGNORECASE)
 RE_ACTIVE = re.compile(r"\bactive\s+(.*)$", re.IGNORECASE)
 RE_EXPIRING = re.compile(r"\b(expiring|expires|ending|ends)\s+(.*)$", re.IGNORECASE)
@@ -69,150 +34,12 @@ def _today() -> date:
     return datetime.now().date()
 
 
-def _parse_date_str(text: str) -> Optional[date]:
-    cleaned = text.strip()
-    if not cleaned:
-        return None
-    for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d"):
-        try:
-            return datetime.strptime(cleaned, fmt).date()
-        except ValueError:
-            continue
-    if dateparser is not None:
-        parsed = dateparser.parse(cleaned)  # pragma: no cover - depends on optional lib
-        if parsed:
-            return parsed.date()
-    return None
-
-
-def _month_bounds(ref: date, shift: int = 0) -> Tuple[date, date]:
-    if relativedelta is not None:
-        start = (ref.replace(day=1) + relativedelta(months=shift)).replace(day=1)
-        end = (start + relativedelta(months=1)) - timedelta(days=1)
-        return start, end
-    # Fallback without dateutil: compute manually
-    month_index = ref.month - 1 + shift
-    year = ref.year + month_index // 12
-    month = month_index % 12 + 1
-    start = date(year, month, 1)
-    if month == 12:
-        end = date(year + 1, 1, 1) - timedelta(days=1)
-    else:
-        end = date(year, month + 1, 1) - timedelta(days=1)
-    return start, end
-
-
-def _quarter_bounds(ref: date, shift_quarters: int = 0) -> Tuple[date, date]:
-    quarter = (ref.month - 1) // 3 + shift_quarters
-    year = ref.year + quarter // 4
-    quarter = quarter % 4
-    start_month = quarter * 3 + 1
-    start = date(year, start_month, 1)
-    end_month = start_month + 2
-    if end_month == 12:
-        end = date(year, 12, 31)
-    else:
-        if end_month in (1, 3, 5, 7, 8, 10, 12):
-            end_day = 31
-        elif end_month == 2:
-            if (year % 400 == 0) or (year % 4 == 0 and year % 100 != 0):
-                end_day = 29
-            else:
-                end_day = 28
-        else:
-            end_day = 30
-        end = date(year, end_month, end_day)
-    return start, end
+_parse_date_str = parse_date_strict
 
 
 def _window_from_text(text: str, now: Optional[date] = None) -> Optional[Tuple[date, date]]:
-    now = now or _today()
-    normalized = text.strip().lower()
-    if not normalized:
-        return None
-
-    keyword = WINDOW_KEYWORDS.get(normalized)
-    if keyword == "LAST_MONTH":
-        return _month_bounds(now, shift=-1)
-    if keyword == "THIS_MONTH":
-        return _month_bounds(now, shift=0)
-    if keyword == "LAST_QUARTER":
-        return _quarter_bounds(now, shift_quarters=-1)
-    if keyword == "THIS_QUARTER":
-        return _quarter_bounds(now, shift_quarters=0)
-    if keyword == "QTD":
-        start, _ = _quarter_bounds(now, shift_quarters=0)
-        return start, now
-    if keyword == "YTD":
-        return date(now.year, 1, 1), now
-    if keyword == "THIS_YEAR":
-        return date(now.year, 1, 1), date(now.year, 12, 31)
-    if keyword == "LAST_YEAR":
-        year = now.year - 1
-        return date(year, 1, 1), date(year, 12, 31)
-    if keyword == "LAST_3_MONTHS":
-        start, _ = _month_bounds(now, shift=-2)
-        return start, now
-    if keyword == "NEXT_90_DAYS":
-        return now, now + timedelta(days=90)
-
-    match = RE_NEXT_N.search(normalized)
-    if match:
-        amount = int(match.group(1))
-        unit = match.group(2)
-        start = now
-        if unit.startswith("day"):
-            end = now + timedelta(days=amount)
-        elif unit.startswith("month"):
-            if relativedelta is not None:
-                end = now + relativedelta(months=amount)
-            else:
-                end = now + timedelta(days=30 * amount)
-        else:
-            if relativedelta is not None:
-                end = now + relativedelta(years=amount)
-            else:
-                end = date(now.year + amount, now.month, now.day)
-        return start, end
-
-    match = RE_LAST_N.search(normalized)
-    if match:
-        amount = int(match.group(1))
-        unit = match.group(2)
-        end = now
-        if unit.startswith("day"):
-            start = now - timedelta(days=amount)
-        elif unit.startswith("month"):
-            if relativedelta is not None:
-                start = now - relativedelta(months=amount)
-            else:
-                start = now - timedelta(days=30 * amount)
-        else:
-            if relativedelta is not None:
-                start = now - relativedelta(years=amount)
-            else:
-                start = date(now.year - amount, now.month, now.day)
-        return start, end
-
-    match = DATE_RE_RANGE.search(normalized)
-    if match:
-        start = _parse_date_str(match.group(1))
-        end = _parse_date_str(match.group(2))
-        if start and end:
-            return start, end
-
-    match = DATE_RE_DMY_RANGE.search(normalized)
-    if match:
-        start = _parse_date_str(match.group(1))
-        end = _parse_date_str(match.group(2))
-        if start and end:
-            return start, end
-
-    single = _parse_date_str(normalized)
-    if single:
-        return single, single
-
-    return None
+    hit = resolve(text, now or _today(), "rate_dates")
+    return (hit.start, hit.end) if hit else None
 
 
 def _date_sql(intent: DateIntent, settings: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
@@ -267,8 +94,10 @@ def build_date_clause(
     comment = comment or ""
     settings = settings or {}
 
+    now = _today()
+
     # Try the new lightweight detector first (supports EN/AR free-form text).
-    win = detect_date_window(comment)
+    win = detect_date_window(comment, today=now)
     if win and win.start and win.end:
         require_both = bool(int(settings.get("DW_OVERLAP_REQUIRE_BOTH_DATES", 1) or 0))
         strict_overlap = bool(int(settings.get("DW_OVERLAP_STRICT", 1) or 0))
@@ -333,7 +162,6 @@ def build_date_clause(
             window_text = value.strip()
             break
 
-    now = _today()
     mode: DateMode = "OVERLAP"
     column: Optional[str] = None
     order_override: Optional[str] = None
@@ -376,9 +204,9 @@ def build_date_clause(
                 key, value = part.split(":", 1)
                 normalized_key = key.strip().lower()
                 if normalized_key == "date_from":
-                    start_value = _parse_date_str(value.strip())
+                    start_value = _parse_date_str(value.strip(), now)
                 elif normalized_key == "date_to":
-                    end_value = _parse_date_str(value.strip())
+                    end_value = _parse_date_str(value.strip(), now)
             if start_value or end_value:
                 start = start_value or now
                 end = end_value or now
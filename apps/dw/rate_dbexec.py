@@ -1,13 +1,18 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Tuple
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
 
 try:  # pragma: no cover - optional dependency during tests
     from sqlalchemy import create_engine, inspect, text
+    from sqlalchemy.exc import DBAPIError
 except Exception:  # pragma: no cover - fallback when SQLAlchemy missing
     create_engine = None  # type: ignore[assignment]
     inspect = None  # type: ignore[assignment]
     text = None  # type: ignore[assignment]
+    DBAPIError = None  # type: ignore[assignment]
 
 try:  # pragma: no cover - optional dependency during tests
     from apps.dw.settings import get_setting
@@ -15,46 +20,143 @@ except Exception:  # pragma: no cover - fallback when settings helpers unavailab
     def get_setting(*_args, **kwargs):  # type: ignore[return-type]
         return kwargs.get("default")
 
+log = logging.getLogger("dw.rate_dbexec")
+
+# One pooled engine per APP_DB_URL and the column lists learned through it.
+# Both are keyed by the URL, so pointing APP_DB_URL elsewhere (admin
+# settings) builds a fresh engine, disposes the old one and drops its columns.
+_ENGINE: Optional[Any] = None
+_ENGINE_URL: Optional[str] = None
+_COLUMNS: Dict[Tuple[str, str], List[str]] = {}
+_LOCK = threading.Lock()
+
+# 0 = fetch everything; DW_RATE_MAX_ROWS opts in to a cap (logged when it bites).
+DEFAULT_MAX_ROWS = 0
+_FETCH_BATCH = 500
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _app_db_url() -> Optional[str]:
+    return get_setting("APP_DB_URL", scope="namespace") or get_setting(
+        "APP_DB_URL", scope="global"
+    )
+
 
 def _get_engine():
+    global _ENGINE, _ENGINE_URL
     if create_engine is None:  # pragma: no cover - guard when dependency missing
         raise RuntimeError("SQLAlchemy is required to execute RATE queries")
-    url = get_setting("APP_DB_URL", scope="namespace") or get_setting(
-        "APP_DB_URL", scope="global"
-    )
-    return create_engine(url, pool_pre_ping=True, future=True)
+    url = _app_db_url()
+    with _LOCK:
+        if _ENGINE is not None and _ENGINE_URL == url:
+            return _ENGINE
+        stale = _ENGINE
+        # Recycling bounds connection age instead of pinging on every checkout;
+        # a connection that still went stale is retried once in _execute().
+        _ENGINE = create_engine(
+            url,
+            future=True,
+            pool_pre_ping=os.getenv("DW_RATE_POOL_PRE_PING", "0").lower() in {"1", "true", "yes", "on"},
+            pool_recycle=_env_int("DW_RATE_POOL_RECYCLE", 1800),
+            pool_size=_env_int("DW_RATE_POOL_SIZE", 5),
+            max_overflow=_env_int("DW_RATE_POOL_OVERFLOW", 5),
+        )
+        _ENGINE_URL = url
+        _COLUMNS.clear()
+    if stale is not None:
+        try:
+            stale.dispose()
+        except Exception:  # pragma: no cover - best effort
+            pass
+    return _ENGINE
+
+
+def reset_engine_cache() -> None:
+    """Dispose the pooled engine and forget cached column lists."""
+
+    global _ENGINE, _ENGINE_URL
+    with _LOCK:
+        stale, _ENGINE, _ENGINE_URL = _ENGINE, None, None
+        _COLUMNS.clear()
+    if stale is not None:
+        try:
+            stale.dispose()
+        except Exception:  # pragma: no cover - best effort
+            pass
 
 
 def fetch_columns_fallback(table: str) -> List[str]:
     if create_engine is None or text is None:  # pragma: no cover - dependency guard
         return []
     eng = _get_engine()
+    key = (str(_ENGINE_URL), table.upper())
+    cached = _COLUMNS.get(key)
+    if cached is not None:
+        return list(cached)
+    cols: List[str] = []
     try:
         if inspect is not None:
             insp = inspect(eng)
             cols = [c["name"] for c in insp.get_columns(table)]
-            if cols:
-                return cols
-    except Exception:
-        pass
-    try:
-        with eng.connect() as conn:
-            rs = conn.execute(text(f'SELECT * FROM "{table}" WHERE 1=0'))
-            return list(rs.keys())
     except Exception:
-        return []
+        cols = []
+    if not cols:
+        try:
+            with eng.connect() as conn:
+                rs = conn.execute(text(f'SELECT * FROM "{table}" WHERE 1=0'))
+                cols = list(rs.keys())
+        except Exception:
+            return []
+    if cols:
+        with _LOCK:
+            if _ENGINE is eng:
+                _COLUMNS[key] = list(cols)
+    return cols
+
+
+def _execute(eng, sql: str, binds: Dict[str, Any], max_rows: int) -> Tuple[List[str], List[List[Any]], bool]:
+    with eng.connect() as conn:
+        rs = conn.execute(text(sql), binds or {})
+        keys = list(rs.keys())
+        rows: List[List[Any]] = []
+        truncated = False
+        while True:
+            batch = rs.fetchmany(_FETCH_BATCH)
+            if not batch:
+                break
+            rows.extend(list(row) for row in batch)
+            if max_rows and len(rows) >= max_rows:
+                truncated = len(rows) > max_rows or rs.fetchone() is not None
+                del rows[max_rows:]
+                break
+    return keys, rows, truncated
 
 
 def exec_sql_with_columns(
     sql: str, binds: Dict[str, Any], table: str
 ) -> Tuple[List[str], List[List[Any]]]:
+    """Run ``sql`` on the pooled engine; fetches at most ``DW_RATE_MAX_ROWS`` rows (0 = all)."""
+
     if create_engine is None or text is None:  # pragma: no cover - dependency guard
         raise RuntimeError("SQLAlchemy is required to execute RATE queries")
     eng = _get_engine()
-    with eng.connect() as conn:
-        rs = conn.execute(text(sql), binds or {})
-        keys = list(rs.keys())
-        rows = [list(row) for row in rs.fetchall()]
+    max_rows = _env_int("DW_RATE_MAX_ROWS", DEFAULT_MAX_ROWS)
+    try:
+        keys, rows, truncated = _execute(eng, sql, binds, max_rows)
+    except Exception as exc:
+        # Without pre-ping a pooled connection may have been dropped by the
+        # server; the pool has invalidated it, so one retry gets a fresh one.
+        if DBAPIError is None or not isinstance(exc, DBAPIError) or not exc.connection_invalidated:
+            raise
+        keys, rows, truncated = _execute(eng, sql, binds, max_rows)
+    if truncated:
+        log.warning("rate result truncated to %s rows (DW_RATE_MAX_ROWS)", max_rows)
     if not keys:
         keys = fetch_columns_fallback(table)
     return keys, rows
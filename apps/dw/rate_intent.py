@@ -15,7 +15,7 @@ from apps.dw.sql_shared import (
     like_sql,
     not_empty_sql,
     or_join,
-    request_type_synonyms,
+    request_type_matcher,
 )
 
 
@@ -323,7 +323,7 @@ def _normalized(values: Iterable[str]) -> List[str]:
 
 
 def _expand_request_type_equals(values: List[str]) -> Tuple[List[str], List[str], List[str]]:
-    mapping = request_type_synonyms().get("Contract.REQUEST_TYPE") or {}
+    matcher = request_type_matcher()
     equals: List[str] = []
     prefixes: List[str] = []
     contains_tokens: List[str] = []
@@ -332,18 +332,11 @@ def _expand_request_type_equals(values: List[str]) -> Tuple[List[str], List[str]
         if not normalized:
             continue
         equals.append(normalized)
-        for key, rules in mapping.items():
-            if not isinstance(rules, dict):
-                continue
-            key_text = str(key).strip()
-            if not key_text:
-                continue
-            all_equals = _normalized(rules.get("equals", [])) or [key_text.upper()]
-            if normalized.upper() == key_text.upper() or normalized.upper() in all_equals:
-                equals.extend(all_equals)
-                prefixes.extend(_normalized(rules.get("prefix", [])))
-                contains_tokens.extend(_normalized(rules.get("contains", [])))
-                break
+        expansion = matcher.expansion(normalized)
+        if expansion is not None:
+            equals.extend(expansion[0])
+            prefixes.extend(expansion[1])
+            contains_tokens.extend(expansion[2])
     return _normalized(equals), _normalized(prefixes), _normalized(contains_tokens)
 
 
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from typing import Any, Dict, Iterable, List, Tuple
 
+from apps.dw import row_limit
 from apps.dw.logger import log
 from apps.dw.rate_intent import _normalized, build_where_and_binds, parse_structured_comment
 from apps.dw.sql_shared import dw_date_col, dw_table, exec_sql, explicit_columns, eq_alias_columns
@@ -175,7 +176,13 @@ def run_rate(inquiry_id: int, rating: int, comment: str) -> Dict[str, Any]:
         }
     )
 
+    limit_meta: Dict[str, Any] = {}
     if not validate_only:
+        policy = row_limit.load_policy({key: get_setting(key) for key in row_limit.SETTING_KEYS})
+        if policy.enabled:
+            sql, binds, limit_meta = row_limit.plan(
+                sql, binds, policy, count_fn=lambda count_sql, count_binds: run_query(count_sql, count_binds)[1][0][0]
+            )
         try:
             result = run_query(sql, binds)
             if isinstance(result, tuple):
@@ -185,6 +192,8 @@ def run_rate(inquiry_id: int, rating: int, comment: str) -> Dict[str, Any]:
                 columns = []
             else:
                 columns, rows = [], []
+            if limit_meta:
+                row_limit.finalize(limit_meta, len(rows))
             log.info(
                 {
                     "event": "rate.sql.done",
@@ -231,6 +240,7 @@ def run_rate(inquiry_id: int, rating: int, comment: str) -> Dict[str, Any]:
         "binds": binds,
         "columns": columns,
         "rows": rows,
+        **limit_meta,
         "debug": {
             "final_sql": {"sql": sql, "size": len(sql)},
             "intent": debug_intent,
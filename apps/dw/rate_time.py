@@ -1,10 +1,10 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
-import re
 from dataclasses import dataclass, field
-from datetime import date, datetime, timedelta
+from datetime import date, datetime
 from typing import List, Dict, Tuple, Optional
-from calendar import monthrange
+
+from apps.dw.date_resolver import resolve
 
 # -----------------------------
 # Datamodel للـ Intent الخاص بـ /dw/rate
@@ -47,144 +47,19 @@ def ar_to_int(tok: str) -> Optional[int]:
 def _today() -> date:
     return datetime.now().date()
 
-def _start_of_month(d: date) -> date:
-    return d.replace(day=1)
-
-def _end_of_month(d: date) -> date:
-    return d.replace(day=monthrange(d.year, d.month)[1])
-
-def _start_of_quarter(d: date) -> date:
-    m = ((d.month - 1)//3)*3 + 1
-    return date(d.year, m, 1)
-
-def _end_of_quarter(d: date) -> date:
-    s = _start_of_quarter(d)
-    e = _shift_months(s, 3) - timedelta(days=1)
-    return e
-
-
-def _shift_months(d: date, months: int) -> date:
-    year = d.year + (d.month - 1 + months) // 12
-    month = (d.month - 1 + months) % 12 + 1
-    day = min(d.day, monthrange(year, month)[1])
-    return date(year, month, day)
-
-
-def _shift_years(d: date, years: int) -> date:
-    try:
-        return d.replace(year=d.year + years)
-    except ValueError:
-        # handle Feb 29
-        return d.replace(month=2, day=28, year=d.year + years)
-
 # -----------------------------
-# Parsing لصيغ التواريخ (EN/AR الأساسية)
+# Parsing لصيغ التواريخ (EN/AR الأساسية) — المنطق فى apps.dw.date_resolver
 # -----------------------------
-_re_num_range = re.compile(r"\b(last|next)\s+(\d+)\s+(day|days|week|weeks|month|months|year|years|quarter|quarters)\b", re.I)
-_re_between   = re.compile(r"\bbetween\s+(\d{4}-\d{2}-\d{2})\s+(and|-)\s+(\d{4}-\d{2}-\d{2})\b", re.I)
-_re_from      = re.compile(r"\bfrom\s+(\d{4}-\d{2}-\d{2})\b", re.I)
-_re_until     = re.compile(r"\b(until|to)\s+(\d{4}-\d{2}-\d{2})\b", re.I)
-
-def parse_date_phrase(text: str) -> Optional[Tuple[str, date, date]]:
+def parse_date_phrase(text: str, today: Optional[date] = None) -> Optional[Tuple[str, date, date]]:
     """
     يرجّع (label, start, end) لو قدر يفسّر العبارة الزمنية العامة
     label ممكن يكون: 'LAST_N_UNITS', 'NEXT_N_UNITS', 'THIS_MONTH', 'THIS_QUARTER', 'THIS_YEAR',
                      'LAST_QUARTER', 'NEXT_QUARTER', 'BETWEEN', 'FROM_TO'
     """
-    s = text.strip().lower()
-
-    # this/current
-    if re.search(r"\b(this|current)\s+month\b", s) or "هذا الشهر" in s or "الشهر الحالي" in s:
-        today = _today()
-        return ("THIS_MONTH", _start_of_month(today), _end_of_month(today))
-    if re.search(r"\b(this|current)\s+quarter\b", s) or "الربع الحالي" in s:
-        today = _today()
-        return ("THIS_QUARTER", _start_of_quarter(today), _end_of_quarter(today))
-    if re.search(r"\b(this|current)\s+year\b", s) or "هذه السنة" in s or "السنة الحالية" in s:
-        y = _today().year
-        return ("THIS_YEAR", date(y,1,1), date(y,12,31))
-
-    # last / next quarter (واحد or N quarters)
-    if re.search(r"\blast\s+quarter\b", s) or "الربع الماضي" in s:
-        tq = _shift_months(_start_of_quarter(_today()), -3)
-        return ("LAST_QUARTER", tq, _end_of_quarter(tq))
-    if re.search(r"\bnext\s+quarter\b", s) or "الربع القادم" in s or "الربع الجاي" in s:
-        nq = _shift_months(_start_of_quarter(_today()), 3)
-        return ("NEXT_QUARTER", nq, _end_of_quarter(nq))
-
-    # last/next N units (EN)
-    m = _re_num_range.search(s)
-    if m:
-        side, n, unit = m.group(1).lower(), int(m.group(2)), m.group(3).lower()
-        today = _today()
-        if unit.startswith("day"):
-            delta = timedelta(days=n)
-        elif unit.startswith("week"):
-            delta = timedelta(weeks=n)
-        elif unit.startswith("month"):
-            # months/quarters بالـ relativedelta
-            if side == "last":
-                start = _shift_months(today, -n)
-                return ("LAST_N_MONTHS", start, today)
-            else:
-                end = _shift_months(today, n)
-                return ("NEXT_N_MONTHS", today, end)
-        elif unit.startswith("year"):
-            if side == "last":
-                start = _shift_years(today, -n)
-                return ("LAST_N_YEARS", start, today)
-            else:
-                end = _shift_years(today, n)
-                return ("NEXT_N_YEARS", today, end)
-        elif unit.startswith("quarter"):
-            if side == "last":
-                start = _shift_months(today, -3*n)
-                return ("LAST_N_QUARTERS", start, today)
-            else:
-                end = _shift_months(today, 3*n)
-                return ("NEXT_N_QUARTERS", today, end)
-
-        if side == "last":
-            return ("LAST_N_DW", today - delta, today)
-        else:
-            return ("NEXT_N_DW", today, today + delta)
-
-    # between / from / until
-    m = _re_between.search(s)
-    if m:
-        d1 = date.fromisoformat(m.group(1))
-        d2 = date.fromisoformat(m.group(4))
-        if d2 < d1:
-            d1, d2 = d2, d1
-        return ("BETWEEN", d1, d2)
-    m = _re_from.search(s)
-    if m:
-        d1 = date.fromisoformat(m.group(1))
-        return ("FROM_TO", d1, _today())
-    m = _re_until.search(s)
-    if m:
-        d2 = date.fromisoformat(m.group(2))
-        # نافذة من قديم الأزل لحد d2
-        return ("FROM_TO", date(1970,1,1), d2)
-
-    # عربى: "الشهر الماضي/اللى فات" ، "الأسبوع القادم" ، "السنة الماضية"…
-    ar = s
-    if "الشهر الماضي" in ar or "الشهر اللى فات" in ar:
-        t = _today()
-        last_m = _shift_months(_start_of_month(t), -1)
-        return ("LAST_MONTH", last_m, _end_of_month(last_m))
-    if "الشهر القادم" in ar or "الشهر الجاي" in ar:
-        t = _today()
-        next_m = _shift_months(_start_of_month(t), 1)
-        return ("NEXT_MONTH", next_m, _end_of_month(next_m))
-    if "الأسبوع الماضي" in ar or "الاسبوع الماضي" in ar:
-        t = _today()
-        return ("LAST_WEEK", t - timedelta(days=7), t)
-    if "الأسبوع القادم" in ar or "الاسبوع القادم" in ar or "الأسبوع الجاي" in ar:
-        t = _today()
-        return ("NEXT_WEEK", t, t + timedelta(days=7))
-
-    return None
+    hit = resolve(text, today or _today(), "rate_time")
+    if hit is None:
+        return None
+    return (hit.label, hit.start, hit.end)
 
 # -----------------------------
 # تحديد نوع النافذة حسب العبارة
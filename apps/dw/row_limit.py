@@ -0,0 +1,351 @@
+"""COUNT-first row limiting for unbounded ``SELECT`` answers.
+
+Most answer paths emit ``SELECT * FROM "Contract" ... ORDER BY ...`` with no
+``FETCH FIRST`` unless the question asked for a top-N, so a vague question
+can return the whole table.  When ``DW_ROW_LIMIT_MODE`` is enabled the
+statement is sized first:
+
+* ``count``   -- ``SELECT COUNT(*)`` over the same statement (exact);
+* ``explain`` -- optimizer cardinality from ``EXPLAIN PLAN`` (no table scan,
+  estimate only; falls back to ``count`` if the plan cannot be read).
+
+Above ``DW_ROW_LIMIT_THRESHOLD`` rows the statement is paged with
+``FETCH FIRST :rl_limit ROWS ONLY`` (``OFFSET`` for later pages) and the
+response meta carries ``row_limit`` with the total and an opaque
+``next_cursor``.  Posting that cursor back with the same question returns
+the next page without recounting.
+
+Settings (mem_settings or env):
+  DW_ROW_LIMIT_MODE=off|count|explain   default off
+  DW_ROW_LIMIT_THRESHOLD=500            rows returned unpaged
+  DW_ROW_LIMIT_PAGE_SIZE=100            rows per page once limited
+"""
+from __future__ import annotations
+
+import base64
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import re
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Tuple
+
+from core.singleflight import canonical_key
+
+LOGGER = logging.getLogger("dw.row_limit")
+
+MODES = ("off", "count", "explain")
+SETTING_KEYS = ("DW_ROW_LIMIT_MODE", "DW_ROW_LIMIT_THRESHOLD", "DW_ROW_LIMIT_PAGE_SIZE")
+DEFAULT_THRESHOLD = 500
+DEFAULT_PAGE_SIZE = 100
+
+OFFSET_BIND = "rl_offset"
+LIMIT_BIND = "rl_limit"
+
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"")
+_LIMITED_RE = re.compile(r"\bFETCH\s+(?:FIRST|NEXT)\b|\bROWNUM\b|\bOFFSET\s+\S+\s+ROWS?\b|\bGROUP\s+BY\b")
+_AGGREGATE_RE = re.compile(r"\b(?:COUNT|SUM|AVG|MIN|MAX|LISTAGG)\s*\(")
+
+
+@dataclass(frozen=True)
+class RowLimitPolicy:
+    mode: str = "off"
+    threshold: int = DEFAULT_THRESHOLD
+    page_size: int = DEFAULT_PAGE_SIZE
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+
+def _setting(settings: Any, key: str, default: Any) -> Any:
+    value = None
+    if isinstance(settings, Mapping):
+        value = settings.get(key)
+    elif settings is not None:
+        getter = getattr(settings, "get", None)
+        if callable(getter):
+            try:
+                value = getter(key)
+            except Exception:
+                value = None
+    if value is None:
+        value = os.getenv(key)
+    return default if value is None or value == "" else value
+
+
+def _positive_int(value: Any, default: int) -> int:
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return default
+    return number if number > 0 else default
+
+
+def load_policy(settings: Any = None) -> RowLimitPolicy:
+    mode = str(_setting(settings, "DW_ROW_LIMIT_MODE", "off")).strip().lower()
+    if mode in {"1", "true", "on", "yes"}:
+        mode = "count"
+    if mode not in MODES:
+        mode = "off"
+    return RowLimitPolicy(
+        mode=mode,
+        threshold=_positive_int(_setting(settings, "DW_ROW_LIMIT_THRESHOLD", DEFAULT_THRESHOLD), DEFAULT_THRESHOLD),
+        page_size=_positive_int(_setting(settings, "DW_ROW_LIMIT_PAGE_SIZE", DEFAULT_PAGE_SIZE), DEFAULT_PAGE_SIZE),
+    )
+
+
+# ---------------------------------------------------------------------------
+# SQL shape
+# ---------------------------------------------------------------------------
+
+def _mask_literals(sql: str) -> str:
+    # Same length as the input so offsets found in the mask apply to ``sql``.
+    return _LITERAL_RE.sub(lambda m: "'" + "_" * (len(m.group(0)) - 2) + "'", sql)
+
+
+def _top_level(masked: str) -> str:
+    """``masked`` with everything inside parentheses blanked out."""
+
+    out = []
+    depth = 0
+    for ch in masked:
+        if ch == "(":
+            depth += 1
+            out.append(" ")
+        elif ch == ")":
+            depth = max(0, depth - 1)
+            out.append(" ")
+        else:
+            out.append(ch if depth == 0 else " ")
+    return "".join(out)
+
+
+def _strip(sql: str) -> str:
+    return str(sql or "").strip().rstrip(";").rstrip()
+
+
+def is_unbounded_select(sql: str) -> bool:
+    """True for a plain row query with no top-level limit, grouping or aggregate."""
+
+    text = _strip(sql)
+    masked = _mask_literals(text).upper()
+    if not re.match(r"\s*(SELECT|WITH)\b", masked):
+        return False
+    top = _top_level(masked)
+    if _LIMITED_RE.search(top):
+        return False
+    select = re.search(r"\bSELECT\b(.*?)\bFROM\b", top, re.S)
+    if select is None:
+        return False
+    # Aggregates without GROUP BY return one row; nothing to page.
+    start, end = select.span(1)
+    return not _AGGREGATE_RE.search(masked[start:end])
+
+
+def split_order_by(sql: str) -> Tuple[str, str]:
+    """Split off a trailing top-level ``ORDER BY``; returns ``(body, order_by)``."""
+
+    text = _strip(sql)
+    top = _top_level(_mask_literals(text).upper())
+    matches = list(re.finditer(r"\bORDER\s+BY\b", top))
+    if not matches:
+        return text, ""
+    idx = matches[-1].start()
+    return text[:idx].rstrip(), text[idx:].strip()
+
+
+def count_sql(sql: str) -> str:
+    body, _ = split_order_by(sql)
+    return f"SELECT COUNT(*) AS TOTAL_ROWS FROM (\n{body}\n)"
+
+
+def paged_sql(sql: str, offset: int) -> str:
+    text = _strip(sql)
+    if offset > 0:
+        return f"{text}\nOFFSET :{OFFSET_BIND} ROWS FETCH NEXT :{LIMIT_BIND} ROWS ONLY"
+    return f"{text}\nFETCH FIRST :{LIMIT_BIND} ROWS ONLY"
+
+
+def explain_cardinality(connection: Any, sql: str) -> Optional[int]:
+    """Optimizer row estimate for ``sql`` via ``EXPLAIN PLAN`` on ``connection``.
+
+    The statement is explained with its placeholders unbound (Oracle only
+    parses it), so this goes through ``exec_driver_sql``.
+    """
+
+    statement_id = "rl_" + uuid.uuid4().hex[:20]
+    connection.exec_driver_sql(f"EXPLAIN PLAN SET STATEMENT_ID = '{statement_id}' FOR {_strip(sql)}")
+    try:
+        row = connection.exec_driver_sql(
+            f"SELECT CARDINALITY FROM PLAN_TABLE WHERE STATEMENT_ID = '{statement_id}' AND ID = 0"
+        ).fetchone()
+    finally:
+        connection.exec_driver_sql(f"DELETE FROM PLAN_TABLE WHERE STATEMENT_ID = '{statement_id}'")
+    if not row or row[0] is None:
+        return None
+    return int(row[0])
+
+
+# ---------------------------------------------------------------------------
+# Cursors
+# ---------------------------------------------------------------------------
+
+def fingerprint(sql: str, binds: Optional[Mapping[str, Any]]) -> str:
+    clean = {k: v for k, v in (binds or {}).items() if k not in (OFFSET_BIND, LIMIT_BIND)}
+    return hashlib.sha1(canonical_key(sql, clean).encode("utf-8")).hexdigest()[:16]
+
+
+def encode_cursor(fp: str, offset: int, page_size: int, total: Optional[int], estimated: bool) -> str:
+    payload = {"f": fp, "o": offset, "n": page_size, "t": total, "e": int(estimated)}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: Any, fp: str) -> Optional[Dict[str, Any]]:
+    """Page described by ``token`` if it belongs to the statement ``fp``."""
+
+    if not token or not isinstance(token, str):
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw.decode("utf-8"))
+        if data.get("f") != fp:
+            return None
+        total = data.get("t")
+        return {
+            "offset": max(0, int(data["o"])),
+            "page_size": _positive_int(data.get("n"), DEFAULT_PAGE_SIZE),
+            "total": int(total) if total is not None else None,
+            "estimated": bool(data.get("e")),
+        }
+    except Exception:
+        return None
+
+
+_CURSOR: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("dw_row_limit_cursor", default=None)
+
+
+@contextmanager
+def requested_page(cursor: Any) -> Iterator[None]:
+    """Expose the request's ``cursor`` to :func:`plan` for the duration of an answer."""
+
+    token = _CURSOR.set(str(cursor) if cursor else None)
+    try:
+        yield
+    finally:
+        _CURSOR.reset(token)
+
+
+def current_cursor() -> Optional[str]:
+    return _CURSOR.get()
+
+
+# ---------------------------------------------------------------------------
+# Planning
+# ---------------------------------------------------------------------------
+
+def plan(
+    sql: str,
+    binds: Optional[Mapping[str, Any]],
+    policy: RowLimitPolicy,
+    *,
+    count_fn: Callable[[str, Dict[str, Any]], int],
+    estimate_fn: Optional[Callable[[str], Optional[int]]] = None,
+    cursor: Optional[str] = None,
+) -> Tuple[str, Dict[str, Any], Dict[str, Any]]:
+    """Return ``(sql, binds, meta)`` to execute instead of ``sql``.
+
+    ``meta`` is empty when the statement is left alone, otherwise it holds a
+    ``row_limit`` entry for the response.  Sizing errors never fail the
+    answer: the statement then runs unpaged, as it did before.
+    """
+
+    binds = dict(binds or {})
+    if not is_unbounded_select(sql):
+        return sql, binds, {}
+    fp = fingerprint(sql, binds)
+    page = decode_cursor(cursor, fp) if cursor else None
+    if page is None and not policy.enabled:
+        return sql, binds, {}
+
+    info: Dict[str, Any] = {"mode": policy.mode}
+    if cursor and page is None:
+        info["cursor_ignored"] = True
+        if not policy.enabled:
+            return sql, binds, {"row_limit": info}
+
+    if page is not None:
+        offset, page_size = page["offset"], page["page_size"]
+        total, estimated = page["total"], page["estimated"]
+    else:
+        offset, page_size = 0, policy.page_size
+        total, estimated = None, False
+        try:
+            if policy.mode == "explain" and estimate_fn is not None:
+                total = estimate_fn(sql)
+                estimated = total is not None
+            if total is None:
+                total = int(count_fn(count_sql(sql), binds))
+        except Exception as exc:
+            LOGGER.warning("row_limit sizing failed: %s", exc)
+            info["error"] = str(exc)
+            return sql, binds, {"row_limit": info}
+        if total <= policy.threshold:
+            info.update({"limited": False, "total_rows": total, "estimated": estimated})
+            return sql, binds, {"row_limit": info}
+
+    binds[LIMIT_BIND] = page_size
+    if offset > 0:
+        binds[OFFSET_BIND] = offset
+    next_offset = offset + page_size
+    info.update(
+        {
+            "limited": True,
+            "total_rows": total,
+            "estimated": estimated,
+            "offset": offset,
+            "page_size": page_size,
+            "ordered": bool(split_order_by(sql)[1]),
+            "next_cursor": (
+                encode_cursor(fp, next_offset, page_size, total, estimated)
+                if estimated or total is None or next_offset < total
+                else None
+            ),
+        }
+    )
+    return paged_sql(sql, offset), binds, {"row_limit": info}
+
+
+def finalize(meta: Dict[str, Any], rows_returned: int) -> Dict[str, Any]:
+    """Drop ``next_cursor`` once a page comes back short (estimates can overshoot)."""
+
+    info = meta.get("row_limit") if isinstance(meta, dict) else None
+    if isinstance(info, dict) and info.get("limited"):
+        info["rows_returned"] = rows_returned
+        if rows_returned < int(info.get("page_size") or 0):
+            info["next_cursor"] = None
+    return meta
+
+
+__all__ = [
+    "SETTING_KEYS",
+    "RowLimitPolicy",
+    "count_sql",
+    "current_cursor",
+    "decode_cursor",
+    "encode_cursor",
+    "explain_cardinality",
+    "finalize",
+    "fingerprint",
+    "is_unbounded_select",
+    "load_policy",
+    "paged_sql",
+    "plan",
+    "requested_page",
+    "split_order_by",
+]
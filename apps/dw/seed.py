@@ -8,6 +8,8 @@ from pathlib import Path
 import yaml
 from sqlalchemy import text
 
+from core.context_cache import bump_context_version
+
 BASE = Path(__file__).parent
 METRICS_DIR = BASE / "metrics"
 JOIN_GRAPH_FILE = BASE / "join_graph.yaml"
@@ -94,4 +96,6 @@ def seed_dw_knowledge(mem_engine, namespace: str, force: bool = False) -> dict:
                 _upsert_join(conn, namespace, join)
                 inserted_joins += 1
 
+    if inserted_metrics or inserted_joins:
+        bump_context_version(namespace)
     return {"metrics": inserted_metrics, "join_graph": inserted_joins}
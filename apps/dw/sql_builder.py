@@ -24,18 +24,25 @@ except Exception:  # pragma: no cover - fallback used in tests
 from apps.dw.fts_utils import DEFAULT_CONTRACT_FTS_COLUMNS
 from apps.dw.settings_defaults import DEFAULT_EXPLICIT_FILTER_COLUMNS
 from apps.dw.settings import get_setting as _rate_get_setting
+from apps.dw.contracts.slot_bridge import bridge_table, exists_predicate, split_slot_columns
+from apps.dw.common.ci_columns import normalized_columns, wrap_ci_trim
+from apps.dw.projection import project_select
 
 
-def _wrap_ci_trim(col_expr: str, bind_name: str, ci: bool, trim: bool) -> str:
+def _wrap_ci_trim(
+    col_expr: str,
+    bind_name: str,
+    ci: bool,
+    trim: bool,
+    normalized: Optional[Dict[str, str]] = None,
+) -> str:
     """Build a case-insensitive / trimmed equality predicate when requested."""
 
-    col = col_expr
+    col = wrap_ci_trim(col_expr, ci=ci, trim=trim, mapping=normalized)
     val = f":{bind_name}"
     if trim:
-        col = f"TRIM({col})"
         val = f"TRIM({val})"
     if ci:
-        col = f"UPPER({col})"
         val = f"UPPER({val})"
     return f"{col} = {val}"
 
@@ -69,6 +76,16 @@ def build_eq_where(
         if isinstance(col, str) and col.strip()
     }
 
+    normalized = normalized_columns(
+        {
+            "DW_NORMALIZED_COLUMNS": _get_setting(
+                "DW_NORMALIZED_COLUMNS",
+                scope="namespace",
+                namespace="dw::common",
+                default=None,
+            )
+        }
+    )
     predicates: List[str] = []
     idx = 0
     for filt in eq_filters:
@@ -81,7 +98,7 @@ def build_eq_where(
         trim_flag = filt.get("trim")
         ci = True if ci_flag is None else bool(ci_flag)
         tr = True if trim_flag is None else bool(trim_flag)
-        predicates.append(_wrap_ci_trim(col, bind_name, ci, tr))
+        predicates.append(_wrap_ci_trim(col, bind_name, ci, tr, normalized))
         idx += 1
     return predicates
 
@@ -820,18 +837,30 @@ def _rate_build_fts_where(fts: Dict[str, Any], binds: Dict[str, Any]) -> Tuple[s
     return "(" + joiner.join(clauses) + ")", binds
 
 
+def _rate_normalized_columns() -> Dict[str, str]:
+    try:
+        return normalized_columns(
+            {"DW_NORMALIZED_COLUMNS": _rate_get_setting("DW_NORMALIZED_COLUMNS", scope="namespace")}
+        )
+    except Exception:
+        return {}
+
+
+def _rate_slot_bridge() -> Optional[str]:
+    try:
+        return bridge_table({"DW_SLOT_BRIDGE": _rate_get_setting("DW_SLOT_BRIDGE", scope="namespace")})
+    except Exception:
+        return None
+
+
 def _rate_build_eq_where(eq_filters: List[Dict[str, Any]], enum_syn: Dict[str, Any], binds: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
     if not eq_filters:
         return "", binds
     parts: List[str] = []
+    normalized = _rate_normalized_columns()
 
     def _wrap(expr: str, *, ci: bool, trim: bool) -> str:
-        value = expr
-        if trim:
-            value = f"TRIM({value})"
-        if ci:
-            value = f"UPPER({value})"
-        return value
+        return wrap_ci_trim(expr, ci=ci, trim=trim, mapping=normalized)
 
     def _normalize_bind(value: Any, *, ci: bool, trim: bool) -> Any:
         if isinstance(value, str):
@@ -982,6 +1011,13 @@ def _rate_build_eq_where(eq_filters: List[Dict[str, Any]], enum_syn: Dict[str, A
 
         placeholders = [f":{name}" for name in bind_names]
         column_clauses: List[str] = []
+        bridge = _rate_slot_bridge() if (ci and tr) else None
+        if bridge:
+            # Slot columns (DEPARTMENT_1..8, CONTRACT_STAKEHOLDER_1..8) collapse
+            # into one indexed EXISTS against the unpivoted bridge.
+            slot_map, columns = split_slot_columns(columns)
+            for kind, slot_nos in slot_map.items():
+                column_clauses.append(exists_predicate(bridge, kind, bind_names, slot_nos=slot_nos))
         for column in columns:
             lhs = _wrap(column, ci=ci, trim=tr)
             column_clauses.append(f"{lhs} IN (" + ",".join(placeholders) + ")")
@@ -1038,7 +1074,9 @@ def _trunc_today() -> date:
     return datetime.utcnow().date()
 
 
-def build_rate_sql(intent: Dict[str, Any], enum_syn: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+def build_rate_sql(
+    intent: Dict[str, Any], enum_syn: Dict[str, Any], settings: Any = None
+) -> Tuple[str, Dict[str, Any]]:
     binds: Dict[str, Any] = {}
     select, group_clause, alias = _rate_build_group_select(intent.get("group_by"), bool(intent.get("gross")))
     where_parts: List[str] = []
@@ -1065,5 +1103,11 @@ def build_rate_sql(intent: Dict[str, Any], enum_syn: Dict[str, Any]) -> Tuple[st
     order_sql = f" {final_order}" if final_order else ""
     fetch_sql = _rate_build_fetch(intent.get("top_n"))
     sql = f"{select} FROM \"Contract\"{where_sql}{group_clause}{order_sql}{fetch_sql}"
+    sql, _ = project_select(
+        sql,
+        settings=settings,
+        question=str(intent.get("comment") or ""),
+        select_all=intent.get("select_all") is True,
+    )
     return sql, binds
 
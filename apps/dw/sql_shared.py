@@ -8,7 +8,10 @@ except Exception:  # pragma: no cover - allow tests without SQLAlchemy
     create_engine = None  # type: ignore[assignment]
     text = None  # type: ignore[assignment]
 
+from apps.dw.contracts.synonyms import CompiledEnumSynonyms, compiled_enum_synonyms
 from apps.dw.settings import get_setting
+from core import cost_guard
+from core.singleflight import engine_scope
 
 OracleBlank = "''"
 
@@ -95,6 +98,12 @@ def request_type_synonyms() -> Dict[str, Dict[str, Dict[str, List[str]]]]:
     return raw
 
 
+def request_type_matcher(key: str = "Contract.REQUEST_TYPE") -> CompiledEnumSynonyms:
+    """Compiled ``DW_ENUM_SYNONYMS`` entry for ``key`` (rebuilt when the setting changes)."""
+
+    return compiled_enum_synonyms(request_type_synonyms(), key)
+
+
 def normalize_ident(value: str) -> str:
     return (value or "").strip().upper()
 
@@ -163,10 +172,14 @@ def exec_sql(sql: str, binds: Dict[str, Any]) -> Tuple[List[str], List[List[Any]
     if text is None:  # pragma: no cover - dependency guard
         raise RuntimeError("sqlalchemy is required to execute DW SQL queries")
     engine = get_engine()
+    policy = cost_guard.load_policy({key: get_setting(key) for key in cost_guard.SETTING_KEYS})
+    if policy.enabled and str(engine.dialect.name).startswith("oracle"):
+        sql = cost_guard.enforce(cost_guard.check(sql, engine.connect, policy, scope=engine_scope(engine)))
     with engine.connect() as connection:
-        result = connection.execute(text(sql), binds or {})
-        columns = list(result.keys())
-        rows = [list(row) for row in result.fetchall()]
+        with cost_guard.call_timeout(connection, policy.timeout_ms):
+            result = connection.execute(text(sql), binds or {})
+            columns = list(result.keys())
+            rows = [list(row) for row in result.fetchall()]
     return columns, rows
 
 
@@ -188,5 +201,6 @@ __all__ = [
     "not_empty_sql",
     "not_equals_sql",
     "or_join",
+    "request_type_matcher",
     "request_type_synonyms",
 ]
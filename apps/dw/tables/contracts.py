@@ -6,6 +6,14 @@ from dataclasses import dataclass
 from datetime import date, datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 
+from apps.dw.date_resolver import (
+    YTD_YEAR_RE as _YTD_YEAR_RE,
+    add_months,
+    last_full_months,
+    last_n,
+    next_n_days as _next_n_days,
+    quarter_bounds,
+)
 from apps.dw.intent_utils import (
     build_fts_predicates,
     collect_fts_tokens,
@@ -13,12 +21,9 @@ from apps.dw.intent_utils import (
     synonyms_to_like_clauses,
 )
 
-from dateutil.relativedelta import relativedelta
-
-_YTD_YEAR_RE = re.compile(
-    r"(?:\b(?:ytd|year\s*to\s*date)\s*(\d{4})\b)|(?:\b(\d{4})\s*(?:ytd|year\s*to\s*date)\b)",
-    re.IGNORECASE,
-)
+from apps.dw.common.ci_columns import normalized_columns, wrap_ci_trim
+from apps.dw.contracts.rollups import RollupConfig, plan_grouped_gross, rollup_config
+from apps.dw.contracts.slot_bridge import bridge_table, exists_predicate, slot_cte_sql
 
 _LOWEST_RE = re.compile(r"\b(lowest|bottom|least|smallest|cheapest|min)\b", re.IGNORECASE)
 
@@ -58,7 +63,11 @@ def _syn_bucket_for(enum_map: Dict, field: str, value: str) -> Optional[Dict]:
     return None
 
 
-def _build_reqtype_condition(value: str, bucket: Optional[Dict]) -> Tuple[str, Dict[str, str]]:
+def _build_reqtype_condition(
+    value: str,
+    bucket: Optional[Dict],
+    lhs: str = "UPPER(TRIM(REQUEST_TYPE))",
+) -> Tuple[str, Dict[str, str]]:
     """Build a SQL predicate for REQUEST_TYPE from synonyms."""
 
     parts: list[str] = []
@@ -82,7 +91,7 @@ def _build_reqtype_condition(value: str, bucket: Optional[Dict]) -> Tuple[str, D
         key = f"rt_eq_{idx}"
         idx += 1
         binds[key] = candidate
-        eq_terms.append(f"UPPER(TRIM(REQUEST_TYPE)) = UPPER(:{key})")
+        eq_terms.append(f"{lhs} = UPPER(:{key})")
     if eq_terms:
         parts.append("(" + " OR ".join(eq_terms) + ")")
 
@@ -90,19 +99,19 @@ def _build_reqtype_condition(value: str, bucket: Optional[Dict]) -> Tuple[str, D
         key = f"rt_pre_{idx}"
         idx += 1
         binds[key] = candidate + "%"
-        parts.append(f"UPPER(TRIM(REQUEST_TYPE)) LIKE UPPER(:{key})")
+        parts.append(f"{lhs} LIKE UPPER(:{key})")
 
     for candidate in contains_list:
         key = f"rt_cont_{idx}"
         idx += 1
         binds[key] = "%" + candidate + "%"
-        parts.append(f"UPPER(TRIM(REQUEST_TYPE)) LIKE UPPER(:{key})")
+        parts.append(f"{lhs} LIKE UPPER(:{key})")
 
     if not bucket:
         key = f"rt_like_{idx}"
         idx += 1
         binds[key] = f"%{_norm(value)}%"
-        parts.append(f"UPPER(TRIM(REQUEST_TYPE)) LIKE UPPER(:{key})")
+        parts.append(f"{lhs} LIKE UPPER(:{key})")
 
     where_sql = "(" + " OR ".join(parts) + ")" if parts else "1=1"
     return where_sql, binds
@@ -125,7 +134,8 @@ def extract_request_type_filter(
     enum_map = _load_enum_synonyms(settings)
     bucket = _syn_bucket_for(enum_map, "Contract.REQUEST_TYPE", raw_value)
 
-    where_sql, binds = _build_reqtype_condition(raw_value, bucket)
+    lhs = wrap_ci_trim("REQUEST_TYPE", ci=True, trim=True, mapping=normalized_columns(settings))
+    where_sql, binds = _build_reqtype_condition(raw_value, bucket, lhs)
     explain = f"Filtering on REQUEST_TYPE ~= '{raw_value}' using synonyms (equals/prefix/contains)."
     return where_sql, binds, explain
 
@@ -252,7 +262,12 @@ def _apply_full_text_search(
     intent.fts_error = None
 
 
-def _maybe_apply_stakeholder_filters(intent: Intent, where_parts: List[str], binds: Dict[str, object]) -> None:
+def _maybe_apply_stakeholder_filters(
+    intent: Intent,
+    where_parts: List[str],
+    binds: Dict[str, object],
+    bridge: Optional[str] = None,
+) -> None:
     raw_question = intent.raw_question or intent.question or ""
     try:
         overrides = intent.overrides or {}
@@ -283,6 +298,9 @@ def _maybe_apply_stakeholder_filters(intent: Intent, where_parts: List[str], bin
         bind_name = f"sh_{key_idx}"
         next_idx = key_idx + 1
         binds[bind_name] = f"%{value}%"
+        if bridge:
+            token_groups.append(exists_predicate(bridge, "STAKEHOLDER", [bind_name], op="like"))
+            continue
         or_parts = [f"UPPER(TRIM({col})) LIKE UPPER(:{bind_name})" for col in STAKEHOLDER_COLS]
         token_groups.append("(" + " OR ".join(or_parts) + ")")
 
@@ -349,9 +367,7 @@ def _normalize_status(user_text: str) -> str | None:
 def _month_bounds_last_n(n: int, today: date) -> tuple[date, date]:
     """Calendar window covering last n months inclusive to end of last full day."""
     # Example: last 1 month => first day of previous month .. last day of previous month
-    end = (today.replace(day=1) - relativedelta(days=1))  # last day of previous month
-    start = (end.replace(day=1) - relativedelta(months=(n - 1)))
-    return start, end
+    return last_full_months(n, today)
 
 
 def _last_month(today: date) -> tuple[date, date]:
@@ -359,17 +375,7 @@ def _last_month(today: date) -> tuple[date, date]:
 
 
 def _last_quarter(today: date) -> tuple[date, date]:
-    q = (today.month - 1) // 3 + 1
-    last_q = q - 1 if q > 1 else 4
-    last_q_year = today.year if q > 1 else today.year - 1
-    first_month = 3 * last_q - 2
-    start = date(last_q_year, first_month, 1)
-    end = (start + relativedelta(months=3) - relativedelta(days=1))
-    return start, end
-
-
-def _next_n_days(n: int, today: date) -> tuple[date, date]:
-    return today, today + timedelta(days=n)
+    return quarter_bounds(today, -1)
 
 
 def _to_date(val: date | datetime | str) -> date:
@@ -491,7 +497,7 @@ def parse_intent(q: str, today: date | None = None) -> Intent:
     m_top_gross = re.search(r"top\s+(\d+)\s+.*gross.*last\s+(\d+)\s+months", qi)
     if m_top_gross:
         n = int(m_top_gross.group(1)); months = int(m_top_gross.group(2))
-        ds = t - relativedelta(months=months)
+        ds = add_months(t, -months)
         de = t
         intent.top_n = n
         intent.gross = True
@@ -534,7 +540,7 @@ def parse_intent(q: str, today: date | None = None) -> Intent:
     m_top_net_lmN = re.search(r"top\s+(\d+)\s+contracts.*contract value.*last\s+(\d+)\s+months", qi)
     if m_top_net_lmN:
         n = int(m_top_net_lmN.group(1)); months = int(m_top_net_lmN.group(2))
-        ds = t - relativedelta(months=months); de = t
+        ds = add_months(t, -months); de = t
         intent.top_n = n
         intent.gross = False
         intent.window_kind = "OVERLAP"
@@ -692,8 +698,9 @@ def parse_intent(q: str, today: date | None = None) -> Intent:
 
     # ---- Gross by stakeholder slots over last N days ------------------------
     if "gross" in qi and "stakeholder" in qi and "last" in qi and "days" in qi:
-        m_days = re.search(r"last\s+(\d+)\s+days", qi)
-        ndays = int(m_days.group(1)) if m_days else 90
+        ndays = last_n(qi, "days")
+        if ndays is None:
+            ndays = 90
         date_end = t
         date_start = t - timedelta(days=ndays)
         intent.special = "gross_by_stakeholder_slots_last_ndays"
@@ -729,8 +736,9 @@ def parse_intent(q: str, today: date | None = None) -> Intent:
 
     # ---- Average gross per REQUEST_TYPE last N months -----------------------
     if "average gross" in qi and "request_type" in qi:
-        m_months = re.search(r"last\s+(\d+)\s+months", qi)
-        months = int(m_months.group(1)) if m_months else 6
+        months = last_n(qi, "months")
+        if months is None:
+            months = 6
         ds, de = _month_bounds_last_n(months, t)
         intent.group_by = "REQUEST_TYPE"
         intent.agg = "avg"
@@ -882,7 +890,11 @@ def parse_intent(q: str, today: date | None = None) -> Intent:
 
 
 # ---- Build SQL ---------------------------------------------------------------
-def _build_special(intent: Intent) -> tuple[str, dict, dict]:
+def _build_special(
+    intent: Intent,
+    bridge: Optional[str] = None,
+    rollup: Optional[RollupConfig] = None,
+) -> tuple[str, dict, dict]:
     params = intent.special_params or {}
     special = intent.special or ""
     explain_meta = "; ".join(intent.explain_parts or [])
@@ -899,18 +911,37 @@ def _build_special(intent: Intent) -> tuple[str, dict, dict]:
         date_start = _to_date(params.get("date_start"))
         date_end = _to_date(params.get("date_end"))
         slots = int(params.get("slots", STAKEHOLDER_SLOTS))
+        planned = None
+        if slots == STAKEHOLDER_SLOTS:
+            planned = plan_grouped_gross(
+                rollup,
+                ["STAKEHOLDER"],
+                date_column="OVERLAP",
+                date_start=date_start,
+                date_end=date_end,
+                measure_alias="MEASURE",
+                with_count=False,
+            )
+        if planned is not None:
+            return planned[0], planned[1], _build_meta(
+                intent,
+                explain=explain_meta,
+                gross=True,
+                group_by="STAKEHOLDER",
+                strategy="contract_deterministic",
+                aggregate_source="rollup",
+            )
         gross_alias = _gross_from_alias("NET", "VAT")
         overlap = _overlap_condition()
-        union_parts = []
-        for idx in range(1, slots + 1):
-            union_parts.append(
-                f"SELECT CONTRACT_STAKEHOLDER_{idx} AS STAKEHOLDER,\n"
-                "       NVL(CONTRACT_VALUE_NET_OF_VAT,0) AS NET,\n"
-                "       NVL(VAT,0) AS VAT\n"
-                '  FROM "Contract"\n'
-                f"  WHERE {overlap}"
-            )
-        cte = "\nUNION ALL\n".join(union_parts)
+        cte = slot_cte_sql(
+            bridge,
+            "STAKEHOLDER",
+            "{col} AS STAKEHOLDER,\n"
+            "       NVL(CONTRACT_VALUE_NET_OF_VAT,0) AS NET,\n"
+            "       NVL(VAT,0) AS VAT\n",
+            overlap,
+            slots=slots,
+        )
         sql = (
             "WITH S AS (\n"
             f"{cte}\n"
@@ -1006,14 +1037,13 @@ def _build_special(intent: Intent) -> tuple[str, dict, dict]:
         min_n = int(params.get("min_n", 5))
         ds = _to_date(date(2024, 1, 1))
         de = _to_date(date(2024, 12, 31))
-        union_parts = []
-        for idx in range(1, STAKEHOLDER_SLOTS + 1):
-            union_parts.append(
-                f"SELECT CONTRACT_STAKEHOLDER_{idx} AS STAKEHOLDER\n"
-                '  FROM "Contract"\n'
-                "  WHERE REQUEST_DATE BETWEEN :date_start AND :date_end"
-            )
-        cte = "\nUNION ALL\n".join(union_parts)
+        cte = slot_cte_sql(
+            bridge,
+            "STAKEHOLDER",
+            "{col} AS STAKEHOLDER\n",
+            "REQUEST_DATE BETWEEN :date_start AND :date_end",
+            slots=STAKEHOLDER_SLOTS,
+        )
         sql = (
             "WITH S AS (\n"
             f"{cte}\n"
@@ -1067,17 +1097,16 @@ def _build_special(intent: Intent) -> tuple[str, dict, dict]:
         ds = _to_date(date(year, 1, 1))
         de = _to_date(date(year, 12, 31))
         overlap = _overlap_condition()
-        union_parts = []
-        for idx in range(1, STAKEHOLDER_SLOTS + 1):
-            union_parts.append(
-                f"SELECT CONTRACT_STAKEHOLDER_{idx} AS STAKEHOLDER,\n"
-                "       OWNER_DEPARTMENT,\n"
-                "       NVL(CONTRACT_VALUE_NET_OF_VAT,0) AS NET,\n"
-                "       NVL(VAT,0) AS VAT\n"
-                '  FROM "Contract"\n'
-                f"  WHERE {overlap}"
-            )
-        cte = "\nUNION ALL\n".join(union_parts)
+        cte = slot_cte_sql(
+            bridge,
+            "STAKEHOLDER",
+            "{col} AS STAKEHOLDER,\n"
+            "       OWNER_DEPARTMENT,\n"
+            "       NVL(CONTRACT_VALUE_NET_OF_VAT,0) AS NET,\n"
+            "       NVL(VAT,0) AS VAT\n",
+            overlap,
+            slots=STAKEHOLDER_SLOTS,
+        )
         gross_alias = _gross_from_alias("NET", "VAT")
         sql = (
             "WITH S AS (\n"
@@ -1107,16 +1136,15 @@ def _build_special(intent: Intent) -> tuple[str, dict, dict]:
         ds = _to_date(end_date - timedelta(days=days))
         de = _to_date(end_date)
         overlap = _overlap_condition()
-        union_parts = []
-        for idx in range(1, STAKEHOLDER_SLOTS + 1):
-            union_parts.append(
-                f"SELECT OWNER_DEPARTMENT, CONTRACT_STAKEHOLDER_{idx} AS STAKEHOLDER,\n"
-                "       NVL(CONTRACT_VALUE_NET_OF_VAT,0) AS NET,\n"
-                "       NVL(VAT,0) AS VAT\n"
-                '  FROM "Contract"\n'
-                f"  WHERE {overlap}"
-            )
-        cte = "\nUNION ALL\n".join(union_parts)
+        cte = slot_cte_sql(
+            bridge,
+            "STAKEHOLDER",
+            "OWNER_DEPARTMENT, {col} AS STAKEHOLDER,\n"
+            "       NVL(CONTRACT_VALUE_NET_OF_VAT,0) AS NET,\n"
+            "       NVL(VAT,0) AS VAT\n",
+            overlap,
+            slots=STAKEHOLDER_SLOTS,
+        )
         gross_alias = _gross_from_alias("NET", "VAT")
         sql = (
             "WITH P AS (\n"
@@ -1276,12 +1304,13 @@ def _build_special(intent: Intent) -> tuple[str, dict, dict]:
 
 
 def build_sql(intent: Intent, settings: Optional[Dict[str, object]] = None) -> tuple[str, dict, dict]:
+    settings_map: Dict[str, object] = dict(settings or {})
+    bridge = bridge_table(settings_map)
     if intent.special:
-        return _build_special(intent)
+        return _build_special(intent, bridge=bridge, rollup=rollup_config(settings_map))
 
     binds = {}
     parts = []
-    settings_map: Dict[str, object] = dict(settings or {})
 
     # Auto-detected equality filters from the natural language question.
     explicit_setting = settings_map.get("DW_EXPLICIT_FILTER_COLUMNS", [])
@@ -1436,7 +1465,7 @@ def build_sql(intent: Intent, settings: Optional[Dict[str, object]] = None) -> t
             binds.update(new_binds)
 
     _apply_full_text_search(settings_map, intent, parts, binds)
-    _maybe_apply_stakeholder_filters(intent, parts, binds)
+    _maybe_apply_stakeholder_filters(intent, parts, binds, bridge=bridge)
 
     # REQUEST_TYPE filter via synonyms (avoid duplicate clauses)
     existing_reqtype = any(
@@ -4,6 +4,7 @@ import datetime as _dt
 import logging
 import os
 import re
+import time
 from calendar import monthrange
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -13,6 +14,8 @@ import yaml
 from dateutil.relativedelta import relativedelta
 from flask import Flask
 
+from .parallel_runner import attach_latency, is_deterministic, post_all, stage_timings
+
 
 class GoldenLoader(yaml.SafeLoader):
     """Custom YAML loader supporting temporal tags for golden tests."""
@@ -740,6 +743,9 @@ def run_golden_tests(
     namespace: Optional[str] = None,
     limit: Optional[int] = None,
     path: Optional[str | Path] = None,
+    workers: int = 1,
+    mode: str = "thread",
+    app_factory: str = "main:create_app",
 ) -> Dict[str, Any]:
     ns_clean = namespace.strip() if isinstance(namespace, str) else None
 
@@ -783,7 +789,7 @@ def run_golden_tests(
         cases = cases[:limit]
 
     # If we do not have an app to call, just report the count
-    if not flask_app:
+    if not flask_app and mode != "process":
         return {
             "ok": True,
             "total": len(cases),
@@ -792,47 +798,56 @@ def run_golden_tests(
             "namespace": ns_clean or default_namespace,
         }
 
+    hydrated = [_hydrate_case(raw) for raw in cases]
+    requests = []
+    for case in hydrated:
+        payload = {
+            "prefixes": case.prefixes,
+            "question": case.question,
+            "auth_email": case.auth_email,
+            "full_text_search": case.full_text_search,
+        }
+        if case.namespace:
+            payload["namespace"] = case.namespace
+        if case.binds:
+            payload["binds"] = _serialize_binds_for_json(case.binds)
+        requests.append(("/dw/answer", payload))
+
+    t_run = time.perf_counter()
+    responses = post_all(
+        requests, app=flask_app, workers=workers, mode=mode, app_factory=app_factory
+    )
+    wall_ms = int((time.perf_counter() - t_run) * 1000)
+
     results: List[Dict[str, Any]] = []
     passed_count = 0
-
-    with flask_app.test_client() as client:
-        for idx, raw in enumerate(cases, start=1):
-            case = _hydrate_case(raw)
-            payload = {
-                "prefixes": case.prefixes,
-                "question": case.question,
-                "auth_email": case.auth_email,
-                "full_text_search": case.full_text_search,
-            }
-            if case.namespace:
-                payload["namespace"] = case.namespace
-            if case.binds:
-                payload["binds"] = _serialize_binds_for_json(case.binds)
-            try:
-                rv = client.post("/dw/answer", json=payload)
-                data = rv.get_json(silent=True) or {}
-            except Exception as e:
-                data = {"ok": False, "error": f"exception: {e}"}
-
-            ok, reasons = _check_expectations(case, data)
-            if ok:
-                passed_count += 1
-
-            results.append({
-                "idx": idx,
-                "namespace": case.namespace,
-                "question": case.question,
-                "passed": ok,
-                "reasons": reasons,
-                "binds": _serialize_binds_for_json(case.binds),
-                "sql": data.get("sql"),
-                "meta": data.get("meta"),
-            })
-
-    return {
+    for idx, (case, response) in enumerate(zip(hydrated, responses), start=1):
+        data = response["data"]
+        ok, reasons = _check_expectations(case, data)
+        if ok:
+            passed_count += 1
+
+        results.append({
+            "idx": idx,
+            "namespace": case.namespace,
+            "question": case.question,
+            "passed": ok,
+            "reasons": reasons,
+            "binds": _serialize_binds_for_json(case.binds),
+            "sql": data.get("sql"),
+            "meta": data.get("meta"),
+            "latency_ms": round(response["latency_ms"], 1),
+            "stages": stage_timings(data, response["latency_ms"]),
+            "deterministic": is_deterministic(data),
+        })
+
+    report = {
         "ok": True,
         "total": len(results),
         "passed": passed_count,
         "results": results,
         "namespace": ns_clean or default_namespace,
+        "workers": workers,
+        "wall_ms": wall_ms,
     }
+    return attach_latency(report, results)
@@ -0,0 +1,299 @@
+"""Parallel execution, timing and perf-baseline helpers for the DW golden suites.
+
+Requests are sharded across a thread pool (one Flask test client per thread)
+or a process pool (one app per process, built from an ``module:factory``
+path).  Every response is timed, stage timings are lifted from
+``meta.duration_ms`` / ``meta.exec_ms``, and reports can be written as JSON or
+JUnit XML.  A perf baseline records p50/p95 latency of the deterministic path
+so a later run fails when it regresses beyond a threshold.
+
+CLI:
+  python -m apps.dw.tests.parallel_runner --cases tests/golden/dw_cases.yaml \\
+      --workers 4 --json out.json --junit out.xml \\
+      --baseline apps/dw/tests/perf_baseline.json --threshold 25
+  (add --update-baseline to record a new baseline)
+"""
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import math
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Strategies that go through the LLM; everything else is the deterministic path.
+NON_DETERMINISTIC_STRATEGIES = {"planner_fallback"}
+
+Request = Tuple[str, Dict[str, Any]]  # (endpoint, json payload)
+
+
+# ---------------------------------------------------------------------------
+# Timing helpers
+# ---------------------------------------------------------------------------
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Linear-interpolated percentile (``pct`` in 0..100)."""
+
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return float(ordered[0])
+    rank = (len(ordered) - 1) * (pct / 100.0)
+    lo = math.floor(rank)
+    hi = math.ceil(rank)
+    if lo == hi:
+        return float(ordered[int(rank)])
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (rank - lo)
+
+
+def latency_summary(values: Sequence[float]) -> Dict[str, Any]:
+    if not values:
+        return {"count": 0, "p50": 0.0, "p95": 0.0, "max": 0.0, "mean": 0.0}
+    return {
+        "count": len(values),
+        "p50": round(percentile(values, 50), 1),
+        "p95": round(percentile(values, 95), 1),
+        "max": round(max(values), 1),
+        "mean": round(sum(values) / len(values), 1),
+    }
+
+
+def stage_timings(data: Dict[str, Any], latency_ms: float) -> Dict[str, Any]:
+    """Per-stage breakdown: client wall time, server time, SQL exec and the rest."""
+
+    meta = (data or {}).get("meta") or {}
+    stages: Dict[str, Any] = {"wall_ms": round(latency_ms, 1)}
+    server_ms = meta.get("duration_ms")
+    exec_ms = meta.get("exec_ms")
+    if isinstance(server_ms, (int, float)):
+        stages["server_ms"] = server_ms
+        if isinstance(exec_ms, (int, float)):
+            stages["plan_ms"] = max(0, server_ms - exec_ms)
+    if isinstance(exec_ms, (int, float)):
+        stages["exec_ms"] = exec_ms
+    return stages
+
+
+def is_deterministic(data: Dict[str, Any]) -> bool:
+    strategy = str(((data or {}).get("meta") or {}).get("strategy") or "")
+    return strategy not in NON_DETERMINISTIC_STRATEGIES and "llm" not in strategy.lower()
+
+
+# ---------------------------------------------------------------------------
+# Execution
+# ---------------------------------------------------------------------------
+
+def _post(client: Any, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    try:
+        rv = client.post(endpoint, json=payload)
+        status = rv.status_code
+        data = rv.get_json(silent=True) or {}
+    except Exception as exc:
+        status = 0
+        data = {"ok": False, "error": f"exception: {exc}"}
+    return {"status": status, "data": data, "latency_ms": (time.perf_counter() - t0) * 1000}
+
+
+_PROC_CLIENT: Any = None
+
+
+def _load_factory(path: str):
+    module_name, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module_name), attr or "create_app")
+
+
+def _proc_init(app_factory: str) -> None:
+    global _PROC_CLIENT
+    _PROC_CLIENT = _load_factory(app_factory)().test_client()
+
+
+def _proc_post(request: Request) -> Dict[str, Any]:
+    return _post(_PROC_CLIENT, request[0], request[1])
+
+
+def post_all(
+    requests: Sequence[Request],
+    *,
+    app: Any = None,
+    workers: int = 1,
+    mode: str = "thread",
+    app_factory: str = "main:create_app",
+) -> List[Dict[str, Any]]:
+    """POST every request and return ``{"status", "data", "latency_ms"}`` in input order."""
+
+    if not requests:
+        return []
+    workers = max(1, int(workers or 1))
+
+    if mode == "process":
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_proc_init, initargs=(app_factory,)
+        ) as pool:
+            return list(pool.map(_proc_post, requests))
+
+    if app is None:
+        raise ValueError("thread mode requires a Flask app")
+    # Unwrap ``current_app`` so worker threads do not need an app context.
+    app = getattr(app, "_get_current_object", lambda: app)()
+
+    if workers == 1:
+        client = app.test_client()
+        return [_post(client, endpoint, payload) for endpoint, payload in requests]
+
+    local = threading.local()
+
+    def _run(request: Request) -> Dict[str, Any]:
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = app.test_client()
+        return _post(client, request[0], request[1])
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="golden") as pool:
+        return list(pool.map(_run, requests))
+
+
+# ---------------------------------------------------------------------------
+# Reports and baselines
+# ---------------------------------------------------------------------------
+
+def write_json_report(path: str | Path, report: Dict[str, Any]) -> None:
+    Path(path).write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+
+
+def write_junit_report(path: str | Path, suite: str, results: Iterable[Dict[str, Any]]) -> None:
+    results = list(results)
+    failures = [r for r in results if not r.get("passed")]
+    total_s = sum(float((r.get("latency_ms") or 0)) for r in results) / 1000.0
+    root = ET.Element(
+        "testsuite",
+        name=suite,
+        tests=str(len(results)),
+        failures=str(len(failures)),
+        time=f"{total_s:.3f}",
+    )
+    for r in results:
+        case = ET.SubElement(
+            root,
+            "testcase",
+            classname=suite,
+            name=f"{r.get('idx')}: {r.get('question') or r.get('name') or ''}"[:200],
+            time=f"{float(r.get('latency_ms') or 0) / 1000.0:.3f}",
+        )
+        if not r.get("passed"):
+            failure = ET.SubElement(case, "failure", message="; ".join(r.get("reasons") or [])[:500])
+            failure.text = r.get("sql") or ""
+    ET.ElementTree(root).write(str(path), encoding="utf-8", xml_declaration=True)
+
+
+def build_baseline(report: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "deterministic": report.get("latency_deterministic") or {},
+    }
+
+
+def compare_to_baseline(
+    report: Dict[str, Any], baseline: Dict[str, Any], threshold_pct: float = 25.0, min_delta_ms: float = 5.0
+) -> List[str]:
+    """Return human-readable regressions of p50/p95 beyond ``threshold_pct``.
+
+    ``min_delta_ms`` ignores noise on very fast paths.
+    """
+
+    current = report.get("latency_deterministic") or {}
+    base = (baseline or {}).get("deterministic") or {}
+    regressions: List[str] = []
+    for key in ("p50", "p95"):
+        old = float(base.get(key) or 0)
+        new = float(current.get(key) or 0)
+        if old <= 0:
+            continue
+        if new > old * (1 + threshold_pct / 100.0) and (new - old) >= min_delta_ms:
+            regressions.append(f"{key} {new:.1f}ms > baseline {old:.1f}ms (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def attach_latency(report: Dict[str, Any], results: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Add overall and deterministic-path latency summaries to ``report``."""
+
+    report["latency"] = latency_summary([r["latency_ms"] for r in results if "latency_ms" in r])
+    report["latency_deterministic"] = latency_summary(
+        [r["latency_ms"] for r in results if "latency_ms" in r and r.get("deterministic")]
+    )
+    return report
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Parallel DW golden runner with perf baseline")
+    parser.add_argument("--cases", default=None, help="golden YAML (defaults to the runner's file)")
+    parser.add_argument("--namespace", default=None)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--mode", choices=["thread", "process"], default="thread")
+    parser.add_argument("--app-factory", default="main:create_app")
+    parser.add_argument("--json", dest="json_path", default=None)
+    parser.add_argument("--junit", dest="junit_path", default=None)
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=25.0, help="allowed p50/p95 regression in percent")
+    args = parser.parse_args(argv)
+
+    from apps.dw.tests.golden_runner import run_golden_tests
+
+    app = _load_factory(args.app_factory)() if args.mode == "thread" else None
+    report = run_golden_tests(
+        flask_app=app,
+        namespace=args.namespace,
+        limit=args.limit,
+        path=args.cases,
+        workers=args.workers,
+        mode=args.mode,
+        app_factory=args.app_factory,
+    )
+
+    exit_code = 0 if report.get("ok") and report.get("passed") == report.get("total") else 1
+    if args.baseline:
+        baseline_path = Path(args.baseline)
+        if args.update_baseline or not baseline_path.exists():
+            write_json_report(baseline_path, build_baseline(report))
+        else:
+            baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+            regressions = compare_to_baseline(report, baseline, args.threshold)
+            report["perf_regressions"] = regressions
+            if regressions:
+                exit_code = 1
+
+    if args.json_path:
+        write_json_report(args.json_path, report)
+    if args.junit_path:
+        write_junit_report(args.junit_path, "dw_golden", report.get("results") or [])
+
+    print(
+        json.dumps(
+            {
+                "passed": report.get("passed"),
+                "total": report.get("total"),
+                "latency": report.get("latency"),
+                "latency_deterministic": report.get("latency_deterministic"),
+                "perf_regressions": report.get("perf_regressions"),
+            },
+            indent=2,
+        )
+    )
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,8 @@ from typing import Any, Dict, List
 
 from flask import Blueprint, current_app, jsonify, request
 
+from .parallel_runner import latency_summary, post_all
+
 rate_tests_bp = Blueprint("rate_tests_bp", __name__)
 
 
@@ -23,15 +25,10 @@ class Case:
     expect: Expect
 
 
-def _run_one(case: Case) -> Dict[str, Any]:
-    client = current_app.test_client()
-    resp = client.post("/dw/rate", json=case.body)
-    ok_http = resp.status_code == 200
-    data: Dict[str, Any] = {}
-    try:
-        data = resp.get_json(force=True, silent=False) or {}
-    except Exception:
-        pass
+def _check_one(case: Case, response: Dict[str, Any]) -> Dict[str, Any]:
+    status = response["status"]
+    ok_http = status == 200
+    data: Dict[str, Any] = response.get("data") or {}
 
     result: Dict[str, Any] = {
         "name": case.name,
@@ -39,10 +36,11 @@ def _run_one(case: Case) -> Dict[str, Any]:
         "ok": False,
         "errors": [],
         "response": data,
+        "latency_ms": round(response["latency_ms"], 1),
     }
 
     if not ok_http:
-        result["errors"].append(f"HTTP {resp.status_code}")
+        result["errors"].append(f"HTTP {status}")
         return result
 
     sql_top = data.get("sql")
@@ -187,7 +185,12 @@ def run_rate_suite() -> Any:
     payload = request.get_json(silent=True) or {}
     level = (payload.get("level") or "all").lower()
     cases = _cases(level)
-    results = [_run_one(case) for case in cases]
+    responses = post_all(
+        [("/dw/rate", case.body) for case in cases],
+        app=current_app,
+        workers=int(payload.get("workers") or 1),
+    )
+    results = [_check_one(case, response) for case, response in zip(cases, responses)]
     passed = sum(1 for result in results if result["ok"])
     return jsonify(
         {
@@ -198,5 +201,6 @@ def run_rate_suite() -> Any:
             "passed": passed,
             "total": len(results),
             "results": results,
+            "latency": latency_summary([r["latency_ms"] for r in results]),
         }
     )
@@ -0,0 +1,450 @@
+"""Open-loop load replay of production question history.
+
+Traffic is rebuilt from the memory DB -- ``dw_runs`` and ``mem_inquiries``
+questions become ``/dw/answer`` calls, ``dw_feedback`` rows become
+``/dw/rate`` calls, and ``--ask-share`` routes a stable fraction of the
+questions to ``/ask`` -- keeping the original inter-arrival times divided by
+``--speedup`` (idle gaps capped at ``--max-gap`` seconds).  Requests are
+issued on schedule regardless of how fast earlier ones finish, so the
+report's ``schedule_lag`` grows when the workers saturate.
+
+Targets are the Flask test client of ``--app-factory`` or, with
+``--base-url``, a running server (``--ask-url`` when ``/ask`` is served by
+``api.server``).  ``--sandbox DIR`` runs the in-process app without the
+warehouse or model weights: both model roles use the stub backend (canned
+SQL, ``--stub-llm-ms`` simulated generation time) and the app's
+``DW_ENGINE`` is a SQLite file holding a synthetic ``Contract`` table.  The
+replay refuses to start unless that engine is the one the DW routes resolve,
+since settings (mem_settings) win over the environment for the warehouse URL.
+Oracle-only SQL fails on SQLite and shows up under ``errors``, so sandbox
+numbers measure planning, caching and serialisation rather than warehouse
+time.
+
+The report gives throughput, error rate and p50/p95/p99 of the client
+latency and of every server-reported stage (``meta.duration_ms``,
+``meta.exec_ms``, ``took_ms_breakdown``) per endpoint.
+
+CLI:
+  python -m apps.dw.tests.replay_load --hours 24 --speedup 20 --concurrency 8 \\
+      --sandbox /tmp/dw_sandbox --json replay.json
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from apps.dw.tests.parallel_runner import _load_factory, _post, percentile, stage_timings, write_json_report
+
+
+@dataclass(frozen=True)
+class TrafficEvent:
+    at_s: float
+    endpoint: str
+    payload: Dict[str, Any] = field(hash=False)
+
+
+# ---------------------------------------------------------------------------
+# Traffic reconstruction
+# ---------------------------------------------------------------------------
+
+def _ts(value: Any) -> Optional[float]:
+    if isinstance(value, dt.datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and value:
+        try:
+            return dt.datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def _routes_to_ask(question: str, share: float) -> bool:
+    # Stable per question, so repeated questions keep hitting the same caches.
+    return share > 0 and (zlib.crc32(question.encode("utf-8")) % 10000) < share * 10000
+
+
+def events_from_history(
+    rows: Iterable[Mapping[str, Any]],
+    *,
+    namespace: str = "dw::common",
+    ask_share: float = 0.0,
+) -> List[TrafficEvent]:
+    """Turn history rows (``source``, ``created_at`` and question or feedback fields) into events.
+
+    Offsets are seconds since the earliest row.
+    """
+
+    timed = sorted(
+        ((ts, row) for row in rows if (ts := _ts(row.get("created_at"))) is not None),
+        key=lambda item: item[0],
+    )
+    if not timed:
+        return []
+    t0 = timed[0][0]
+    events: List[TrafficEvent] = []
+    for ts, row in timed:
+        if row.get("source") == "dw_feedback":
+            if row.get("inquiry_id") is None or row.get("rating") is None:
+                continue
+            payload = {"inquiry_id": row["inquiry_id"], "rating": row["rating"], "comment": row.get("comment") or ""}
+            events.append(TrafficEvent(ts - t0, "/dw/rate", payload))
+            continue
+        question = str(row.get("question") or "").strip()
+        if not question:
+            continue
+        if _routes_to_ask(question, ask_share):
+            events.append(TrafficEvent(ts - t0, "/ask", {"q": question}))
+        else:
+            events.append(TrafficEvent(ts - t0, "/dw/answer", {"question": question, "namespace": namespace}))
+    return events
+
+
+def compress_schedule(events: Sequence[TrafficEvent], *, speedup: float = 1.0, max_gap: float = 5.0) -> List[TrafficEvent]:
+    """Divide inter-arrival gaps by ``speedup`` and cap each gap at ``max_gap`` seconds."""
+
+    speedup = speedup if speedup > 0 else 1.0
+    out: List[TrafficEvent] = []
+    prev_src = None
+    at = 0.0
+    for event in sorted(events, key=lambda e: e.at_s):
+        if prev_src is not None:
+            gap = (event.at_s - prev_src) / speedup
+            at += min(gap, max_gap) if max_gap > 0 else gap
+        prev_src = event.at_s
+        out.append(TrafficEvent(at, event.endpoint, event.payload))
+    return out
+
+
+_HISTORY_QUERIES = {
+    "dw_runs": """
+        SELECT created_at, question FROM dw_runs
+         WHERE created_at >= :since AND namespace = :ns AND question IS NOT NULL
+         ORDER BY created_at LIMIT :lim
+    """,
+    "mem_inquiries": """
+        SELECT created_at, question FROM mem_inquiries
+         WHERE created_at >= :since AND namespace = :ns AND question IS NOT NULL
+         ORDER BY created_at LIMIT :lim
+    """,
+    "dw_feedback": """
+        SELECT created_at, inquiry_id, rating, comment FROM dw_feedback
+         WHERE created_at >= :since
+         ORDER BY created_at LIMIT :lim
+    """,
+}
+
+
+def load_history(
+    mem_engine: Any, *, hours: float, namespace: str, limit: int, sources: Sequence[str] = tuple(_HISTORY_QUERIES)
+) -> List[Dict[str, Any]]:
+    """Read question/feedback history; a source whose table is missing is skipped."""
+
+    from sqlalchemy import text
+
+    since = dt.datetime.utcnow() - dt.timedelta(hours=hours)
+    rows: List[Dict[str, Any]] = []
+    for source in sources:
+        try:
+            with mem_engine.connect() as conn:
+                result = conn.execute(
+                    text(_HISTORY_QUERIES[source]), {"since": since, "ns": namespace, "lim": int(limit)}
+                )
+                rows.extend({"source": source, **dict(r)} for r in result.mappings())
+        except Exception as exc:
+            print(f"[replay] skipping {source}: {exc}", file=sys.stderr)
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# Sandbox
+# ---------------------------------------------------------------------------
+
+def prepare_sandbox(directory: str | Path, *, rows: int = 5000, seed: int = 7, llm_delay_ms: int = 0) -> Path:
+    """Create ``contract.sqlite`` with synthetic ``Contract`` rows and select the stub models.
+
+    Call :func:`attach_sandbox` on the app afterwards to route its SQL there.
+    """
+
+    from apps.dw.projection import known_columns
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    db_path = directory / "contract.sqlite"
+    columns = known_columns({})
+    rnd = random.Random(seed)
+    base = dt.date(2020, 1, 1)
+
+    def _value(column: str, i: int) -> Any:
+        if column.endswith("_DATE"):
+            return (base + dt.timedelta(days=rnd.randint(0, 2000))).isoformat()
+        if column in {"CONTRACT_VALUE_NET_OF_VAT", "VAT"}:
+            return round(rnd.uniform(1_000, 5_000_000), 2)
+        if column == "CONTRACT_ID":
+            return f"C-{i:07d}"
+        return f"{column.lower()}-{rnd.randint(1, 50)}"
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('DROP TABLE IF EXISTS "Contract"')
+        conn.execute('CREATE TABLE "Contract" (' + ", ".join(f'"{c}"' for c in columns) + ")")
+        conn.executemany(
+            'INSERT INTO "Contract" VALUES (' + ", ".join("?" for _ in columns) + ")",
+            ([_value(c, i) for c in columns] for i in range(rows)),
+        )
+    # LLM-routed questions then run their full path against canned output.
+    os.environ["MODEL_BACKEND"] = "stub"
+    os.environ["CLARIFIER_MODEL_BACKEND"] = "stub"
+    os.environ["MODEL_STUB_DELAY_MS"] = str(max(0, int(llm_delay_ms)))
+    return db_path
+
+
+def attach_sandbox(app: Any, db_path: str | Path) -> Any:
+    """Make ``db_path`` the app's ``DW_ENGINE``; raise unless the DW routes resolve to it."""
+
+    from sqlalchemy import create_engine
+
+    from apps.dw.app import _ensure_engine
+
+    engine = create_engine(f"sqlite:///{db_path}", future=True)
+    app.config["DW_ENGINE"] = engine
+    with app.app_context():
+        resolved = _ensure_engine()
+    if resolved is not engine:
+        raise RuntimeError(f"DW routes resolve {resolved!r}, not the sandbox; refusing to replay")
+    return engine
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+
+class _HttpResponse:
+    def __init__(self, status: int, body: bytes) -> None:
+        self.status_code = status
+        self._body = body
+
+    def get_json(self, silent: bool = True) -> Any:
+        try:
+            return json.loads(self._body.decode("utf-8") or "null")
+        except ValueError:
+            if silent:
+                return None
+            raise
+
+
+class HttpClient:
+    """``test_client``-shaped POST client for a running server."""
+
+    def __init__(self, base_url: str, timeout: float = 120.0) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def post(self, endpoint: str, json: Any = None) -> _HttpResponse:  # noqa: A002 - mirrors Flask
+        import json as _json
+
+        req = urllib.request.Request(
+            self.base_url + endpoint,
+            data=_json.dumps(json or {}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return _HttpResponse(resp.status, resp.read())
+        except urllib.error.HTTPError as exc:
+            return _HttpResponse(exc.code, exc.read())
+
+
+ClientFactory = Callable[[str], Any]
+
+
+def replay(
+    events: Sequence[TrafficEvent],
+    client_for: ClientFactory,
+    *,
+    concurrency: int = 4,
+    clock: Callable[[], float] = time.perf_counter,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Dict[str, Any]:
+    """Issue ``events`` on their schedule; ``client_for(endpoint)`` is called once per worker thread and endpoint."""
+
+    local = threading.local()
+
+    def _send(event: TrafficEvent, scheduled: float) -> Dict[str, Any]:
+        clients = getattr(local, "clients", None)
+        if clients is None:
+            clients = local.clients = {}
+        client = clients.get(event.endpoint)
+        if client is None:
+            client = clients[event.endpoint] = client_for(event.endpoint)
+        lag_ms = max(0.0, (clock() - scheduled) * 1000)
+        result = _post(client, event.endpoint, event.payload)
+        result.update({"endpoint": event.endpoint, "lag_ms": lag_ms})
+        return result
+
+    start = clock()
+    futures = []
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="replay") as pool:
+        for event in events:
+            due = start + event.at_s
+            delay = due - clock()
+            if delay > 0:
+                sleep(delay)
+            futures.append(pool.submit(_send, event, due))
+        results = [f.result() for f in futures]
+    return {"results": results, "wall_s": clock() - start}
+
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+
+def _pcts(values: Sequence[float]) -> Dict[str, float]:
+    return {
+        "p50": round(percentile(values, 50), 1),
+        "p95": round(percentile(values, 95), 1),
+        "p99": round(percentile(values, 99), 1),
+    }
+
+
+def _is_error(result: Mapping[str, Any]) -> bool:
+    status = int(result.get("status") or 0)
+    data = result.get("data")
+    return status == 0 or status >= 400 or (isinstance(data, dict) and data.get("ok") is False)
+
+
+def _stages(result: Mapping[str, Any]) -> Dict[str, float]:
+    data = result.get("data") if isinstance(result.get("data"), dict) else {}
+    stages = {k: float(v) for k, v in stage_timings(data, result.get("latency_ms") or 0).items()}
+    breakdown = data.get("took_ms_breakdown")
+    if isinstance(breakdown, dict):
+        for key, value in breakdown.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                stages[str(key)] = float(value)
+    return stages
+
+
+def summarise(results: Sequence[Mapping[str, Any]], wall_s: float) -> Dict[str, Any]:
+    wall_s = max(wall_s, 1e-9)
+    groups: Dict[str, List[Mapping[str, Any]]] = {}
+    for result in results:
+        groups.setdefault(str(result.get("endpoint")), []).append(result)
+
+    def _block(items: Sequence[Mapping[str, Any]]) -> Dict[str, Any]:
+        errors = [r for r in items if _is_error(r)]
+        stage_values: Dict[str, List[float]] = {}
+        for r in items:
+            for name, value in _stages(r).items():
+                stage_values.setdefault(name, []).append(value)
+        statuses: Dict[str, int] = {}
+        for r in items:
+            statuses[str(r.get("status"))] = statuses.get(str(r.get("status")), 0) + 1
+        return {
+            "requests": len(items),
+            "throughput_rps": round(len(items) / wall_s, 2),
+            "errors": len(errors),
+            "error_rate": round(len(errors) / len(items), 4) if items else 0.0,
+            "statuses": statuses,
+            "latency_ms": _pcts([float(r.get("latency_ms") or 0) for r in items]),
+            "stages_ms": {name: _pcts(values) for name, values in sorted(stage_values.items())},
+        }
+
+    return {
+        "wall_s": round(wall_s, 2),
+        "overall": _block(results),
+        "schedule_lag_ms": _pcts([float(r.get("lag_ms") or 0) for r in results]),
+        "endpoints": {name: _block(items) for name, items in sorted(groups.items())},
+    }
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay question history as load")
+    parser.add_argument("--hours", type=float, default=24.0)
+    parser.add_argument("--limit", type=int, default=5000, help="rows read per history source")
+    parser.add_argument("--namespace", default="dw::common")
+    parser.add_argument("--speedup", type=float, default=10.0)
+    parser.add_argument("--max-gap", type=float, default=5.0, help="cap on any compressed idle gap (s)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--ask-share", type=float, default=0.0, help="fraction of questions sent to /ask")
+    parser.add_argument("--no-rate", action="store_true", help="do not replay dw_feedback as /dw/rate")
+    parser.add_argument("--app-factory", default="main:create_app")
+    parser.add_argument("--base-url", default=None, help="replay against a running server instead")
+    parser.add_argument("--ask-url", default=None, help="server base URL for /ask (api.server)")
+    parser.add_argument("--sandbox", default=None, help="directory for the SQLite Contract stand-in")
+    parser.add_argument("--sandbox-rows", type=int, default=5000)
+    parser.add_argument("--stub-llm-ms", type=int, default=0, help="simulated generation time per stub LLM call")
+    parser.add_argument("--json", dest="json_path", default=None)
+    args = parser.parse_args(argv)
+
+    sandbox_db = None
+    if args.sandbox:
+        if args.base_url or args.ask_url:
+            parser.error("--sandbox only applies to the in-process app (drop --base-url/--ask-url)")
+        sandbox_db = prepare_sandbox(args.sandbox, rows=args.sandbox_rows, llm_delay_ms=args.stub_llm_ms)
+        print(f"[replay] sandbox DB: {sandbox_db}", file=sys.stderr)
+
+    from core.sql_exec import get_mem_engine
+    from core.settings import Settings
+
+    sources = ["dw_runs", "mem_inquiries"] + ([] if args.no_rate else ["dw_feedback"])
+    history = load_history(
+        get_mem_engine(Settings(namespace=args.namespace)),
+        hours=args.hours,
+        namespace=args.namespace,
+        limit=args.limit,
+        sources=sources,
+    )
+    events = compress_schedule(
+        events_from_history(history, namespace=args.namespace, ask_share=args.ask_share),
+        speedup=args.speedup,
+        max_gap=args.max_gap,
+    )
+    if not events:
+        print("[replay] no history in the selected window", file=sys.stderr)
+        return 1
+    print(
+        f"[replay] {len(events)} requests over {events[-1].at_s:.1f}s (speedup {args.speedup}x)",
+        file=sys.stderr,
+    )
+
+    app = None if args.base_url else _load_factory(args.app_factory)()
+    if sandbox_db is not None:
+        attach_sandbox(app, sandbox_db)
+
+    def client_for(endpoint: str) -> Any:
+        if endpoint == "/ask" and args.ask_url:
+            return HttpClient(args.ask_url)
+        if args.base_url:
+            return HttpClient(args.base_url)
+        return app.test_client()
+
+    run = replay(events, client_for, concurrency=args.concurrency)
+    report = summarise(run["results"], run["wall_s"])
+    report["config"] = {k: v for k, v in vars(args).items() if k != "json_path"}
+    if args.json_path:
+        write_json_report(args.json_path, report)
+    print(json.dumps({k: report[k] for k in ("wall_s", "overall", "schedule_lag_ms", "endpoints")}, indent=2))
+    return 0 if report["overall"]["errors"] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,9 +3,10 @@ from __future__ import annotations
 from datetime import date
 import subprocess
 import sys
+import time
 from pathlib import Path
 from flask import Blueprint, current_app, jsonify, request
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 # Optional imports for core NLU checks
 try:  # pragma: no cover
@@ -16,6 +17,7 @@ except Exception:  # pragma: no cover - keep routes importable even if missing
     _resolve_window = None  # type: ignore[assignment]
 
 from .golden_runner import run_golden_tests
+from .parallel_runner import post_all
 
 
 golden_bp = Blueprint("golden", __name__, url_prefix="/admin")
@@ -50,12 +52,14 @@ def run_golden():
     ns = req.get("namespace") or req.get("ns")  # accept both keys
     limit = req.get("limit")
     file_path = req.get("file")
+    workers = int(req.get("workers") or 1)
 
     report = run_golden_tests(
         flask_app=current_app,
         namespace=ns,
         limit=limit,
         path=file_path,
+        workers=workers,
     )
     if not report.get("ok", True):
         report.setdefault("error", "Golden YAML failed to load or contained no matching cases.")
@@ -220,6 +224,8 @@ def run_all_tests():
     - run_golden_rate:  bool (default true)
     - run_core_nlu:     bool (default true)
     - namespace/ns, limit, file/path: forwarded to golden endpoints
+    - workers: per-suite case concurrency (default 1)
+    - parallel: bool, run the suites concurrently (default false)
     - level: forwarded to rate suite endpoint ("easy"|"medium"|"all")
     """
     body = request.get_json(silent=True) or {}
@@ -228,43 +234,50 @@ def run_all_tests():
     want_golden_rate = body.get("run_golden_rate", True)
     want_core = body.get("run_core_nlu", True)
 
-    out: Dict[str, Any] = {"ok": True, "parts": {}}
-    any_fail = False
-
-    with current_app.test_client() as client:
-        if want_golden:
-            payload = {
+    parts: List[Tuple[str, str, Dict[str, Any]]] = []
+    if want_golden:
+        parts.append((
+            "golden_answer",
+            "/admin/run_golden",
+            {
                 "namespace": body.get("namespace") or body.get("ns"),
                 "limit": body.get("limit"),
                 "file": body.get("file") or body.get("path"),
-            }
-            rv = client.post("/admin/run_golden", json=payload)
-            data = rv.get_json(silent=True) or {}
-            ok = bool(data.get("ok", rv.status_code == 200))
-            any_fail = any_fail or not ok
-            out["parts"]["golden_answer"] = {"status": rv.status_code, **data}
-
-        if want_rate_suite:
-            payload = {"level": body.get("level") or "all"}
-            rv = client.post("/dw/tests/run_rate_suite", json=payload)
-            data = rv.get_json(silent=True) or {}
-            ok = bool(data.get("ok", rv.status_code == 200))
-            any_fail = any_fail or not ok
-            out["parts"]["rate_suite"] = {"status": rv.status_code, **data}
-
-        if want_golden_rate:
-            rv = client.post("/dw/admin/run_golden_rate", json={})
-            data = rv.get_json(silent=True) or {}
-            ok = bool(data.get("ok", rv.status_code == 200))
-            any_fail = any_fail or not ok
-            out["parts"]["golden_rate"] = {"status": rv.status_code, **data}
-
-        if want_core:
-            rv = client.post("/admin/tests/core_nlu", json={})
-            data = rv.get_json(silent=True) or {}
-            ok = bool(data.get("ok", rv.status_code == 200))
-            any_fail = any_fail or not ok
-            out["parts"]["core_nlu"] = {"status": rv.status_code, **data}
+                "workers": body.get("workers"),
+            },
+        ))
+    if want_rate_suite:
+        parts.append((
+            "rate_suite",
+            "/dw/tests/run_rate_suite",
+            {"level": body.get("level") or "all", "workers": body.get("workers")},
+        ))
+    if want_golden_rate:
+        parts.append(("golden_rate", "/dw/admin/run_golden_rate", {}))
+    if want_core:
+        parts.append(("core_nlu", "/admin/tests/core_nlu", {}))
+
+    # parallel=true runs the suites side by side instead of back-to-back.
+    workers = len(parts) if body.get("parallel") else 1
+    t0 = time.perf_counter()
+    responses = post_all(
+        [(endpoint, payload) for _, endpoint, payload in parts],
+        app=current_app,
+        workers=workers,
+    )
+
+    out: Dict[str, Any] = {"ok": True, "parts": {}}
+    any_fail = False
+    for (name, _, _), response in zip(parts, responses):
+        data = response["data"]
+        ok = bool(data.get("ok", response["status"] == 200))
+        any_fail = any_fail or not ok
+        out["parts"][name] = {
+            "status": response["status"],
+            **data,
+            "took_ms": int(response["latency_ms"]),
+        }
+    out["took_ms"] = int((time.perf_counter() - t0) * 1000)
 
     out["ok"] = not any_fail
     status = 200 if out["ok"] else 400
@@ -0,0 +1,85 @@
+import json
+import pathlib
+import sys
+import time
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[3]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from flask import Flask  # noqa: E402
+
+import apps.dw.answer_batch as answer_batch  # noqa: E402
+import apps.dw.app as dw_app  # noqa: E402
+
+
+@pytest.fixture()
+def batch_client(monkeypatch):
+    closed = []
+    answered = []
+    close = answer_batch.BatchContext.close
+
+    def _close(self):
+        closed.append(self)
+        close(self)
+
+    def _answer_item(item):
+        # Later questions finish first, so completion order != request order.
+        time.sleep(0.02 * (3 - len(item["question"])))
+        answered.append(answer_batch.current_batch() is not None)
+        return 200, {"ok": True, "echo": item["question"]}
+
+    monkeypatch.setenv("DW_ANSWER_BATCH_MAX", "10")
+    monkeypatch.setenv("DW_ANSWER_BATCH_WORKERS", "4")
+    monkeypatch.setattr(answer_batch.BatchContext, "close", _close)
+    monkeypatch.setattr(answer_batch, "prefetch_rules", lambda factory, qnorms: {})
+    monkeypatch.setattr(dw_app, "_get_settings", lambda: None)
+    monkeypatch.setattr(dw_app, "_answer_item", _answer_item)
+
+    app = Flask(__name__)
+    app.register_blueprint(dw_app.dw_bp, url_prefix="/dw")
+    with app.test_client() as client:
+        yield client, closed, answered
+
+
+def test_batch_returns_items_in_request_order(batch_client):
+    client, closed, answered = batch_client
+    resp = client.post("/dw/answer/batch", json={"questions": ["a", "bb", ""]})
+
+    body = resp.get_json()
+    assert resp.status_code == 200
+    assert [(item["index"], item["status"]) for item in body["items"]] == [(0, 200), (1, 200), (2, 400)]
+    assert [item["response"].get("echo") for item in body["items"]] == ["a", "bb", None]
+    assert answered == [True, True]
+    assert len(closed) == 1
+
+
+def test_batch_streams_ndjson_and_closes_context(batch_client):
+    client, closed, _ = batch_client
+    resp = client.post(
+        "/dw/answer/batch",
+        json={"questions": ["a", "bb"]},
+        headers={"Accept": "application/x-ndjson"},
+    )
+
+    assert resp.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert sorted(line["index"] for line in lines[:-1]) == [0, 1]
+    assert lines[0]["index"] == 1  # completion order
+    assert lines[-1]["done"] is True and lines[-1]["meta"]["count"] == 2
+    assert len(closed) == 1
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [{"questions": "a"}, {"questions": []}, {"questions": ["q"] * 11}],
+)
+def test_batch_rejects_bad_payloads(batch_client, payload):
+    client, closed, answered = batch_client
+    resp = client.post("/dw/answer/batch", json=payload)
+
+    assert resp.status_code == 400
+    assert resp.get_json()["ok"] is False
+    assert answered == [] and closed == []
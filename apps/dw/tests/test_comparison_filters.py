@@ -0,0 +1,23 @@
+import pathlib
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parents[3]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from apps.dw.app import _extract_comparison_filters  # noqa: E402
+
+COLS = ["CONTRACT_VALUE_NET_OF_VAT", "VAT", "REQUEST_DATE"]
+
+
+def test_only_columns_named_in_question_are_scanned():
+    filters = _extract_comparison_filters("contract_value_net_of_vat >= 1000 and VAT at least 5", COLS)
+    assert [(f["col"], f["op"], f["val"]) for f in filters] == [
+        ("CONTRACT_VALUE_NET_OF_VAT", "gte", 1000),
+        ("VAT", "gte", 5),
+    ]
+    # VAT inside CONTRACT_VALUE_NET_OF_VAT is not a column mention on its own.
+    assert [f["col"] for f in _extract_comparison_filters("CONTRACT_VALUE_NET_OF_VAT > 3", COLS)] == [
+        "CONTRACT_VALUE_NET_OF_VAT"
+    ]
+    assert _extract_comparison_filters("value over 3", COLS) == []
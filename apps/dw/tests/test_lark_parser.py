@@ -80,3 +80,45 @@ def test_lark_parser_allows_and_inside_value() -> None:
 
     eq_filters = intent.get("eq_filters") or []
     assert eq_filters == [["OWNER", ["FACILITY AND SITE SERVICES (FARABI)"]]]
+
+
+def test_lark_parser_separates_value_or_from_clause_or() -> None:
+    parser = DwQuestionParser()
+    parsed = parser.parse(
+        "ENTITY = DSFH and REPRESENTATIVE_EMAIL = a@x.com or b@y.com or stakeholder = Amr Taher"
+    )
+
+    assert parsed.eq_filters == [
+        ["ENTITY", ["DSFH"]],
+        ["REPRESENTATIVE_EMAIL", ["a@x.com", "b@y.com"]],
+        ["STAKEHOLDER", ["Amr Taher"]],
+    ]
+    assert parsed.bool_tree["type"] == "or"
+
+
+def test_lark_parser_fts_verb_and_in_list() -> None:
+    parser = DwQuestionParser()
+    parsed = parser.parse("contains maintenance or home care and entity in (DSFH, Farabi)")
+
+    assert parsed.fts_tokens == ["maintenance", "home care"]
+    assert parsed.eq_filters == [["ENTITY", ["DSFH", "Farabi"]]]
+
+
+
+def test_lark_parser_between_clause() -> None:
+    parser = DwQuestionParser()
+    parsed = parser.parse("VAT between 10 and 20")
+
+    assert parsed.num_filters == [{"col": "VAT", "op": "between", "values": [10, 20]}]
+    assert parsed.bool_tree["type"] == "num"
+
+def test_lark_tables_are_serialised_by_grammar_hash(tmp_path, monkeypatch) -> None:
+    from apps.dw.intent_parser import lark_parser
+
+    monkeypatch.setenv("DW_LARK_CACHE_DIR", str(tmp_path))
+    lark_parser.build_lark()
+    cached = list(tmp_path.glob(f"*{lark_parser.grammar_hash()}*"))
+    assert len(cached) == 1
+
+    reloaded = lark_parser.build_lark()
+    assert reloaded.parse("departments = SUPPORT SERVICES", start="start") is not None
@@ -0,0 +1,75 @@
+import pathlib
+import sys
+import threading
+
+ROOT = pathlib.Path(__file__).resolve().parents[3]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+import apps.dw.app as dw_app  # noqa: E402
+from apps.dw.answer_batch import BatchContext, activate  # noqa: E402
+
+
+class _Driver:
+    call_timeout = 0
+
+
+class _Result:
+    def keys(self):
+        return ["N"]
+
+    def fetchall(self):
+        return [(1,)]
+
+
+class _Connection:
+    class dialect:
+        name = "oracle"
+
+    def __init__(self, seen):
+        self.connection = _Driver()
+        self._seen = seen
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, stmt, binds):
+        self._seen.append((threading.current_thread().name, self.connection.call_timeout))
+        return _Result()
+
+
+class _Engine:
+    def __init__(self):
+        self.seen = []
+        self.url = "oracle://batch-test"
+
+    def connect(self):
+        return _Connection(self.seen)
+
+
+def test_batched_execution_uses_timeout_resolved_on_request_thread(monkeypatch):
+    request_thread = threading.current_thread()
+
+    def _settings_need_app_context():
+        # Mirrors Flask: settings are only reachable from the request thread.
+        if threading.current_thread() is not request_thread:
+            raise RuntimeError("Working outside of application context.")
+        return {"DW_SQL_CALL_TIMEOUT_MS": 250}
+
+    engine = _Engine()
+    monkeypatch.setattr(dw_app, "_ensure_engine", lambda: engine)
+    monkeypatch.setattr(dw_app, "_get_settings", _settings_need_app_context)
+
+    batch = BatchContext(db_workers=1)
+    try:
+        with activate(batch):
+            rows, cols, meta = dw_app._execute_oracle("SELECT 1 AS N FROM DUAL", {})
+    finally:
+        batch.close()
+
+    assert rows == [[1]] and cols == ["N"] and meta["rows"] == 1
+    assert batch.executions == 1
+    assert [(name.startswith("dw-batch-sql"), timeout) for name, timeout in engine.seen] == [(True, 250)]
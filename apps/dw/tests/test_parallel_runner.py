@@ -0,0 +1,63 @@
+import xml.etree.ElementTree as ET
+
+from apps.dw.tests.parallel_runner import (
+    attach_latency,
+    compare_to_baseline,
+    percentile,
+    post_all,
+    stage_timings,
+    write_junit_report,
+)
+
+
+class _Resp:
+    status_code = 200
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def get_json(self, silent=True):
+        return self._payload
+
+
+class _Client:
+    def post(self, endpoint, json=None):
+        return _Resp({"echo": json["n"], "meta": {"duration_ms": 12, "exec_ms": 5, "strategy": "explicit_filters"}})
+
+
+class _App:
+    def test_client(self):
+        return _Client()
+
+
+def test_post_all_keeps_order_across_threads():
+    requests = [("/dw/answer", {"n": i}) for i in range(20)]
+    out = post_all(requests, app=_App(), workers=4)
+    assert [r["data"]["echo"] for r in out] == list(range(20))
+    stages = stage_timings(out[0]["data"], out[0]["latency_ms"])
+    assert stages["server_ms"] == 12 and stages["exec_ms"] == 5 and stages["plan_ms"] == 7
+
+
+def test_percentile_and_baseline_regression():
+    assert percentile([1, 2, 3, 4], 50) == 2.5
+    results = [{"latency_ms": v, "deterministic": True} for v in (10, 20, 30, 40, 100)]
+    report = attach_latency({}, results)
+    assert report["latency_deterministic"]["p50"] == 30.0
+    baseline = {"deterministic": {"p50": 20.0, "p95": 88.0}}
+    regressions = compare_to_baseline(report, baseline, threshold_pct=25)
+    assert len(regressions) == 1 and regressions[0].startswith("p50")
+    assert compare_to_baseline(report, {"deterministic": {"p50": 30.0, "p95": 88.0}}) == []
+
+
+def test_junit_report(tmp_path):
+    path = tmp_path / "junit.xml"
+    write_junit_report(
+        path,
+        "dw_golden",
+        [
+            {"idx": 1, "question": "q1", "passed": True, "latency_ms": 5},
+            {"idx": 2, "question": "q2", "passed": False, "reasons": ["bad"], "latency_ms": 7},
+        ],
+    )
+    root = ET.parse(path).getroot()
+    assert root.get("tests") == "2" and root.get("failures") == "1"
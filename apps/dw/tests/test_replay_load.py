@@ -0,0 +1,100 @@
+import datetime as dt
+import os
+import sqlite3
+
+import pytest
+
+from apps.dw.tests.replay_load import (
+    TrafficEvent,
+    attach_sandbox,
+    compress_schedule,
+    events_from_history,
+    prepare_sandbox,
+    replay,
+    summarise,
+)
+
+
+class _Resp:
+    def __init__(self, status, payload):
+        self.status_code = status
+        self._payload = payload
+
+    def get_json(self, silent=True):
+        return self._payload
+
+
+class _Client:
+    def post(self, endpoint, json=None):
+        if endpoint == "/dw/rate":
+            return _Resp(500, {"ok": False})
+        if endpoint == "/ask":
+            return _Resp(200, {"ok": True, "took_ms_breakdown": {"queue_ms": 3, "gen_ms": 40}})
+        return _Resp(200, {"ok": True, "meta": {"duration_ms": 20, "exec_ms": 15}})
+
+
+def test_history_becomes_ordered_events():
+    t0 = dt.datetime(2026, 1, 1, 9, 0, 0)
+    rows = [
+        {"source": "dw_runs", "created_at": t0 + dt.timedelta(seconds=30), "question": "contracts by entity"},
+        {"source": "mem_inquiries", "created_at": t0, "question": "top 10 contracts"},
+        {"source": "dw_feedback", "created_at": t0 + dt.timedelta(seconds=40), "inquiry_id": 5, "rating": 1},
+        {"source": "dw_runs", "created_at": None, "question": "dropped"},
+        {"source": "dw_runs", "created_at": t0, "question": "  "},
+    ]
+    events = events_from_history(rows)
+    assert [(e.at_s, e.endpoint) for e in events] == [(0.0, "/dw/answer"), (30.0, "/dw/answer"), (40.0, "/dw/rate")]
+    assert events[2].payload == {"inquiry_id": 5, "rating": 1, "comment": ""}
+    all_ask = events_from_history(rows, ask_share=1.0)
+    assert [e.endpoint for e in all_ask][:2] == ["/ask", "/ask"]
+
+
+def test_compress_schedule_speedup_and_gap_cap():
+    events = [TrafficEvent(t, "/dw/answer", {}) for t in (0, 10, 20, 620)]
+    out = compress_schedule(events, speedup=10, max_gap=5)
+    assert [e.at_s for e in out] == [0.0, 1.0, 2.0, 7.0]
+
+
+def test_replay_reports_per_endpoint():
+    events = [
+        TrafficEvent(0.0, "/dw/answer", {"question": "a"}),
+        TrafficEvent(0.0, "/dw/answer", {"question": "b"}),
+        TrafficEvent(0.0, "/ask", {"q": "c"}),
+        TrafficEvent(0.0, "/dw/rate", {"inquiry_id": 1, "rating": 1}),
+    ]
+    run = replay(events, lambda endpoint: _Client(), concurrency=2)
+    report = summarise(run["results"], run["wall_s"])
+    assert report["overall"]["requests"] == 4 and report["overall"]["errors"] == 1
+    assert report["endpoints"]["/dw/rate"]["error_rate"] == 1.0
+    answer = report["endpoints"]["/dw/answer"]
+    assert answer["stages_ms"]["exec_ms"]["p99"] == 15.0 and answer["stages_ms"]["plan_ms"]["p50"] == 5.0
+    assert report["endpoints"]["/ask"]["stages_ms"]["gen_ms"]["p95"] == 40.0
+
+
+def test_sandbox_creates_contract_table(tmp_path, monkeypatch):
+    for key in ("MODEL_BACKEND", "CLARIFIER_MODEL_BACKEND", "MODEL_STUB_DELAY_MS"):
+        monkeypatch.delenv(key, raising=False)
+    path = prepare_sandbox(tmp_path, rows=25, llm_delay_ms=30)
+    with sqlite3.connect(path) as conn:
+        assert conn.execute('SELECT COUNT(*) FROM "Contract"').fetchone()[0] == 25
+    assert os.environ["MODEL_BACKEND"] == os.environ["CLARIFIER_MODEL_BACKEND"] == "stub"
+    assert os.environ["MODEL_STUB_DELAY_MS"] == "30"
+
+
+def test_attach_sandbox_injects_engine_and_checks_resolution(tmp_path, monkeypatch):
+    pytest.importorskip("flask.testing")
+    pytest.importorskip("sqlalchemy", minversion="1.4")
+    import flask
+
+    import apps.dw.app as dw_app
+
+    path = prepare_sandbox(tmp_path, rows=5)
+    app = flask.Flask("sandbox")
+    engine = attach_sandbox(app, path)
+    assert app.config["DW_ENGINE"] is engine
+    with engine.connect() as cx:
+        assert cx.exec_driver_sql('SELECT COUNT(*) FROM "Contract"').scalar() == 5
+
+    monkeypatch.setattr(dw_app, "_ensure_engine", lambda: object())
+    with pytest.raises(RuntimeError):
+        attach_sandbox(app, path)
@@ -88,6 +88,116 @@ def _infer_value_type(value) -> str:
     return "string"
 
 
+def _normalise_items(settings_items: list[dict]) -> list[dict]:
+    """Validate payload items into upsert rows; the last item wins per (key, scope, scope_id)."""
+
+    rows: dict[tuple, dict] = {}
+    for item in settings_items:
+        if "key" not in item:
+            abort(400, description="Missing 'key' in settings payload")
+        value = item.get("value")
+        row = {
+            "key": item["key"],
+            "value_json": json.dumps(value, ensure_ascii=False),
+            "value_type": item.get("value_type") or _infer_value_type(value),
+            "scope": item.get("scope") or "namespace",
+            "scope_id": None if item.get("scope_id") is None else str(item.get("scope_id")),
+            "is_secret": bool(item.get("is_secret")),
+        }
+        ident = (row["key"], row["scope"], row["scope_id"])
+        rows.pop(ident, None)
+        rows[ident] = row
+    return list(rows.values())
+
+
+# mem_settings has no unique constraint over (namespace, key, scope, scope_id)
+# (scope_id is nullable), so instead of ON CONFLICT the whole payload goes in
+# as unnest() arrays: one UPDATE for rows whose value actually differs and one
+# INSERT ... WHERE NOT EXISTS for new keys, in a single statement.  A
+# per-namespace advisory lock keeps concurrent imports from double-inserting.
+_BULK_UPSERT_SQL = text(
+    """
+    WITH incoming AS (
+        SELECT t.key, CAST(t.value AS jsonb) AS value, t.value_type, t.scope, t.scope_id, t.is_secret
+          FROM unnest(CAST(:keys AS text[]), CAST(:vals AS text[]), CAST(:vtypes AS text[]),
+                      CAST(:scopes AS text[]), CAST(:scope_ids AS text[]), CAST(:secrets AS boolean[]))
+               AS t(key, value, value_type, scope, scope_id, is_secret)
+    ),
+    updated AS (
+        UPDATE mem_settings m
+           SET value = i.value,
+               value_type = i.value_type,
+               updated_by = :upd_by,
+               updated_at = NOW(),
+               is_secret  = i.is_secret
+          FROM incoming i
+         WHERE m.namespace = :ns
+           AND m.key = i.key
+           AND m.scope = i.scope
+           AND m.scope_id IS NOT DISTINCT FROM i.scope_id
+           AND (m.value IS DISTINCT FROM i.value
+                OR m.value_type IS DISTINCT FROM i.value_type
+                OR m.is_secret IS DISTINCT FROM i.is_secret)
+     RETURNING m.key
+    ),
+    inserted AS (
+        INSERT INTO mem_settings(namespace, key, value, value_type, scope, scope_id,
+                                 overridable, updated_by, created_at, updated_at, is_secret)
+        SELECT :ns, i.key, i.value, i.value_type, i.scope, i.scope_id,
+               true, :upd_by, NOW(), NOW(), i.is_secret
+          FROM incoming i
+         WHERE NOT EXISTS (
+               SELECT 1 FROM mem_settings m
+                WHERE m.namespace = :ns
+                  AND m.key = i.key
+                  AND m.scope = i.scope
+                  AND m.scope_id IS NOT DISTINCT FROM i.scope_id)
+     RETURNING key
+    )
+    SELECT key, 'updated' AS action FROM updated
+    UNION ALL
+    SELECT key, 'inserted' AS action FROM inserted
+    """
+)
+
+
+def _bulk_upsert_settings(conn, *, ns: str, rows: list[dict], updated_by: str) -> list[tuple[str, str]]:
+    """Upsert ``rows`` in one statement; returns ``(key, "inserted"|"updated")`` for real changes."""
+
+    if not rows:
+        return []
+    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:lock))"), {"lock": f"mem_settings:{ns}"})
+    result = conn.execute(
+        _BULK_UPSERT_SQL,
+        {
+            "ns": ns,
+            "upd_by": updated_by,
+            "keys": [r["key"] for r in rows],
+            "vals": [r["value_json"] for r in rows],
+            "vtypes": [r["value_type"] for r in rows],
+            "scopes": [r["scope"] for r in rows],
+            "scope_ids": [r["scope_id"] for r in rows],
+            "secrets": [r["is_secret"] for r in rows],
+        },
+    )
+    return [(row[0], row[1]) for row in result]
+
+
+def _invalidate_settings_caches() -> None:
+    try:
+        from apps.dw.settings import get_settings
+
+        get_settings.cache_clear()
+    except Exception:  # pragma: no cover - DW app not importable
+        pass
+    try:
+        from apps.dw.contracts.synonyms import invalidate_enum_synonyms
+
+        invalidate_enum_synonyms()
+    except Exception:  # pragma: no cover - DW app not importable
+        pass
+
+
 @admin_bp.post("/settings/bulk")
 def settings_bulk():
     payload = request.get_json(force=True) or {}
@@ -135,35 +245,33 @@ def settings_bulk():
     if not settings_items:
         return jsonify({"ok": True, "namespace": ns, "upserted": 0})
 
+    rows = _normalise_items(settings_items)
     settings = Settings(namespace=ns)
     mem = get_mem_engine(settings)
 
     with mem.begin() as conn:
-        for item in settings_items:
-            if "key" not in item:
-                abort(400, description="Missing 'key' in settings payload")
-            key = item["key"]
-            scope = item.get("scope") or "namespace"
-            scope_id = item.get("scope_id")
-            value = item.get("value")
-            value_type = item.get("value_type") or _infer_value_type(value)
-            is_secret = bool(item.get("is_secret"))
-
-            value_json = json.dumps(value, ensure_ascii=False)
-
-            _manual_upsert_setting(
-                conn,
-                ns=ns,
-                key=key,
-                value_json=value_json,
-                value_type=value_type,
-                scope=scope,
-                scope_id=scope_id,
-                updated_by=updated_by,
-                is_secret=is_secret,
-            )
+        if conn.dialect.name == "postgresql":
+            changes = _bulk_upsert_settings(conn, ns=ns, rows=rows, updated_by=updated_by)
+        else:
+            for row in rows:
+                _manual_upsert_setting(conn, ns=ns, updated_by=updated_by, **row)
+            changes = [(row["key"], "updated") for row in rows]
 
-    return jsonify({"ok": True, "namespace": ns, "upserted": len(settings_items)})
+    if changes:
+        _invalidate_settings_caches()
+    inserted = sorted({key for key, action in changes if action == "inserted"})
+    updated = sorted({key for key, action in changes if action == "updated"})
+    return jsonify(
+        {
+            "ok": True,
+            "namespace": ns,
+            "upserted": len(rows),
+            "changed": sorted(set(inserted) | set(updated)),
+            "inserted": inserted,
+            "updated": updated,
+            "unchanged": max(len(rows) - len(changes), 0),
+        }
+    )
 
 
 @admin_bp.get("/settings/get")
@@ -7,6 +7,8 @@ from typing import Any, Dict, List, Optional, Tuple
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
 
+from core.context_cache import render_columns_text, render_tables_text
+
 
 @dataclass
 class BaseContext:
@@ -72,8 +74,8 @@ class PlannerAgent:
                 pass
 
         # fall back: LLM prompt using tables/columns
-        tables = ", ".join(sorted({t['table_name'] for t in context.get('tables', [])}))
-        cols = ", ".join(sorted({f"{c['table_name']}.{c['column_name']}" for c in context.get('columns', [])}))
+        tables = context.get("tables_text") or ", ".join(sorted({t['table_name'] for t in context.get('tables', [])}))
+        cols = context.get("columns_text") or ", ".join(sorted({f"{c['table_name']}.{c['column_name']}" for c in context.get('columns', [])}))
         metrics_list = ", ".join(sorted((context.get("metrics") or {}).keys())) or "(none)"
 
         hint_txt = ""
@@ -116,12 +118,9 @@ class PlannerAgent:
     def plan(self, question: str, context: Dict[str, Any], hints: Dict[str, Any] | None = None) -> Tuple[str, str]:
 
         """Generic SQL planner over the provided schema context (app-agnostic)."""
-        tables = ", ".join(sorted({t.get('table_name','') for t in context.get('tables', []) if t.get('table_name')}))
-        cols = ", ".join(sorted({
-            f"{c.get('table_name')}.{c.get('column_name')}"
-            for c in context.get('columns', [])
-            if c.get('table_name') and c.get('column_name')
-        }))
+        # Cached context snapshots pre-render these strings (core.context_cache).
+        tables = context.get("tables_text") or render_tables_text(context.get("tables", []))
+        cols = context.get("columns_text") or render_columns_text(context.get("columns", []))
         hint_txt = ""
         if hints:
             if (dr := hints.get("date_range")) and dr.get("start") and dr.get("end"):
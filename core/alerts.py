@@ -1,5 +1,7 @@
 # core/alerts.py
 from __future__ import annotations
+import json
+import os
 from typing import Iterable, Optional
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
@@ -13,7 +15,7 @@ def queue_alert(mem_engine: Engine, *, namespace: str, event_type: str, payload:
     """
     sql = text("""
         INSERT INTO mem_alerts(namespace, event_type, recipient, payload, status, created_at)
-        VALUES (:ns, :et, :rcpt, :payload, 'queued', NOW())
+        VALUES (:ns, :et, :rcpt, CAST(:payload AS jsonb), 'queued', NOW())
         RETURNING id
     """)
     with mem_engine.begin() as con:
@@ -21,12 +23,22 @@ def queue_alert(mem_engine: Engine, *, namespace: str, event_type: str, payload:
             "ns": namespace,
             "et": event_type,
             "rcpt": recipient,
-            "payload": payload,
+            "payload": json.dumps(payload, default=str),
         }).scalar_one()
     return int(alert_id)
 
 def notify_admins_via_email(*, subject: str, body_text: str, to_emails: Iterable[str]) -> None:
     s = current_app.config["SETTINGS"]
+    mem_engine = current_app.config.get("MEM_ENGINE")
+    if mem_engine is not None and str(os.getenv("ALERTS_OUTBOX", "0")).lower() in {"1", "true", "yes", "on"}:
+        # Delivered by core.outbox so a slow relay never blocks the request.
+        queue_alert(
+            mem_engine,
+            namespace="admin",
+            event_type="admin_email",
+            payload={"subject": subject, "body_text": body_text, "to": list(to_emails)},
+        )
+        return
     from core.mailer import send_email
     send_email(
         smtp_host=s.get("SMTP_HOST", "localhost"),
@@ -0,0 +1,190 @@
+"""Versioned, per-namespace schema context snapshots for the SQL planner.
+
+Schema metadata (mem_tables / mem_columns / mem_metrics plus the DW hint
+helpers) only changes when someone re-seeds, so the planner context is built
+once per namespace, frozen into tuples and shared across threads.  Seeding
+helpers call :func:`bump_context_version` and the next reader rebuilds.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+_VERSIONS: Dict[str, int] = {}
+_GLOBAL_VERSION = 0
+_SNAPSHOTS: Dict[str, "ContextSnapshot"] = {}
+_BUILD_LOCKS: Dict[str, threading.Lock] = {}
+_LOCK = threading.Lock()
+
+Row = Mapping[str, Any]
+
+
+def _freeze_row(row: Mapping[str, Any]) -> Row:
+    return MappingProxyType(dict(row))
+
+
+def _freeze_value(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: _freeze_value(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze_value(v) for v in value)
+    return value
+
+
+def _thaw_value(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {k: _thaw_value(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw_value(v) for v in value]
+    return value
+
+
+def render_tables_text(tables: Iterable[Row]) -> str:
+    """Comma-separated, sorted table names as used in the planner prompt."""
+
+    return ", ".join(sorted({t.get("table_name", "") for t in tables if t.get("table_name")}))
+
+
+def render_columns_text(columns: Iterable[Row]) -> str:
+    """Comma-separated, sorted ``table.column`` names as used in the planner prompt."""
+
+    return ", ".join(
+        sorted(
+            {
+                f"{c.get('table_name')}.{c.get('column_name')}"
+                for c in columns
+                if c.get("table_name") and c.get("column_name")
+            }
+        )
+    )
+
+
+@dataclass(frozen=True)
+class ContextSnapshot:
+    """Immutable planner context for one namespace at one version."""
+
+    namespace: str
+    version: int
+    tables: Tuple[Row, ...] = ()
+    columns: Tuple[Row, ...] = ()
+    metrics: Mapping[str, Row] = field(default_factory=lambda: MappingProxyType({}))
+    join_hints: Tuple[Any, ...] = ()
+    reserved_terms: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+    date_columns: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+    tables_text: str = ""
+    columns_text: str = ""
+    built_at: float = 0.0
+
+    @classmethod
+    def from_context(cls, namespace: str, version: int, context: Mapping[str, Any]) -> "ContextSnapshot":
+        tables = tuple(_freeze_row(r) for r in context.get("tables") or [])
+        columns = tuple(_freeze_row(r) for r in context.get("columns") or [])
+        metrics = MappingProxyType(
+            {k: _freeze_row(v) for k, v in (context.get("metrics") or {}).items()}
+        )
+        return cls(
+            namespace=namespace,
+            version=version,
+            tables=tables,
+            columns=columns,
+            metrics=metrics,
+            join_hints=_freeze_value(list(context.get("join_hints") or [])),
+            reserved_terms=_freeze_value(dict(context.get("reserved_terms") or {})),
+            date_columns=_freeze_value(dict(context.get("date_columns") or {})),
+            tables_text=render_tables_text(tables),
+            columns_text=render_columns_text(columns),
+            built_at=time.time(),
+        )
+
+    def to_context(self) -> Dict[str, Any]:
+        """Return a fresh, mutable context dict safe for per-request updates."""
+
+        return {
+            "tables": [dict(r) for r in self.tables],
+            "columns": [dict(r) for r in self.columns],
+            "metrics": {k: dict(v) for k, v in self.metrics.items()},
+            "join_hints": _thaw_value(self.join_hints),
+            "reserved_terms": _thaw_value(self.reserved_terms),
+            "date_columns": _thaw_value(self.date_columns),
+            "tables_text": self.tables_text,
+            "columns_text": self.columns_text,
+            "context_version": self.version,
+        }
+
+
+def get_context_version(namespace: str) -> int:
+    with _LOCK:
+        return _GLOBAL_VERSION + _VERSIONS.get(namespace, 0)
+
+
+def bump_context_version(namespace: Optional[str] = None) -> int:
+    """Invalidate cached snapshots for ``namespace`` (or every namespace)."""
+
+    global _GLOBAL_VERSION
+    with _LOCK:
+        if namespace is None:
+            _GLOBAL_VERSION += 1
+            _SNAPSHOTS.clear()
+            return _GLOBAL_VERSION
+        _VERSIONS[namespace] = _VERSIONS.get(namespace, 0) + 1
+        _SNAPSHOTS.pop(namespace, None)
+        return _GLOBAL_VERSION + _VERSIONS[namespace]
+
+
+def _build_lock(namespace: str) -> threading.Lock:
+    with _LOCK:
+        lock = _BUILD_LOCKS.get(namespace)
+        if lock is None:
+            lock = _BUILD_LOCKS[namespace] = threading.Lock()
+        return lock
+
+
+def _fresh(snapshot: Optional[ContextSnapshot], version: int, max_age_s: float) -> bool:
+    if snapshot is None or snapshot.version != version:
+        return False
+    if max_age_s and max_age_s > 0:
+        return (time.time() - snapshot.built_at) < max_age_s
+    return True
+
+
+def get_context_snapshot(
+    namespace: str,
+    builder: Callable[[str], Mapping[str, Any]],
+    *,
+    max_age_s: float = 0.0,
+) -> ContextSnapshot:
+    """Return the cached snapshot for ``namespace``, building it at most once per version.
+
+    ``max_age_s`` > 0 additionally expires snapshots by age, which covers
+    re-seeds performed by another process.
+    """
+
+    version = get_context_version(namespace)
+    snapshot = _SNAPSHOTS.get(namespace)
+    if _fresh(snapshot, version, max_age_s):
+        return snapshot  # type: ignore[return-value]
+
+    with _build_lock(namespace):
+        version = get_context_version(namespace)
+        snapshot = _SNAPSHOTS.get(namespace)
+        if _fresh(snapshot, version, max_age_s):
+            return snapshot  # type: ignore[return-value]
+        snapshot = ContextSnapshot.from_context(namespace, version, builder(namespace))
+        with _LOCK:
+            # Only publish if nobody re-seeded while we were building.
+            if _GLOBAL_VERSION + _VERSIONS.get(namespace, 0) == version:
+                _SNAPSHOTS[namespace] = snapshot
+        return snapshot
+
+
+__all__ = [
+    "ContextSnapshot",
+    "bump_context_version",
+    "get_context_snapshot",
+    "get_context_version",
+    "render_columns_text",
+    "render_tables_text",
+]
@@ -0,0 +1,361 @@
+"""Pre-execution cost guard and per-statement call timeouts.
+
+Before a statement runs, its optimizer estimate (``COST`` and
+``CARDINALITY`` of plan line 0) is read with ``EXPLAIN PLAN`` and cached per
+SQL shape (whitespace-normalised text, so bind values do not matter).  Then:
+
+* estimated cost above ``DW_COST_GUARD_MAX_COST``      -> rejected;
+* estimated rows above ``DW_COST_GUARD_MAX_ROWS``      -> an unbounded
+  ``SELECT`` is rewritten with ``FETCH FIRST <max_rows> ROWS ONLY``,
+  anything else is rejected;
+* ``DW_COST_GUARD_MODE=warn`` only records the verdict in the meta.
+
+A plan that cannot be read never blocks execution.  Separately,
+:func:`call_timeout` bounds each database round trip
+(``DW_SQL_CALL_TIMEOUT_MS``): Oracle connections get ``call_timeout``, so
+the driver cancels the call and frees the session; Postgres gets
+``statement_timeout``.
+
+The plan provider is pluggable (``provider(connection, sql) -> PlanEstimate``)
+so the guard can be exercised without a database.
+
+Settings (mem_settings or env):
+  DW_COST_GUARD_MODE=off|warn|enforce   default off
+  DW_COST_GUARD_MAX_COST=0              0 disables the cost check
+  DW_COST_GUARD_MAX_ROWS=0              0 disables the cardinality check
+  DW_COST_GUARD_CACHE_TTL=600           seconds a cached plan stays valid
+  DW_SQL_CALL_TIMEOUT_MS=0              0 disables the call timeout
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Tuple
+
+from core.singleflight import canonical_sql
+
+log = logging.getLogger("core.cost_guard")
+
+MODES = ("off", "warn", "enforce")
+SETTING_KEYS = (
+    "DW_COST_GUARD_MODE",
+    "DW_COST_GUARD_MAX_COST",
+    "DW_COST_GUARD_MAX_ROWS",
+    "DW_COST_GUARD_CACHE_TTL",
+    "DW_SQL_CALL_TIMEOUT_MS",
+)
+CACHE_SIZE = 512
+
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_BOUNDED_RE = re.compile(r"\bFETCH\s+(?:FIRST|NEXT)\b|\bROWNUM\b|\bLIMIT\s+\d+|\bGROUP\s+BY\b", re.I)
+_AGGREGATE_RE = re.compile(r"\b(?:COUNT|SUM|AVG|MIN|MAX|LISTAGG)\s*\(", re.I)
+
+
+class CostGuardRejected(RuntimeError):
+    """Raised when a statement's estimate exceeds the configured limits."""
+
+    def __init__(self, reason: str, estimate: "PlanEstimate") -> None:
+        super().__init__(f"cost_guard_rejected: {reason}")
+        self.reason = reason
+        self.estimate = estimate
+
+
+class StatementTimeout(RuntimeError):
+    """Raised when a statement was cancelled by the call timeout."""
+
+
+@dataclass(frozen=True)
+class PlanEstimate:
+    cost: Optional[int] = None
+    cardinality: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class GuardPolicy:
+    mode: str = "off"
+    max_cost: int = 0
+    max_rows: int = 0
+    cache_ttl: float = 600.0
+    timeout_ms: int = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off" and (self.max_cost > 0 or self.max_rows > 0)
+
+
+@dataclass
+class GuardDecision:
+    action: str  # allow|rewrite|reject|warn
+    sql: str
+    estimate: PlanEstimate = field(default_factory=PlanEstimate)
+    reason: Optional[str] = None
+    cached: bool = False
+
+    def meta(self) -> Dict[str, Any]:
+        return {
+            "action": self.action,
+            "cost": self.estimate.cost,
+            "cardinality": self.estimate.cardinality,
+            "reason": self.reason,
+            "cached": self.cached,
+        }
+
+
+def _setting(settings: Any, key: str, default: Any) -> Any:
+    value = None
+    if isinstance(settings, Mapping):
+        value = settings.get(key)
+    elif settings is not None:
+        getter = getattr(settings, "get", None)
+        if callable(getter):
+            try:
+                value = getter(key)
+            except Exception:
+                value = None
+    if value is None:
+        value = os.getenv(key)
+    return default if value is None or value == "" else value
+
+
+def _non_negative(value: Any, default: float) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return default
+    return number if number >= 0 else default
+
+
+def load_policy(settings: Any = None) -> GuardPolicy:
+    mode = str(_setting(settings, "DW_COST_GUARD_MODE", "off")).strip().lower()
+    if mode in {"1", "true", "on", "yes"}:
+        mode = "enforce"
+    if mode not in MODES:
+        mode = "off"
+    return GuardPolicy(
+        mode=mode,
+        max_cost=int(_non_negative(_setting(settings, "DW_COST_GUARD_MAX_COST", 0), 0)),
+        max_rows=int(_non_negative(_setting(settings, "DW_COST_GUARD_MAX_ROWS", 0), 0)),
+        cache_ttl=_non_negative(_setting(settings, "DW_COST_GUARD_CACHE_TTL", 600), 600.0),
+        timeout_ms=int(_non_negative(_setting(settings, "DW_SQL_CALL_TIMEOUT_MS", 0), 0)),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Plans
+# ---------------------------------------------------------------------------
+
+PlanProvider = Callable[[Any, str], PlanEstimate]
+
+
+def oracle_plan(connection: Any, sql: str) -> PlanEstimate:
+    """``EXPLAIN PLAN`` estimate; placeholders stay unbound, hence ``exec_driver_sql``."""
+
+    statement_id = "cg_" + uuid.uuid4().hex[:20]
+    body = canonical_sql(sql)
+    connection.exec_driver_sql(f"EXPLAIN PLAN SET STATEMENT_ID = '{statement_id}' FOR {body}")
+    try:
+        row = connection.exec_driver_sql(
+            f"SELECT COST, CARDINALITY FROM PLAN_TABLE WHERE STATEMENT_ID = '{statement_id}' AND ID = 0"
+        ).fetchone()
+    finally:
+        connection.exec_driver_sql(f"DELETE FROM PLAN_TABLE WHERE STATEMENT_ID = '{statement_id}'")
+    if not row:
+        return PlanEstimate()
+    return PlanEstimate(
+        cost=int(row[0]) if row[0] is not None else None,
+        cardinality=int(row[1]) if row[1] is not None else None,
+    )
+
+
+class PlanCache:
+    """Small LRU of plan estimates keyed by SQL shape."""
+
+    def __init__(self, size: int = CACHE_SIZE) -> None:
+        self.size = size
+        self._items: "OrderedDict[str, Tuple[float, PlanEstimate]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, shape: str, ttl: float) -> Optional[PlanEstimate]:
+        with self._lock:
+            item = self._items.get(shape)
+            if item is None or (ttl and time.monotonic() - item[0] > ttl):
+                self.misses += 1
+                return None
+            self._items.move_to_end(shape)
+            self.hits += 1
+            return item[1]
+
+    def put(self, shape: str, estimate: PlanEstimate) -> None:
+        with self._lock:
+            self._items[shape] = (time.monotonic(), estimate)
+            self._items.move_to_end(shape)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._items), "hits": self.hits, "misses": self.misses}
+
+
+_CACHE = PlanCache()
+
+
+def plan_cache() -> PlanCache:
+    return _CACHE
+
+
+def shape_key(sql: str, scope: Any = None) -> str:
+    return f"{scope or ''}::{canonical_sql(sql)}"
+
+
+def is_unbounded(sql: str) -> bool:
+    """Top-level ``SELECT`` without a row limit, ``GROUP BY`` or aggregate."""
+
+    masked = _LITERAL_RE.sub("''", sql)
+    depth = 0
+    top = []
+    for ch in masked:
+        if ch == "(":
+            depth += 1
+            if depth == 1:
+                top.append(ch)
+        elif ch == ")":
+            depth = max(0, depth - 1)
+            if depth == 0:
+                top.append(ch)
+        elif depth == 0:
+            top.append(ch)
+    head = "".join(top)
+    if not re.match(r"\s*(?:WITH\b.*?\bSELECT|SELECT)\b", head, re.I | re.S):
+        return False
+    return not (_BOUNDED_RE.search(head) or _AGGREGATE_RE.search(re.split(r"\bFROM\b", head, 1, flags=re.I)[0]))
+
+
+def check(
+    sql: str,
+    connect: Callable[[], Any],
+    policy: GuardPolicy,
+    *,
+    provider: PlanProvider = oracle_plan,
+    scope: Any = None,
+    cache: Optional[PlanCache] = None,
+) -> GuardDecision:
+    """Decide whether ``sql`` may run; ``connect()`` returns a context-managed connection for EXPLAIN."""
+
+    if not policy.enabled:
+        return GuardDecision("allow", sql)
+    cache = cache or _CACHE
+    key = shape_key(sql, scope)
+    estimate = cache.get(key, policy.cache_ttl)
+    cached = estimate is not None
+    if estimate is None:
+        try:
+            with connect() as connection:
+                estimate = provider(connection, sql)
+        except Exception as exc:
+            log.info("cost guard: plan unavailable, allowing: %s", exc)
+            return GuardDecision("allow", sql, reason="plan_unavailable")
+        cache.put(key, estimate)
+
+    reason = None
+    action = "allow"
+    out_sql = sql
+    if policy.max_cost and estimate.cost is not None and estimate.cost > policy.max_cost:
+        reason = f"cost {estimate.cost} > {policy.max_cost}"
+        action = "reject"
+    elif policy.max_rows and estimate.cardinality is not None and estimate.cardinality > policy.max_rows:
+        reason = f"rows {estimate.cardinality} > {policy.max_rows}"
+        if is_unbounded(sql):
+            action = "rewrite"
+            out_sql = f"{canonical_sql(sql)} FETCH FIRST {policy.max_rows} ROWS ONLY"
+        else:
+            action = "reject"
+    if policy.mode == "warn" and action != "allow":
+        log.warning("cost guard (warn): %s would be %sed: %s", canonical_sql(sql)[:200], action, reason)
+        return GuardDecision("warn", sql, estimate, reason, cached)
+    return GuardDecision(action, out_sql, estimate, reason, cached)
+
+
+def enforce(decision: GuardDecision) -> str:
+    """SQL to execute for ``decision``; raises :class:`CostGuardRejected` when rejected."""
+
+    if decision.action == "reject":
+        raise CostGuardRejected(decision.reason or "over limit", decision.estimate)
+    return decision.sql
+
+
+# ---------------------------------------------------------------------------
+# Call timeouts
+# ---------------------------------------------------------------------------
+
+def _driver_connection(connection: Any) -> Any:
+    raw = getattr(connection, "connection", connection)
+    return getattr(raw, "driver_connection", None) or getattr(raw, "dbapi_connection", None) or raw
+
+
+@contextmanager
+def call_timeout(connection: Any, timeout_ms: int) -> Iterator[None]:
+    """Bound each round trip on ``connection`` to ``timeout_ms`` (0 = unchanged).
+
+    Raises :class:`StatementTimeout` when the driver cancelled the call.
+    """
+
+    if not timeout_ms:
+        yield
+        return
+    dialect = str(getattr(getattr(connection, "dialect", None), "name", "")).lower()
+    started = time.monotonic()
+    restore: Optional[Callable[[], None]] = None
+    if dialect.startswith("oracle"):
+        driver = _driver_connection(connection)
+        previous = getattr(driver, "call_timeout", 0)
+        driver.call_timeout = int(timeout_ms)
+        restore = lambda: setattr(driver, "call_timeout", previous)  # noqa: E731
+    elif dialect.startswith("postgres"):
+        connection.exec_driver_sql(f"SET statement_timeout = {int(timeout_ms)}")
+        restore = lambda: connection.exec_driver_sql("SET statement_timeout = DEFAULT")  # noqa: E731
+    try:
+        yield
+    except Exception as exc:
+        if (time.monotonic() - started) * 1000 >= timeout_ms * 0.95:
+            raise StatementTimeout(f"statement cancelled after {timeout_ms} ms") from exc
+        raise
+    finally:
+        if restore is not None:
+            try:
+                restore()
+            except Exception:  # pragma: no cover - connection already broken
+                pass
+
+
+__all__ = [
+    "CostGuardRejected",
+    "GuardDecision",
+    "GuardPolicy",
+    "PlanCache",
+    "PlanEstimate",
+    "SETTING_KEYS",
+    "StatementTimeout",
+    "call_timeout",
+    "check",
+    "enforce",
+    "is_unbounded",
+    "load_policy",
+    "oracle_plan",
+    "plan_cache",
+    "shape_key",
+]
@@ -0,0 +1,177 @@
+"""Fast JSON encoding, columnar row payloads and negotiated compression.
+
+Large answers spend most of their CPU in serialisation: rows are built as
+Python lists, then ``jsonify`` walks every cell again and routes each
+``date``/``Decimal`` through a default hook.  This module provides:
+
+* :func:`dumps` -- ``orjson`` when installed (dates natively as ISO 8601),
+  otherwise compact ``json``; ``Decimal`` becomes ``int``/``float``;
+* :func:`columnar` / :func:`fetch_columnar` -- ``{"columns": [...],
+  "data": {col: [...]}}`` built by transposing rows or cursor batches, so
+  each column name is written once instead of once per row;
+* :func:`negotiate_encoding` / :func:`encode_body` -- ``br`` (when the
+  ``brotli`` package is installed) or ``gzip`` chosen from
+  ``Accept-Encoding`` for bodies above a minimum size.
+
+Environment:
+  DW_RESPONSE_COMPRESS_MIN=1024   smallest body (bytes) worth compressing
+  DW_RESPONSE_GZIP_LEVEL=1        gzip level (low favours latency over ratio)
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:  # pragma: no cover - optional dependency
+    import orjson
+except Exception:  # pragma: no cover - fallback to stdlib json
+    orjson = None  # type: ignore[assignment]
+
+try:  # pragma: no cover - optional dependency
+    import brotli
+except Exception:  # pragma: no cover - br is simply not offered
+    brotli = None  # type: ignore[assignment]
+
+DEFAULT_COMPRESS_MIN = 1024
+DEFAULT_GZIP_LEVEL = 1
+DEFAULT_FETCH_BATCH = 5000
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return bytes(obj).decode("utf-8", "ignore")
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    read = getattr(obj, "read", None)
+    if callable(read):  # Oracle LOBs
+        return read()
+    return str(obj)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialise ``obj`` to UTF-8 JSON bytes."""
+
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def backend() -> str:
+    return "orjson" if orjson is not None else "json"
+
+
+# ---------------------------------------------------------------------------
+# Columnar payloads
+# ---------------------------------------------------------------------------
+
+def _unique_names(columns: Sequence[Any]) -> List[str]:
+    seen: Dict[str, int] = {}
+    out: List[str] = []
+    for col in columns:
+        name = str(col)
+        count = seen.get(name, 0) + 1
+        seen[name] = count
+        out.append(name if count == 1 else f"{name}_{count}")
+    return out
+
+
+def columnar(columns: Sequence[Any], rows: Iterable[Sequence[Any]]) -> Dict[str, Any]:
+    """Transpose ``rows`` into ``{"columns": [...], "data": {col: [...]}}``."""
+
+    names = _unique_names(columns)
+    transposed = list(zip(*rows))
+    if not transposed:
+        transposed = [() for _ in names]
+    return {"columns": names, "data": {name: list(values) for name, values in zip(names, transposed)}}
+
+
+def fetch_columnar(result: Any, batch_size: int = DEFAULT_FETCH_BATCH) -> Dict[str, Any]:
+    """Build the columnar payload from a DB-API/SQLAlchemy result in ``fetchmany`` batches."""
+
+    names = _unique_names(list(result.keys()))
+    buckets: List[List[Any]] = [[] for _ in names]
+    while True:
+        batch = result.fetchmany(batch_size)
+        if not batch:
+            break
+        for bucket, values in zip(buckets, zip(*batch)):
+            bucket.extend(values)
+    return {"columns": names, "data": dict(zip(names, buckets))}
+
+
+# ---------------------------------------------------------------------------
+# Compression
+# ---------------------------------------------------------------------------
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best of ``br``/``gzip`` accepted by the client (``q=0`` excludes)."""
+
+    offered: Dict[str, float] = {}
+    for part in str(accept_encoding or "").split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        offered[token] = q
+    available = (["br"] if brotli is not None else []) + ["gzip"]
+    best: Optional[str] = None
+    best_q = 0.0
+    for encoding in available:
+        q = offered.get(encoding, offered.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(body, quality=4)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=_env_int("DW_RESPONSE_GZIP_LEVEL", DEFAULT_GZIP_LEVEL))
+    raise ValueError(f"unsupported encoding: {encoding}")
+
+
+def encode_body(obj: Any, accept_encoding: Optional[str] = None) -> Tuple[bytes, Dict[str, str]]:
+    """Return ``(body, headers)`` for a JSON response, compressed when worthwhile."""
+
+    body = dumps(obj)
+    headers = {"Vary": "Accept-Encoding"}
+    encoding = negotiate_encoding(accept_encoding)
+    if encoding and len(body) >= _env_int("DW_RESPONSE_COMPRESS_MIN", DEFAULT_COMPRESS_MIN):
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return body, headers
+
+
+__all__ = [
+    "backend",
+    "columnar",
+    "compress",
+    "dumps",
+    "encode_body",
+    "fetch_columnar",
+    "negotiate_encoding",
+]
@@ -0,0 +1,109 @@
+"""Immutable, structurally shared snapshots of JSON-like intent data.
+
+Intent dicts, explain lists and binds used to be ``copy.deepcopy``'d every
+time they entered or left a cache.  :func:`freeze` instead turns them once
+into :class:`FrozenDict` / :class:`FrozenList`, which subclass ``dict`` and
+``list`` (so ``isinstance`` checks, ``json.dumps`` and Jinja keep working)
+but refuse mutation.  A frozen value can be handed to any number of readers
+and threads without copying; code that needs to edit part of it asks for a
+mutable copy of just that part with :func:`thaw_shallow`.
+
+Already-frozen sub-trees are reused as-is, so freezing a structure built from
+frozen pieces only allocates the new containers around them.
+"""
+from __future__ import annotations
+
+from typing import Any, Mapping
+
+__all__ = ["FrozenDict", "FrozenList", "freeze", "thaw", "thaw_shallow"]
+
+
+def _immutable(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} is immutable; use thaw() for a mutable copy")
+
+
+class FrozenDict(dict):
+    """Read-only ``dict``; copies of it are plain mutable dicts."""
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = update = _immutable
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        return _immutable(self)
+
+    def __copy__(self) -> dict:
+        return dict(self)
+
+    def __deepcopy__(self, memo) -> dict:
+        return thaw(self)
+
+    def __reduce__(self):
+        return (dict, (thaw(self),))
+
+
+class FrozenList(list):
+    """Read-only ``list``; copies of it are plain mutable lists."""
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+    append = extend = insert = remove = pop = clear = sort = reverse = _immutable
+
+    def __copy__(self) -> list:
+        return list(self)
+
+    def __deepcopy__(self, memo) -> list:
+        return thaw(self)
+
+    def __reduce__(self):
+        return (list, (thaw(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Return an immutable version of ``value`` (dicts, lists, tuples, sets).
+
+    Scalars and other objects are shared as-is; they are expected to be
+    immutable already (str, numbers, dates, Decimal, None).
+    """
+
+    if isinstance(value, (FrozenDict, FrozenList, frozenset)):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    if isinstance(value, tuple) and type(value) is tuple:
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Deep mutable copy of a frozen (or plain) JSON-like value."""
+
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [thaw(item) for item in value]
+    if isinstance(value, tuple) and type(value) is tuple:
+        return tuple(thaw(item) for item in value)
+    return value
+
+
+def thaw_shallow(value: Mapping[str, Any], *keys: str) -> dict:
+    """Mutable top-level copy of ``value`` with only ``keys`` deep-thawed.
+
+    Every other entry stays the shared frozen object, so the copy costs one
+    dict plus whatever the caller intends to edit.
+    """
+
+    out = dict(value)
+    for key in keys:
+        if key in out:
+            out[key] = thaw(out[key])
+    return out
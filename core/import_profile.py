@@ -0,0 +1,121 @@
+"""
+Import-time profile for the service entry points.
+
+Runs ``python -X importtime -c "import <module>"`` in a child interpreter and
+summarises the per-module and per-package cumulative import cost.
+
+Usage:
+  python -m core.import_profile                 # profiles ``main``
+  python -m core.import_profile apps.dw.app --top 30
+  python -m core.import_profile main --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional, Sequence
+
+_LINE_RE = re.compile(r"^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S.*)$")
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Parse ``-X importtime`` output into rows of self/cumulative microseconds."""
+
+    rows: List[Dict[str, Any]] = []
+    for line in stderr.splitlines():
+        match = _LINE_RE.match(line.rstrip())
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        rows.append(
+            {
+                "module": module.strip(),
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                # importtime indents nested imports by two spaces per level
+                "depth": max(0, (len(indent) - 1) // 2),
+            }
+        )
+    return rows
+
+
+def summarise(rows: Sequence[Dict[str, Any]], top: int = 20) -> Dict[str, Any]:
+    """Return the slowest modules and the self-time aggregated per top-level package."""
+
+    by_package: Dict[str, int] = {}
+    for row in rows:
+        pkg = row["module"].split(".", 1)[0]
+        by_package[pkg] = by_package.get(pkg, 0) + row["self_us"]
+    total_us = sum(row["self_us"] for row in rows)
+    slowest = sorted(rows, key=lambda r: r["cumulative_us"], reverse=True)[:top]
+    packages = sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    return {
+        "total_ms": round(total_us / 1000.0, 1),
+        "modules": len(rows),
+        "slowest": [
+            {
+                "module": r["module"],
+                "cumulative_ms": round(r["cumulative_us"] / 1000.0, 1),
+                "self_ms": round(r["self_us"] / 1000.0, 1),
+            }
+            for r in slowest
+        ],
+        "packages": [
+            {"package": name, "self_ms": round(us / 1000.0, 1)} for name, us in packages
+        ],
+    }
+
+
+def profile_import(module: str, *, python: Optional[str] = None) -> Dict[str, Any]:
+    """Import ``module`` in a fresh interpreter and return the summarised profile."""
+
+    env = dict(os.environ)
+    env.setdefault("APP_FAST_START", "1")
+    proc = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=os.getcwd(),
+    )
+    rows = parse_importtime(proc.stderr)
+    errors = [ln for ln in proc.stderr.splitlines() if ln and not ln.startswith("import time:")]
+    return {"module": module, "ok": proc.returncode == 0, "rows": rows, "errors": errors[-5:]}
+
+
+def _print_report(module: str, summary: Dict[str, Any], ok: bool, errors: List[str]) -> None:
+    print(f"import {module}: {summary['total_ms']} ms across {summary['modules']} modules")
+    if not ok:
+        print("  (import failed; partial profile)")
+        for line in errors:
+            print(f"  ! {line}")
+    print("\nslowest modules (cumulative ms / self ms):")
+    for row in summary["slowest"]:
+        print(f"  {row['cumulative_ms']:>9.1f} {row['self_ms']:>9.1f}  {row['module']}")
+    print("\nself time by top-level package (ms):")
+    for row in summary["packages"]:
+        print(f"  {row['self_ms']:>9.1f}  {row['package']}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import-time profile for an entry module")
+    parser.add_argument("module", nargs="?", default="main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="emit JSON instead of text")
+    args = parser.parse_args(argv)
+
+    result = profile_import(args.module)
+    summary = summarise(result["rows"], top=args.top)
+    if args.json:
+        print(json.dumps({"module": args.module, "ok": result["ok"], "errors": result["errors"], **summary}, indent=2))
+    else:
+        _print_report(args.module, summary, result["ok"], result["errors"])
+    return 0 if result["ok"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,12 +1,17 @@
 import os
 import threading
+import time
 from typing import Any, Dict, Iterable, Optional, Tuple
 
-import torch
+# torch (and the model backends) are imported lazily inside the loaders so that
+# importing this module stays cheap for processes that never load weights.
 
 _MODEL_CACHE: Dict[Tuple[str, str, str], Optional[Dict[str, Any]]] = {}
 _ROLE_TO_KEY: Dict[str, Tuple[str, str, str]] = {}
 _LOCK = threading.Lock()
+_LOAD_LOCKS: Dict[str, threading.Lock] = {}
+# role -> {"state": pending|loading|ready|disabled|failed, "error", "started_at", "ready_at"}
+_STATUS: Dict[str, Dict[str, Any]] = {}
 
 
 def _env_bool(name: str, default: bool = False) -> bool:
@@ -44,6 +49,21 @@ def _resolve_role_config(role: str) -> tuple[str, Optional[str]]:
     raise ValueError(f"Unknown model role: {role}")
 
 
+def _stub_payload(role: str, default_response: str) -> Dict[str, Any]:
+    """CPU-only stand-in (``*_BACKEND=stub``) for load tests without weights.
+
+    ``<ROLE>_STUB_RESPONSE`` sets the canned text and ``MODEL_STUB_DELAY_MS``
+    simulates generation time.
+    """
+
+    from core.model_server import StubGenerator
+
+    response = os.getenv(f"{role.upper()}_STUB_RESPONSE", default_response)
+    handle = StubGenerator(response=response, delay_s=_env_int("MODEL_STUB_DELAY_MS", 0) / 1000.0)
+    _log(f"[{role}] stub model ({int(handle.delay_s * 1000)} ms per call)")
+    return {"role": role, "backend": "stub", "path": None, "handle": handle, "gen_cfg": {}}
+
+
 # ---------------------------
 # SQLCoder (ExLlamaV2) loader
 # ---------------------------
@@ -54,6 +74,29 @@ def _load_sql_model(backend: str, path: Optional[str]) -> Optional[Dict[str, Any
     if backend in {"off", "none", "disabled"}:
         _log("[sql] model disabled by config")
         return None
+    if backend == "stub":
+        return _stub_payload("sql", 'SELECT * FROM "Contract"')
+    if backend == "remote":
+        # Weights live in a shared ``core.model_server`` process; this worker
+        # only holds a socket client with the same generate() interface.
+        from core.model_server import RemoteGenerator
+
+        handle = RemoteGenerator(
+            os.getenv("MODEL_SERVER_ADDRESS"),
+            max_connections=_env_int("MODEL_SERVER_MAX_CONNECTIONS", 4),
+        )
+        _log(f"SQL model (remote) via {handle.address}")
+        return {
+            "role": "sql",
+            "backend": backend,
+            "path": handle.address,
+            "handle": handle,
+            "gen_cfg": {
+                "max_new_tokens": _env_int("GENERATION_MAX_NEW_TOKENS", 256),
+                "temperature": float(os.getenv("GENERATION_TEMPERATURE", "0.2")),
+                "top_p": float(os.getenv("GENERATION_TOP_P", "0.9")),
+            },
+        }
     path = path or os.getenv("MODEL_PATH")
     if not path:
         raise RuntimeError("MODEL_PATH not set for SQL model")
@@ -99,8 +142,6 @@ def _resolve_device_for_inputs(model: Any, device_map: str | None) -> Any:
     if hasattr(model, "device"):
         return model.device
     try:
-        import torch
-
         return next(model.parameters()).device
     except Exception:
         return None
@@ -111,6 +152,8 @@ def _load_clarifier_model(backend: str, path: Optional[str]) -> Optional[Dict[st
     if backend in {"off", "none", "disabled"}:
         _log("[clarifier] disabled by config")
         return None
+    if backend == "stub":
+        return _stub_payload("clarifier", "{}")
 
     if not path:
         raise RuntimeError("CLARIFIER_MODEL_PATH not set")
@@ -118,6 +161,8 @@ def _load_clarifier_model(backend: str, path: Optional[str]) -> Optional[Dict[st
     device_map_env = os.getenv("CLARIFIER_DEVICE_MAP", "auto").strip()
     device_map = device_map_env if device_map_env else "auto"
     low_cpu_mem = _env_bool("CLARIFIER_LOW_CPU_MEM", True)
+    import torch
+
     compute_dtype_str = os.getenv("CLARIFIER_COMPUTE_DTYPE", "float16")
     compute_dtype = getattr(torch, compute_dtype_str, torch.float16)
     quant_type = os.getenv("CLARIFIER_QUANT_TYPE", "nf4").lower()
@@ -263,6 +308,25 @@ def _load_clarifier_model(backend: str, path: Optional[str]) -> Optional[Dict[st
     }
 
 
+def _set_status(role: str, state: str, error: Optional[str] = None) -> None:
+    with _LOCK:
+        entry = _STATUS.setdefault(role, {})
+        entry["state"] = state
+        entry["error"] = error
+        if state == "loading":
+            entry["started_at"] = time.time()
+        elif state in {"ready", "disabled", "failed"}:
+            entry["ready_at"] = time.time()
+
+
+def _load_lock(role: str) -> threading.Lock:
+    with _LOCK:
+        lock = _LOAD_LOCKS.get(role)
+        if lock is None:
+            lock = _LOAD_LOCKS[role] = threading.Lock()
+        return lock
+
+
 def load_llm(role: str) -> Optional[Dict[str, Any]]:
     """Load a model for the given role ("sql" or "clarifier")."""
 
@@ -278,19 +342,81 @@ def load_llm(role: str) -> Optional[Dict[str, Any]]:
             _ROLE_TO_KEY[role] = cache_key
             return payload
 
-    if role == "sql":
-        payload = _load_sql_model(backend_key, path)
-    elif role == "clarifier":
-        payload = _load_clarifier_model(backend_key, path)
-    else:
-        raise ValueError(f"Unknown model role: {role}")
+    # Serialise loads per role so a request arriving during a background
+    # warm-up waits for it instead of loading a second copy of the weights.
+    with _load_lock(role):
+        with _LOCK:
+            if cache_key in _MODEL_CACHE:
+                _ROLE_TO_KEY[role] = cache_key
+                return _MODEL_CACHE[cache_key]
 
-    with _LOCK:
-        _MODEL_CACHE[cache_key] = payload
-        _ROLE_TO_KEY[role] = cache_key
+        _set_status(role, "loading")
+        try:
+            if role == "sql":
+                payload = _load_sql_model(backend_key, path)
+            elif role == "clarifier":
+                payload = _load_clarifier_model(backend_key, path)
+            else:
+                raise ValueError(f"Unknown model role: {role}")
+        except Exception as exc:
+            _set_status(role, "failed", str(exc))
+            raise
+
+        with _LOCK:
+            _MODEL_CACHE[cache_key] = payload
+            _ROLE_TO_KEY[role] = cache_key
+        _set_status(role, "ready" if payload else "disabled")
     return payload
 
 
+def warm_up_async(roles: Iterable[str]) -> threading.Thread:
+    """Load the given model roles on a daemon thread and return it.
+
+    Progress is reported through :func:`model_status`; failures are logged and
+    recorded rather than raised.
+    """
+
+    role_list = [r for r in roles if r]
+    for role in role_list:
+        with _LOCK:
+            if role not in _STATUS:
+                _STATUS[role] = {"state": "pending", "error": None}
+
+    def _run() -> None:
+        for role in role_list:
+            try:
+                load_llm(role)
+            except Exception as exc:  # pragma: no cover - best effort log
+                _log(f"[{role}] background load failed: {exc}")
+
+    thread = threading.Thread(target=_run, name="model-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def model_status() -> Dict[str, Dict[str, Any]]:
+    """Return a snapshot of per-role load state without triggering a load."""
+
+    with _LOCK:
+        return {role: dict(entry) for role, entry in _STATUS.items()}
+
+
+def is_loading(role: str) -> bool:
+    with _LOCK:
+        return (_STATUS.get(role) or {}).get("state") in {"pending", "loading"}
+
+
+def peek_model(role: str) -> Optional[Any]:
+    """Return the cached handle for ``role`` if already loaded; never loads."""
+
+    with _LOCK:
+        key = _ROLE_TO_KEY.get(role)
+        payload = _MODEL_CACHE.get(key) if key else None
+    if isinstance(payload, dict):
+        return payload.get("handle")
+    return None
+
+
 def ensure_model(role: str) -> Optional[Any]:
     """Ensure a model for the role is loaded and return the handle."""
 
@@ -368,7 +494,7 @@ def model_info() -> Dict[str, Any]:
         with _LOCK:
             key = _ROLE_TO_KEY.get(role)
             payload = _MODEL_CACHE.get(key) if key else None
-        if payload is None:
+        if payload is None and not is_loading(role):
             try:
                 payload = load_llm(role)
             except Exception:
@@ -379,6 +505,8 @@ def model_info() -> Dict[str, Any]:
     clar = _ensure_payload("clarifier")
 
     def _describe(role: str, payload: Optional[Dict[str, Any]]) -> str:
+        if not payload and is_loading(role):
+            return "loading"
         if not payload:
             return "disabled" if role == "clarifier" else "unavailable"
         env_key = "MODEL_NAME" if role == "sql" else "CLARIFIER_MODEL_NAME"
@@ -404,6 +532,7 @@ def model_info() -> Dict[str, Any]:
         "mode": "dw-pipeline",
         "llm": _describe("sql", sql),
         "clarifier": _describe("clarifier", clar),
+        "status": model_status(),
     }
 
 
@@ -0,0 +1,336 @@
+"""
+Local inference server so several WSGI workers share one GPU-resident model.
+
+The server owns the only copy of the SQL model and listens on a Unix socket
+(``multiprocessing.connection`` framing carrying JSON, never pickles).  The
+socket lives in a private 0700 runtime directory and connections must pass the
+``multiprocessing`` HMAC handshake: the key comes from ``MODEL_SERVER_AUTHKEY``
+or is generated by the server into ``<address>.key`` (mode 0600), which
+workers running as the same user read back.  Workers talk to it through
+:class:`RemoteGenerator`, which implements the same ``generate()`` interface as
+the in-process ExLlama handle, so ``core.model_loader`` can hand it out when
+``MODEL_BACKEND=remote``.
+
+Usage:
+  python -m core.model_server                    # exllama, default socket
+  python -m core.model_server --backend stub
+
+Workers:
+  MODEL_BACKEND=remote gunicorn -w 4 main:app
+
+The default socket is ``$XDG_RUNTIME_DIR/copilot/sql-model.sock`` (falling back
+to ``<tmpdir>/copilot-<uid>/``); set ``MODEL_SERVER_ADDRESS`` on both sides to
+move it.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import queue
+import secrets
+import stat
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Dict, Iterable, Optional
+
+SOCKET_NAME = "sql-model.sock"
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+
+_GENERATE_KEYS = ("max_new_tokens", "temperature", "top_p", "stop")
+
+
+def _private_dir(path: str) -> str:
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise RuntimeError(f"model server runtime dir {path} must be a 0700 directory owned by this user")
+    return path
+
+
+def runtime_dir() -> str:
+    base = os.getenv("XDG_RUNTIME_DIR")
+    if base:
+        return _private_dir(os.path.join(base, "copilot"))
+    return _private_dir(os.path.join(tempfile.gettempdir(), f"copilot-{os.getuid()}"))
+
+
+def default_address() -> str:
+    return os.getenv("MODEL_SERVER_ADDRESS") or os.path.join(runtime_dir(), SOCKET_NAME)
+
+
+def _authkey_path(address: str) -> str:
+    return f"{address}.key"
+
+
+def _authkey(address: str, *, create: bool = False) -> bytes:
+    """HMAC key for the connection handshake; never ``None``.
+
+    ``MODEL_SERVER_AUTHKEY`` wins.  Otherwise the server writes a fresh random
+    key next to the socket (0600) and clients read it from there.
+    """
+
+    key = os.getenv("MODEL_SERVER_AUTHKEY")
+    if key:
+        return key.encode("utf-8")
+    path = _authkey_path(address)
+    if create:
+        secret = secrets.token_hex(32).encode("ascii")
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(secret)
+        return secret
+    with open(path, "rb") as fh:
+        return fh.read().strip()
+
+
+def _send(conn: Connection, message: Dict[str, Any]) -> None:
+    conn.send_bytes(json.dumps(message).encode("utf-8"))
+
+
+def _recv(conn: Connection) -> Any:
+    return json.loads(conn.recv_bytes(MAX_MESSAGE_BYTES).decode("utf-8"))
+
+
+def _log(msg: str) -> None:
+    print(msg, flush=True)
+
+
+class StubGenerator:
+    """CPU-only stand-in backend used for tests and GPU-less environments."""
+
+    def __init__(self, response: Optional[str] = None, delay_s: float = 0.0) -> None:
+        self.response = response if response is not None else os.getenv(
+            "MODEL_SERVER_STUB_RESPONSE", "SELECT 1 AS ONE FROM DUAL"
+        )
+        self.delay_s = delay_s
+        self.calls = 0
+
+    def generate(
+        self,
+        prompt: str,
+        max_new_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        stop: Optional[Iterable[str]] = None,
+    ) -> str:
+        self.calls += 1
+        if self.delay_s:
+            time.sleep(self.delay_s)
+        return self.response
+
+
+def _load_backend(backend: str) -> Any:
+    backend = (backend or "exllama").lower()
+    if backend == "stub":
+        return StubGenerator()
+    if backend == "exllama":
+        from core.model_loader import _load_sql_model
+
+        payload = _load_sql_model("exllama", os.getenv("MODEL_PATH"))
+        if not payload:
+            raise RuntimeError("SQL model disabled; nothing to serve")
+        return payload["handle"]
+    raise RuntimeError(f"Unsupported model server backend={backend}")
+
+
+class ModelServer:
+    """Serve ``generate`` calls for one model handle over a Unix socket."""
+
+    def __init__(self, handle: Any, address: Optional[str] = None, backend: str = "custom") -> None:
+        self.handle = handle
+        self.address = address or default_address()
+        self.backend = backend
+        # The GPU runs one generation at a time; connections queue on this lock.
+        self._gen_lock = threading.Lock()
+        self._listener: Optional[Listener] = None
+        self._stopped = threading.Event()
+        self.stats: Dict[str, Any] = {"requests": 0, "errors": 0, "busy_ms": 0}
+
+    def start(self) -> "ModelServer":
+        if os.path.lexists(self.address):
+            # Only replace a stale socket of ours, never an arbitrary file.
+            if not stat.S_ISSOCK(os.lstat(self.address).st_mode):
+                raise RuntimeError(f"{self.address} exists and is not a socket")
+            os.unlink(self.address)
+        authkey = _authkey(self.address, create=True)
+        self._listener = Listener(self.address, family="AF_UNIX", authkey=authkey)
+        thread = threading.Thread(target=self._accept_loop, name="model-server", daemon=True)
+        thread.start()
+        _log(f"[model-server] listening on {self.address} ({self.backend})")
+        return self
+
+    def serve_forever(self) -> None:
+        self.start()
+        try:
+            while not self._stopped.wait(1.0):
+                pass
+        except KeyboardInterrupt:  # pragma: no cover - interactive
+            pass
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._listener is not None:
+            try:
+                self._listener.close()
+            except Exception:
+                pass
+            self._listener = None
+        for path in (self.address, _authkey_path(self.address)):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def _accept_loop(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                conn = self._listener.accept()  # type: ignore[union-attr]
+            except Exception:
+                if self._stopped.is_set():
+                    return
+                continue
+            threading.Thread(target=self._serve_conn, args=(conn,), daemon=True).start()
+
+    def _serve_conn(self, conn: Connection) -> None:
+        with conn:
+            while not self._stopped.is_set():
+                try:
+                    request = _recv(conn)
+                except (EOFError, OSError, ValueError):
+                    return
+                _send(conn, self._dispatch(request))
+
+    def _dispatch(self, request: Any) -> Dict[str, Any]:
+        op = (request or {}).get("op") if isinstance(request, dict) else None
+        if op == "ping":
+            return {"ok": True}
+        if op == "info":
+            return {"ok": True, "backend": self.backend, "stats": dict(self.stats)}
+        if op != "generate":
+            return {"ok": False, "error": f"unknown op: {op!r}"}
+
+        kwargs = {k: v for k, v in (request.get("kwargs") or {}).items() if k in _GENERATE_KEYS}
+        t0 = time.perf_counter()
+        try:
+            with self._gen_lock:
+                text = self.handle.generate(request.get("prompt") or "", **kwargs)
+        except Exception as exc:
+            self.stats["errors"] += 1
+            return {"ok": False, "error": str(exc)}
+        finally:
+            self.stats["requests"] += 1
+            self.stats["busy_ms"] += int((time.perf_counter() - t0) * 1000)
+        return {"ok": True, "text": text}
+
+
+class RemoteGenerator:
+    """Client-side handle with the same ``generate()`` signature as ExLlamaGenerator."""
+
+    def __init__(
+        self,
+        address: Optional[str] = None,
+        *,
+        max_connections: int = 4,
+        connect_timeout_s: float = 10.0,
+    ) -> None:
+        self.address = address or default_address()
+        self.connect_timeout_s = connect_timeout_s
+        self._pool: "queue.LifoQueue[Connection]" = queue.LifoQueue(maxsize=max_connections)
+
+    def _connect(self) -> Connection:
+        deadline = time.monotonic() + self.connect_timeout_s
+        while True:
+            try:
+                # Re-read the key each time: a restarted server writes a new one.
+                return Client(self.address, family="AF_UNIX", authkey=_authkey(self.address))
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.monotonic() >= deadline:
+                    raise RuntimeError(f"model server not reachable at {self.address}")
+                time.sleep(0.1)
+
+    def _checkout(self) -> Connection:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def _checkin(self, conn: Connection) -> None:
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _call(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        for attempt in (1, 2):
+            conn = self._checkout()
+            try:
+                _send(conn, request)
+                reply = _recv(conn)
+            except (EOFError, OSError):
+                # Stale pooled connection (server restarted); retry once on a fresh one.
+                conn.close()
+                if attempt == 2:
+                    raise
+                continue
+            self._checkin(conn)
+            return reply
+        raise RuntimeError("unreachable")  # pragma: no cover
+
+    def generate(
+        self,
+        prompt: str,
+        max_new_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        stop: Optional[Iterable[str]] = None,
+    ) -> str:
+        kwargs: Dict[str, Any] = {}
+        if max_new_tokens is not None:
+            kwargs["max_new_tokens"] = int(max_new_tokens)
+        if temperature is not None:
+            kwargs["temperature"] = float(temperature)
+        if top_p is not None:
+            kwargs["top_p"] = float(top_p)
+        if stop is not None:
+            kwargs["stop"] = list(stop)
+        reply = self._call({"op": "generate", "prompt": prompt, "kwargs": kwargs})
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("error") or "model server error")
+        return reply.get("text") or ""
+
+    def info(self) -> Dict[str, Any]:
+        return self._call({"op": "info"})
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Shared local model inference server")
+    parser.add_argument("--address", default=None, help="Unix socket path (default: private runtime dir)")
+    parser.add_argument(
+        "--backend",
+        default=os.getenv("MODEL_SERVER_BACKEND", "exllama"),
+        choices=["exllama", "stub"],
+    )
+    args = parser.parse_args(list(argv) if argv is not None else None)
+    handle = _load_backend(args.backend)
+    ModelServer(handle, address=args.address, backend=args.backend).serve_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,550 @@
+"""Outbox dispatcher for ``mem_alerts``.
+
+``queue_alert``/``insert_alert`` only write a ``queued`` row; this module
+delivers them off the request thread.  A dispatcher claims a batch of due
+rows, sends them through one transport connection (a single SMTP session
+is reused for the whole batch, and kept open between batches while it is
+idle for less than ``OUTBOX_SMTP_IDLE`` seconds), then marks each row
+``sent``, ``retry`` (exponential backoff) or ``failed`` after
+``OUTBOX_MAX_ATTEMPTS``.
+
+Claiming pushes ``next_attempt_at`` forward by a lease, so rows held by a
+worker that died become due again instead of staying stuck in ``sending``.
+
+Transports: ``smtp`` (default), ``file`` (one ``.eml`` per message under
+``OUTBOX_FILE_DIR``) and ``memory`` (kept in-process, for tests).
+
+Settings (mem_settings or env):
+  OUTBOX_TRANSPORT=smtp|file|memory
+  OUTBOX_BATCH_SIZE=50   OUTBOX_MAX_ATTEMPTS=5
+  OUTBOX_BACKOFF_BASE=30 OUTBOX_BACKOFF_MAX=3600   (seconds)
+  OUTBOX_POLL_INTERVAL=5 OUTBOX_SMTP_IDLE=60       (seconds)
+  OUTBOX_FILE_DIR=./outbox
+  ALERTS_EMAILS          fallback recipients (comma-separated)
+  SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, SMTP_FROM, SMTP_SECURITY
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import smtplib
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Protocol
+
+log = logging.getLogger("core.outbox")
+
+DEFAULTS: Dict[str, Any] = {
+    "OUTBOX_TRANSPORT": "smtp",
+    "OUTBOX_BATCH_SIZE": 50,
+    "OUTBOX_MAX_ATTEMPTS": 5,
+    "OUTBOX_BACKOFF_BASE": 30,
+    "OUTBOX_BACKOFF_MAX": 3600,
+    "OUTBOX_POLL_INTERVAL": 5,
+    "OUTBOX_SMTP_IDLE": 60,
+    "OUTBOX_FILE_DIR": "outbox",
+}
+
+_MIGRATIONS = (
+    "ALTER TABLE mem_alerts ADD COLUMN IF NOT EXISTS attempts INT NOT NULL DEFAULT 0",
+    "ALTER TABLE mem_alerts ADD COLUMN IF NOT EXISTS next_attempt_at TIMESTAMP",
+    "ALTER TABLE mem_alerts ADD COLUMN IF NOT EXISTS sent_at TIMESTAMP",
+    "ALTER TABLE mem_alerts ADD COLUMN IF NOT EXISTS last_error TEXT",
+    "CREATE INDEX IF NOT EXISTS idx_mem_alerts_outbox ON mem_alerts (status, next_attempt_at)",
+)
+
+
+@dataclass
+class Alert:
+    id: int
+    namespace: str
+    event_type: str
+    recipient: Optional[str]
+    payload: Dict[str, Any]
+    created_at: Optional[datetime] = None
+    attempts: int = 0
+
+
+def _setting(settings: Any, key: str) -> Any:
+    value = None
+    if isinstance(settings, dict):
+        value = settings.get(key)
+    elif settings is not None:
+        getter = getattr(settings, "get", None)
+        if callable(getter):
+            try:
+                value = getter(key)
+            except Exception:
+                value = None
+    if value is None or value == "":
+        value = os.getenv(key)
+    return DEFAULTS.get(key) if value is None or value == "" else value
+
+
+def _int_setting(settings: Any, key: str) -> int:
+    try:
+        return int(_setting(settings, key))
+    except (TypeError, ValueError):
+        return int(DEFAULTS[key])
+
+
+def _split_emails(raw: Any) -> List[str]:
+    if not raw:
+        return []
+    if isinstance(raw, str):
+        raw = raw.replace(";", ",").split(",")
+    return [str(e).strip() for e in raw if str(e or "").strip()]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _age_seconds(then: datetime, now: datetime) -> float:
+    # Naive timestamps (TIMESTAMP WITHOUT TIME ZONE, SQLite) are taken as UTC.
+    if then.tzinfo is None:
+        then = then.replace(tzinfo=timezone.utc)
+    return (now - then).total_seconds()
+
+
+def build_message(alert: Alert, *, mail_from: str, default_recipients: Iterable[str] = ()) -> EmailMessage:
+    """Render an alert row as an email; raises ``ValueError`` without recipients."""
+
+    payload = alert.payload if isinstance(alert.payload, dict) else {}
+    to = _split_emails(alert.recipient) or _split_emails(payload.get("to")) or list(default_recipients)
+    if not to:
+        raise ValueError("no recipients")
+    msg = EmailMessage()
+    msg["From"] = mail_from
+    msg["To"] = ", ".join(to)
+    msg["Subject"] = str(payload.get("subject") or f"[{alert.namespace}] {alert.event_type}")
+    body = payload.get("body_text") or payload.get("body")
+    msg.set_content(str(body) if body else json.dumps(payload, indent=2, default=str))
+    msg["X-Alert-Id"] = str(alert.id)
+    return msg
+
+
+# ---------------------------------------------------------------------------
+# Transports
+# ---------------------------------------------------------------------------
+
+class Transport(Protocol):
+    def send(self, msg: EmailMessage) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class SMTPTransport:
+    """One SMTP session reused across messages; reconnects once if the server dropped it."""
+
+    def __init__(
+        self,
+        *,
+        host: str,
+        port: int,
+        user: Optional[str] = None,
+        password: Optional[str] = None,
+        security: Optional[str] = None,
+        idle_seconds: int = 60,
+    ) -> None:
+        self.host, self.port = host, port
+        self.user, self.password, self.security = user, password, security
+        self.idle_seconds = idle_seconds
+        self._client: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self.connects = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        import ssl
+
+        from core.mailer import _smtp_connect
+
+        try:
+            client = _smtp_connect(self.host, self.port, self.security)
+        except ssl.SSLError as exc:
+            if "WRONG_VERSION_NUMBER" not in str(exc):
+                raise
+            client = _smtp_connect(self.host, self.port, "starttls")
+        if self.user and self.password:
+            client.login(self.user, self.password)
+        self.connects += 1
+        return client
+
+    def _session(self) -> smtplib.SMTP:
+        if self._client is not None and time.monotonic() - self._last_used > self.idle_seconds:
+            self.close()
+        if self._client is None:
+            self._client = self._connect()
+        return self._client
+
+    def send(self, msg: EmailMessage) -> None:
+        try:
+            self._session().send_message(msg)
+        except (smtplib.SMTPServerDisconnected, ConnectionError, OSError) as exc:
+            if isinstance(exc, smtplib.SMTPResponseException):
+                raise
+            self._client = None
+            self._session().send_message(msg)
+        self._last_used = time.monotonic()
+
+    def close(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            try:
+                client.quit()
+            except Exception:
+                pass
+
+
+class FileTransport:
+    """Write each message to ``<directory>/<alert-id>-<ts>.eml`` (local stand-in for SMTP)."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = Path(directory)
+
+    def send(self, msg: EmailMessage) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = f"{msg.get('X-Alert-Id', 'msg')}-{time.time_ns()}.eml"
+        (self.directory / name).write_bytes(bytes(msg))
+
+    def close(self) -> None:
+        return None
+
+
+class MemoryTransport:
+    """Keep sent messages in ``self.sent`` (in-process stand-in for tests)."""
+
+    def __init__(self) -> None:
+        self.sent: List[EmailMessage] = []
+
+    def send(self, msg: EmailMessage) -> None:
+        self.sent.append(msg)
+
+    def close(self) -> None:
+        return None
+
+
+def transport_from_settings(settings: Any) -> Transport:
+    kind = str(_setting(settings, "OUTBOX_TRANSPORT")).strip().lower()
+    if kind == "file":
+        return FileTransport(str(_setting(settings, "OUTBOX_FILE_DIR")))
+    if kind == "memory":
+        return MemoryTransport()
+    return SMTPTransport(
+        host=str(_setting(settings, "SMTP_HOST") or "localhost"),
+        port=int(_setting(settings, "SMTP_PORT") or 465),
+        user=_setting(settings, "SMTP_USER"),
+        password=_setting(settings, "SMTP_PASSWORD"),
+        security=_setting(settings, "SMTP_SECURITY"),
+        idle_seconds=_int_setting(settings, "OUTBOX_SMTP_IDLE"),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Store
+# ---------------------------------------------------------------------------
+
+class SqlAlertStore:
+    """``mem_alerts`` access (Postgres: ``FOR UPDATE SKIP LOCKED`` lets workers share the table)."""
+
+    def __init__(self, engine: Any, *, lease_seconds: int = 300) -> None:
+        self.engine = engine
+        self.lease_seconds = lease_seconds
+
+    def ensure_schema(self) -> None:
+        from sqlalchemy import text
+
+        with self.engine.begin() as cx:
+            for stmt in _MIGRATIONS:
+                cx.execute(text(stmt))
+
+    def claim(self, limit: int) -> List[Alert]:
+        from sqlalchemy import text
+
+        sql = text(
+            """
+            UPDATE mem_alerts
+               SET status = 'sending',
+                   next_attempt_at = NOW() + make_interval(secs => :lease)
+             WHERE id IN (
+                   SELECT id FROM mem_alerts
+                    WHERE status IN ('queued', 'retry', 'sending')
+                      AND (next_attempt_at IS NULL OR next_attempt_at <= NOW())
+                    ORDER BY id
+                    LIMIT :limit
+                      FOR UPDATE SKIP LOCKED)
+            RETURNING id, namespace, event_type, recipient, payload, created_at, attempts
+            """
+        )
+        with self.engine.begin() as cx:
+            rows = cx.execute(sql, {"limit": int(limit), "lease": self.lease_seconds}).mappings().all()
+        alerts = []
+        for row in sorted(rows, key=lambda r: r["id"]):
+            payload = row["payload"]
+            if isinstance(payload, str):
+                try:
+                    payload = json.loads(payload)
+                except ValueError:
+                    payload = {"body_text": payload}
+            alerts.append(
+                Alert(
+                    id=int(row["id"]),
+                    namespace=row["namespace"] or "",
+                    event_type=row["event_type"] or "",
+                    recipient=row["recipient"],
+                    payload=payload or {},
+                    created_at=row["created_at"],
+                    attempts=int(row["attempts"] or 0),
+                )
+            )
+        return alerts
+
+    def mark_sent(self, alert_ids: List[int]) -> None:
+        from sqlalchemy import bindparam, text
+
+        if not alert_ids:
+            return
+        sql = text(
+            "UPDATE mem_alerts SET status = 'sent', sent_at = NOW(), attempts = attempts + 1, "
+            "last_error = NULL WHERE id IN :ids"
+        ).bindparams(bindparam("ids", expanding=True))
+        with self.engine.begin() as cx:
+            cx.execute(sql, {"ids": list(alert_ids)})
+
+    def mark_failed(self, alert_id: int, error: str, retry_in: Optional[float]) -> None:
+        from sqlalchemy import text
+
+        if retry_in is None:
+            sql = text(
+                "UPDATE mem_alerts SET status = 'failed', attempts = attempts + 1, last_error = :err "
+                "WHERE id = :id"
+            )
+            params: Dict[str, Any] = {"id": alert_id, "err": error[:2000]}
+        else:
+            sql = text(
+                "UPDATE mem_alerts SET status = 'retry', attempts = attempts + 1, last_error = :err, "
+                "next_attempt_at = NOW() + make_interval(secs => :delay) WHERE id = :id"
+            )
+            params = {"id": alert_id, "err": error[:2000], "delay": float(retry_in)}
+        with self.engine.begin() as cx:
+            cx.execute(sql, params)
+
+    def depth(self) -> Dict[str, Any]:
+        from sqlalchemy import text
+
+        sql = text(
+            """
+            SELECT COUNT(*) AS pending, MIN(created_at) AS oldest
+              FROM mem_alerts
+             WHERE status IN ('queued', 'retry', 'sending')
+            """
+        )
+        with self.engine.connect() as cx:
+            row = cx.execute(sql).mappings().first() or {}
+        oldest = row.get("oldest")
+        age = _age_seconds(oldest, _utcnow()) if isinstance(oldest, datetime) else None
+        return {"pending": int(row.get("pending") or 0), "oldest_age_s": age}
+
+
+# ---------------------------------------------------------------------------
+# Dispatcher
+# ---------------------------------------------------------------------------
+
+@dataclass
+class _Counters:
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+    batches: int = 0
+    latencies_ms: Deque[int] = field(default_factory=lambda: deque(maxlen=1000))
+
+
+class OutboxDispatcher:
+    def __init__(
+        self,
+        store: Any,
+        transport_factory: Callable[[], Transport],
+        *,
+        mail_from: str,
+        default_recipients: Iterable[str] = (),
+        batch_size: int = 50,
+        max_attempts: int = 5,
+        backoff_base: float = 30,
+        backoff_max: float = 3600,
+        poll_interval: float = 5,
+    ) -> None:
+        self.store = store
+        self.transport_factory = transport_factory
+        self.mail_from = mail_from
+        self.default_recipients = list(default_recipients)
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.poll_interval = poll_interval
+        self._transport: Optional[Transport] = None
+        self._counters = _Counters()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_settings(cls, engine: Any, settings: Any) -> "OutboxDispatcher":
+        return cls(
+            SqlAlertStore(engine),
+            lambda: transport_from_settings(settings),
+            mail_from=str(_setting(settings, "SMTP_FROM") or "no-reply@example.com"),
+            default_recipients=_split_emails(_setting(settings, "ALERTS_EMAILS")),
+            batch_size=_int_setting(settings, "OUTBOX_BATCH_SIZE"),
+            max_attempts=_int_setting(settings, "OUTBOX_MAX_ATTEMPTS"),
+            backoff_base=_int_setting(settings, "OUTBOX_BACKOFF_BASE"),
+            backoff_max=_int_setting(settings, "OUTBOX_BACKOFF_MAX"),
+            poll_interval=_int_setting(settings, "OUTBOX_POLL_INTERVAL"),
+        )
+
+    def backoff(self, attempts: int) -> float:
+        return float(min(self.backoff_max, self.backoff_base * (2 ** max(attempts - 1, 0))))
+
+    def _get_transport(self) -> Transport:
+        if self._transport is None:
+            self._transport = self.transport_factory()
+        return self._transport
+
+    def drain_once(self) -> Dict[str, int]:
+        """Deliver one batch of due alerts; returns per-outcome counts."""
+
+        alerts = self.store.claim(self.batch_size)
+        result = {"claimed": len(alerts), "sent": 0, "retried": 0, "failed": 0}
+        if not alerts:
+            return result
+        sent_ids: List[int] = []
+        latencies_ms: List[int] = []
+        for alert in alerts:
+            attempts = alert.attempts + 1
+            try:
+                msg = build_message(alert, mail_from=self.mail_from, default_recipients=self.default_recipients)
+            except ValueError as exc:
+                self.store.mark_failed(alert.id, str(exc), None)
+                result["failed"] += 1
+                continue
+            try:
+                self._get_transport().send(msg)
+            except Exception as exc:
+                # A broken session is not reused for the next message.
+                self._close_transport()
+                retry_in = self.backoff(attempts) if attempts < self.max_attempts else None
+                self.store.mark_failed(alert.id, f"{type(exc).__name__}: {exc}", retry_in)
+                result["retried" if retry_in is not None else "failed"] += 1
+                log.warning("outbox alert %s attempt %s failed: %s", alert.id, attempts, exc)
+                continue
+            sent_ids.append(alert.id)
+            if isinstance(alert.created_at, datetime):
+                latencies_ms.append(int(_age_seconds(alert.created_at, _utcnow()) * 1000))
+        self.store.mark_sent(sent_ids)
+        # Metrics only after the sends are recorded, so they can never cause a resend.
+        result["sent"] = len(sent_ids)
+        with self._lock:
+            self._counters.latencies_ms.extend(latencies_ms)
+            self._counters.sent += result["sent"]
+            self._counters.retried += result["retried"]
+            self._counters.failed += result["failed"]
+            self._counters.batches += 1
+        return result
+
+    def _close_transport(self) -> None:
+        transport, self._transport = self._transport, None
+        if transport is not None:
+            transport.close()
+
+    def run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                result = self.drain_once()
+            except Exception as exc:
+                log.warning("outbox drain failed: %s", exc)
+                result = {"claimed": 0}
+            # A full batch means more is probably waiting; otherwise sleep.
+            if result.get("claimed", 0) < self.batch_size:
+                self._stop.wait(self.poll_interval)
+        self._close_transport()
+
+    def start(self) -> threading.Thread:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name="mem-alerts-outbox", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = self._counters
+            latencies = sorted(counters.latencies_ms)
+            out: Dict[str, Any] = {
+                "sent": counters.sent,
+                "retried": counters.retried,
+                "failed": counters.failed,
+                "batches": counters.batches,
+                "running": bool(self._thread and self._thread.is_alive()),
+            }
+        if latencies:
+            out["delivery_latency_ms"] = {
+                "p50": latencies[int(round(0.5 * (len(latencies) - 1)))],
+                "p95": latencies[int(round(0.95 * (len(latencies) - 1)))],
+                "max": latencies[-1],
+            }
+        depth = getattr(self.store, "depth", None)
+        if callable(depth):
+            try:
+                out["depth"] = depth()
+            except Exception as exc:
+                out["depth"] = {"error": str(exc)}
+        return out
+
+
+_DISPATCHER: Optional[OutboxDispatcher] = None
+_DISPATCHER_LOCK = threading.Lock()
+
+
+def start_outbox_worker(engine: Any, settings: Any) -> OutboxDispatcher:
+    """Start the process-wide dispatcher thread (idempotent)."""
+
+    global _DISPATCHER
+    with _DISPATCHER_LOCK:
+        if _DISPATCHER is None:
+            dispatcher = OutboxDispatcher.from_settings(engine, settings)
+            try:
+                dispatcher.store.ensure_schema()
+            except Exception as exc:
+                log.warning("mem_alerts outbox migration skipped: %s", exc)
+            _DISPATCHER = dispatcher
+        _DISPATCHER.start()
+        return _DISPATCHER
+
+
+def outbox_stats() -> Optional[Dict[str, Any]]:
+    return _DISPATCHER.stats() if _DISPATCHER is not None else None
+
+
+__all__ = [
+    "Alert",
+    "FileTransport",
+    "MemoryTransport",
+    "OutboxDispatcher",
+    "SMTPTransport",
+    "SqlAlertStore",
+    "build_message",
+    "outbox_stats",
+    "start_outbox_worker",
+    "transport_from_settings",
+]
@@ -6,6 +6,7 @@ from typing import Any, Dict, List, Optional, Sequence
 from sqlalchemy import text
 
 from core.agents import PlannerAgent, ValidatorAgent
+from core.context_cache import get_context_snapshot
 from core.datasources import DatasourceRegistry
 from core.intent import IntentRouter
 from core.inquiries import (
@@ -13,7 +14,12 @@ from core.inquiries import (
     set_inquiry_status,
     update_inquiry_status_run,
 )
-from core.model_loader import load_llm_from_settings, model_info as loader_model_info
+from core.model_loader import (
+    is_loading,
+    load_llm_from_settings,
+    model_info as loader_model_info,
+    peek_model,
+)
 from core.research import load_researcher
 from core.settings import Settings
 from core.snippets import autosave_snippet
@@ -59,7 +65,13 @@ log = get_logger(__name__)
 class Pipeline:
     """LLM-assisted SQL pipeline used by the DocuWare app."""
 
-    def __init__(self, settings: Settings | None = None, namespace: str = "dw::common") -> None:
+    def __init__(
+        self,
+        settings: Settings | None = None,
+        namespace: str = "dw::common",
+        *,
+        lazy_llm: bool = False,
+    ) -> None:
         self.settings = settings or Settings(namespace=namespace)
         self.namespace = namespace or getattr(self.settings, "namespace", "dw::common")
 
@@ -89,12 +101,18 @@ class Pipeline:
         # Clarifier stays disabled per environment request
         self.clarifier_llm = None
 
-        # Load the SQL generation model (SQLCoder via ExLlama2 or configured backend)
-        self.llm, self.llm_info = load_llm_from_settings(self.settings)
-        if not self.llm:
-            log.warning(
-                "Base SQL LLM disabled or unavailable; relying on deterministic fallbacks."
-            )
+        # Load the SQL generation model (SQLCoder via ExLlama2 or configured backend).
+        # In fast-start mode the model is warmed up in the background and
+        # picked up by the ``llm`` property once it is ready.
+        self._lazy_llm = lazy_llm
+        self._llm = None
+        self.llm_info: Dict[str, Any] = {}
+        if not lazy_llm:
+            self.llm, self.llm_info = load_llm_from_settings(self.settings)
+            if not self.llm:
+                log.warning(
+                    "Base SQL LLM disabled or unavailable; relying on deterministic fallbacks."
+                )
 
         self.validator = (
             ValidatorAgent(self.app_engine, self.settings) if self.app_engine else None
@@ -109,6 +127,17 @@ class Pipeline:
             (self.settings.get("ACTIVE_APP", scope="namespace") or "dw").strip() or "dw"
         )
 
+    # ------------------------------------------------------------------
+    @property
+    def llm(self):
+        if self._llm is None and self._lazy_llm:
+            self._llm = peek_model("sql")
+        return self._llm
+
+    @llm.setter
+    def llm(self, value) -> None:
+        self._llm = value
+
     # ------------------------------------------------------------------
     def model_info(self) -> Dict[str, Any]:
         return loader_model_info()
@@ -623,6 +652,12 @@ class Pipeline:
 
     # ------------------------------------------------------------------
     def _build_context(self, namespace: str) -> Dict[str, Any]:
+        ttl = self.settings.get_int("CONTEXT_SNAPSHOT_TTL_SECONDS", default=0) or 0
+        snapshot = get_context_snapshot(namespace, self._load_context, max_age_s=ttl)
+        return snapshot.to_context()
+
+    # ------------------------------------------------------------------
+    def _load_context(self, namespace: str) -> Dict[str, Any]:
         context: Dict[str, Any] = {
             "tables": [],
             "columns": [],
@@ -697,6 +732,14 @@ class Pipeline:
 
     # ------------------------------------------------------------------
     def _plan_sql(self, question: str, context: Dict[str, Any], hints: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.llm and self._lazy_llm and is_loading("sql"):
+            return {
+                "status": "llm_warming_up",
+                "questions": [
+                    "The SQL generator is still loading. Please try again in a moment.",
+                ],
+                "rationale": "Base LLM warming up",
+            }
         if not self.llm:
             return {
                 "status": "llm_unavailable",
@@ -734,7 +777,7 @@ class Pipeline:
         cleaned = extract_sql_one_stmt(sql_text, dialect=dialect)
         if not cleaned:
             raise RuntimeError("empty_or_invalid_sql_after_sanitize")
-        result = run_sql(engine, cleaned)
+        result = run_sql(engine, cleaned, settings=self.settings)
         if not result.ok:
             raise RuntimeError(result.error or "SQL execution failed")
         return result
@@ -8,6 +8,8 @@ from typing import Any, Iterable, Mapping, Sequence
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
 
+from core.context_cache import bump_context_version
+
 
 @dataclass
 class UpsertResult:
@@ -89,6 +91,8 @@ def upsert_metrics(
             }
             conn.execute(insert_sql, payload)
             count += 1
+    if count:
+        bump_context_version(namespace)
     return UpsertResult(count=count)
 
 
@@ -155,6 +159,8 @@ def upsert_mappings(
             }
             conn.execute(insert_sql, payload)
             count += 1
+    if count:
+        bump_context_version(namespace)
     return UpsertResult(count=count)
 
 
@@ -0,0 +1,186 @@
+"""Single-flight coalescing for identical concurrent SQL executions.
+
+When several requests run the same statement with the same binds at the same
+time, only the first ("leader") hits the database; the others wait for its
+result and receive a copy.  Nothing is kept once the leader finishes, so this
+is independent of any result cache: a call that starts after the leader
+returned executes again.
+
+Waiters give up after ``timeout`` seconds and run the statement themselves,
+so a slow leader never blocks them for longer than that.
+
+Environment:
+  SQL_SINGLEFLIGHT=0              disable coalescing
+  SQL_SINGLEFLIGHT_TIMEOUT=30     seconds a waiter waits for the leader
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_TIMEOUT = 30.0
+
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"")
+
+
+def canonical_sql(sql: str) -> str:
+    """Collapse whitespace and drop a trailing ``;`` outside quoted literals."""
+
+    text = str(sql or "")
+    parts = []
+    pos = 0
+    for match in _LITERAL_RE.finditer(text):
+        parts.append(" ".join(text[pos:match.start()].split()))
+        parts.append(match.group(0))
+        pos = match.end()
+    parts.append(" ".join(text[pos:].split()))
+    joined = " ".join(p for p in parts if p)
+    return joined.rstrip().rstrip(";").rstrip()
+
+
+def _bind_value(value: Any) -> Any:
+    # Type-tag values so '2024-01-01' (str) and date(2024, 1, 1) do not collide.
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return [type(value).__name__, value]
+    if isinstance(value, (date, datetime, Decimal)):
+        return [type(value).__name__, str(value)]
+    if isinstance(value, (list, tuple)):
+        return ["seq", [_bind_value(v) for v in value]]
+    return [type(value).__name__, repr(value)]
+
+
+def canonical_key(sql: str, binds: Optional[Mapping[str, Any]] = None, scope: Any = None) -> str:
+    """Key for ``(scope, sql, binds)``; ``scope`` separates engines/datasources."""
+
+    payload = {
+        "scope": str(scope or ""),
+        "sql": canonical_sql(sql),
+        "binds": {str(k): _bind_value(v) for k, v in sorted((binds or {}).items())},
+    }
+    return json.dumps(payload, sort_keys=True, default=str)
+
+
+def engine_scope(engine: Any) -> str:
+    url = getattr(engine, "url", None)
+    if url is None:
+        return f"engine@{id(engine)}"
+    render = getattr(url, "render_as_string", None)
+    return render(hide_password=True) if callable(render) else str(url)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key."""
+
+    def __init__(self, name: str, *, timeout: Optional[float] = None) -> None:
+        self.name = name
+        self.timeout = timeout
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "executions": 0, "coalesced": 0, "timeouts": 0, "errors": 0}
+
+    def _timeout(self) -> float:
+        if self.timeout is not None:
+            return self.timeout
+        try:
+            return float(os.getenv("SQL_SINGLEFLIGHT_TIMEOUT", DEFAULT_TIMEOUT))
+        except ValueError:
+            return DEFAULT_TIMEOUT
+
+    def do(
+        self,
+        key: str,
+        fn: Callable[[], T],
+        *,
+        copy: Optional[Callable[[T], T]] = None,
+    ) -> Tuple[T, bool]:
+        """Return ``(result, shared)``; ``shared`` is True when another call's result was reused."""
+
+        if str(os.getenv("SQL_SINGLEFLIGHT", "1")).strip().lower() in {"0", "false", "no", "off"}:
+            with self._lock:
+                self._stats["calls"] += 1
+                self._stats["executions"] += 1
+            return fn(), False
+
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats["executions"] += 1
+
+        if not leader:
+            if call.done.wait(self._timeout()):
+                with self._lock:
+                    self._stats["coalesced"] += 1
+                if call.error is not None:
+                    raise call.error
+                return (copy(call.result) if copy else call.result), True
+            with self._lock:
+                self._stats["timeouts"] += 1
+                self._stats["executions"] += 1
+            return fn(), False
+
+        try:
+            call.result = fn()
+            # The stored result stays pristine for waiters; callers may mutate theirs.
+            return (copy(call.result) if copy else call.result), False
+        except BaseException as exc:
+            call.error = exc
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._stats)
+            out["in_flight"] = len(self._calls)
+        return out
+
+
+_REGISTRY: Dict[str, SingleFlight] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_flight(name: str) -> SingleFlight:
+    """Process-wide coalescer registered under ``name``."""
+
+    flight = _REGISTRY.get(name)
+    if flight is None:
+        with _REGISTRY_LOCK:
+            flight = _REGISTRY.setdefault(name, SingleFlight(name))
+    return flight
+
+
+def singleflight_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: flight.stats() for name, flight in sorted(_REGISTRY.items())}
+
+
+__all__ = [
+    "SingleFlight",
+    "canonical_key",
+    "canonical_sql",
+    "engine_scope",
+    "get_flight",
+    "singleflight_stats",
+]
@@ -11,6 +11,8 @@ from typing import Any, Dict, List, Optional, Tuple
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine import Engine
 
+from core import cost_guard
+from core.singleflight import canonical_key, engine_scope, get_flight
 from core.sql_utils import extract_sql_one_stmt, sanitize_oracle_sql, validate_oracle_sql
 
 SAFE_SQL_RE = re.compile(r"(?is)^\s*(with|select)\b")
@@ -120,19 +122,35 @@ def explain(engine: Engine, sql: str) -> None:
     with engine.connect() as c:
         c.execute(text(f"EXPLAIN {cleaned}"))
 
-def run_select(engine: Engine, sql: str, limit: Optional[int] = None) -> Dict[str, Any]:
+def run_select(
+    engine: Engine, sql: str, limit: Optional[int] = None, *, timeout_ms: int = 0
+) -> Dict[str, Any]:
     s = sql.strip().rstrip(";")
     if limit and " limit " not in s.lower():
         s = f"{s} LIMIT {int(limit)}"
     with engine.connect() as c:
-        rs = c.execute(text(s))
-        cols = list(rs.keys())
-        rows = [dict(zip(cols, list(r))) for r in rs]
+        with cost_guard.call_timeout(c, timeout_ms):
+            rs = c.execute(text(s))
+            cols = list(rs.keys())
+            rows = [dict(zip(cols, list(r))) for r in rs]
     return {"columns": cols, "rows": rows, "rowcount": len(rows)}
 
 
-def run_sql(engine: Engine, sql: str, limit: Optional[int] = None) -> SQLExecutionResult:
-    """Execute a read-only SQL statement and normalise the response."""
+def _copy_select_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "columns": list(result.get("columns") or []),
+        "rows": [dict(r) for r in result.get("rows") or []],
+        "rowcount": result.get("rowcount"),
+    }
+
+
+def run_sql(
+    engine: Engine, sql: str, limit: Optional[int] = None, *, settings: Any = None
+) -> SQLExecutionResult:
+    """Execute a read-only SQL statement and normalise the response.
+
+    ``settings`` supplies the ``DW_COST_GUARD_*`` policy (env vars otherwise).
+    """
 
     dialect = getattr(getattr(engine, "dialect", None), "name", "generic")
     cleaned = extract_sql_one_stmt(sql, dialect=dialect)
@@ -177,8 +195,26 @@ def run_sql(engine: Engine, sql: str, limit: Optional[int] = None) -> SQLExecuti
             error=message,
         )
 
+    policy = cost_guard.load_policy(settings)
+    if policy.enabled and dialect.lower().startswith("oracle"):
+        decision = cost_guard.check(cleaned, engine.connect, policy, scope=engine_scope(engine))
+        if decision.action == "reject":
+            return SQLExecutionResult(
+                ok=False,
+                columns=[],
+                rows=[],
+                rowcount=0,
+                error=f"cost_guard_rejected: {decision.reason}",
+            )
+        cleaned = decision.sql
+
     try:
-        result = run_select(engine, cleaned, limit)
+        key = canonical_key(cleaned, {"limit": limit}, scope=engine_scope(engine))
+        result, _shared = get_flight("core.run_sql").do(
+            key,
+            lambda: run_select(engine, cleaned, limit, timeout_ms=policy.timeout_ms),
+            copy=_copy_select_result,
+        )
     except Exception as exc:  # pragma: no cover - passthrough to caller
         return SQLExecutionResult(
             ok=False,
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import copy
 import itertools
 import json
 import os
@@ -11,6 +10,8 @@ from typing import Any, Dict, List, Optional, Tuple
 
 from flask import Blueprint, jsonify, render_template, request
 
+from core.frozen import FrozenDict, freeze
+
 from . import settings as dw_settings
 from .examples import retrieve_examples_for_question, save_example_if_positive
 from .explain import build_explain, build_user_explain
@@ -27,7 +28,7 @@ dw_bp = Blueprint("dw", __name__)
 
 _INQUIRY_COUNTER = itertools.count(1)
 _SNAPSHOT_LOCK = threading.Lock()
-_SNAPSHOTS: Dict[int, Dict[str, Any]] = {}
+_SNAPSHOTS: Dict[int, FrozenDict] = {}
 _DEFAULT_NAMESPACE = "dw::common"
 _RULES_ENGINE: Optional[RulesEngine] = None
 
@@ -353,14 +354,16 @@ def _next_inquiry_id() -> int:
 
 
 def save_answer_snapshot(inquiry_id: int, record: Dict[str, Any]) -> None:
+    frozen = freeze(record)
     with _SNAPSHOT_LOCK:
-        _SNAPSHOTS[inquiry_id] = copy.deepcopy(record)
+        _SNAPSHOTS[inquiry_id] = frozen
+
 
+def load_answer_snapshot(inquiry_id: int) -> Optional[FrozenDict]:
+    """Return the stored snapshot; it is read-only and shared, not a copy."""
 
-def load_answer_snapshot(inquiry_id: int) -> Optional[Dict[str, Any]]:
     with _SNAPSHOT_LOCK:
-        rec = _SNAPSHOTS.get(inquiry_id)
-        return copy.deepcopy(rec) if rec is not None else None
+        return _SNAPSHOTS.get(inquiry_id)
 
 
 def _rate_comment_hints(comment: str) -> Dict[str, Any]:
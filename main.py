@@ -5,19 +5,17 @@ import time
 from flask import Flask, jsonify, g, request
 from sqlalchemy import create_engine
 
-from apps.common.admin import admin_bp as admin_common_bp
-from apps.dw.app import create_dw_blueprint
-from apps.dw.admin_api import bp as dw_admin_bp
-from apps.dw.routes import debug_bp
-from apps.dw.tests.routes import golden_bp
-from core.admin_api import admin_bp as core_admin_bp
 from core.logging_utils import get_logger, log_event, setup_logging
 from core.memdb import ensure_dw_feedback_schema, get_mem_engine
-from core.model_loader import ensure_model, model_info
+from core.model_loader import ensure_model, model_info, model_status, warm_up_async
 from core.pipeline import Pipeline
 from core.settings import Settings
 
 
+def _env_flag(name: str, default: str = "0") -> bool:
+    return str(os.getenv(name, default)).strip().lower() in {"1", "true", "yes", "y", "on"}
+
+
 def make_engine(url: str, echo_env: str):
     """Create a SQLAlchemy engine honouring environment echo toggles."""
 
@@ -86,20 +84,36 @@ def create_app():
 
     log_event(log, "boot", "app_boot", {"message": "registering blueprints"})
 
-    # Warm up SQL model unless explicitly disabled
-    import os as _os
-    _disable_sql = str(_os.getenv("DISABLE_SQL_MODEL", "0")).strip().lower() in {"1", "true", "yes"}
-    if not _disable_sql:
-        ensure_model(role="sql")
-
-    # NEW: warm up clarifier if it isn't explicitly disabled
-    # The loader will read CLARIFIER_* from the environment.
-    try:
-        ensure_model(role="clarifier")  # safe no-op if unavailable / disabled
-    except Exception as e:  # pragma: no cover - best effort log
-        log.warning("[clarifier] load failed: %s", e)
+    # Blueprint modules pull in the DW parsers/builders; import them here so
+    # that importing ``main`` alone stays cheap.
+    from apps.common.admin import admin_bp as admin_common_bp
+    from apps.dw.app import create_dw_blueprint
+    from apps.dw.admin_api import bp as dw_admin_bp
+    from apps.dw.routes import debug_bp
+    from apps.dw.tests.routes import golden_bp
+    from core.admin_api import admin_bp as core_admin_bp
+
+    _disable_sql = _env_flag("DISABLE_SQL_MODEL")
+    # APP_FAST_START=1: load model weights on a background thread so that
+    # deterministic routes (/dw/answer, /dw/rate) serve immediately.
+    fast_start = _env_flag("APP_FAST_START")
+    if fast_start:
+        roles = ["clarifier"] if _disable_sql else ["sql", "clarifier"]
+        warm_up_async(roles)
+        log_event(log, "boot", "model_warmup_async", {"roles": roles})
+    else:
+        # Warm up SQL model unless explicitly disabled
+        if not _disable_sql:
+            ensure_model(role="sql")
+
+        # NEW: warm up clarifier if it isn't explicitly disabled
+        # The loader will read CLARIFIER_* from the environment.
+        try:
+            ensure_model(role="clarifier")  # safe no-op if unavailable / disabled
+        except Exception as e:  # pragma: no cover - best effort log
+            log.warning("[clarifier] load failed: %s", e)
 
-    pipeline = Pipeline(settings=settings, namespace="dw::common")
+    pipeline = Pipeline(settings=settings, namespace="dw::common", lazy_llm=fast_start)
 
     app.config["SETTINGS"] = settings
     app.config["PIPELINE"] = pipeline
@@ -132,9 +146,27 @@ def create_app():
     except Exception as exc:  # pragma: no cover - defensive logging
         app.logger.exception("memdb.bootstrap.fail: %s", exc)
 
+    # ALERTS_OUTBOX=1: deliver mem_alerts from a background dispatcher
+    # instead of sending mail on the request thread (core/outbox.py).
+    if _env_flag("ALERTS_OUTBOX"):
+        try:
+            from core.outbox import start_outbox_worker
+
+            start_outbox_worker(get_mem_engine(app), settings)
+            log_event(log, "boot", "alerts_outbox_started", {})
+        except Exception as exc:  # pragma: no cover - defensive logging
+            app.logger.warning("alerts.outbox.start_failed: %s", exc)
+
     @app.get("/health")
     def health():
-        return {"ok": True}
+        status = model_status()
+        sql_state = (status.get("sql") or {}).get("state")
+        return {
+            "ok": True,
+            "fast_start": fast_start,
+            "models_ready": sql_state not in {"pending", "loading"},
+            "models": status,
+        }
 
     @app.get("/model/info")
     def model_info_endpoint():
@@ -417,4 +449,15 @@ def _install_dw_answer_trace_wrappers(app: Flask) -> None:
         pass
 
 
-app = create_app()
+_APP: Flask | None = None
+
+
+def __getattr__(name: str):
+    """Create ``main.app`` on first access (``flask run``, gunicorn ``main:app``)."""
+
+    global _APP
+    if name == "app":
+        if _APP is None:
+            _APP = create_app()
+        return _APP
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Answer payload serialisation on 10k/100k-row results: stdlib json with a
+default hook (what jsonify does), core.fast_json row lists, core.fast_json
+columnar, and the gzip cost of each body (DW_RESPONSE_GZIP_LEVEL).
+Usage:
+  python scripts/bench_json_payload.py --rows 10000 100000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from core import fast_json  # noqa: E402
+
+COLUMNS = [
+    "CONTRACT_ID", "CONTRACT_SUBJECT", "ENTITY", "OWNER_DEPARTMENT", "CONTRACT_STATUS",
+    "REQUEST_DATE", "START_DATE", "END_DATE", "CONTRACT_VALUE_NET_OF_VAT", "VAT",
+]
+
+
+def _rows(n: int):
+    rnd = random.Random(11)
+    base = date(2020, 1, 1)
+    out = []
+    for i in range(n):
+        start = base + timedelta(days=rnd.randint(0, 1500))
+        out.append([
+            f"C-{i:07d}",
+            "annual maintenance and support services",
+            rnd.choice(["HQ", "North", "South", "East"]),
+            rnd.choice(["IT", "Finance", "Legal", "Procurement"]),
+            rnd.choice(["Active", "Expired", "Draft"]),
+            datetime.combine(start, datetime.min.time()),
+            start,
+            start + timedelta(days=365),
+            Decimal(f"{rnd.uniform(1_000, 5_000_000):.2f}"),
+            Decimal(f"{rnd.uniform(0, 250_000):.2f}"),
+        ])
+    return out
+
+
+def _time(fn, repeat):
+    best = float("inf")
+    out = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return out, best * 1000
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"encoder backend: {fast_json.backend()}")
+    for n in args.rows:
+        rows = _rows(n)
+        cases = {
+            "json+default": lambda: json.dumps({"columns": COLUMNS, "rows": rows}, default=str).encode("utf-8"),
+            "fast rows": lambda: fast_json.dumps({"columns": COLUMNS, "rows": rows}),
+            "fast columnar": lambda: fast_json.dumps(fast_json.columnar(COLUMNS, rows)),
+        }
+        print(f"\n{n} rows")
+        for name, fn in cases.items():
+            body, ms = _time(fn, args.repeat)
+            gz, gz_ms = _time(lambda: fast_json.compress(body, "gzip"), 1)
+            print(
+                f"  {name:<14} {ms:8.1f} ms {len(body) / 1024:10.1f} KiB"
+                f"   gzip {gz_ms:7.1f} ms {len(gz) / 1024:9.1f} KiB"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parse throughput of the DW question grammar (apps/dw/intent_parser/lark_parser.py)
+over the golden questions: Earley (dynamic lexer) versus LALR (contextual lexer),
+plus LALR start-up with and without the serialised parser-table cache.
+Usage:
+  python scripts/bench_lark_parser.py --repeat 50
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import yaml  # noqa: E402
+from lark import Lark  # noqa: E402
+
+from apps.dw.intent_parser import lark_parser  # noqa: E402
+
+GOLDEN_FILES = [
+    "apps/dw/tests/golden.yaml",
+    "apps/dw/tests/golden_dw_contracts.yaml",
+    "tests/golden_dw.yml",
+    "tests/dw_golden.json",
+    *sorted(str(p.relative_to(ROOT)) for p in (ROOT / "tests" / "golden").glob("*.yaml")),
+]
+
+
+class _Loader(yaml.SafeLoader):
+    """Golden YAML with custom tags (``!today`` ...) read as plain scalars."""
+
+
+_Loader.add_multi_constructor("!", lambda loader, suffix, node: None)
+
+
+def _collect(node, out):
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key in ("question", "q") and isinstance(value, str):
+                out.append(value)
+            else:
+                _collect(value, out)
+    elif isinstance(node, list):
+        for item in node:
+            _collect(item, out)
+
+
+def golden_questions() -> list[str]:
+    questions: list[str] = []
+    for rel in GOLDEN_FILES:
+        path = ROOT / rel
+        if not path.exists():
+            continue
+        with path.open("r", encoding="utf-8") as handle:
+            data = json.load(handle) if path.suffix == ".json" else yaml.load(handle, Loader=_Loader)
+        _collect(data, questions)
+    return list(dict.fromkeys(questions))
+
+
+def _prepare(question: str) -> str:
+    # Same trimming as DwQuestionParser.parse.
+    match = re.search(r"(?i)\bwhere\b(.+)", question)
+    text = match.group(1) if match else question
+    text = re.sub(r"[.?!]+$", "", text.strip())
+    return re.sub(r"(?i)^and\s+", "", text)
+
+
+def _build(kind: str, cache) -> tuple[Lark, float]:
+    options = dict(lark_parser._LARK_OPTIONS)
+    if kind == "earley":
+        options.update(parser="earley", lexer="dynamic")
+    t0 = time.perf_counter()
+    parser = Lark(lark_parser.GRAMMAR, cache=cache, **options)
+    return parser, (time.perf_counter() - t0) * 1000
+
+
+def _run(parser: Lark, texts: list[str], repeat: int) -> tuple[int, float]:
+    ok = 0
+    for text in texts:
+        try:
+            parser.parse(text, start="start")
+            ok += 1
+        except Exception:
+            pass
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            try:
+                parser.parse(text, start="start")
+            except Exception:
+                pass
+    elapsed = time.perf_counter() - t0
+    return ok, elapsed * 1e6 / (repeat * len(texts))
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    texts = [_prepare(q) for q in golden_questions()]
+    print(f"{len(texts)} golden questions, grammar {lark_parser.grammar_hash()}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = str(Path(tmp) / "bench.lark")
+        lalr, cold_ms = _build("lalr", False)
+        _build("lalr", cache_file)
+        _, warm_ms = _build("lalr", cache_file)
+    earley, earley_ms = _build("earley", False)
+    print(f"startup  earley {earley_ms:8.1f} ms   lalr {cold_ms:8.1f} ms   lalr (cached tables) {warm_ms:8.1f} ms")
+
+    for name, parser in (("earley", earley), ("lalr", lalr)):
+        ok, us = _run(parser, texts, args.repeat)
+        print(f"{name:<7} parsed {ok:>3}/{len(texts)}   {us:9.1f} us/question   {1e6 / us:9.0f} questions/s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bytes and serialisation time of a row-level Contract answer with SELECT *
+versus the DW_DISPLAY_COLUMNS projection (apps/dw/projection.py), on
+synthetic rows shaped like the Contract table.
+Usage:
+  python scripts/bench_projection.py --rows 5000 --display CONTRACT_ID,CONTRACT_SUBJECT,ENTITY,REQUEST_DATE
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from apps.dw.projection import known_columns  # noqa: E402
+
+WIDE_EXTRA = [f"DEPARTMENT_{i}" for i in range(1, 9)] + [f"CONTRACT_STAKEHOLDER_{i}" for i in range(3, 9)]
+
+
+def _value(column: str, rnd: random.Random):
+    if column.endswith("_DATE"):
+        return (date(2020, 1, 1) + timedelta(days=rnd.randint(0, 2000))).isoformat()
+    if column in {"CONTRACT_VALUE_NET_OF_VAT", "VAT"}:
+        return round(rnd.uniform(1_000, 5_000_000), 2)
+    if column in {"CONTRACT_SUBJECT", "CONTRACT_PURPOSE"}:
+        return " ".join(rnd.choice(["supply", "maintenance", "services", "network", "annual", "support"]) for _ in range(12))
+    return f"{column.lower()}-{rnd.randint(1, 500)}"
+
+
+def _measure(columns, rows, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        encoded = json.dumps({"columns": columns, "rows": rows}, default=str)
+    json_ms = (time.perf_counter() - t0) * 1000 / repeat
+    buf = io.StringIO()
+    t0 = time.perf_counter()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    writer.writerows(rows)
+    csv_ms = (time.perf_counter() - t0) * 1000
+    return len(encoded.encode("utf-8")), json_ms, len(buf.getvalue().encode("utf-8")), csv_ms
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=5000)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--display", default="CONTRACT_ID,CONTRACT_SUBJECT,ENTITY,REQUEST_DATE,CONTRACT_VALUE_NET_OF_VAT")
+    args = ap.parse_args()
+
+    rnd = random.Random(7)
+    wide = known_columns({}) + WIDE_EXTRA
+    rows = [[_value(c, rnd) for c in wide] for _ in range(args.rows)]
+    display = [c.strip().upper() for c in args.display.split(",") if c.strip()]
+    idx = [wide.index(c) for c in display]
+    narrow = [[row[i] for i in idx] for row in rows]
+
+    print(f"{args.rows} rows, SELECT * = {len(wide)} columns, projection = {len(display)} columns")
+    for name, cols, data in (("select *", wide, rows), ("projected", display, narrow)):
+        json_bytes, json_ms, csv_bytes, csv_ms = _measure(cols, data, args.repeat)
+        print(
+            f"{name:<10} json {json_bytes / 1024:10.1f} KiB {json_ms:8.1f} ms   "
+            f"csv {csv_bytes / 1024:10.1f} KiB {csv_ms:8.1f} ms"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Per-question parse time through the DW intent parsers, with and without the
+shared lexer (apps/dw/nlp/lexer.py) gating the alias and comparison scans.
+
+Each question runs the full chain a /dw/answer request applies: alias EQ
+augmentation, comparison filters, the Lark parser, contracts.parse_intent,
+the date-window detector and FTS term extraction.  The "ungated" arm replays
+the previous behaviour by reporting every alias/column as present and a
+comparator in every question.
+Usage:
+  python scripts/bench_question_lexer.py --aliases 40 --repeat 200
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import time
+from contextlib import ExitStack
+from datetime import date
+from pathlib import Path
+from unittest import mock
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import apps.dw.app as dw_app  # noqa: E402
+from apps.dw.contracts.fts import extract_fts_terms  # noqa: E402
+from apps.dw.intent_parser import DwQuestionParser  # noqa: E402
+from apps.dw.nlp import lexer  # noqa: E402
+from apps.dw.rate.date_windows import detect_date_window  # noqa: E402
+from apps.dw.tables import contracts  # noqa: E402
+
+QUESTIONS = [
+    "list contracts where DEPARTMENTS = SUPPORT or IT and request type = renewal",
+    "top 10 stakeholders by gross value last 3 months",
+    "contracts expiring in next 30 days for EMAIL = a.b@example.com",
+    "count of contracts by owner department ytd where contract value >= 1,000,000",
+    "show contracts has home care or nursing and ENTITY = DSFH",
+    "VAT between 10 and 20",
+]
+COLUMNS = ["CONTRACT_VALUE_NET_OF_VAT", "VAT", "ENTITY", "OWNER_DEPARTMENT", "REQUEST_TYPE", "CONTRACT_STATUS"]
+TODAY = date(2024, 5, 20)
+_PARSER = DwQuestionParser()
+
+
+def _parse(question: str, alias_keys: list[str]) -> tuple:
+    light: dict = {}
+    dw_app._augment_light_intent_with_aliases(
+        question, light, alias_keys, COLUMNS, list(dw_app._COMPARISON_TRAILING_MARKERS)
+    )
+    comparisons = dw_app._extract_comparison_filters(question, COLUMNS)
+    try:
+        parsed = _PARSER.parse(question)
+    except Exception:
+        parsed = None
+    intent = contracts.parse_intent(question, today=TODAY)
+    window = detect_date_window(question, today=TODAY)
+    fts = extract_fts_terms(question)
+    return (
+        repr(light.get("eq_filters")),
+        repr(comparisons),
+        repr(parsed),
+        repr((intent.window_kind, intent.window_start, intent.window_end)),
+        repr(window),
+        repr(fts),
+    )
+
+
+def _ungated() -> ExitStack:
+    stack = ExitStack()
+    every_comparator = lexer.TokenStream([lexer.Token(lexer.COMPARATOR, "", 0, 0)])
+    stack.enter_context(
+        mock.patch.object(dw_app, "phrases_present", lambda q, keys: {str(k).upper() for k in keys})
+    )
+    stack.enter_context(mock.patch.object(dw_app, "lex", lambda q, *a, **k: every_comparator))
+    return stack
+
+
+def _time(alias_keys, repeat):
+    # Start every arm with cold regex and lexer caches so neither inherits work.
+    re.purge()
+    lexer._lex_cached.cache_clear()
+    samples = []
+    for _ in range(repeat):
+        for q in QUESTIONS:
+            t0 = time.perf_counter()
+            _parse(q, alias_keys)
+            samples.append(time.perf_counter() - t0)
+    samples.sort()
+    mean = sum(samples) * 1e6 / len(samples)
+    return mean, samples[len(samples) // 2] * 1e6, samples[int(len(samples) * 0.95)] * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark full intent parsing per question")
+    parser.add_argument("--aliases", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    alias_keys = ["DEPARTMENTS", "DEPARTMENT", "EMAIL", "REQUEST TYPE", "ENTITY", "STAKEHOLDER"]
+    alias_keys += [f"ALIAS_{i}" for i in range(max(0, args.aliases - len(alias_keys)))]
+
+    with _ungated():
+        before = _time(alias_keys, args.repeat)
+        expected = [_parse(q, alias_keys) for q in QUESTIONS]
+    after = _time(alias_keys, args.repeat)
+    assert expected == [_parse(q, alias_keys) for q in QUESTIONS], "arms disagree"
+    lexicon = lexer.build_lexicon({k: [] for k in alias_keys})
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        for q in QUESTIONS:
+            lexer._lex_cached.__wrapped__(q, lexicon)
+    lex_only = (time.perf_counter() - t0) * 1e6 / (args.repeat * len(QUESTIONS))
+
+    print(f"aliases={len(alias_keys)} questions={len(QUESTIONS)} repeat={args.repeat}")
+    print("  arm                  mean us   p50 us   p95 us  (per question, full parse)")
+    print("  ungated (previous) {:9.1f} {:8.1f} {:8.1f}".format(*before))
+    print("  lexer-gated        {:9.1f} {:8.1f} {:8.1f}".format(*after))
+    print(f"  token stream alone {lex_only:9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
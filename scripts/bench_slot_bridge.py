@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compare stakeholder lookups over the eight Contract slot columns with the
+unpivoted CONTRACT_SLOT_BRIDGE, on a synthetic in-memory SQLite dataset.
+Usage:
+  python scripts/bench_slot_bridge.py --rows 50000 --repeat 20
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from apps.dw.contracts.slot_bridge import (  # noqa: E402
+    SLOT_COUNT,
+    bridge_ddl,
+    exists_predicate,
+    refresh_statements,
+    slot_cte_sql,
+)
+
+
+def _build(rows: int, distinct: int, seed: int) -> sqlite3.Connection:
+    rng = random.Random(seed)
+    cols = ", ".join(
+        f"CONTRACT_STAKEHOLDER_{i} TEXT, DEPARTMENT_{i} TEXT" for i in range(1, SLOT_COUNT + 1)
+    )
+    cx = sqlite3.connect(":memory:")
+    cx.execute(f'CREATE TABLE "Contract" (CONTRACT_ID TEXT, CONTRACT_VALUE_NET_OF_VAT REAL, {cols})')
+    names = [f"Stakeholder {n}" for n in range(distinct)]
+    placeholders = ", ".join("?" for _ in range(2 + 2 * SLOT_COUNT))
+    batch = []
+    for idx in range(rows):
+        filled = rng.randint(1, SLOT_COUNT)
+        values = [f"C{idx}", rng.random() * 1e6]
+        for slot in range(1, SLOT_COUNT + 1):
+            values.append(rng.choice(names) if slot <= filled else None)
+            values.append(None)
+        batch.append(values)
+    cx.executemany(f'INSERT INTO "Contract" VALUES ({placeholders})', batch)
+    # SQLite accepts the Oracle DDL modulo the NVARCHAR2/NUMBER type names.
+    for stmt in bridge_ddl():
+        cx.execute(stmt.replace("NVARCHAR2", "VARCHAR").replace("VARCHAR2", "VARCHAR"))
+    for stmt in refresh_statements()[1:]:
+        cx.execute(stmt)
+    cx.execute('CREATE INDEX CONTRACT_ID_IX ON "Contract" (CONTRACT_ID)')
+    return cx
+
+
+def _time(cx: sqlite3.Connection, sql: str, binds: dict, repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    count = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        count = len(cx.execute(sql, binds).fetchall())
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000, count
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--distinct", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    cx = _build(args.rows, args.distinct, args.seed)
+    binds = {"v0": "Stakeholder 42"}
+    slot_or = " OR ".join(
+        f"UPPER(TRIM(CONTRACT_STAKEHOLDER_{i})) = UPPER(TRIM(:v0))" for i in range(1, SLOT_COUNT + 1)
+    )
+    template = "{col} AS STAKEHOLDER, CONTRACT_VALUE_NET_OF_VAT AS NET\n"
+    group = "SELECT STAKEHOLDER, SUM(NET) FROM ({src}) GROUP BY STAKEHOLDER"
+    cases = [
+        ("filter: 8-way OR", f'SELECT CONTRACT_ID FROM "Contract" WHERE ({slot_or})'),
+        (
+            "filter: bridge EXISTS",
+            'SELECT CONTRACT_ID FROM "Contract" WHERE '
+            + exists_predicate("CONTRACT_SLOT_BRIDGE", "STAKEHOLDER", ["v0"]),
+        ),
+        ("group: 8-way UNION ALL", group.format(src=slot_cte_sql(None, "STAKEHOLDER", template, "1=1"))),
+        (
+            "group: bridge join",
+            group.format(src=slot_cte_sql("CONTRACT_SLOT_BRIDGE", "STAKEHOLDER", template, "1=1")),
+        ),
+    ]
+    print(f"rows={args.rows} distinct={args.distinct} repeat={args.repeat} (best of)")
+    for label, sql in cases:
+        ms, count = _time(cx, sql, binds, args.repeat)
+        print(f"  {label:<26} {ms:9.2f} ms  rows={count}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
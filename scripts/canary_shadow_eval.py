@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shadow-replay canary dw_rules against recent dw_runs questions and record a
+pass/regressed verdict per rule (apps/dw/canary.py). Run from cron or by hand
+before approving a canary rule.
+Usage:
+  python scripts/canary_shadow_eval.py [--namespace dw::common] [--rule 12 --rule 14]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from apps.dw.canary import evaluate_canaries  # noqa: E402
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--namespace", default=None)
+    ap.add_argument("--rule", type=int, action="append", dest="rules")
+    args = ap.parse_args()
+
+    results = evaluate_canaries(namespace=args.namespace, rule_ids=args.rules)
+    print(json.dumps(results, indent=2, default=str))
+    return 1 if any(r.get("verdict") == "regressed" for r in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
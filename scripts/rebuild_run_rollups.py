@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Recompute dw_run_rollups (per-minute run counts by latency bucket) from
+dw_runs. Run once after deploying the rollup table so /admin/dw/metrics
+covers runs recorded before it existed.
+Usage:
+  MEMORY_DB_URL=postgresql+psycopg2://... python scripts/rebuild_run_rollups.py --hours 168
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from apps.dw.learning_store import init_db, list_metrics_summary, rebuild_run_rollups  # noqa: E402
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--hours", type=int, default=24)
+    args = ap.parse_args()
+
+    init_db()
+    folded = rebuild_run_rollups(args.hours)
+    print(f"folded {folded} runs from the last {args.hours}h into dw_run_rollups")
+    print(list_metrics_summary(min(args.hours, 24)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
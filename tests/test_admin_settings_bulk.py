@@ -0,0 +1,86 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+pytest.importorskip("flask")
+pytest.importorskip("sqlalchemy")
+
+import core.admin_api as admin_api  # noqa: E402
+from core.admin_api import _normalise_items  # noqa: E402
+
+
+def test_normalise_items_last_write_wins_and_infers_types():
+    rows = _normalise_items(
+        [
+            {"key": "A", "value": 1},
+            {"key": "B", "value": {"x": 1}, "scope": "global"},
+            {"key": "A", "value": True},
+            {"key": "A", "value": "s", "scope": "user", "scope_id": 7},
+        ]
+    )
+    by_ident = {(r["key"], r["scope"], r["scope_id"]): r for r in rows}
+    assert len(rows) == 3
+    assert by_ident[("A", "namespace", None)]["value_json"] == "true"
+    assert by_ident[("A", "namespace", None)]["value_type"] == "bool"
+    assert by_ident[("B", "global", None)]["value_type"] == "json"
+    assert by_ident[("A", "user", "7")]["value_json"] == '"s"'
+
+
+class _Conn:
+    class dialect:
+        name = "postgresql"
+
+    def __init__(self, result):
+        self.calls = []
+        self._result = result
+
+    def execute(self, stmt, params=None):
+        self.calls.append((stmt, params))
+        return self._result if stmt is admin_api._BULK_UPSERT_SQL else []
+
+
+class _Engine:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def begin(self):
+        engine = self
+
+        class _Tx:
+            def __enter__(self):
+                return engine.conn
+
+            def __exit__(self, *exc):
+                return False
+
+        return _Tx()
+
+
+def test_settings_bulk_route_runs_one_upsert_statement(monkeypatch):
+    from flask import Flask
+
+    conn = _Conn([("A", "inserted"), ("B", "updated")])
+    invalidated = []
+    monkeypatch.setattr(admin_api, "Settings", lambda namespace: namespace)
+    monkeypatch.setattr(admin_api, "get_mem_engine", lambda settings: _Engine(conn))
+    monkeypatch.setattr(admin_api, "_invalidate_settings_caches", lambda: invalidated.append(True))
+    app = Flask(__name__)
+    app.register_blueprint(admin_api.admin_bp, url_prefix="/admin")
+
+    resp = app.test_client().post(
+        "/admin/settings/bulk",
+        json={"namespace": "dw::common", "settings": {"A": 1, "B": {"value": [1]}, "C": "same"}},
+    )
+
+    body = resp.get_json()
+    assert resp.status_code == 200
+    assert (body["changed"], body["inserted"], body["updated"], body["unchanged"]) == (["A", "B"], ["A"], ["B"], 1)
+    upserts = [params for stmt, params in conn.calls if stmt is admin_api._BULK_UPSERT_SQL]
+    assert len(upserts) == 1
+    assert upserts[0]["ns"] == "dw::common"
+    assert upserts[0]["keys"] == ["A", "B", "C"]
+    assert upserts[0]["vals"] == ["1", "[1]", '"same"']
+    assert invalidated == [True]
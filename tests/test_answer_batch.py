@@ -0,0 +1,104 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from apps.dw.answer_batch import BatchContext, current_batch, normalize_items, run_items
+
+
+class _Settings:
+    def __init__(self):
+        self.calls = 0
+
+    def _fetch(self, key, **kwargs):
+        self.calls += 1
+        return {"value": key.lower(), "value_type": "text"}
+
+    def get(self, key, default=None):
+        rec = self._fetch(key)
+        return rec["value"] if rec else default
+
+
+def test_normalize_items_merges_shared_keys():
+    items = normalize_items(
+        {"namespace": "dw::common", "questions": ["a ", {"question": "b", "namespace": "x"}], "stream": True}
+    )
+    assert items == [
+        {"namespace": "dw::common", "question": "a"},
+        {"namespace": "x", "question": "b"},
+    ]
+    with pytest.raises(ValueError):
+        normalize_items({"questions": "a"})
+
+
+def test_settings_snapshot_fetches_each_key_once():
+    settings = _Settings()
+    ctx = BatchContext(settings=settings)
+    try:
+        assert ctx.settings.get("DW_X") == "dw_x"
+        assert ctx.settings.get("DW_X") == "dw_x"
+        assert ctx.settings.get("DW_Y") == "dw_y"
+    finally:
+        ctx.close()
+    assert settings.calls == 2
+    assert ctx.stats()["settings_cache_hits"] == 1
+
+
+def test_identical_sql_runs_once_and_distinct_sql_is_bounded():
+    active = []
+    peak = []
+    lock = threading.Lock()
+    calls = []
+
+    def runner(sql, binds):
+        with lock:
+            calls.append(sql)
+            active.append(1)
+            peak.append(len(active))
+        time.sleep(0.02)
+        with lock:
+            active.pop()
+        return [[sql, binds.get("v")]], ["SQL", "V"], {"rows": 1}
+
+    ctx = BatchContext(db_workers=2)
+
+    def answer(item):
+        assert current_batch() is ctx
+        rows, cols, meta = ctx.execute(item["sql"], {"v": 1}, runner)
+        rows[0].append("mutated")
+        return 200, {"rows": rows, "shared": bool(meta.get("batch_shared"))}
+
+    items = [{"question": str(i), "sql": f"SELECT {i % 3} FROM dual"} for i in range(9)]
+    try:
+        results = list(run_items(items, answer, ctx, workers=9))
+    finally:
+        ctx.close()
+
+    assert sorted(calls) == ["SELECT 0 FROM dual", "SELECT 1 FROM dual", "SELECT 2 FROM dual"]
+    assert max(peak) <= 2
+    assert sorted(r["index"] for r in results) == list(range(9))
+    assert sum(r["response"]["shared"] for r in results) == 6
+    assert all(r["response"]["rows"] == [[items[r["index"]]["sql"], 1, "mutated"]] for r in results)
+    assert all(r["status"] == 200 and r["elapsed_ms"] >= 0 for r in results)
+    assert ctx.stats()["distinct_sql"] == 3
+
+
+def test_item_errors_are_reported_per_item():
+    ctx = BatchContext()
+
+    def answer(item):
+        if item["question"] == "bad":
+            raise RuntimeError("boom")
+        return 200, {"ok": True}
+
+    try:
+        results = sorted(run_items([{"question": "ok"}, {"question": "bad"}], answer, ctx), key=lambda r: r["index"])
+    finally:
+        ctx.close()
+    assert results[0]["status"] == 200
+    assert results[1]["status"] == 500 and results[1]["response"]["error"] == "boom"
+    assert current_batch() is None
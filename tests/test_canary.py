@@ -0,0 +1,87 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from apps.dw.canary import CanaryThresholds, load_thresholds, replay, rule_overrides, summarise  # noqa: E402
+
+
+def _plan(question, overrides):
+    sql = f"SELECT * FROM T WHERE q = '{question}'"
+    if overrides.get("wide") and question.startswith("wide"):
+        sql += " UNION ALL SELECT * FROM T"
+    return sql, {}
+
+
+def _execute_factory(slow_union_ms=0.0, union_rows=1000):
+    import time
+
+    def _execute(sql, _binds):
+        if "UNION ALL" in sql:
+            time.sleep(slow_union_ms / 1000)
+            return union_rows
+        time.sleep(0.002)
+        return 10
+
+    return _execute
+
+
+def test_unchanged_sql_is_not_executed():
+    calls = []
+    samples = replay(["a", "b"], _plan, lambda sql, b: calls.append(sql) or 1, {"wide": True})
+    assert calls == [] and not any(s.changed for s in samples)
+    assert summarise(samples, CanaryThresholds())["verdict"] == "no_coverage"
+
+
+def test_widened_rows_regress():
+    samples = replay(["wide one", "narrow"], _plan, _execute_factory(), {"wide": True}, repeats=1)
+    summary = summarise(samples, CanaryThresholds())
+    assert summary["changed"] == 1
+    assert summary["verdict"] == "regressed"
+    assert summary["rows_widened"] == ["wide one"]
+
+
+def test_latency_regression_needs_ratio_and_delta():
+    samples = replay(["wide a", "wide b"], _plan, _execute_factory(slow_union_ms=40, union_rows=10), {"wide": True},
+                     repeats=1)
+    loose = CanaryThresholds(min_delta_ms=1000)
+    assert summarise(samples, loose)["verdict"] == "pass"
+    strict = CanaryThresholds(min_delta_ms=5)
+    summary = summarise(samples, strict)
+    assert summary["verdict"] == "regressed" and summary["reasons"][0].startswith("latency_ratio")
+
+
+def test_candidate_errors_regress():
+    def _execute(sql, _binds):
+        if "UNION ALL" in sql:
+            raise RuntimeError("ORA-00904")
+        return 1
+
+    summary = summarise(replay(["wide x"], _plan, _execute, {"wide": True}, repeats=1), CanaryThresholds())
+    assert summary["verdict"] == "regressed" and summary["errors"][0]["error"] == "ORA-00904"
+
+
+def test_plan_failures_blame_only_the_failing_side():
+    def _plan_flaky(question, overrides):
+        if question == "broken" or (question == "fixed" and not overrides) or (question == "new rule" and overrides):
+            raise ValueError("no intent")
+        return _plan(question, overrides)
+
+    samples = replay(["broken", "fixed", "new rule"], _plan_flaky, _execute_factory(), {"wide": True}, repeats=1)
+    broken, fixed, new_rule = samples
+    assert broken.baseline_error == broken.candidate_error == "plan: no intent"
+    assert fixed.baseline_error == "plan: no intent" and fixed.candidate_error is None
+    assert new_rule.candidate_error == "plan: no intent" and new_rule.baseline_error is None
+    summary = summarise([broken, fixed], CanaryThresholds())
+    assert summary["verdict"] == "pass" and not summary["errors"]
+    assert summarise(samples, CanaryThresholds())["errors"] == [{"question": "new rule", "error": "plan: no intent"}]
+
+
+def test_overrides_and_thresholds(monkeypatch):
+    assert rule_overrides({"overrides": {"a": 1}, "note": "x"}) == {"a": 1}
+    assert rule_overrides({"a": 1}) == {"a": 1}
+    assert rule_overrides(None) == {}
+    monkeypatch.setenv("DW_CANARY_MAX_LATENCY_RATIO", "2")
+    monkeypatch.setenv("DW_CANARY_REPEATS", "3")
+    thresholds = load_thresholds({"DW_CANARY_REPLAY_LIMIT": "7"})
+    assert thresholds.max_latency_ratio == 2.0 and thresholds.repeats == 3 and thresholds.replay_limit == 7
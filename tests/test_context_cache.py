@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.context_cache import bump_context_version, get_context_snapshot
+
+
+def _builder(calls):
+    def build(namespace):
+        calls.append(namespace)
+        return {
+            "tables": [{"table_name": "Contract"}],
+            "columns": [
+                {"table_name": "Contract", "column_name": "REQUEST_DATE"},
+                {"table_name": "Contract", "column_name": "ENTITY"},
+            ],
+            "metrics": {"gross": {"metric_key": "gross", "calculation_sql": "SUM(x)"}},
+            "join_hints": [{"from": "a", "to": "b"}],
+        }
+
+    return build
+
+
+def test_snapshot_built_once_per_version():
+    calls = []
+    snap1 = get_context_snapshot("test::ctx", _builder(calls))
+    snap2 = get_context_snapshot("test::ctx", _builder(calls))
+    assert snap1 is snap2
+    assert calls == ["test::ctx"]
+    assert snap1.tables_text == "Contract"
+    assert snap1.columns_text == "Contract.ENTITY, Contract.REQUEST_DATE"
+
+    bump_context_version("test::ctx")
+    snap3 = get_context_snapshot("test::ctx", _builder(calls))
+    assert snap3 is not snap1
+    assert snap3.version > snap1.version
+    assert calls == ["test::ctx", "test::ctx"]
+
+
+def test_to_context_returns_mutable_copies():
+    snap = get_context_snapshot("test::ctx2", _builder([]))
+    ctx = snap.to_context()
+    ctx["tables"].append({"table_name": "Other"})
+    ctx["metrics"]["gross"]["calculation_sql"] = "changed"
+    fresh = snap.to_context()
+    assert fresh["tables"] == [{"table_name": "Contract"}]
+    assert fresh["metrics"]["gross"]["calculation_sql"] == "SUM(x)"
+    assert fresh["join_hints"] == [{"from": "a", "to": "b"}]
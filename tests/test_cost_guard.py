@@ -0,0 +1,107 @@
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core import cost_guard  # noqa: E402
+from core.cost_guard import GuardPolicy, PlanCache, PlanEstimate  # noqa: E402
+
+
+class _Provider:
+    def __init__(self, estimate):
+        self.estimate = estimate
+        self.calls = 0
+
+    def __call__(self, connection, sql):
+        self.calls += 1
+        return self.estimate
+
+
+@contextmanager
+def _connect():
+    yield object()
+
+
+SQL = 'SELECT * FROM "Contract" WHERE ENTITY = :e ORDER BY REQUEST_DATE DESC'
+
+
+def test_plans_are_cached_per_shape():
+    provider = _Provider(PlanEstimate(cost=10, cardinality=5))
+    policy = GuardPolicy(mode="enforce", max_cost=100, max_rows=1000)
+    cache = PlanCache()
+    first = cost_guard.check(SQL, _connect, policy, provider=provider, cache=cache)
+    second = cost_guard.check(SQL.replace(" ", "  "), _connect, policy, provider=provider, cache=cache)
+    assert first.action == second.action == "allow"
+    assert provider.calls == 1 and second.cached
+
+
+def test_cost_over_limit_is_rejected():
+    policy = GuardPolicy(mode="enforce", max_cost=100)
+    decision = cost_guard.check(SQL, _connect, policy, provider=_Provider(PlanEstimate(cost=5000)), cache=PlanCache())
+    assert decision.action == "reject"
+    with pytest.raises(cost_guard.CostGuardRejected):
+        cost_guard.enforce(decision)
+
+
+def test_unbounded_select_is_capped_and_aggregates_rejected():
+    policy = GuardPolicy(mode="enforce", max_rows=1000)
+    provider = _Provider(PlanEstimate(cost=50, cardinality=250000))
+    decision = cost_guard.check(SQL, _connect, policy, provider=provider, cache=PlanCache())
+    assert decision.action == "rewrite"
+    assert cost_guard.enforce(decision).endswith("ORDER BY REQUEST_DATE DESC FETCH FIRST 1000 ROWS ONLY")
+    grouped = 'SELECT ENTITY, COUNT(*) FROM "Contract" GROUP BY ENTITY'
+    assert cost_guard.check(grouped, _connect, policy, provider=provider, cache=PlanCache()).action == "reject"
+
+
+def test_warn_mode_and_unreadable_plan_allow():
+    warn = GuardPolicy(mode="warn", max_cost=1)
+    decision = cost_guard.check(SQL, _connect, warn, provider=_Provider(PlanEstimate(cost=99)), cache=PlanCache())
+    assert decision.action == "warn" and cost_guard.enforce(decision) == SQL
+
+    def broken(connection, sql):
+        raise RuntimeError("ORA-02402")
+
+    enforce = GuardPolicy(mode="enforce", max_cost=1)
+    assert cost_guard.check(SQL, _connect, enforce, provider=broken, cache=PlanCache()).action == "allow"
+
+
+def test_load_policy_and_timeout(monkeypatch):
+    monkeypatch.setenv("DW_COST_GUARD_MODE", "on")
+    monkeypatch.setenv("DW_SQL_CALL_TIMEOUT_MS", "1500")
+    policy = cost_guard.load_policy({"DW_COST_GUARD_MAX_ROWS": "2000"})
+    assert policy.mode == "enforce" and policy.max_rows == 2000 and policy.timeout_ms == 1500
+
+    class _Driver:
+        call_timeout = 0
+
+    class _Conn:
+        class dialect:
+            name = "oracle"
+
+        def __init__(self):
+            self.connection = type("Fairy", (), {"driver_connection": _Driver()})()
+
+    conn = _Conn()
+    driver = conn.connection.driver_connection
+    with cost_guard.call_timeout(conn, 1500):
+        assert driver.call_timeout == 1500
+    assert driver.call_timeout == 0
+
+
+def test_run_sql_loads_policy_from_given_settings(monkeypatch):
+    sqlalchemy = pytest.importorskip("sqlalchemy", minversion="1.4")
+    from core import sql_exec
+
+    seen = []
+
+    def _load_policy(settings=None):
+        seen.append(settings)
+        return GuardPolicy()
+
+    monkeypatch.setattr(cost_guard, "load_policy", _load_policy)
+    settings = {"DW_COST_GUARD_MODE": "enforce"}
+    result = sql_exec.run_sql(sqlalchemy.create_engine("sqlite://"), "SELECT 1 AS one", settings=settings)
+    assert result.ok and seen == [settings]
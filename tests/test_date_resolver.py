@@ -0,0 +1,140 @@
+import json
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import apps.dw.rate_dates as rate_dates  # noqa: E402
+import apps.dw.rate_time as rate_time  # noqa: E402
+from apps.dw import date_resolver  # noqa: E402
+from apps.dw.rate import date_windows  # noqa: E402
+from apps.dw.rate.date_windows import detect_date_window  # noqa: E402
+
+contracts = pytest.importorskip("apps.dw.tables.contracts")
+
+# Outputs of the four parsers recorded before they shared the resolver.
+GOLDEN = json.loads((Path(__file__).parent / "golden" / "date_windows.json").read_text(encoding="utf-8"))
+
+# Deliberate differences from the recorded behaviour:
+# * rate_time "between" used to raise IndexError (wrong group index);
+# * date_windows "last/next N years" raised ValueError on 29 February;
+# * rate_dates treated runs of spaces as different phrases.
+FIXED_ERRORS = {("parse_date_phrase", "IndexError"), ("detect_date_window", "ValueError"), ("build_date_clause", "ValueError")}
+SAME_AS = {("window_from_text", "last  3   months"): "last 3 months"}
+
+SETTINGS = {"DW_OVERLAP_REQUIRE_BOTH_DATES": 1, "DW_OVERLAP_STRICT": 1}
+
+
+def _enc(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return [_enc(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _enc(item) for key, item in value.items()}
+    return value
+
+
+def _window_from_text(text, today):
+    return rate_dates._window_from_text(text, today)
+
+
+def _detect_date_window(text, today):
+    win = detect_date_window(text, today=today)
+    return None if win is None else [win.kind, win.col, win.start, win.end, win.detected, win.suggested_order_by]
+
+
+def _parse_date_phrase(text, today):
+    return rate_time.parse_date_phrase(text, today=today)
+
+
+def _build_date_clause(text, today):
+    intent, sql, binds, debug = rate_dates.build_date_clause(text, SETTINGS)
+    head = None if intent is None else [
+        intent.mode, intent.column, intent.start, intent.end, intent.input_text, intent.order_by_override
+    ]
+    return [head, sql, binds, debug]
+
+
+def _parse_intent(text, today):
+    i = contracts.parse_intent(text, today=today)
+    return [i.window_kind, i.window_start, i.window_end, i.special, i.special_params, i.top_n]
+
+
+CALLS = {
+    "window_from_text": _window_from_text,
+    "detect_date_window": _detect_date_window,
+    "parse_date_phrase": _parse_date_phrase,
+    "build_date_clause": _build_date_clause,
+    "parse_intent": _parse_intent,
+}
+
+
+def _run(fn, text, today):
+    try:
+        return _enc(CALLS[fn](text, today))
+    except Exception as exc:
+        return {"error": type(exc).__name__}
+
+
+def test_parsers_match_recorded_outputs(monkeypatch):
+    # The recordings were made without the optional dateparser fallback.
+    for module in (date_resolver, rate_dates, rate_time, date_windows, contracts):
+        if hasattr(module, "dateparser"):
+            monkeypatch.setattr(module, "dateparser", None)
+    date_resolver._resolve_cached.cache_clear()
+    mismatches = []
+    for fn, day, text, expected in GOLDEN:
+        today = date.fromisoformat(day)
+        monkeypatch.setattr(rate_dates, "_today", lambda: today)
+        got = _run(fn, text, today)
+        if isinstance(expected, dict) and (fn, expected.get("error")) in FIXED_ERRORS:
+            assert got and "error" not in got, (fn, day, text, got)
+            continue
+        if (fn, text) in SAME_AS:
+            expected = _run(fn, SAME_AS[(fn, text)], today)
+        if got != expected:
+            mismatches.append((fn, day, text, expected, got))
+    date_resolver._resolve_cached.cache_clear()
+    assert not mismatches, mismatches[:5]
+
+
+def test_dateparser_fallback_is_relative_to_reference_date(monkeypatch):
+    seen = []
+
+    class _Dateparser:
+        @staticmethod
+        def parse(text, settings=None):
+            seen.append(settings)
+            return settings["RELATIVE_BASE"]
+
+    monkeypatch.setattr(date_resolver, "dateparser", _Dateparser)
+    today = date(2023, 6, 15)
+    assert date_resolver.parse_date_strict("yesterday", today) == today
+    assert date_resolver.parse_date_loose("yesterday", today) == today
+    assert seen[1]["DATE_ORDER"] == "DMY"
+
+
+def test_fixed_edge_cases():
+    leap = date(2024, 2, 29)
+    assert rate_time.parse_date_phrase("between 2024-03-01 and 2024-01-01", today=leap) == (
+        "BETWEEN", date(2024, 1, 1), date(2024, 3, 1)
+    )
+    win = detect_date_window("next 1 year", today=leap)
+    assert (win.start, win.end) == (leap, date(2025, 2, 28))
+
+
+def test_resolve_is_memoised_per_phrase_and_day():
+    date_resolver._resolve_cached.cache_clear()
+    today = date(2024, 5, 20)
+    first = date_resolver.resolve("Last ٣  Months", today, "date_windows")
+    assert first is date_resolver.resolve("last 3 months", today, "date_windows")
+    assert first.start == date(2024, 2, 20)
+    assert date_resolver.resolve("last 3 months", date(2024, 5, 21), "date_windows").end == date(2024, 5, 21)
+    info = date_resolver._resolve_cached.cache_info()
+    assert (info.hits, info.misses) == (1, 2)
+    with pytest.raises(ValueError):
+        date_resolver.resolve("last month", today, "nope")
@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from apps.dw.projection import display_columns, project_select
+
+SETTINGS = {"DW_DISPLAY_COLUMNS": ["CONTRACT_ID", "CONTRACT_SUBJECT", "REQUEST_DATE"]}
+
+
+def test_no_display_set_keeps_select_star():
+    sql = 'SELECT * FROM "Contract" ORDER BY REQUEST_DATE DESC'
+    assert project_select(sql, settings={}) == (sql, {})
+    assert project_select(sql, settings=None) == (sql, {})
+
+
+def test_projection_adds_filter_order_and_question_columns():
+    sql = (
+        'SELECT * FROM "Contract" WHERE UPPER(TRIM(ENTITY)) = :eq_0 '
+        "AND CONTRACT_SUBJECT LIKE '%OWNER_DEPARTMENT%' ORDER BY NVL(CONTRACT_VALUE_NET_OF_VAT,0) DESC"
+    )
+    projected, meta = project_select(sql, settings=SETTINGS, question="contracts by department oul")
+    assert projected.startswith(
+        'SELECT CONTRACT_ID, CONTRACT_SUBJECT, REQUEST_DATE, ENTITY, CONTRACT_VALUE_NET_OF_VAT, DEPARTMENT_OUL '
+        'FROM "Contract" WHERE'
+    )
+    assert projected.endswith(sql[len('SELECT * FROM "Contract"'):])
+    assert meta["projection"]["display"] == 3
+
+
+def test_explicit_requests_and_non_row_queries_are_untouched():
+    sql = 'SELECT * FROM "Contract"'
+    assert project_select(sql, settings=SETTINGS, question="show all columns for contracts")[0] == sql
+    assert project_select(sql, settings=SETTINGS, select_all=True)[0] == sql
+    grouped = 'SELECT ENTITY, COUNT(*) FROM "Contract" GROUP BY ENTITY'
+    assert project_select(grouped, settings=SETTINGS)[0] == grouped
+    joined = 'SELECT * FROM "Contract" c JOIN t ON t.ID = c.CONTRACT_ID'
+    assert project_select(joined, settings=SETTINGS)[0] == joined
+
+
+def test_display_columns_parses_setting_shapes():
+    assert display_columns({"DW_DISPLAY_COLUMNS": "contract_id, entity"}) == ["CONTRACT_ID", "ENTITY"]
+    assert display_columns({"DW_DISPLAY_COLUMNS": '["ENTITY", "bad name"]'}) == ["ENTITY"]
+
+
+def test_llm_prompt_uses_namespace_display_columns(monkeypatch):
+    from apps.dw import llm
+
+    prompts = []
+
+    class _Model:
+        def generate(self, prompt, **kwargs):
+            prompts.append(prompt)
+            return "```sql\nSELECT CONTRACT_ID FROM \"Contract\"\n```"
+
+    monkeypatch.setattr(llm, "get_model", lambda role: _Model())
+    monkeypatch.setattr(llm, "basic_checks", lambda sql, allowed_binds=None: {"ok": True, "errors": []})
+    ctx = {"settings": SETTINGS, "namespace": "dw::common", "allowed_columns": ["CONTRACT_ID"]}
+    llm.nl_to_sql_with_llm("list contracts", ctx, intent={"wants_all_columns": True})
+    assert "SELECT only: CONTRACT_ID, CONTRACT_SUBJECT, REQUEST_DATE plus" in prompts[0]
+    assert "display_columns" not in ctx
+
+    prompts.clear()
+    llm.nl_to_sql_with_llm("list contracts", {"settings": {}}, intent={"wants_all_columns": True})
+    assert "SELECT ALL columns (use SELECT *)" in prompts[0]
@@ -0,0 +1,108 @@
+import random
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from apps.dw.contracts import synonyms  # noqa: E402
+from apps.dw.contracts.synonyms import compiled_enum_synonyms, expand_enum_predicate  # noqa: E402
+
+
+def _legacy_expand(col, user_value, entry):
+    """The linear scan expand_enum_predicate used before compilation."""
+
+    uv = (user_value or "").strip()
+    uv_up = uv.upper()
+    bucket = None
+    for name, rules in entry.items():
+        if uv_up and uv_up in [s.upper() for s in rules.get("equals", []) if isinstance(s, str)]:
+            bucket = name
+            break
+    if bucket is None and uv_up:
+        for name, rules in entry.items():
+            if any(isinstance(p, str) and uv_up.startswith(p.upper()) for p in rules.get("prefix", []) or []):
+                bucket = name
+                break
+    if bucket is None and uv_up:
+        for name, rules in entry.items():
+            if any(isinstance(c, str) and c.upper() in uv_up for c in rules.get("contains", []) or []):
+                bucket = name
+                break
+    binds = {"v_like": f"%{uv}%"}
+    pieces = [f"UPPER({col}) LIKE UPPER(:v_like)"]
+    if bucket and bucket in entry:
+        rules = entry[bucket]
+        for i, s in enumerate([s for s in rules.get("equals", []) if isinstance(s, str) and s]):
+            pieces.append(f"UPPER({col}) = UPPER(:v_eq_{i})")
+            binds[f"v_eq_{i}"] = s
+        for j, p in enumerate([s for s in rules.get("prefix", []) if isinstance(s, str) and s]):
+            pieces.append(f"UPPER({col}) LIKE UPPER(:v_pref_{j})")
+            binds[f"v_pref_{j}"] = f"{p}%"
+    return "(" + " OR ".join(pieces) + ")", binds
+
+
+def _legacy_request_type(value, mapping):
+    norm = lambda vals: list(dict.fromkeys(v.strip().upper() for v in vals if isinstance(v, str) and v.strip()))  # noqa: E731
+    for key, rules in mapping.items():
+        all_equals = norm(rules.get("equals", [])) or [key.strip().upper()]
+        if value.upper() == key.upper() or value.upper() in all_equals:
+            return tuple(all_equals), tuple(norm(rules.get("prefix", []))), tuple(norm(rules.get("contains", [])))
+    return None
+
+
+WORDS = ["new", "renew", "renewal", "ext", "extension", "add", "addendum", "amend", "po", "purchase order", "x"]
+
+
+def _random_entry(rnd):
+    entry = {}
+    for b in range(rnd.randint(1, 5)):
+        entry[f"BUCKET_{b}"] = {
+            kind: [rnd.choice(WORDS).title() if rnd.random() < 0.5 else rnd.choice(WORDS) for _ in range(rnd.randint(0, 3))]
+            for kind in ("equals", "prefix", "contains")
+        }
+    return entry
+
+
+def test_compiled_matches_legacy_scan_on_random_configs():
+    rnd = random.Random(48)
+    for _ in range(300):
+        entry = _random_entry(rnd)
+        cfg = {"Contract.REQUEST_TYPE": entry}
+        for _ in range(10):
+            value = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(0, 2)))
+            if rnd.random() < 0.3:
+                value = f"  {value.upper()} "
+            got = expand_enum_predicate("Contract", "REQUEST_TYPE", value, lambda key, default=None: cfg)
+            assert got == _legacy_expand("REQUEST_TYPE", value, entry), (entry, value)
+            matcher = compiled_enum_synonyms(cfg, "Contract.REQUEST_TYPE")
+            for key in [value.strip()] + list(entry):
+                if key.strip():
+                    assert matcher.expansion(key.strip()) == _legacy_request_type(key.strip(), entry)
+
+
+def _request_type_cfg(*prefixes):
+    return {"Contract.REQUEST_TYPE": {"RENEWAL": {"equals": ["Renewal"], "prefix": ["Renew", *prefixes]}}}
+
+
+def test_compiled_matcher_is_rebuilt_only_when_settings_change(monkeypatch):
+    synonyms.invalidate_enum_synonyms()
+    cfg = _request_type_cfg()
+    first = compiled_enum_synonyms(cfg, "Contract.REQUEST_TYPE")
+    # Same loaded object: no comparison at all.
+    monkeypatch.setattr(synonyms, "CompiledEnumSynonyms", None)
+    assert compiled_enum_synonyms(cfg, "Contract.REQUEST_TYPE") is first
+    # A reload that produced equal settings reuses the matcher.
+    assert compiled_enum_synonyms(_request_type_cfg(), "Contract.REQUEST_TYPE") is first
+    monkeypatch.undo()
+    second = compiled_enum_synonyms(_request_type_cfg("Extens"), "Contract.REQUEST_TYPE")
+    assert second is not first and second.resolve("extension") == "RENEWAL"
+
+
+def test_invalidate_drops_matchers_for_in_place_edits():
+    synonyms.invalidate_enum_synonyms()
+    cfg = _request_type_cfg()
+    first = compiled_enum_synonyms(cfg, "Contract.REQUEST_TYPE")
+    cfg["Contract.REQUEST_TYPE"]["RENEWAL"]["prefix"].append("Extens")
+    synonyms.invalidate_enum_synonyms()
+    second = compiled_enum_synonyms(cfg, "Contract.REQUEST_TYPE")
+    assert second is not first and second.resolve("extension") == "RENEWAL"
@@ -0,0 +1,67 @@
+import gzip
+import json
+import sys
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core import fast_json
+
+ROW = ["C-1", date(2024, 1, 31), datetime(2024, 2, 1, 8, 30), Decimal("12.50"), Decimal("7"), b"x"]
+
+
+def _decoded(monkeypatch, backend):
+    if backend == "json":
+        monkeypatch.setattr(fast_json, "orjson", None)
+    return json.loads(fast_json.dumps({"rows": [ROW]}))
+
+
+def test_dumps_types_match_across_backends(monkeypatch):
+    expected = ["C-1", "2024-01-31", "2024-02-01T08:30:00", 12.5, 7, "x"]
+    if fast_json.orjson is not None:
+        assert _decoded(monkeypatch, "orjson")["rows"] == [expected]
+    assert _decoded(monkeypatch, "json")["rows"] == [expected]
+
+
+def test_columnar_transposes_and_keeps_duplicate_columns():
+    table = fast_json.columnar(["A", "B", "A"], [[1, 2, 3], [4, 5, 6]])
+    assert table == {"columns": ["A", "B", "A_2"], "data": {"A": [1, 4], "B": [2, 5], "A_2": [3, 6]}}
+    assert fast_json.columnar(["A"], []) == {"columns": ["A"], "data": {"A": []}}
+
+
+def test_fetch_columnar_reads_in_batches():
+    class _Result:
+        def __init__(self, rows):
+            self.rows = rows
+            self.calls = 0
+
+        def keys(self):
+            return ["ID", "NAME"]
+
+        def fetchmany(self, size):
+            self.calls += 1
+            batch, self.rows = self.rows[:size], self.rows[size:]
+            return batch
+
+    result = _Result([(i, f"n{i}") for i in range(5)])
+    table = fast_json.fetch_columnar(result, batch_size=2)
+    assert table["data"] == {"ID": [0, 1, 2, 3, 4], "NAME": ["n0", "n1", "n2", "n3", "n4"]}
+    assert result.calls == 4
+
+
+def test_encoding_negotiation_and_threshold(monkeypatch):
+    monkeypatch.setattr(fast_json, "brotli", None)
+    assert fast_json.negotiate_encoding("gzip, deflate") == "gzip"
+    assert fast_json.negotiate_encoding("gzip;q=0, identity") is None
+    assert fast_json.negotiate_encoding("*") == "gzip"
+    assert fast_json.negotiate_encoding(None) is None
+
+    payload = {"rows": [ROW] * 200}
+    body, headers = fast_json.encode_body(payload, "gzip")
+    assert headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(body))["rows"][0][0] == "C-1"
+
+    small, headers = fast_json.encode_body({"ok": True}, "gzip")
+    assert "Content-Encoding" not in headers and json.loads(small) == {"ok": True}
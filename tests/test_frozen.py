@@ -0,0 +1,81 @@
+import copy
+import json
+import pickle
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.frozen import FrozenDict, FrozenList, freeze, thaw, thaw_shallow  # noqa: E402
+
+
+def _intent():
+    return {
+        "eq_filters": [["ENTITY_NO", ["E-123"]], {"col": "DEPARTMENT", "val": "HR"}],
+        "fts_groups": [["alpha", "beta"]],
+        "explain_parts": ["Ordering: descending (top/highest)."],
+        "binds": {"date_start": date(2024, 1, 1)},
+        "_meta": {"segments": {}, "allowed_cols": ("ENTITY_NO",)},
+    }
+
+
+def test_freeze_keeps_dict_and_list_behaviour_for_readers():
+    frozen = freeze(_intent())
+    assert isinstance(frozen, dict) and isinstance(frozen["eq_filters"], list)
+    assert isinstance(frozen["eq_filters"][1], FrozenDict)
+    assert frozen == _intent()
+    assert json.loads(json.dumps(frozen, default=str))["eq_filters"][0] == ["ENTITY_NO", ["E-123"]]
+    assert frozen.setdefault("_meta") is frozen["_meta"]
+
+
+@pytest.mark.parametrize(
+    "mutate",
+    [
+        lambda i: i.__setitem__("x", 1),
+        lambda i: i.setdefault("x", []),
+        lambda i: i.update(x=1),
+        lambda i: i.pop("binds"),
+        lambda i: i["eq_filters"].append(["X", ["Y"]]),
+        lambda i: i["eq_filters"][1].__setitem__("col", "OTHER"),
+        lambda i: i["fts_groups"][0].extend(["gamma"]),
+        lambda i: i["explain_parts"].__iadd__(["more"]),
+    ],
+)
+def test_frozen_intent_rejects_mutation(mutate):
+    frozen = freeze(_intent())
+    with pytest.raises(TypeError):
+        mutate(frozen)
+    assert frozen == _intent()
+
+
+def test_freeze_shares_frozen_subtrees():
+    frozen = freeze(_intent())
+    assert freeze(frozen) is frozen
+    wrapped = freeze({"intent": frozen, "sql": "SELECT 1"})
+    assert wrapped["intent"] is frozen
+
+
+def test_thaw_and_copies_are_plain_mutable():
+    frozen = freeze(_intent())
+    for clone in (thaw(frozen), copy.deepcopy(frozen), pickle.loads(pickle.dumps(frozen))):
+        assert type(clone) is dict and type(clone["eq_filters"][1]) is dict
+        clone["eq_filters"].append(["X", ["Y"]])
+    assert type(copy.copy(frozen)) is dict
+    assert type(copy.copy(frozen["eq_filters"])) is list
+    assert len(frozen["eq_filters"]) == 2
+
+
+def test_thaw_shallow_only_copies_named_keys():
+    frozen = freeze(_intent())
+    working = thaw_shallow(frozen, "eq_filters")
+    working["eq_filters"][1]["col"] = "DEPT"
+    working["eq_filters"].append(["X", ["Y"]])
+    working["fts_groups"] = [["gamma"]]
+    assert frozen["eq_filters"][1]["col"] == "DEPARTMENT"
+    assert frozen["fts_groups"] == [["alpha", "beta"]]
+    assert working["_meta"] is frozen["_meta"] and working["binds"] is frozen["binds"]
+    assert isinstance(working["_meta"], FrozenDict) and isinstance(frozen["explain_parts"], FrozenList)
+
@@ -0,0 +1,145 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from api.scheduler import GenerationScheduler, Lane, QueueFull, QueueTimeout, Ticket
+
+
+def _lanes(depth=4, timeout=5.0):
+    return [
+        Lane(name="sql", priority=0, max_depth=depth, timeout_s=timeout),
+        Lane(name="chat", priority=2, max_depth=depth, timeout_s=timeout),
+    ]
+
+
+def test_sql_lane_served_before_chat():
+    sched = GenerationScheduler(_lanes())
+    order = []
+    gate = threading.Event()
+
+    def hold():
+        with sched.slot("chat"):
+            gate.wait(5)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    time.sleep(0.05)
+
+    def call(lane):
+        sched.run(lane, order.append, lane)
+
+    waiters = [threading.Thread(target=call, args=("chat",)), threading.Thread(target=call, args=("sql",))]
+    for t in waiters:
+        t.start()
+        time.sleep(0.05)
+    gate.set()
+    for t in [holder, *waiters]:
+        t.join(5)
+    assert order == ["sql", "chat"]
+
+
+def test_queue_depth_and_timeout():
+    sched = GenerationScheduler(_lanes(depth=1, timeout=0.1))
+    with sched.slot("sql"):
+        errors = []
+
+        def wait():
+            try:
+                sched.run("sql", lambda: None)
+            except QueueTimeout as exc:
+                errors.append(exc)
+
+        waiter = threading.Thread(target=wait)
+        waiter.start()
+        time.sleep(0.02)
+        with pytest.raises(QueueFull):
+            sched.run("sql", lambda: None)
+        waiter.join(5)
+    assert len(errors) == 1
+    stats = sched.stats()["lanes"]["sql"]
+    assert stats["rejected"] == 1 and stats["timed_out"] == 1
+
+
+def test_ticket_accumulates_timings():
+    sched = GenerationScheduler(_lanes())
+    ticket = Ticket(lane="sql")
+    sched.run("sql", time.sleep, 0.01, ticket=ticket)
+    sched.run("sql", time.sleep, 0.01, ticket=ticket)
+    timings = ticket.timings()
+    assert timings["gen_calls"] == 2
+    assert timings["gen_ms"] >= 20
+
+
+class _Pipeline:
+    """answer_question-shaped: one model call, then database work."""
+
+    def __init__(self, sched):
+        self.sched = sched
+        self.slot_free_during_sql = None
+
+    def refine(self, q):
+        return self.generate(q)
+
+    def generate(self, q):
+        return q.upper()
+
+    def answer(self, q):
+        sql = self.refine(q)
+        # Another request can take the only slot while this one "executes SQL".
+        with self.sched.slot("sql", timeout_s=0.5):
+            self.slot_free_during_sql = True
+        return sql
+
+
+def test_instrumented_methods_only_hold_slot_around_generation():
+    sched = GenerationScheduler(_lanes(), gpu_lock=threading.Lock())
+    pipeline = _Pipeline(sched)
+    sched.instrument(pipeline, "refine", "generate")
+    sched.instrument(pipeline, "refine", "generate")
+    assert pipeline.answer("unbound") == "UNBOUND"
+    assert sched.stats()["lanes"]["chat"]["served"] == 0
+
+    with sched.lane("chat") as ticket:
+        assert pipeline.answer("q") == "Q"
+    assert pipeline.slot_free_during_sql
+    # Nested refine -> generate takes one slot, not two (and does not deadlock).
+    assert ticket.timings()["gen_calls"] == 1
+    assert sched.stats()["lanes"]["chat"]["served"] == 1
+
+
+class _Analyzer:
+    def __init__(self):
+        self.holding = []
+
+    def analyze(self, sched):
+        self.holding.append(sched._holding.get())
+
+    def _private(self, sched):
+        self.holding.append(sched._holding.get())
+
+
+def test_instrument_without_names_gates_every_public_method():
+    sched = GenerationScheduler(_lanes())
+    analyzer = _Analyzer()
+    sched.instrument(analyzer)
+    with sched.lane("sql") as ticket:
+        analyzer.analyze(sched)
+        analyzer._private(sched)
+    assert analyzer.holding == [True, False]
+    assert ticket.timings()["gen_calls"] == 1
+
+
+def test_request_deadline_spans_slots():
+    lanes = [Lane(name="sql", priority=0, max_depth=4, timeout_s=5.0, deadline_s=0.05)]
+    sched = GenerationScheduler(lanes)
+    with sched.lane("sql") as ticket:
+        sched.run("sql", time.sleep, 0.06, ticket=ticket)
+        with pytest.raises(QueueTimeout):
+            sched.run("sql", lambda: None, ticket=ticket)
+    assert ticket.timings()["gen_calls"] == 1
+    assert sched.stats()["lanes"]["sql"]["timed_out"] == 1
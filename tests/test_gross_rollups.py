@@ -0,0 +1,160 @@
+import random
+import sqlite3
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from apps.dw import sql_builders  # noqa: E402
+from apps.dw.contracts.rollups import (  # noqa: E402
+    RollupConfig,
+    is_gross_measure,
+    month_aligned,
+    plan_grouped_gross,
+    plan_yoy_gross,
+    refresh_statements,
+    rollup_config,
+)
+
+GROSS = (
+    "NVL(CONTRACT_VALUE_NET_OF_VAT,0) + CASE WHEN NVL(VAT,0) BETWEEN 0 AND 1 "
+    "THEN NVL(CONTRACT_VALUE_NET_OF_VAT,0) * NVL(VAT,0) ELSE NVL(VAT,0) END"
+)
+
+
+def _db(rows=400, seed=3):
+    cx = sqlite3.connect(":memory:")
+    cx.create_function("NVL", 2, lambda a, b: b if a is None else a)
+    cx.create_function("TRUNC", 2, lambda d, _fmt: None if d is None else d[:8] + "01")
+    slots = ", ".join(f"CONTRACT_STAKEHOLDER_{i} TEXT" for i in range(1, 9))
+    cx.execute(
+        'CREATE TABLE "Contract" (CONTRACT_ID TEXT, REQUEST_DATE TEXT, START_DATE TEXT, END_DATE TEXT, '
+        "OWNER_DEPARTMENT TEXT, ENTITY TEXT, CONTRACT_STATUS TEXT, "
+        f"CONTRACT_VALUE_NET_OF_VAT REAL, VAT REAL, {slots})"
+    )
+    rng = random.Random(seed)
+    for idx in range(rows):
+        start = date(2022, 1, 1) + timedelta(days=rng.randint(0, 900))
+        end = start + timedelta(days=rng.randint(0, 500))
+        vat = rng.choice([None, 0.15, 0.05, 1500.0])
+        cx.execute(
+            'INSERT INTO "Contract" (CONTRACT_ID, REQUEST_DATE, START_DATE, END_DATE, OWNER_DEPARTMENT, '
+            "ENTITY, CONTRACT_STATUS, CONTRACT_VALUE_NET_OF_VAT, VAT, CONTRACT_STAKEHOLDER_1) "
+            "VALUES (?,?,?,?,?,?,?,?,?,?)",
+            (
+                f"C{idx}",
+                (start - timedelta(days=rng.randint(0, 60))).isoformat(),
+                start.isoformat() if rng.random() > 0.05 else None,
+                end.isoformat() if rng.random() > 0.05 else None,
+                rng.choice(["HR", "IT", "OPS"]),
+                rng.choice(["E1", "E2"]),
+                "Active",
+                rng.random() * 1000,
+                vat,
+                rng.choice(["Alpha", "Beta", None]),
+            ),
+        )
+    for table, cols in (
+        ("CONTRACT_GROSS_MONTHLY", "OWNER_DEPARTMENT TEXT, ENTITY TEXT, CONTRACT_STATUS TEXT"),
+        ("CONTRACT_GROSS_STAKEHOLDER_MONTHLY", "OWNER_DEPARTMENT TEXT, STAKEHOLDER TEXT"),
+    ):
+        cx.execute(
+            f"CREATE TABLE {table} (REQUEST_MONTH TEXT, START_MONTH TEXT, END_MONTH TEXT, {cols}, "
+            "CNT INT, NET REAL, GROSS REAL)"
+        )
+    for _, stmt in refresh_statements():
+        cx.execute(stmt)
+    return cx
+
+
+def _rounded(rows):
+    return sorted((key, round(total, 4), cnt) for key, total, cnt in rows)
+
+
+def test_rollup_config_and_alignment():
+    assert rollup_config({}) is None
+    assert rollup_config({"DW_GROSS_ROLLUP": True}) == RollupConfig()
+    assert rollup_config({"DW_GROSS_ROLLUP": {"enabled": True, "table": "bad name"}}) is None
+    assert month_aligned(date(2024, 1, 1), date(2024, 3, 31))
+    assert month_aligned("2024-02-01", "2024-02-29")
+    assert not month_aligned(date(2024, 1, 2), date(2024, 3, 31))
+    assert not month_aligned(date(2024, 1, 1), date(2024, 3, 30))
+    assert is_gross_measure(GROSS.replace(" + ", "+\n  "))
+    assert not is_gross_measure("NVL(CONTRACT_VALUE_NET_OF_VAT,0)")
+
+
+def test_unaligned_window_falls_back():
+    plan = plan_grouped_gross(
+        RollupConfig(), ["OWNER_DEPARTMENT"], date_column="OVERLAP",
+        date_start=date(2023, 1, 15), date_end=date(2023, 6, 30),
+    )
+    assert plan is None
+    assert plan_grouped_gross(
+        RollupConfig(), ["CONTRACT_OWNER"], date_column="OVERLAP",
+        date_start=date(2023, 1, 1), date_end=date(2023, 6, 30),
+    ) is None
+
+
+@pytest.mark.parametrize("strict", [False, True])
+def test_grouped_gross_matches_base_table(monkeypatch, strict):
+    monkeypatch.setattr(sql_builders, "STRICT_OVERLAP", strict)
+    cx = _db()
+    binds = {"date_start": "2023-01-01", "date_end": "2023-06-30"}
+    for date_column in ("OVERLAP", "REQUEST_DATE", "END_DATE"):
+        # The builder's own predicate, so NULL handling cannot drift.
+        base_where = sql_builders.window_predicate(date_column)
+        base = cx.execute(
+            f'SELECT OWNER_DEPARTMENT, SUM({GROSS}), COUNT(*) FROM "Contract" '
+            f"WHERE {base_where} GROUP BY OWNER_DEPARTMENT",
+            binds,
+        ).fetchall()
+        sql, plan_binds = plan_grouped_gross(
+            RollupConfig(), ["OWNER_DEPARTMENT"], date_column=date_column,
+            date_start=date(2023, 1, 1), date_end=date(2023, 6, 30),
+        )
+        assert "FETCH FIRST" not in sql
+        got = cx.execute(sql, {k: v.isoformat() for k, v in plan_binds.items()}).fetchall()
+        assert _rounded(got) == _rounded(base)
+
+
+def test_stakeholder_and_yoy_plans():
+    cx = _db()
+    sql, binds = plan_grouped_gross(
+        RollupConfig(), ["STAKEHOLDER"], date_column="OVERLAP",
+        date_start=date(2023, 1, 1), date_end=date(2023, 12, 31),
+        measure_alias="MEASURE", with_count=False,
+    )
+    assert "CONTRACT_GROSS_STAKEHOLDER_MONTHLY" in sql and "STAKEHOLDER IS NOT NULL" in sql
+    got = dict(cx.execute(sql, {k: v.isoformat() for k, v in binds.items()}).fetchall())
+    base = dict(cx.execute(
+        f'SELECT CONTRACT_STAKEHOLDER_1, SUM({GROSS}) FROM "Contract" '
+        f"WHERE CONTRACT_STAKEHOLDER_1 IS NOT NULL AND {sql_builders.overlap_predicate()} "
+        "GROUP BY CONTRACT_STAKEHOLDER_1",
+        {"date_start": "2023-01-01", "date_end": "2023-12-31"},
+    ).fetchall())
+    assert {k: round(v, 4) for k, v in got.items()} == {k: round(v, 4) for k, v in base.items()}
+
+    yoy = plan_yoy_gross(
+        RollupConfig(),
+        {"ds": date(2024, 1, 1), "de": date(2024, 3, 31), "p_ds": date(2023, 1, 1), "p_de": date(2023, 3, 31)},
+        date_column="REQUEST_DATE",
+    )
+    assert yoy is not None and "REQUEST_MONTH BETWEEN :p_ds AND :p_de" in yoy[0]
+    assert plan_yoy_gross(None, {}, date_column="OVERLAP") is None
+
+
+def test_incremental_refresh_equals_full_rebuild():
+    cx = _db()
+    full = cx.execute("SELECT * FROM CONTRACT_GROSS_MONTHLY ORDER BY 1,2,3,4,5,6").fetchall()
+    cx.execute("UPDATE \"Contract\" SET VAT = 0 WHERE END_DATE >= '2024-01-01'")
+    for _, stmt in refresh_statements(since=date(2024, 1, 1)):
+        cx.execute(stmt, {"since": "2024-01-01"})
+    incremental = cx.execute("SELECT * FROM CONTRACT_GROSS_MONTHLY ORDER BY 1,2,3,4,5,6").fetchall()
+    for _, stmt in refresh_statements():
+        cx.execute(stmt)
+    rebuilt = cx.execute("SELECT * FROM CONTRACT_GROSS_MONTHLY ORDER BY 1,2,3,4,5,6").fetchall()
+    assert incremental == rebuilt
+    assert incremental != full
@@ -0,0 +1,52 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from apps.dw.common.ci_columns import normalized_columns, wrap_ci_trim
+from apps.dw.index_advisor import analyse, recommend, scan_sql
+
+
+def test_scan_sql_counts_wrapped_predicates_once():
+    sql = (
+        'SELECT * FROM "Contract" WHERE UPPER(TRIM(ENTITY)) = UPPER(TRIM(:eq_0)) '
+        "AND UPPER(TRIM(REQUEST_TYPE)) LIKE UPPER(:rt_0) "
+        "AND UPPER(CONTRACT_STATUS) IN (:s0, :s1) "
+        "ORDER BY UPPER(TRIM(ENTITY))"
+    )
+    found = scan_sql(sql)
+    assert found["UPPER(TRIM(ENTITY))"] == ("ENTITY", "UPPER(TRIM())", 1, 0)
+    assert found["UPPER(TRIM(REQUEST_TYPE))"][3] == 1
+    assert found["UPPER(CONTRACT_STATUS)"][2] == 1
+    assert "TRIM(ENTITY)" not in found
+
+
+def test_recommend_emits_function_index_and_virtual_column():
+    statements = ["SELECT 1 FROM \"Contract\" WHERE UPPER(TRIM(ENTITY)) = UPPER(:e)"] * 6
+    statements += ["SELECT 1 FROM \"Contract\" WHERE UPPER(OWNER_DEPARTMENT) = UPPER(:d)"] * 2
+    recs = recommend(analyse(statements), total_queries=len(statements))
+    assert [r["expr"] for r in recs] == ["UPPER(TRIM(ENTITY))"]
+    rec = recs[0]
+    assert rec["function_index_ddl"] == 'CREATE INDEX CONTRACT_ENTITY_UT_FX ON "Contract" (UPPER(TRIM(ENTITY)))'
+    assert rec["virtual_column"] == "ENTITY_UT"
+    assert "GENERATED ALWAYS AS (UPPER(TRIM(ENTITY))) VIRTUAL" in rec["virtual_column_ddl"][0]
+
+
+def test_index_names_differ_per_expression_kind():
+    exprs = ["UPPER(TRIM(ENTITY))", "UPPER(ENTITY)", "TRIM(ENTITY)", "LOWER(ENTITY)"]
+    statements = [f'SELECT 1 FROM "Contract" WHERE {e} = :v' for e in exprs] * 5
+    recs = recommend(analyse(statements), total_queries=len(statements))
+    names = [r["function_index_ddl"].split()[2] for r in recs]
+    assert sorted(names) == ["CONTRACT_ENTITY_L_FX", "CONTRACT_ENTITY_T_FX", "CONTRACT_ENTITY_UT_FX", "CONTRACT_ENTITY_U_FX"]
+    long_col = "C" * 130
+    statements = [f"SELECT 1 FROM T WHERE {w}({long_col}) = :v" for w in ("UPPER", "LOWER")] * 5
+    names = [r["function_index_ddl"].split()[2] for r in recommend(analyse(statements), table="T")]
+    assert len(set(names)) == 2 and all(len(n) <= 128 for n in names)
+
+
+def test_normalized_columns_only_replace_ci_trim():
+    mapping = normalized_columns({"DW_NORMALIZED_COLUMNS": {"entity": "ENTITY_UT", "BAD": "x y"}})
+    assert mapping == {"ENTITY": "ENTITY_UT"}
+    assert wrap_ci_trim("ENTITY", ci=True, trim=True, mapping=mapping) == "ENTITY_UT"
+    assert wrap_ci_trim("ENTITY", ci=True, trim=False, mapping=mapping) == "UPPER(ENTITY)"
+    assert wrap_ci_trim("OWNER_DEPARTMENT", ci=True, trim=True, mapping=mapping) == "UPPER(TRIM(OWNER_DEPARTMENT))"
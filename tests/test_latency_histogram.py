@@ -0,0 +1,41 @@
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from apps.dw.latency_histogram import latency_bucket, percentile
+
+
+def _sorted_p(values, q):
+    # The rank rule list_metrics_summary used when it sorted every duration.
+    values = sorted(values)
+    return values[int(round(q * (len(values) - 1)))] if values else 0
+
+
+def test_bucket_keeps_three_significant_digits():
+    assert [latency_bucket(v) for v in (None, -5, 0, 7, 999, 1000, 1049, 9999, 123456)] == [
+        0, 0, 0, 7, 999, 1000, 1040, 9990, 123000,
+    ]
+
+
+def test_percentiles_match_the_sorted_scan():
+    rnd = random.Random(3)
+    fast = [rnd.randint(0, 999) for _ in range(5000)]
+    hist = Counter(latency_bucket(v) for v in fast)
+    for q in (0.5, 0.95, 0.99):
+        assert percentile(hist, q) == _sorted_p(fast, q)
+
+    mixed = [int(rnd.lognormvariate(7, 1.5)) for _ in range(20000)]
+    hist = Counter(latency_bucket(v) for v in mixed)
+    for q in (0.5, 0.95, 0.99):
+        exact = _sorted_p(mixed, q)
+        assert exact * 0.99 <= percentile(hist, q) <= exact
+    assert len(hist) < len(set(mixed))
+
+
+def test_percentile_of_empty_histogram():
+    assert percentile({}, 0.95) == 0
+    assert percentile([(10, 0)], 0.95) == 0
+    assert percentile([(10, 1)], 0.95) == 10
@@ -0,0 +1,72 @@
+import os
+import stat
+import sys
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.model_server import ModelServer, RemoteGenerator, StubGenerator, runtime_dir  # noqa: E402
+
+
+def test_remote_generator_shares_stub_backend(tmp_path):
+    stub = StubGenerator(response="SELECT COUNT(*) FROM \"Contract\"")
+    server = ModelServer(stub, address=str(tmp_path / "model.sock"), backend="stub").start()
+    try:
+        results = []
+
+        def worker():
+            client = RemoteGenerator(server.address, max_connections=2)
+            try:
+                results.append(client.generate("prompt", max_new_tokens=8, stop=["</s>"]))
+            finally:
+                client.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=10)
+
+        assert results == ['SELECT COUNT(*) FROM "Contract"'] * 4
+        assert stub.calls == 4
+        info = RemoteGenerator(server.address).info()
+        assert info["ok"] and info["stats"]["requests"] == 4
+    finally:
+        server.stop()
+
+
+def test_server_requires_generated_authkey(tmp_path, monkeypatch):
+    monkeypatch.delenv("MODEL_SERVER_AUTHKEY", raising=False)
+    server = ModelServer(StubGenerator(), address=str(tmp_path / "model.sock"), backend="stub").start()
+    try:
+        key_file = tmp_path / "model.sock.key"
+        assert stat.S_IMODE(key_file.stat().st_mode) == 0o600
+        with pytest.raises(AuthenticationError):
+            Client(server.address, family="AF_UNIX", authkey=b"wrong")
+        assert RemoteGenerator(server.address).info()["ok"]
+    finally:
+        server.stop()
+    assert not key_file.exists()
+
+
+def test_start_refuses_to_replace_non_socket(tmp_path):
+    target = tmp_path / "model.sock"
+    target.write_text("precious")
+    with pytest.raises(RuntimeError):
+        ModelServer(StubGenerator(), address=str(target)).start()
+    assert target.read_text() == "precious"
+
+
+def test_default_runtime_dir_is_private(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    path = runtime_dir()
+    assert path == os.path.join(str(tmp_path), "copilot")
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o700
+    os.chmod(path, 0o755)
+    with pytest.raises(RuntimeError):
+        runtime_dir()
@@ -0,0 +1,36 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core import model_loader
+from core.import_profile import parse_importtime, summarise
+
+
+def test_warm_up_async_reports_status(monkeypatch):
+    monkeypatch.setenv("MODEL_BACKEND", "off")
+    monkeypatch.setenv("CLARIFIER_MODEL_BACKEND", "off")
+    thread = model_loader.warm_up_async(["sql", "clarifier"])
+    thread.join(timeout=5)
+    status = model_loader.model_status()
+    assert status["sql"]["state"] == "disabled"
+    assert status["clarifier"]["state"] == "disabled"
+    assert model_loader.peek_model("sql") is None
+    assert not model_loader.is_loading("sql")
+
+
+def test_parse_importtime_summary():
+    stderr = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       100 |        100 |   json.decoder",
+            "import time:       300 |        400 | json",
+            "import time:      2000 |       2000 | apps.dw.app",
+        ]
+    )
+    rows = parse_importtime(stderr)
+    assert [r["module"] for r in rows] == ["json.decoder", "json", "apps.dw.app"]
+    assert rows[0]["depth"] == 1
+    summary = summarise(rows, top=2)
+    assert summary["slowest"][0]["module"] == "apps.dw.app"
+    assert summary["packages"][0] == {"package": "apps", "self_ms": 2.0}
@@ -0,0 +1,104 @@
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.outbox import Alert, FileTransport, MemoryTransport, OutboxDispatcher, build_message  # noqa: E402
+
+
+class _Store:
+    def __init__(self, alerts):
+        self.pending = list(alerts)
+        self.sent = []
+        self.failures = []
+
+    def claim(self, limit):
+        batch, self.pending = self.pending[:limit], self.pending[limit:]
+        return batch
+
+    def mark_sent(self, ids):
+        self.sent.extend(ids)
+
+    def mark_failed(self, alert_id, error, retry_in):
+        self.failures.append((alert_id, error, retry_in))
+
+
+class _FlakyTransport(MemoryTransport):
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+        self.closed = 0
+
+    def send(self, msg):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("relay down")
+        super().send(msg)
+
+    def close(self):
+        self.closed += 1
+
+
+def _alert(i, **kw):
+    kw.setdefault("payload", {"subject": f"s{i}", "body_text": "hello"})
+    return Alert(id=i, namespace="dw::common", event_type="x", recipient="a@example.com",
+                 created_at=datetime.utcnow() - timedelta(seconds=2), **kw)
+
+
+def test_build_message_uses_payload_then_default_recipients():
+    msg = build_message(_alert(1), mail_from="bot@example.com")
+    assert msg["To"] == "a@example.com" and msg["Subject"] == "s1"
+    alert = Alert(id=2, namespace="ns", event_type="evt", recipient=None, payload={"k": 1})
+    msg = build_message(alert, mail_from="bot@example.com", default_recipients=["ops@example.com"])
+    assert msg["To"] == "ops@example.com" and msg["Subject"] == "[ns] evt"
+
+
+def test_batch_reuses_one_transport():
+    store = _Store([_alert(i) for i in range(1, 6)])
+    made = []
+
+    def factory():
+        made.append(MemoryTransport())
+        return made[-1]
+
+    dispatcher = OutboxDispatcher(store, factory, mail_from="bot@example.com", batch_size=10)
+    result = dispatcher.drain_once()
+    assert result["sent"] == 5 and store.sent == [1, 2, 3, 4, 5]
+    assert len(made) == 1 and len(made[0].sent) == 5
+    assert dispatcher.stats()["delivery_latency_ms"]["p50"] >= 2000
+
+
+def test_aware_and_naive_created_at_are_both_marked_sent():
+    aware = _alert(1)
+    aware.created_at = datetime.now(timezone.utc) - timedelta(seconds=3)
+    store = _Store([aware, _alert(2)])
+    dispatcher = OutboxDispatcher(store, MemoryTransport, mail_from="bot@example.com", batch_size=10)
+    assert dispatcher.drain_once()["sent"] == 2 and store.sent == [1, 2]
+    assert dispatcher.stats()["delivery_latency_ms"]["p50"] >= 2000
+
+
+def test_failures_back_off_then_fail():
+    transport = _FlakyTransport(failures=2)
+    store = _Store([_alert(1), _alert(2, attempts=4)])
+    dispatcher = OutboxDispatcher(store, lambda: transport, mail_from="bot@example.com",
+                                  max_attempts=5, backoff_base=30, backoff_max=100)
+    result = dispatcher.drain_once()
+    assert result == {"claimed": 2, "sent": 0, "retried": 1, "failed": 1}
+    assert store.failures[0][2] == 30 and store.failures[1][2] is None
+    assert transport.closed == 2
+    assert dispatcher.backoff(3) == 100
+
+
+def test_missing_recipient_is_not_retried():
+    store = _Store([Alert(id=9, namespace="ns", event_type="e", recipient=None, payload={})])
+    dispatcher = OutboxDispatcher(store, MemoryTransport, mail_from="bot@example.com")
+    assert dispatcher.drain_once()["failed"] == 1
+    assert store.failures == [(9, "no recipients", None)]
+
+
+def test_file_transport_writes_eml(tmp_path):
+    transport = FileTransport(str(tmp_path / "out"))
+    transport.send(build_message(_alert(3), mail_from="bot@example.com"))
+    files = list((tmp_path / "out").glob("3-*.eml"))
+    assert len(files) == 1 and b"Subject: s3" in files[0].read_bytes()
@@ -0,0 +1,61 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from apps.dw.contracts.fts import _cut_tail_at_alias
+from apps.dw.nlp import lexer
+from apps.dw.nlp.lexer import AhoCorasick, lex, phrases_present
+
+ALIASES = {"DEPARTMENT": ["OWNER_DEPARTMENT"], "DEPARTMENTS": ["DEPARTMENT_1"], "REQUEST TYPE": ["REQUEST_TYPE"], "TYPE": ["X"]}
+
+
+def test_automaton_is_leftmost_longest_and_word_bounded():
+    ac = AhoCorasick([("he", 1), ("hers", 2), ("she", 3)])
+    assert ac.find("ushers hers") == [(7, 11, 2)]
+    assert [p for _, _, p in ac.find("she said he", overlapping=True)] == [3, 1]
+
+
+def test_token_stream_carries_alias_targets():
+    stream = lex("departments = IT or request type = renewals", ALIASES)
+    assert [(t.kind, t.text, t.value) for t in stream.of_kind("ALIAS")] == [
+        ("ALIAS", "departments", ("DEPARTMENT_1",)),
+        ("ALIAS", "request type", ("REQUEST_TYPE",)),
+    ]
+    assert stream.matched("ALIAS") == {"DEPARTMENTS", "REQUEST TYPE"}
+    assert lex("departments = IT", ALIASES) is lex("departments = IT", ALIASES)
+
+
+def test_typed_tokens_and_enum_synonyms():
+    enums = {"Contract.REQUEST_TYPE": {"Renewal": {"prefix": ["renew"], "equals": ["extension"]}}}
+    stream = lex("renewals since 2024-01-01 and VALUE >= 10k or owner a.b@x.com", ALIASES, enums)
+    assert [(t.kind, t.value) for t in stream] == [
+        ("ENUM", ("Contract.REQUEST_TYPE", "Renewal", "prefix")),
+        ("DATE", "2024-01-01"),
+        ("BOOL", "and"),
+        ("COMPARATOR", ">="),
+        ("NUMBER", 10000),
+        ("BOOL", "or"),
+        ("EMAIL", None),
+    ]
+    assert lex("contracts over 5 or not equal to 3").matched("COMPARATOR") == {"OVER", "EQUAL TO"}
+
+
+def test_lexicon_is_cached_by_mapping_identity(monkeypatch):
+    alias_map = {"DEPARTMENT": ["OWNER_DEPARTMENT"]}
+    first = lexer.build_lexicon(alias_map)
+    phrases_present("department = IT", ["DEPARTMENT"])
+    monkeypatch.setattr(lexer.json, "dumps", None)  # a fingerprint would now fail
+    assert lexer.build_lexicon(alias_map) is first
+    assert phrases_present("department = IT", ["DEPARTMENT"]) == {"DEPARTMENT"}
+
+
+def test_phrases_present_keeps_overlaps():
+    assert phrases_present("request type = renewal", list(ALIASES)) == {"REQUEST TYPE", "TYPE"}
+    assert phrases_present("departmental budget", list(ALIASES)) == set()
+
+
+def test_cut_tail_matches_previous_regex_behaviour():
+    assert _cut_tail_at_alias("home care and DEPARTMENT = IT", ["DEPARTMENT"]) == "home care "
+    assert _cut_tail_at_alias("home care and DEPARTMENT stuff", ["DEPARTMENT"]) == "home care and DEPARTMENT stuff"
+    assert _cut_tail_at_alias("nursing or request type like x", ["REQUEST TYPE"]) == "nursing "
@@ -0,0 +1,85 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from apps.dw import rate_dbexec  # noqa: E402
+
+
+class _Result:
+    def __init__(self, keys, rows):
+        self._keys = keys
+        self._rows = list(rows)
+
+    def keys(self):
+        return self._keys
+
+    def fetchmany(self, n):
+        batch, self._rows = self._rows[:n], self._rows[n:]
+        return batch
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+
+class _Engine:
+    def __init__(self, url, rows):
+        self.url = url
+        self.rows = rows
+        self.disposed = False
+
+    def connect(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, _sql, _binds=None):
+        return _Result(["A", "B"], self.rows)
+
+    def dispose(self):
+        self.disposed = True
+
+
+def _patch(monkeypatch, url_holder, rows):
+    built = []
+
+    def fake_create_engine(url, **_kw):
+        built.append(_Engine(url, rows))
+        return built[-1]
+
+    monkeypatch.setattr(rate_dbexec, "create_engine", fake_create_engine)
+    monkeypatch.setattr(rate_dbexec, "text", lambda sql: sql)
+    monkeypatch.setattr(rate_dbexec, "inspect", None)
+    monkeypatch.setattr(rate_dbexec, "get_setting", lambda key, **kw: url_holder[0])
+    rate_dbexec.reset_engine_cache()
+    return built
+
+
+def test_engine_reused_until_url_changes(monkeypatch):
+    url = ["oracle://one"]
+    built = _patch(monkeypatch, url, [(1, 2)])
+    for _ in range(3):
+        assert rate_dbexec.exec_sql_with_columns("SELECT 1", {}, "T") == (["A", "B"], [[1, 2]])
+    assert len(built) == 1
+    assert rate_dbexec.fetch_columns_fallback("T") == ["A", "B"]
+    url[0] = "oracle://two"
+    rate_dbexec.exec_sql_with_columns("SELECT 1", {}, "T")
+    assert len(built) == 2 and built[0].disposed
+    assert rate_dbexec._COLUMNS == {}
+
+
+def test_fetch_is_bounded(monkeypatch):
+    _patch(monkeypatch, ["oracle://one"], [(i, i) for i in range(1200)])
+    monkeypatch.delenv("DW_RATE_MAX_ROWS", raising=False)
+    _, rows = rate_dbexec.exec_sql_with_columns("SELECT 1", {}, "T")
+    assert len(rows) == 1200
+    monkeypatch.setenv("DW_RATE_MAX_ROWS", "1000")
+    _, rows = rate_dbexec.exec_sql_with_columns("SELECT 1", {}, "T")
+    assert len(rows) == 1000
+    monkeypatch.setenv("DW_RATE_MAX_ROWS", "0")
+    _, rows = rate_dbexec.exec_sql_with_columns("SELECT 1", {}, "T")
+    assert len(rows) == 1200
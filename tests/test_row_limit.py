@@ -0,0 +1,75 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from apps.dw import row_limit
+from apps.dw.row_limit import RowLimitPolicy, count_sql, is_unbounded_select, load_policy, plan
+
+SQL = """SELECT * FROM "Contract" WHERE ENTITY = 'A (b) ORDER BY x' ORDER BY REQUEST_DATE DESC"""
+
+
+def test_shape_detection_and_count_sql():
+    assert is_unbounded_select(SQL)
+    assert not is_unbounded_select(SQL + " FETCH FIRST :top_n ROWS ONLY")
+    assert not is_unbounded_select('SELECT OWNER_DEPARTMENT, COUNT(*) FROM "Contract" GROUP BY OWNER_DEPARTMENT')
+    assert not is_unbounded_select('SELECT SUM(CONTRACT_VALUE_NET_OF_VAT) AS TOTAL FROM "Contract"')
+    assert not is_unbounded_select("UPDATE t SET a = 1")
+    assert is_unbounded_select('SELECT * FROM "Contract" WHERE ID IN (SELECT ID FROM t FETCH FIRST 5 ROWS ONLY)')
+    assert count_sql(SQL) == (
+        "SELECT COUNT(*) AS TOTAL_ROWS FROM (\n"
+        """SELECT * FROM "Contract" WHERE ENTITY = 'A (b) ORDER BY x'\n)"""
+    )
+
+
+def test_load_policy_defaults_and_aliases(monkeypatch):
+    monkeypatch.delenv("DW_ROW_LIMIT_MODE", raising=False)
+    assert load_policy(None) == RowLimitPolicy()
+    policy = load_policy({"DW_ROW_LIMIT_MODE": "true", "DW_ROW_LIMIT_THRESHOLD": "50", "DW_ROW_LIMIT_PAGE_SIZE": -1})
+    assert (policy.mode, policy.threshold, policy.page_size) == ("count", 50, row_limit.DEFAULT_PAGE_SIZE)
+
+
+def test_small_results_run_unpaged_and_large_results_page():
+    policy = RowLimitPolicy(mode="count", threshold=100, page_size=40)
+    counted = []
+
+    def count(sql, binds):
+        counted.append((sql, dict(binds)))
+        return total
+
+    total = 80
+    sql, binds, meta = plan(SQL, {"x": 1}, policy, count_fn=count)
+    assert sql == SQL and binds == {"x": 1}
+    assert meta["row_limit"] == {"mode": "count", "limited": False, "total_rows": 80, "estimated": False}
+
+    total = 90_000
+    sql, binds, meta = plan(SQL, {"x": 1}, policy, count_fn=count)
+    info = meta["row_limit"]
+    assert sql.endswith("FETCH FIRST :rl_limit ROWS ONLY") and binds == {"x": 1, "rl_limit": 40}
+    assert info["total_rows"] == 90_000 and info["offset"] == 0 and info["ordered"]
+    assert counted[-1][1] == {"x": 1}
+
+    # The cursor pages forward without counting again.
+    counted.clear()
+    sql, binds, meta = plan(SQL, {"x": 1}, policy, count_fn=count, cursor=info["next_cursor"])
+    assert not counted
+    assert sql.endswith("OFFSET :rl_offset ROWS FETCH NEXT :rl_limit ROWS ONLY")
+    assert binds["rl_offset"] == 40 and meta["row_limit"]["total_rows"] == 90_000
+
+    # A cursor minted for different binds is ignored.
+    _, binds, meta = plan(SQL, {"x": 2}, policy, count_fn=count, cursor=info["next_cursor"])
+    assert meta["row_limit"]["cursor_ignored"] and "rl_offset" not in binds
+
+
+def test_estimates_and_failures():
+    policy = RowLimitPolicy(mode="explain", threshold=10, page_size=5)
+    _, _, meta = plan(SQL, {}, policy, count_fn=lambda s, b: 1 / 0, estimate_fn=lambda s: 12)
+    info = meta["row_limit"]
+    assert info["estimated"] and info["next_cursor"]
+    row_limit.finalize(meta, 3)
+    assert info["next_cursor"] is None and info["rows_returned"] == 3
+
+    sql, binds, meta = plan(SQL, {}, RowLimitPolicy(mode="count"), count_fn=lambda s, b: 1 / 0)
+    assert sql == SQL and "error" in meta["row_limit"]
+
+    assert plan(SQL, {}, RowLimitPolicy(), count_fn=lambda s, b: 1 / 0) == (SQL, {}, {})
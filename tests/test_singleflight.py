@@ -0,0 +1,101 @@
+import sys
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.singleflight import SingleFlight, canonical_key, canonical_sql
+
+
+def test_canonical_sql_keeps_literals_intact():
+    assert canonical_sql("SELECT  *\n FROM t  WHERE a = 'x  y' ;") == "SELECT * FROM t WHERE a = 'x  y'"
+    assert canonical_sql("select 1 from t where a='x y'") != canonical_sql("select 1 from t where a='x  y'")
+
+
+def test_canonical_key_separates_bind_types_and_scopes():
+    assert canonical_key("SELECT :d", {"d": "2024-01-01"}) != canonical_key("SELECT :d", {"d": date(2024, 1, 1)})
+    assert canonical_key("SELECT 1", scope="a") != canonical_key("SELECT 1", scope="b")
+    assert canonical_key("SELECT 1 ", {"a": 1, "b": 2}) == canonical_key("SELECT 1", {"b": 2, "a": 1})
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight("test", timeout=5)
+    calls = []
+    release = threading.Event()
+
+    def run():
+        calls.append(1)
+        release.wait(2)
+        return [[1, "a"]]
+
+    results = []
+
+    def worker():
+        results.append(flight.do("k", run, copy=lambda rows: [list(r) for r in rows]))
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for t in threads:
+        t.start()
+    while flight.stats()["calls"] < 5:
+        time.sleep(0.005)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert all(rows == [[1, "a"]] for rows, _ in results)
+    assert len({id(rows) for rows, _ in results}) == 5
+    stats = flight.stats()
+    assert stats["executions"] == 1 and stats["coalesced"] == 4 and stats["in_flight"] == 0
+
+    # Nothing is cached once the leader has finished.
+    flight.do("k", lambda: calls.append(1))
+    assert len(calls) == 2
+
+
+def test_waiters_time_out_and_errors_propagate():
+    flight = SingleFlight("slow", timeout=0.05)
+    release = threading.Event()
+    leader = threading.Thread(target=lambda: flight.do("k", lambda: release.wait(2)))
+    leader.start()
+    while flight.stats()["in_flight"] == 0:
+        time.sleep(0.005)
+    assert flight.do("k", lambda: "own") == ("own", False)
+    release.set()
+    leader.join()
+    assert flight.stats()["timeouts"] == 1
+
+    failing = SingleFlight("err", timeout=5)
+    gate = threading.Event()
+    errors = []
+
+    def boom():
+        gate.wait(2)
+        raise RuntimeError("ora-1")
+
+    def call():
+        try:
+            failing.do("k", boom)
+        except RuntimeError as exc:
+            errors.append(str(exc))
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for t in threads:
+        t.start()
+    while failing.stats()["calls"] < 3:
+        time.sleep(0.005)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert errors == ["ora-1"] * 3
+    assert failing.stats()["executions"] == 1
+
+
+def test_disabled_by_env(monkeypatch):
+    monkeypatch.setenv("SQL_SINGLEFLIGHT", "0")
+    flight = SingleFlight("off")
+    assert flight.do("k", lambda: 1) == (1, False)
+    assert flight.stats()["coalesced"] == 0
@@ -0,0 +1,81 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from apps.dw.contracts.slot_bridge import (
+    bridge_table,
+    exists_predicate,
+    refresh_statements,
+    slot_cte_sql,
+    slot_of,
+    split_slot_columns,
+)
+
+
+def _legacy_union(where: str) -> str:
+    parts = []
+    for idx in range(1, 9):
+        parts.append(
+            f"SELECT CONTRACT_STAKEHOLDER_{idx} AS STAKEHOLDER,\n"
+            "       NVL(CONTRACT_VALUE_NET_OF_VAT,0) AS NET,\n"
+            "       NVL(VAT,0) AS VAT\n"
+            '  FROM "Contract"\n'
+            f"  WHERE {where}"
+        )
+    return "\nUNION ALL\n".join(parts)
+
+
+def test_default_path_matches_legacy_union():
+    template = (
+        "{col} AS STAKEHOLDER,\n"
+        "       NVL(CONTRACT_VALUE_NET_OF_VAT,0) AS NET,\n"
+        "       NVL(VAT,0) AS VAT\n"
+    )
+    where = "START_DATE <= :date_end"
+    assert slot_cte_sql(None, "STAKEHOLDER", template, where, slots=8) == _legacy_union(where)
+
+
+def test_bridge_setting_parsing():
+    assert bridge_table({}) is None
+    assert bridge_table({"DW_SLOT_BRIDGE": True}) == "CONTRACT_SLOT_BRIDGE"
+    assert bridge_table({"DW_SLOT_BRIDGE": {"enabled": True, "table": "CSB"}}) == "CSB"
+    assert bridge_table({"DW_SLOT_BRIDGE": {"enabled": True, "table": "x; drop"}}) is None
+
+
+def test_slot_column_helpers():
+    assert slot_of("CONTRACT_STAKEHOLDER_3") == ("STAKEHOLDER", 3)
+    assert slot_of('"DEPARTMENT_8"') == ("DEPARTMENT", 8)
+    assert slot_of("DEPARTMENT_9") is None
+    slots, rest = split_slot_columns(["DEPARTMENT_1", "DEPARTMENT_2", "OWNER_DEPARTMENT"])
+    assert slots == {"DEPARTMENT": [1, 2]}
+    assert rest == ["OWNER_DEPARTMENT"]
+
+
+def test_bridge_predicates_match_slot_scan_on_sqlite():
+    cols = ", ".join(f"CONTRACT_STAKEHOLDER_{i} TEXT, DEPARTMENT_{i} TEXT" for i in range(1, 9))
+    cx = sqlite3.connect(":memory:")
+    cx.execute(f'CREATE TABLE "Contract" (CONTRACT_ID TEXT, {cols})')
+    cx.execute(
+        "CREATE TABLE CONTRACT_SLOT_BRIDGE (CONTRACT_ID TEXT, SLOT_KIND TEXT, SLOT_NO INT, "
+        "VALUE_NORM TEXT, VALUE_RAW TEXT)"
+    )
+    rows = [("C1", "Acme "), ("C2", None), ("C3", "beta")]
+    for cid, sh in rows:
+        cx.execute(
+            'INSERT INTO "Contract" (CONTRACT_ID, CONTRACT_STAKEHOLDER_4) VALUES (?, ?)', (cid, sh)
+        )
+    for stmt in refresh_statements()[1:]:
+        cx.execute(stmt)
+
+    pred = exists_predicate("CONTRACT_SLOT_BRIDGE", "STAKEHOLDER", ["v0"])
+    got = cx.execute(f'SELECT CONTRACT_ID FROM "Contract" WHERE {pred}', {"v0": "acme"}).fetchall()
+    assert got == [("C1",)]
+
+    like = exists_predicate("CONTRACT_SLOT_BRIDGE", "STAKEHOLDER", ["v0"], op="like")
+    got = cx.execute(f'SELECT CONTRACT_ID FROM "Contract" WHERE {like}', {"v0": "%ET%"}).fetchall()
+    assert got == [("C3",)]
+
+    src = slot_cte_sql("CONTRACT_SLOT_BRIDGE", "STAKEHOLDER", "{col} AS STAKEHOLDER\n", "1=1")
+    assert sorted(cx.execute(src).fetchall()) == [("Acme",), ("beta",)]